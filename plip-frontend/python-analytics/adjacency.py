@@ -0,0 +1,150 @@
+"""
+행정동 인접 그래프 (TopoJSON 공유 arc)
+
+TopoJSON은 이웃한 두 동의 경계선을 같은 arc 하나로 저장하므로, 동 x arc 사용 행렬 A에서
+A @ diag(arc 길이) @ A.T 를 구하면 동 쌍별 공유 경계 길이(km)가 나옵니다 (0이 아니면 이웃).
+
+    neighbors(code)            이웃 동과 공유 경계 길이
+    weights(codes, weighting)  임의 동 순서(예: 큐브 동 순서)에 맞춘 희소 가중치 행렬
+    spatial_lag(values, codes) 이웃 가중 평균 (결측 이웃 제외) - 파급(spillover) 특성
+    smooth(values, codes)      자기 값과 이웃 평균의 가중 평균 - 공간 평활
+
+그래프는 geometry.load_dong_geometry 결과(파일 수정 시각 단위 캐시)마다 한 번만 만듭니다.
+"""
+
+from typing import Any, Dict, List
+import threading
+
+import numpy as np
+
+from districts import DONG_TOPOJSON_PATH
+from geometry import DongGeometry, load_dong_geometry
+
+# 위도 1도 길이 (km)
+KM_PER_DEGREE = 111.32
+
+WEIGHTINGS = ('row', 'border', 'binary')
+
+
+def arc_lengths_km(arcs: List[np.ndarray]) -> np.ndarray:
+    """arc별 길이 (km, 위도 보정한 평면 근사)"""
+    lengths = np.empty(len(arcs))
+    for i, coords in enumerate(arcs):
+        d = np.diff(coords, axis=0)
+        lat = np.radians(coords[:-1, 1] + d[:, 1] / 2)
+        lengths[i] = np.hypot(d[:, 0] * np.cos(lat), d[:, 1]).sum() * KM_PER_DEGREE
+    return lengths
+
+
+class DongAdjacency:
+    """공유 arc 기반 행정동 인접 그래프
+
+    scipy.sparse는 임포트에 0.1초 넘게 걸려 main 기동을 늦추므로 그래프를 처음 만들 때 가져옵니다.
+    """
+
+    def __init__(self, geometry: DongGeometry):
+        from scipy import sparse
+
+        self.geometry = geometry
+        self.codes = geometry.codes
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+
+        rows, cols = [], []
+        for i, polygons in enumerate(geometry.arc_polygons):
+            arcs = {index if index >= 0 else ~index for polygon in polygons for ring in polygon for index in ring}
+            rows.extend([i] * len(arcs))
+            cols.extend(arcs)
+        incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                                      shape=(len(self.codes), len(geometry.arcs)))
+        self.arc_km = arc_lengths_km(geometry.arcs)
+        border = (incidence @ sparse.diags(self.arc_km) @ incidence.T).tolil()
+        border.setdiag(0)
+        self.border_km = border.tocsr()
+        self.border_km.eliminate_zeros()
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.border_km.nnz // 2)
+
+    def neighbors(self, dong_code: str) -> List[Dict[str, Any]]:
+        """이웃 동 목록 (공유 경계 길이 내림차순)"""
+        if dong_code not in self.code_index:
+            raise KeyError(f"행정동 경계에 없는 코드입니다: {dong_code}")
+        row = self.border_km.getrow(self.code_index[dong_code])
+        order = np.argsort(-row.data, kind='stable')
+        return [
+            {'dong_code': self.codes[j], 'dong_name': self.geometry.names[j],
+             'district_name': self.geometry.district_names[j], 'shared_border_km': round(float(row.data[k]), 3)}
+            for k, j in zip(order, row.indices[order])
+        ]
+
+    def weights(self, dong_codes: List[str], weighting: str = 'row') -> 'sparse.csr_matrix':
+        """dong_codes 순서의 (n, n) 인접 가중치 행렬. 경계에 없는 동은 이웃 없음
+
+        row: 행 합이 1 (이웃 단순 평균), border: 공유 경계 길이 비례로 행 정규화, binary: 0/1
+        """
+        from scipy import sparse
+
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"weighting은 {', '.join(WEIGHTINGS)} 중 하나여야 합니다.")
+        present = np.array([code in self.code_index for code in dong_codes], dtype=bool)
+        positions = np.flatnonzero(present)
+        geometry_rows = np.array([self.code_index[dong_codes[k]] for k in positions], dtype=int)
+        # 경계 행렬에서 요청한 동끼리의 부분 행렬만 꺼내 요청 순서로 재배치
+        sub = self.border_km[geometry_rows][:, geometry_rows].tocoo()
+        matrix = sparse.csr_matrix((sub.data, (positions[sub.row], positions[sub.col])),
+                                   shape=(len(dong_codes), len(dong_codes)))
+        if weighting != 'border':
+            matrix.data = np.ones_like(matrix.data)
+        if weighting in ('row', 'border'):
+            totals = np.asarray(matrix.sum(axis=1)).ravel()
+            matrix = sparse.diags(np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)) @ matrix
+        return matrix.tocsr()
+
+    def spatial_lag(self, values: np.ndarray, dong_codes: List[str], weighting: str = 'row') -> np.ndarray:
+        """(동, ...) 값의 이웃 가중 평균. 결측 이웃은 빼고 다시 정규화, 이웃이 없으면 NaN"""
+        values = np.asarray(values, dtype=np.float64)
+        flat = values.reshape(len(dong_codes), -1)
+        matrix = self.weights(dong_codes, weighting)
+        valid = ~np.isnan(flat)
+        totals = matrix @ np.where(valid, flat, 0)
+        weights = matrix @ valid.astype(np.float64)
+        lag = np.divide(totals, weights, out=np.full(totals.shape, np.nan), where=weights > 0)
+        return lag.reshape(values.shape)
+
+    def smooth(self, values: np.ndarray, dong_codes: List[str], alpha: float = 0.5,
+               weighting: str = 'row') -> np.ndarray:
+        """(1 - alpha) * 자기 값 + alpha * 이웃 평균 (이웃 값이 없으면 자기 값 유지)"""
+        values = np.asarray(values, dtype=np.float64)
+        lag = self.spatial_lag(values, dong_codes, weighting)
+        return np.where(np.isnan(lag), values, (1 - alpha) * values + alpha * lag)
+
+    def adjacency_list(self) -> Dict[str, List[str]]:
+        return {code: [self.codes[j] for j in self.border_km.getrow(i).indices] for i, code in enumerate(self.codes)}
+
+    def info(self) -> Dict[str, Any]:
+        degree = np.diff(self.border_km.indptr)
+        return {
+            'dongs': len(self.codes),
+            'edges': self.n_edges,
+            'mean_degree': round(float(degree.mean()), 2),
+            'max_degree': int(degree.max()),
+            'isolated': [self.codes[i] for i in np.flatnonzero(degree == 0)],
+            'topology_mtime': self.geometry.mtime
+        }
+
+
+_adjacency_cache: Dict[str, DongAdjacency] = {}
+_adjacency_lock = threading.Lock()
+
+
+def load_dong_adjacency(path: str = DONG_TOPOJSON_PATH) -> DongAdjacency:
+    """행정동 인접 그래프 (TopoJSON 파일이 바뀌었을 때만 다시 계산)"""
+    geometry = load_dong_geometry(path)
+    with _adjacency_lock:
+        cached = _adjacency_cache.get(path)
+        if cached is not None and cached.geometry is geometry:
+            return cached
+        adjacency = DongAdjacency(geometry)
+        _adjacency_cache[path] = adjacency
+        return adjacency
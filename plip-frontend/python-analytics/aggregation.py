@@ -0,0 +1,210 @@
+"""
+인구 큐브 group-by 집계
+
+상세 통계/비교 분석 페이지가 일별 원본 목록을 받아 브라우저에서 집계하던 작업을
+서버의 인구 큐브 위에서 벡터화된 축 축소(reduction)로 계산합니다.
+
+    차원(group_by): dong, date, weekday, hour, segment
+    측정값(measures): total, local, long, temp
+    집계(aggs): mean, sum, min, max, median, std, count
+    필터: dong_codes / district, start_date, end_date, hours, weekdays
+
+같은 질의(정규화한 형태)는 큐브 버전이 바뀌기 전까지 결과를 재사용합니다.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+import threading
+import warnings
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES, WEEKDAY_NAMES
+
+DIMENSIONS = ('dong', 'date', 'weekday', 'hour', 'segment')
+
+AGGREGATES = {
+    'mean': lambda a: np.nanmean(a, axis=-1, dtype=np.float64),
+    'sum': lambda a: np.nansum(a, axis=-1, dtype=np.float64),
+    'min': lambda a: np.nanmin(a, axis=-1),
+    'max': lambda a: np.nanmax(a, axis=-1),
+    'median': lambda a: np.nanmedian(a, axis=-1),
+    'std': lambda a: np.nanstd(a, axis=-1, dtype=np.float64),
+    'count': lambda a: np.count_nonzero(~np.isnan(a), axis=-1)
+}
+
+# 한 번에 돌려주는 최대 결과 행 수
+MAX_AGGREGATION_ROWS = 100000
+
+# 질의 결과 캐시 크기
+AGGREGATION_CACHE_SIZE = 256
+
+# 큐브 축 순서 (dong, date, hour, segment)
+_CUBE_AXES = ('dong', 'date', 'hour', 'segment')
+
+
+def normalize_query(data: Dict[str, Any], cube: PopulationCube, district_dongs=None) -> Tuple:
+    """요청을 검증하고 캐시 키로 쓸 수 있는 정규화된 튜플로 바꿉니다."""
+    group_by = tuple(dict.fromkeys(data.get('group_by') or []))
+    unknown = [d for d in group_by if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"지원하지 않는 차원입니다: {unknown} (가능: {', '.join(DIMENSIONS)})")
+
+    measures = tuple(dict.fromkeys(data.get('measures') or ['total']))
+    unknown = [m for m in measures if m not in MEASURE_NAMES]
+    if unknown:
+        raise ValueError(f"지원하지 않는 측정값입니다: {unknown} (가능: {', '.join(MEASURE_NAMES)})")
+
+    aggs = tuple(dict.fromkeys(data.get('aggs') or ['mean']))
+    unknown = [a for a in aggs if a not in AGGREGATES]
+    if unknown:
+        raise ValueError(f"지원하지 않는 집계입니다: {unknown} (가능: {', '.join(AGGREGATES)})")
+
+    if data.get('dong_codes'):
+        dong_codes = tuple(str(code) for code in data['dong_codes'])
+    elif district_dongs is not None:
+        dong_codes = tuple(code for code in district_dongs if code in cube)
+    else:
+        dong_codes = tuple(cube.dong_codes)
+    missing = [code for code in dong_codes if code not in cube]
+    if missing:
+        raise KeyError(f"큐브에 없는 동 코드입니다: {missing[:5]}")
+    if not dong_codes:
+        raise ValueError("집계할 동이 없습니다. 먼저 /cube/refresh로 큐브를 적재하세요.")
+
+    hours = tuple(sorted({int(h) for h in data.get('hours') or range(24)}))
+    weekdays = tuple(sorted({int(w) for w in data.get('weekdays') or range(7)}))
+    if any(h < 0 or h > 23 for h in hours):
+        raise ValueError("hours는 0~23 사이여야 합니다.")
+    if any(w < 0 or w > 6 for w in weekdays):
+        raise ValueError("weekdays는 0(월)~6(일) 사이여야 합니다.")
+
+    return (dong_codes, data.get('start_date'), data.get('end_date'), hours, weekdays, group_by, measures, aggs)
+
+
+def _cell(agg: str, value):
+    if np.isnan(value):
+        return None
+    return int(value) if agg == 'count' else float(value)
+
+
+def _reduce(block: np.ndarray, keep: List[str], aggs) -> Dict[str, np.ndarray]:
+    """keep 차원만 남기고 나머지 축을 하나로 펼쳐 집계합니다."""
+    kept_axes = [_CUBE_AXES.index(k) for k in keep]
+    other_axes = [i for i in range(block.ndim) if i not in kept_axes]
+    arranged = np.moveaxis(block, kept_axes + other_axes, list(range(block.ndim)))
+    flat = arranged.reshape(*[block.shape[i] for i in kept_axes], -1)
+    with warnings.catch_warnings():
+        # 모든 값이 결측인 그룹은 NaN으로 두고 경고는 숨김
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if flat.shape[-1] == 0:
+            return {agg: np.full(flat.shape[:-1], np.nan) for agg in aggs}
+        return {agg: AGGREGATES[agg](flat) for agg in aggs}
+
+
+def _response(query: Tuple, date_count: int, cells: int, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    dong_codes, _, _, _, _, group_by, measures, aggs = query
+    return {
+        'group_by': list(group_by),
+        'measures': list(measures),
+        'aggs': list(aggs),
+        'dong_count': len(dong_codes),
+        'date_count': date_count,
+        'cells': cells,
+        'rows': rows
+    }
+
+
+def run_aggregation(cube: PopulationCube, query: Tuple) -> Dict[str, Any]:
+    """정규화된 질의를 큐브에서 실행해 행 목록으로 돌려줍니다."""
+    dong_codes, start_date, end_date, hours, weekdays, group_by, measures, aggs = query
+
+    date_slice = cube.date_slice(start_date, end_date)
+    dates = cube.dates[date_slice]
+    day_of_week = cube.weekdays[date_slice]
+    date_mask = np.isin(day_of_week, weekdays)
+    dong_index = np.array([cube.dong_index(code) for code in dong_codes])
+    measure_index = [MEASURE_NAMES.index(m) for m in measures]
+
+    date_index = np.arange(date_slice.start, date_slice.stop)[date_mask]
+    if len(date_index) == 0:
+        # 기간/요일 필터에 맞는 날짜가 없으면 결측 값으로 채운 가짜 행 대신 빈 결과
+        return _response(query, 0, 0, [])
+    block = cube.values[np.ix_(dong_index, date_index, list(hours), measure_index)]
+    dates, day_of_week = dates[date_mask], day_of_week[date_mask]
+
+    # 측정값(segment) 축은 항상 남기고, segment로 그룹하지 않으면 측정값별 컬럼으로 펼침
+    segment_grouped = 'segment' in group_by
+    keep = [axis for axis in _CUBE_AXES if axis in group_by or axis == 'segment']
+    by_weekday = 'weekday' in group_by and 'date' not in group_by
+    if by_weekday:
+        # 요일별로 날짜 축을 나눠 각각 집계한 뒤 날짜 축 자리에 쌓음
+        present = [w for w in weekdays if (day_of_week == w).any()]
+        parts = [_reduce(block[:, day_of_week == w], keep, aggs) for w in present]
+        position = 1 if 'dong' in keep else 0
+        results = {agg: np.stack([p[agg] for p in parts], axis=position) for agg in aggs}
+        keep.insert(position, 'weekday')
+    else:
+        results = _reduce(block, keep, aggs)
+
+    labels = {
+        'dong': list(dong_codes),
+        'date': [str(d) for d in dates],
+        'hour': list(hours),
+        'segment': list(measures),
+        'weekday': [WEEKDAY_NAMES[w] for w in present] if by_weekday else None
+    }
+    shape = results[aggs[0]].shape
+    row_dims = keep if segment_grouped else keep[:-1]
+    row_shape = shape if segment_grouped else shape[:-1]
+    n_rows = int(np.prod(row_shape))
+    if n_rows > MAX_AGGREGATION_ROWS:
+        raise ValueError(f"결과 행이 너무 많습니다 ({n_rows:,}행). 최대 {MAX_AGGREGATION_ROWS:,}행까지 가능합니다.")
+
+    date_weekday = {str(d): WEEKDAY_NAMES[w] for d, w in zip(dates, day_of_week)}
+    rows = []
+    for index in np.ndindex(*row_shape) if n_rows else []:
+        row = {dim: labels[dim][i] for dim, i in zip(row_dims, index)}
+        if 'date' in row and 'weekday' in group_by:
+            row['weekday'] = date_weekday[row['date']]
+        for agg in aggs:
+            values = results[agg][index]
+            if segment_grouped:
+                row[agg] = _cell(agg, values)
+            else:
+                for measure, value in zip(measures, np.atleast_1d(values)):
+                    row[f"{measure}_{agg}"] = _cell(agg, value)
+        rows.append(row)
+
+    return _response(query, int(len(dates)), int(block.size), rows)
+
+
+class AggregationCache:
+    """(큐브, 큐브 버전, 정규화된 질의) 단위 LRU 결과 캐시"""
+
+    def __init__(self, maxsize: int = AGGREGATION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, cube: PopulationCube, query: Tuple) -> Tuple[Dict[str, Any], bool]:
+        key = (id(cube), cube.version, query)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], True
+        result = run_aggregation(cube, query)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = result
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else None}
@@ -0,0 +1,337 @@
+"""
+모든 동 일괄 이상치 / 변화점 탐지
+
+행사나 데이터 오류로 평소와 다르게 움직이는 동-시간을 찾기 위해 인구 큐브 전체를 한 번에 점수화합니다.
+
+    이상치:  같은 요일-시간의 직전 BASELINE_WEEKS주 값으로 만든 중앙값/MAD 기준 robust z-score
+            z = (값 - 중앙값) / (1.4826 * MAD),  |z| >= ANOMALY_THRESHOLD 이면 이상치
+    변화점:  일평균에서 동별 요일 중앙값을 뺀 잔차에 대해 PELT(가지치기 최적 분할)로 평균 수준 변화 탐지
+
+점수는 (동, 날짜, 시간) 배열로 보관해 동/날짜 범위로 바로 조회하고, 큐브 버전이 바뀌면
+바뀐 동의 "바뀐 날짜 ~ 그 뒤 BASELINE_WEEKS주" 구간만 다시 계산합니다 (기준선이 과거 값만 쓰기 때문).
+날짜 축이 늘어난 경우에는 새 날짜의 기준선과 변화점을 모든 동에 대해 다시 구해 전체 재계산과 같은 결과를 유지합니다.
+"""
+
+from typing import Any, Dict, List
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES, WEEKDAY_NAMES
+
+# 기준선에 쓰는 직전 같은 요일-시간 관측 주 수
+BASELINE_WEEKS = 8
+
+# 기준선을 만들 최소 관측 수 (부족하면 점수 없음)
+MIN_BASELINE_OBSERVATIONS = 4
+
+# 이상치 판단 기준 |z|
+ANOMALY_THRESHOLD = 4.0
+
+# 정규분포에서 MAD -> 표준편차 환산 계수
+MAD_SCALE = 1.4826
+
+# MAD가 0에 가까운 동/시간에서 z가 폭주하지 않도록 하는 최소 척도 (기준선 중앙값 대비 비율)
+MIN_SCALE_RATIO = 0.05
+
+# 한 번에 점수화하는 날짜 수 (메모리 사용량 제한)
+SCORE_CHUNK_DAYS = 120
+
+# 변화점 사이 최소 일수와 벌점 계수 (표준화 잔차 기준 penalty = 계수 * log(n))
+MIN_SEGMENT_DAYS = 7
+CHANGE_PENALTY_FACTOR = 8.0
+
+# 공휴일 같은 하루짜리 이상치가 변화점으로 잡히지 않도록 표준화 잔차를 자르는 한계
+RESIDUAL_CLIP = 3.0
+
+
+def _masked_median(stack: np.ndarray) -> np.ndarray:
+    """마지막 축 NaN 제외 중앙값 (정렬 후 관측 개수로 위치를 골라 작은 축에서 np.nanmedian보다 빠름)"""
+    ordered = np.sort(stack, axis=-1)                       # NaN은 뒤로 정렬됨
+    count = (~np.isnan(stack)).sum(axis=-1)
+    lo = np.maximum((count - 1) // 2, 0)[..., None]
+    hi = np.maximum(count // 2, 0)[..., None]
+    median = (np.take_along_axis(ordered, lo, -1) + np.take_along_axis(ordered, hi, -1))[..., 0] / 2
+    return np.where(count > 0, median, np.nan)
+
+
+def robust_scores(history: np.ndarray, n_target: int, weeks: int = BASELINE_WEEKS):
+    """(동, 날짜, 24) 이력의 마지막 n_target일에 대한 (z, 기준선 중앙값)
+
+    history는 대상 날짜 앞에 최대 weeks주 이력을 포함해야 합니다 (모자라면 NaN으로 채움).
+    """
+    lead = weeks * 7
+    missing = lead - (history.shape[1] - n_target)
+    if missing > 0:
+        pad = np.full((history.shape[0], missing, 24), np.nan, dtype=history.dtype)
+        history = np.concatenate([pad, history], axis=1)
+    history = history[:, history.shape[1] - n_target - lead:]
+
+    target = history[:, lead:]
+    lags = np.stack([history[:, lead - 7 * k:lead - 7 * k + n_target] for k in range(1, weeks + 1)], axis=-1)
+    observed = (~np.isnan(lags)).sum(axis=-1)
+    median = _masked_median(lags)
+    mad = _masked_median(np.abs(lags - median[..., None]))
+    scale = np.maximum(MAD_SCALE * mad, MIN_SCALE_RATIO * np.abs(median))
+    scale = np.maximum(scale, 1.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (target - median) / scale
+    z[observed < MIN_BASELINE_OBSERVATIONS] = np.nan
+    return z.astype(np.float32), median.astype(np.float32)
+
+
+def deseasonalized_daily(daily: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+    """(동, 날짜) 일평균에서 동별 요일 중앙값을 빼고 잡음 척도로 나눈 잔차 (결측은 0, ±RESIDUAL_CLIP로 자름)"""
+    residual = np.full(daily.shape, np.nan)
+    for w in range(7):
+        columns = weekdays == w
+        if columns.any():
+            block = daily[:, columns]
+            residual[:, columns] = block - _masked_median(block)[:, None]
+    # 1차 차분 MAD로 추정한 잡음 표준편차 (수준 변화에 덜 민감)
+    diffs = np.diff(residual, axis=1)
+    noise = MAD_SCALE * _masked_median(np.abs(diffs - _masked_median(diffs)[:, None])) / np.sqrt(2)
+    noise = np.where(np.isnan(noise) | (noise <= 0), 1.0, noise)
+    return np.clip(np.nan_to_num(residual / noise[:, None], nan=0.0), -RESIDUAL_CLIP, RESIDUAL_CLIP)
+
+
+def pelt_change_points(series: np.ndarray, penalty: float = None, min_size: int = MIN_SEGMENT_DAYS) -> List[List[int]]:
+    """(동, n) 표준화 시계열의 평균 변화점을 모든 동에 대해 동시에 찾습니다 (PELT, 가우시안 평균 비용).
+
+    각 t마다 후보 분할점 s 전체에 대한 비용을 (동, 후보) 배열로 한 번에 계산하고,
+    F[s] + cost(s, t) > F[t] 인 후보는 그 동에서 영구히 제외합니다.
+    모든 동에서 제외된 앞쪽 후보는 열 범위에서 빠지므로 계산량이 줄어듭니다.
+    """
+    n_series, n = series.shape
+    if penalty is None:
+        penalty = CHANGE_PENALTY_FACTOR * np.log(max(n, 2))
+    if n < 2 * min_size:
+        return [[] for _ in range(n_series)]
+
+    s1 = np.zeros((n_series, n + 1))
+    s2 = np.zeros((n_series, n + 1))
+    np.cumsum(series, axis=1, out=s1[:, 1:])
+    np.cumsum(series ** 2, axis=1, out=s2[:, 1:])
+
+    F = np.full((n_series, n + 1), np.inf)
+    F[:, 0] = -penalty
+    last = np.zeros((n_series, n + 1), dtype=np.int32)
+    admissible = np.zeros((n_series, n + 1), dtype=bool)
+    admissible[:, 0] = True
+    first = 0
+
+    for t in range(min_size, n + 1):
+        # 길이 min_size를 막 채운 분할점 t - min_size를 후보에 추가
+        if t - min_size >= min_size:
+            admissible[:, t - min_size] = True
+        stop = t - min_size + 1
+        s = np.arange(first, stop)
+        length = t - s
+        cost = (s2[:, t:t + 1] - s2[:, first:stop]) - (s1[:, t:t + 1] - s1[:, first:stop]) ** 2 / length
+        total = np.where(admissible[:, first:stop], F[:, first:stop] + cost, np.inf)
+        best = total.argmin(axis=1)
+        F[:, t] = total[np.arange(n_series), best] + penalty
+        last[:, t] = s[best]
+        # PELT 가지치기
+        admissible[:, first:stop] &= total <= F[:, t:t + 1]
+        while first < stop and not admissible[:, first].any():
+            first += 1
+
+    results = []
+    for i in range(n_series):
+        points = []
+        t = n
+        while t > 0:
+            t = int(last[i, t])
+            if t > 0:
+                points.append(t)
+        results.append(sorted(points))
+    return results
+
+
+class AnomalyIndex:
+    """측정값별 이상치 점수 / 변화점 색인 (큐브 버전 단위로 증분 갱신)"""
+
+    def __init__(self, threshold: float = ANOMALY_THRESHOLD, weeks: int = BASELINE_WEEKS):
+        self.threshold = threshold
+        self.weeks = weeks
+        self._lock = threading.Lock()
+        # measure -> 색인 상태
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    def _score_rows(self, cube: PopulationCube, m: int, rows: np.ndarray, first_date: int,
+                    scores: np.ndarray, baseline: np.ndarray):
+        """rows 동의 first_date 이후 날짜를 청크 단위로 점수화해 scores/baseline에 씁니다."""
+        for start in range(first_date, cube.n_dates, SCORE_CHUNK_DAYS):
+            stop = min(start + SCORE_CHUNK_DAYS, cube.n_dates)
+            lo = max(start - self.weeks * 7, 0)
+            history = np.asarray(cube.values[rows, lo:stop, :, m], dtype=np.float32)
+            z, median = robust_scores(history, stop - start, self.weeks)
+            scores[rows, start:stop] = z
+            baseline[rows, start:stop] = median
+
+    def _change_points(self, cube: PopulationCube, m: int, rows: np.ndarray) -> List[List[int]]:
+        daily = cube.daily_means()[rows, :, m]
+        return pelt_change_points(deseasonalized_daily(daily, cube.weekdays))
+
+    def refresh(self, cube: PopulationCube, measure: str = 'total') -> Dict[str, Any]:
+        """큐브의 현재 버전까지 색인을 갱신합니다 (가능하면 바뀐 동/날짜만)."""
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        with self._lock:
+            state = self._states.get(measure)
+            if state is not None and state['cube_id'] == id(cube) and state['version'] == cube.version:
+                return state['last_refresh']
+
+            start = time.perf_counter()
+            m = MEASURE_NAMES.index(measure)
+            shape = (cube.n_dongs, cube.n_dates, 24)
+            reusable = (state is not None and state['cube_id'] == id(cube) and state['start_date'] == cube.start_date)
+            if reusable:
+                changed, first_date = cube.changes_since(state['version'])
+                old_dongs, old_dates = state['scores'].shape[:2]
+                rows = np.union1d(changed, np.arange(old_dongs, cube.n_dongs)).astype(int)
+                first_date = min(first_date, old_dates)
+                scores = np.full(shape, np.nan, dtype=np.float32)
+                baseline = np.full(shape, np.nan, dtype=np.float32)
+                scores[:old_dongs, :old_dates] = state['scores']
+                baseline[:old_dongs, :old_dates] = state['baseline']
+                change_points = state['change_points'] + [[] for _ in range(cube.n_dongs - old_dongs)]
+                # 날짜가 늘면 바뀌지 않은 동도 새 날짜의 기준선과 (시계열 길이가 달라진) 변화점을 다시 계산
+                grown_from = old_dates if cube.n_dates > old_dates else None
+                mode = 'incremental'
+            else:
+                rows = np.arange(cube.n_dongs)
+                first_date = 0
+                grown_from = None
+                scores = np.full(shape, np.nan, dtype=np.float32)
+                baseline = np.full(shape, np.nan, dtype=np.float32)
+                change_points = [[] for _ in range(cube.n_dongs)]
+                mode = 'full'
+
+            if len(rows) and not cube.is_empty:
+                self._score_rows(cube, m, rows, first_date, scores, baseline)
+            point_rows = rows
+            if grown_from is not None:
+                self._score_rows(cube, m, np.setdiff1d(np.arange(cube.n_dongs), rows), grown_from, scores, baseline)
+                point_rows = np.arange(cube.n_dongs)
+            if len(point_rows) and not cube.is_empty:
+                for i, points in zip(point_rows, self._change_points(cube, m, point_rows)):
+                    change_points[i] = points
+
+            info = {
+                'measure': measure,
+                'mode': mode,
+                'cube_version': cube.version,
+                'rescored_dongs': int(len(rows)),
+                'rescored_from': str(cube.dates[first_date]) if len(rows) and first_date < cube.n_dates else None,
+                'elapsed_seconds': time.perf_counter() - start
+            }
+            self._states[measure] = {
+                'cube_id': id(cube), 'version': cube.version, 'start_date': cube.start_date,
+                'scores': scores, 'baseline': baseline, 'change_points': change_points, 'last_refresh': info
+            }
+            return info
+
+    def anomalies(self, cube: PopulationCube, dong_codes: List[str] = None, start_date=None, end_date=None,
+                  measure: str = 'total', min_score: float = None, limit: int = 100,
+                  names: Dict[str, str] = None) -> Dict[str, Any]:
+        """동/날짜 범위의 이상치 (|z| 내림차순)와 동별 요약"""
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        self.refresh(cube, measure)
+        state = self._states[measure]
+        min_score = self.threshold if min_score is None else float(min_score)
+        names = names or {}
+
+        rows = np.arange(cube.n_dongs) if dong_codes is None else np.array(
+            [cube.dong_index(code) for code in dong_codes], dtype=int)
+        date_slice = cube.date_slice(start_date, end_date)
+        z = state['scores'][rows, date_slice]
+        hits = np.abs(z) >= min_score                          # NaN은 False
+        r, d, h = np.nonzero(hits)
+        magnitude = np.abs(z[r, d, h])
+        if len(magnitude) > limit:
+            keep = np.argpartition(-magnitude, limit - 1)[:limit]
+        else:
+            keep = np.arange(len(magnitude))
+        keep = keep[np.argsort(-magnitude[keep], kind='stable')]
+
+        m = MEASURE_NAMES.index(measure)
+        dates = cube.dates[date_slice]
+        day_of_week = cube.weekdays[date_slice]
+        records = []
+        for j in keep:
+            i, day, hour = rows[r[j]], date_slice.start + d[j], h[j]
+            score = float(z[r[j], d[j], hour])
+            records.append({
+                'dong_code': cube.dong_codes[i],
+                'dong_name': names.get(cube.dong_codes[i]),
+                'date': str(dates[d[j]]),
+                'weekday': WEEKDAY_NAMES[day_of_week[d[j]]],
+                'hour': int(hour),
+                'value': round(float(cube.values[i, day, hour, m]), 1),
+                'expected': round(float(state['baseline'][i, day, hour]), 1),
+                'score': round(score, 2),
+                'direction': 'spike' if score > 0 else 'drop'
+            })
+
+        per_dong = hits.sum(axis=(1, 2))
+        with warnings.catch_warnings():
+            # 이상치가 없는 동은 모두 NaN (요약에서 제외)
+            warnings.simplefilter('ignore', RuntimeWarning)
+            max_score = np.nanmax(np.where(hits, np.abs(z), np.nan), axis=(1, 2)) if hits.any() else None
+        summary = [
+            {'dong_code': cube.dong_codes[rows[k]], 'dong_name': names.get(cube.dong_codes[rows[k]]),
+             'anomalies': int(per_dong[k]), 'max_score': round(float(max_score[k]), 2)}
+            for k in np.argsort(-per_dong, kind='stable') if per_dong[k] > 0
+        ]
+        return {
+            'measure': measure,
+            'threshold': min_score,
+            'start_date': str(dates[0]) if len(dates) else None,
+            'end_date': str(dates[-1]) if len(dates) else None,
+            'total_anomalies': int(len(magnitude)),
+            'anomalies': records,
+            'by_dong': summary
+        }
+
+    def change_points(self, cube: PopulationCube, dong_codes: List[str] = None, start_date=None, end_date=None,
+                      measure: str = 'total', names: Dict[str, str] = None) -> Dict[str, Any]:
+        """동별 일평균 수준 변화점과 변화 전/후 평균"""
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        self.refresh(cube, measure)
+        state = self._states[measure]
+        names = names or {}
+        rows = range(cube.n_dongs) if dong_codes is None else [cube.dong_index(code) for code in dong_codes]
+        date_slice = cube.date_slice(start_date, end_date)
+        daily = cube.daily_means()[:, :, MEASURE_NAMES.index(measure)]
+
+        result = []
+        for i in rows:
+            bounds = [0] + state['change_points'][i] + [cube.n_dates]
+            points = []
+            for k in range(1, len(bounds) - 1):
+                if not date_slice.start <= bounds[k] < date_slice.stop:
+                    continue
+                with np.errstate(invalid='ignore'):
+                    before = np.nanmean(daily[i, bounds[k - 1]:bounds[k]])
+                    after = np.nanmean(daily[i, bounds[k]:bounds[k + 1]])
+                if np.isnan(before) or np.isnan(after):
+                    continue
+                points.append({
+                    'date': str(cube.dates[bounds[k]]),
+                    'before_mean': round(float(before), 1),
+                    'after_mean': round(float(after), 1),
+                    'change_percent': round(float((after - before) / before * 100), 2) if before else None
+                })
+            if points or dong_codes is not None:
+                result.append({'dong_code': cube.dong_codes[i], 'dong_name': names.get(cube.dong_codes[i]),
+                               'change_points': points})
+        return {'measure': measure, 'dongs': result}
+
+    def stats(self) -> Dict[str, Any]:
+        return {measure: state['last_refresh'] for measure, state in self._states.items()}
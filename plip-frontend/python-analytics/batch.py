@@ -0,0 +1,143 @@
+"""
+여러 동 x 여러 날짜 배치 예측
+
+비교/즐겨찾기 페이지가 동 x 날짜마다 보내던 예측 요청을 한 번에 처리합니다.
+요청을 모델(동) 단위로 묶어 동마다 future 프레임을 하나만 만들고,
+동 그룹들은 샤딩 워커 풀에서 동시에 실행합니다.
+"""
+
+from typing import Any, Dict, List
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+# 한 번의 배치에서 허용하는 최대 예측 시점 수
+MAX_BATCH_FORECASTS = 50000
+
+# 요청 하나에서 허용하는 최대 기간 (일)
+MAX_BATCH_DAYS = 30
+
+
+def parse_batch_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """요청 항목을 검증하고 (dong_code, district, dates, hours) 형태로 정규화합니다."""
+    parsed = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"{i}번째 요청이 객체가 아닙니다.")
+        dong_code = str(item.get('dong_code') or item.get('dongCode') or '')
+        if not dong_code:
+            raise ValueError(f"{i}번째 요청에 dong_code가 없습니다.")
+
+        if not (item.get('start_date') or item.get('date')):
+            raise ValueError(f"{i}번째 요청에 start_date(또는 date)가 없습니다.")
+        start = pd.to_datetime(item.get('start_date') or item.get('date'))
+        end = pd.to_datetime(item.get('end_date') or start)
+        if end < start:
+            raise ValueError(f"{i}번째 요청의 end_date가 start_date보다 빠릅니다.")
+        dates = pd.date_range(start.normalize(), end.normalize(), freq='D')
+        if len(dates) > MAX_BATCH_DAYS:
+            raise ValueError(f"{i}번째 요청의 기간이 너무 깁니다. 최대 {MAX_BATCH_DAYS}일까지 가능합니다.")
+
+        hours = item.get('hours') or list(range(24))
+        if not isinstance(hours, list) or any(isinstance(h, bool) or not isinstance(h, (int, np.integer)) for h in hours):
+            raise ValueError(f"{i}번째 요청의 hours는 정수 목록이어야 합니다.")
+        if any(h < 0 or h > 23 for h in hours):
+            raise ValueError(f"{i}번째 요청의 hours는 0~23 사이여야 합니다.")
+
+        parsed.append({
+            'dong_code': dong_code,
+            'district': item.get('district'),
+            'dates': dates,
+            'hours': np.asarray(sorted(set(hours)), dtype=int)
+        })
+    return parsed
+
+
+def group_by_model(parsed: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """동(모델)별로 요청을 묶고 필요한 타임스탬프의 합집합을 만듭니다.
+
+    동 모델은 하나이므로 같은 동 요청의 district가 서로 다르면 ValueError (생략한 요청은 다른 요청 값을 따름)
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for index, item in enumerate(parsed):
+        grid = (item['dates'].values[:, None] + item['hours'][None, :].astype('timedelta64[h]')).ravel()
+        group = groups.setdefault(item['dong_code'], {'district': None, 'members': [], 'grids': []})
+        if item['district']:
+            if group['district'] and group['district'] != item['district']:
+                raise ValueError(f"{item['dong_code']} 요청들의 district가 서로 다릅니다: "
+                                 f"{group['district']}, {item['district']}")
+            group['district'] = item['district']
+        group['members'].append(index)
+        group['grids'].append(grid)
+
+    for group in groups.values():
+        group['timestamps'] = pd.DatetimeIndex(np.unique(np.concatenate(group['grids'])))
+    return groups
+
+
+def assemble_results(parsed: List[Dict[str, Any]], groups: Dict[str, Dict[str, Any]],
+                     outputs: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """동별 예측 배열을 원래 요청 순서의 압축 형식(날짜 x 시간 행렬)으로 되돌립니다."""
+    results: List[Dict[str, Any]] = [None] * len(parsed)
+    for dong_code, group in groups.items():
+        output = outputs[dong_code]
+        for index, grid in zip(group['members'], group['grids']):
+            item = parsed[index]
+            shape = (len(item['dates']), len(item['hours']))
+            if 'error' in output:
+                results[index] = {'dong_code': dong_code, 'error': output['error']}
+                continue
+            positions = np.searchsorted(group['timestamps'].values, grid)
+            results[index] = {
+                'dong_code': dong_code,
+                'dates': [d.strftime('%Y-%m-%d') for d in item['dates']],
+                'hours': item['hours'].tolist(),
+                'yhat': np.maximum(output['yhat'][positions], 0).round().astype(int).reshape(shape).tolist(),
+                'lower': np.maximum(output['yhat_lower'][positions], 0).round().astype(int).reshape(shape).tolist(),
+                'upper': output['yhat_upper'][positions].round().astype(int).reshape(shape).tolist()
+            }
+    return results
+
+
+async def run_batch(pool, items: List[Dict[str, Any]], interval_mode: str = 'conformal') -> Dict[str, Any]:
+    """배치 예측을 실행하고 처리량(forecasts/sec)과 함께 반환합니다."""
+    start = time.perf_counter()
+    parsed = parse_batch_items(items)
+    groups = group_by_model(parsed)
+    n_forecasts = sum(len(item['dates']) * len(item['hours']) for item in parsed)
+    if n_forecasts > MAX_BATCH_FORECASTS:
+        raise ValueError(f"배치 예측 시점이 너무 많습니다. 최대 {MAX_BATCH_FORECASTS}개까지 가능합니다.")
+
+    futures = {
+        dong_code: asyncio.wrap_future(pool.submit(
+            'predict_frame', dong_code, district=group['district'],
+            timestamps=group['timestamps'], interval_mode=interval_mode
+        ))
+        for dong_code, group in groups.items()
+    }
+    settled = await asyncio.gather(*futures.values(), return_exceptions=True)
+
+    outputs = {}
+    for dong_code, value in zip(futures, settled):
+        outputs[dong_code] = {'error': str(value)} if isinstance(value, Exception) else value
+
+    results = assemble_results(parsed, groups, outputs)
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for r in results if 'error' in r)
+
+    return {
+        'interval_mode': interval_mode,
+        'results': results,
+        'stats': {
+            'requests': len(parsed),
+            'model_groups': len(groups),
+            'failed_requests': failed,
+            'forecasts': n_forecasts,
+            'unique_forecasts': int(sum(len(g['timestamps']) for g in groups.values())),
+            'model_cache_hits': sum(1 for o in outputs.values() if o.get('model_cache_hit')),
+            'elapsed_seconds': elapsed,
+            'forecasts_per_sec': n_forecasts / elapsed if elapsed > 0 else None
+        }
+    }
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+성능 벤치마크 스크립트
+
+    python benchmark.py cold-start       # 임포트 프로파일 + 서버 포트 오픈/준비 완료까지 걸린 시간
+    python benchmark.py cube-snapshot    # 합성 데이터셋에서 큐브 재구성 vs 메모리 맵 스냅샷 열기
+    python benchmark.py spatial          # 이웃 특성 전역 모델 vs 동별 독립 Prophet 정확도/시간
+    python benchmark.py prefetch         # 즐겨찾기 워밍 전후 캐시 적중률 / p95 응답 시간
+
+결과는 JSON으로 출력합니다 (--output 지정 시 파일로 저장).
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import urllib.error
+import urllib.request
+
+from warmup import parse_importtime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PREFETCH_TOP_K = 20
+
+
+def import_profile(module: str = 'main', top: int = 15):
+    """새 인터프리터에서 `python -X importtime`으로 모듈 임포트 시간을 측정합니다."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=HERE, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} 임포트 실패:\n{proc.stderr[-2000:]}")
+    return {
+        'module': module,
+        'wall_seconds': round(wall, 3),
+        'top_imports': parse_importtime(proc.stderr, top)
+    }
+
+
+def _port_open(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        return sock.connect_ex(('127.0.0.1', port)) == 0
+
+
+def _http_status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return 0
+
+
+def server_startup(port: int = 8765, timeout: float = 120):
+    """서버를 새로 띄워 포트 오픈 / '/' 응답 / '/ready' 200까지 걸린 시간을 측정합니다."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {'port_open_seconds': None, 'liveness_seconds': None, 'ready_seconds': None}
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"서버가 종료되었습니다 (exit code {proc.returncode})")
+            elapsed = time.perf_counter() - start
+            if result['port_open_seconds'] is None:
+                if _port_open(port):
+                    result['port_open_seconds'] = round(elapsed, 3)
+            elif result['liveness_seconds'] is None:
+                if _http_status(f'http://127.0.0.1:{port}/') == 200:
+                    result['liveness_seconds'] = round(elapsed, 3)
+            elif _http_status(f'http://127.0.0.1:{port}/ready') == 200:
+                result['ready_seconds'] = round(elapsed, 3)
+                break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+
+def cold_start(args):
+    return {
+        'import_profile': import_profile('main', args.top),
+        'server': server_startup(args.port)
+    }
+
+
+# 새 프로세스에서 큐브를 준비하고 첫 질의까지의 시간과 최대 RSS를 측정하는 스크립트
+_CUBE_PROBE = textwrap.dedent("""
+    import json, sys, time
+    from cube import PopulationCube
+    from datasources import LocalDatasetSource
+    from snapshot import load_cube_snapshot
+
+    def peak_rss_mb():
+        # exec 이후 새 주소 공간 기준 최대 RSS (ru_maxrss는 fork한 부모 값을 물려받을 수 있음)
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+
+    mode, path = sys.argv[1], sys.argv[2]
+    start = time.perf_counter()
+    if mode == 'snapshot':
+        cube = load_cube_snapshot(path)
+    else:
+        source = LocalDatasetSource(path)
+        cube = PopulationCube()
+        cube.refresh(source, source.dong_codes())
+    ready = time.perf_counter() - start
+    cube.stats_time_week(cube.dong_codes[0])
+    print(json.dumps({
+        'ready_seconds': round(ready, 4),
+        'first_query_seconds': round(time.perf_counter() - start - ready, 4),
+        'peak_rss_mb': peak_rss_mb()
+    }))
+""")
+
+
+def _cube_probe(mode: str, path: str):
+    proc = subprocess.run([sys.executable, '-c', _CUBE_PROBE, mode, path], cwd=HERE, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def cube_snapshot(args):
+    from synthetic import write_synthetic_dataset
+    from datasources import LocalDatasetSource
+    from cube import PopulationCube
+    from snapshot import save_cube_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_dir = os.path.join(tmp, 'dataset')
+        dataset = write_synthetic_dataset(dataset_dir, n_dongs=args.dongs, days=args.days)
+        source = LocalDatasetSource(dataset_dir)
+        cube = PopulationCube()
+        cube.refresh(source, source.dong_codes())
+        manifest = save_cube_snapshot(cube, os.path.join(tmp, 'snapshots'))
+        return {
+            'dongs': dataset['dongs'],
+            'rows': dataset['rows'],
+            'snapshot_mb': manifest['size_mb'],
+            'rebuild_from_dataset': _cube_probe('rebuild', dataset_dir),
+            'memory_mapped_snapshot': _cube_probe('snapshot', manifest['path'])
+        }
+
+
+def spatial(args):
+    """같은 보류 기간에서 전역 시공간 모델(이웃 특성 포함/제외)과 동별 독립 Prophet 모델 비교
+
+    Prophet은 동마다 학습 시간이 길어 앞쪽 --isolated-dongs개 동만 학습하고 전체 시간은 동당 평균으로 추정합니다.
+    정확도는 같은 동 부분집합에서 비교합니다.
+    """
+    import numpy as np
+    import pandas as pd
+    from synthetic import write_synthetic_dataset
+    from datasources import LocalDatasetSource
+    from cube import PopulationCube
+    from segments import fit_prophet_series
+    from spatiotemporal import SpatioTemporalModel, forecast_errors
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = write_synthetic_dataset(tmp, n_dongs=args.dongs, days=args.days)
+        source = LocalDatasetSource(tmp)
+        cube = PopulationCube()
+        cube.refresh(source, source.dong_codes())
+
+    test_days = args.test_days
+    end = cube.n_dates - 1 - test_days
+    train_start = max(end - args.train_days + 1, 0)
+    actual = np.asarray(cube.values[:, end + 1:end + 1 + test_days, :, 0], dtype=np.float64)
+    end_date = str(cube.start_date + np.timedelta64(end, 'D'))
+
+    report = {'dongs': dataset['dongs'], 'train_days': args.train_days, 'test_days': test_days, 'models': {}}
+    predictions = {}
+    for name, use_neighbors in (('global_neighbors', True), ('global_own_only', False)):
+        started = time.perf_counter()
+        model = SpatioTemporalModel(cube, 'total', end_date, args.train_days, use_neighbors)
+        predictions[name] = model.forecast(test_days)
+        report['models'][name] = {
+            'total_seconds': round(time.perf_counter() - started, 3),
+            'fit_seconds': round(model.fit_seconds, 3),
+            'all_dongs': forecast_errors(predictions[name], actual)
+        }
+    predictions['profile_baseline'] = model.profile_forecast(test_days)
+
+    subset = min(args.isolated_dongs, cube.n_dongs)
+    dates = pd.date_range(str(cube.start_date + np.timedelta64(train_start, 'D')),
+                          str(cube.start_date + np.timedelta64(end, 'D')) + ' 23:00', freq='h')
+    future = pd.DataFrame({'ds': pd.date_range(dates[-1] + pd.Timedelta(hours=1), periods=test_days * 24, freq='h')})
+    isolated = np.full((subset, test_days, 24), np.nan)
+    started = time.perf_counter()
+    for row in range(subset):
+        history = np.asarray(cube.values[row, train_start:end + 1, :, 0], dtype=np.float64).ravel()
+        frame = pd.DataFrame({'ds': dates, 'y': history}).dropna()
+        prophet = fit_prophet_series(frame, 'y')
+        isolated[row] = prophet.predict(future)['yhat'].to_numpy().reshape(test_days, 24)
+    prophet_seconds = time.perf_counter() - started
+    report['models']['isolated_prophet'] = {
+        'dongs_fitted': subset,
+        'seconds_per_dong': round(prophet_seconds / max(subset, 1), 3),
+        'estimated_total_seconds': round(prophet_seconds / max(subset, 1) * cube.n_dongs, 1)
+    }
+
+    report['accuracy_on_prophet_subset'] = {
+        name: forecast_errors(values[:subset], actual[:subset])
+        for name, values in {**predictions, 'isolated_prophet': isolated}.items()
+    }
+    return report
+
+
+def prefetch(args):
+    """즐겨찾기 인기도(Zipf)에 따른 화면 요청을 워밍 없이 / 상위 동 워밍 후 재생해 적중률과 지연 시간을 비교
+
+    예측(동별 Prophet, 최근 28일)과 비교(이웃 동 compare_dongs)는 실제로 계산하고,
+    LLM 인사이트는 이 서비스 밖의 에이전트 호출이라 --llm-ms 지연으로 대신합니다.
+    """
+    import numpy as np
+    import pandas as pd
+    from synthetic import write_synthetic_dataset
+    from datasources import LocalDatasetSource
+    from cube import PopulationCube
+    from profiles import HourOfWeekIndex
+    from comparison import compare_dongs
+    from adjacency import load_dong_adjacency
+    from segments import fit_prophet_series
+    from prefetch import PrefetchCache, FavoriteWarmer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_synthetic_dataset(tmp, n_dongs=args.dongs, days=args.days)
+        source = LocalDatasetSource(tmp)
+        cube = PopulationCube()
+        cube.refresh(source, source.dong_codes())
+    index = HourOfWeekIndex()
+    adjacency = load_dong_adjacency()
+
+    def forecast(code, date):
+        row = cube.dong_index(code)
+        history = np.asarray(cube.values[row, -28:, :, 0], dtype=np.float64).ravel()
+        ds = pd.date_range(str(cube.dates[-28]), periods=len(history), freq='h')
+        model = fit_prophet_series(pd.DataFrame({'ds': ds, 'y': history}).dropna(), 'y')
+        return model.predict(pd.DataFrame({'ds': pd.date_range(date, periods=24, freq='h')}))['yhat'].tolist()
+
+    def comparison(code, date):
+        neighbors = [n['dong_code'] for n in adjacency.neighbors(code) if n['dong_code'] in cube]
+        return compare_dongs(cube, index, [code] + (neighbors or [cube.dong_codes[0]]), include_profiles=False)
+
+    def insights(code, date):
+        time.sleep(args.llm_ms / 1000)
+        return {'dong_code': code}
+
+    jobs = {'forecast': forecast, 'comparison': comparison, 'insights': insights}
+    rng = np.random.default_rng(args.seed)
+    popularity = 1.0 / np.arange(1, cube.n_dongs + 1) ** args.zipf
+    popularity /= popularity.sum()
+    codes = np.array(cube.dong_codes)[rng.permutation(cube.n_dongs)]
+    # 사용자마다 인기도에 비례해 즐겨찾기 3개, 화면 요청도 같은 분포에서 뽑음
+    favorites = [rng.choice(codes, size=3, replace=False, p=popularity) for _ in range(args.users)]
+    counts = dict(zip(*np.unique(np.concatenate(favorites), return_counts=True)))
+    workload = list(zip(rng.choice(codes, size=args.requests, p=popularity),
+                        rng.choice(list(jobs), size=args.requests)))
+    date = str(cube.dates[-1] + np.timedelta64(1, 'D'))
+
+    report = {'dongs': cube.n_dongs, 'users': args.users, 'requests': args.requests,
+              'top_k': args.top_k, 'llm_ms_simulated': args.llm_ms}
+    for mode in ('cold', 'warmed'):
+        warmer = FavoriteWarmer(PrefetchCache(), jobs)
+        if mode == 'warmed':
+            warm = warmer.warm(counts, args.top_k, date=date)
+            report['warm'] = {key: warm[key] for key in ('computed', 'elapsed_seconds', 'mean_job_ms')}
+        for code, kind in workload:
+            warmer.get(kind, code, date)
+        stats = warmer.cache.stats()
+        report[mode] = {key: stats[key] for key in ('hit_rate', 'p50_ms', 'p95_ms')}
+        report[mode]['by_kind'] = stats['by_kind']
+    return report
+
+
+SECTIONS = {
+    'cold-start': cold_start,
+    'cube-snapshot': cube_snapshot,
+    'spatial': spatial,
+    'prefetch': prefetch
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인구 예측 API 성능 벤치마크")
+    parser.add_argument('sections', nargs='*', help=f"측정 항목 ({', '.join(SECTIONS)}), 생략 시 전체")
+    parser.add_argument('--port', type=int, default=8765, help="벤치마크용 서버 포트")
+    parser.add_argument('--top', type=int, default=15, help="임포트 프로파일 상위 모듈 수")
+    parser.add_argument('--dongs', type=int, default=100, help="합성 데이터 동 개수")
+    parser.add_argument('--days', type=int, default=365, help="합성 데이터 기간 (일)")
+    parser.add_argument('--train-days', type=int, default=182, help="spatial: 학습 기간 (일)")
+    parser.add_argument('--test-days', type=int, default=14, help="spatial: 보류 기간 (일)")
+    parser.add_argument('--isolated-dongs', type=int, default=20, help="spatial: 독립 Prophet을 학습할 동 수")
+    parser.add_argument('--users', type=int, default=500, help="prefetch: 즐겨찾기 사용자 수")
+    parser.add_argument('--requests', type=int, default=300, help="prefetch: 재생할 화면 요청 수")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_PREFETCH_TOP_K, help="prefetch: 워밍할 상위 동 수")
+    parser.add_argument('--zipf', type=float, default=1.1, help="prefetch: 동 인기도 Zipf 지수")
+    parser.add_argument('--llm-ms', type=float, default=1500, help="prefetch: LLM 인사이트 응답 지연 (ms, 모의)")
+    parser.add_argument('--seed', type=int, default=7, help="prefetch: 요청 재현용 시드")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+    unknown = [name for name in args.sections if name not in SECTIONS]
+    if unknown:
+        parser.error(f"알 수 없는 측정 항목: {', '.join(unknown)}")
+    args.sections = args.sections or list(SECTIONS)
+
+    report = {}
+    for name in args.sections:
+        print(f"⏱️ {name} 측정 중...", file=sys.stderr)
+        report[name] = SECTIONS[name](args)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+서버 측 단계구분도(choropleth) 응답 생성
+
+지도 페이지가 원본 topomap.json / topomap_dong.json 전체를 받아 브라우저에서 값과 조인하던 것을
+줌 레벨에 맞게 단순화한 TopoJSON + 같은 순서의 값 배열 한 번으로 대체합니다.
+
+    단순화: arc 단위 Douglas-Peucker (이웃 동이 같은 arc를 공유하므로 경계 틈이 생기지 않음)
+            허용 오차 = SIMPLIFY_PIXELS 픽셀에 해당하는 경위도 (256px 타일 기준 줌 레벨별)
+    양자화: 허용 오차 절반 격자로 다시 양자화 + 델타 인코딩 (topojson-client로 그대로 디코딩)
+    값:     population(큐브), forecast(예측 원장), density(인구 / 면적 km², 구 레이어는 인구밀도 CSV 공식 면적)
+
+도형은 (레이어, 줌, 파일 수정 시각) 단위로, 전체 응답은 (레이어, 줌, 지표, 시간 구간, 데이터 버전) 단위로
+직렬화한 바이트를 캐시합니다.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+from districts import DISTRICT_TOPOJSON_PATH, DONG_TOPOJSON_PATH, backend_dong_code
+from geometry import decode_arcs, ring_coordinates
+from adjacency import KM_PER_DEGREE
+from density import load_density_table
+
+LAYERS = {'district': DISTRICT_TOPOJSON_PATH, 'dong': DONG_TOPOJSON_PATH}
+METRICS = ('population', 'forecast', 'density')
+
+MIN_ZOOM = 8
+MAX_ZOOM = 16
+DEFAULT_ZOOM = 11
+
+# 단순화 허용 오차 (화면 픽셀)
+SIMPLIFY_PIXELS = 0.75
+
+# 값 구간 경계 (분위수)
+VALUE_BREAK_QUANTILES = (0.2, 0.4, 0.6, 0.8)
+
+# 직렬화한 응답 캐시 크기
+CHOROPLETH_CACHE_SIZE = 128
+
+
+def zoom_tolerance(zoom: int) -> float:
+    """줌 레벨에서 SIMPLIFY_PIXELS 픽셀에 해당하는 경위도 크기"""
+    return SIMPLIFY_PIXELS * 360.0 / (256 * 2 ** zoom)
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """선의 양 끝을 고정한 Douglas-Peucker 단순화 (남길 점 마스크). 닫힌 arc는 가장 먼 점에서 나눠 처리"""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    if n <= 2:
+        return keep
+    stack = [(0, n - 1)]
+    if np.allclose(points[0], points[-1]):
+        far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+        keep[far] = True
+        stack = [(0, far), (far, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        segment = points[b] - points[a]
+        inner = points[a + 1:b] - points[a]
+        length = np.hypot(*segment)
+        if length == 0:
+            distance = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distance = np.abs(inner[:, 0] * segment[1] - inner[:, 1] * segment[0]) / length
+        k = int(np.argmax(distance))
+        if distance[k] > tolerance:
+            keep[a + 1 + k] = True
+            stack.append((a, a + 1 + k))
+            stack.append((a + 1 + k, b))
+    return keep
+
+
+def ring_area_km2(coords: np.ndarray) -> float:
+    """경위도 링 면적 (km², 위도 보정 평면 근사, 부호 있음)"""
+    lat0 = np.radians(coords[:, 1].mean())
+    x = coords[:, 0] * np.cos(lat0) * KM_PER_DEGREE
+    y = coords[:, 1] * KM_PER_DEGREE
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+class ChoroplethLayer:
+    """원본 토폴로지 하나 (코드/이름, arc, 면적)와 줌별 단순화 결과 캐시"""
+
+    def __init__(self, layer: str, path: str):
+        self.layer = layer
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, encoding='utf-8') as f:
+            topology = json.load(f)
+        self.object_name, collection = next(iter(topology['objects'].items()))
+        self.arcs = decode_arcs(topology)
+        self.geometries = [g for g in collection['geometries'] if g['type'] in ('Polygon', 'MultiPolygon')]
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        for g in self.geometries:
+            props = g['properties']
+            if layer == 'dong':
+                name = props['adm_nm'].split()[-1]
+                self.codes.append(backend_dong_code(props['adm_cd'], name))
+            else:
+                name = props['SIG_KOR_NM']
+                self.codes.append(str(props['SIG_CD']))
+            self.names.append(name)
+
+        # 도형별 면적 (km², 원본 해상도, 구멍 제외)
+        self.area_km2 = np.array([
+            sum(abs(ring_area_km2(ring_coordinates(self.arcs, ring))) * (1 if k == 0 else -1)
+                for polygon in self._polygons(g) for k, ring in enumerate(polygon))
+            for g in self.geometries
+        ])
+        self._simplified: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _polygons(geometry: Dict[str, Any]) -> List:
+        return [geometry['arcs']] if geometry['type'] == 'Polygon' else geometry['arcs']
+
+    def topology(self, zoom: int) -> Dict[str, Any]:
+        """줌 레벨용 단순화 + 재양자화 TopoJSON (캐시)"""
+        with self._lock:
+            if zoom in self._simplified:
+                return self._simplified[zoom]
+            tolerance = zoom_tolerance(zoom)
+            origin = np.min([arc.min(axis=0) for arc in self.arcs], axis=0)
+            step = tolerance / 2
+            arcs = []
+            n_points = 0
+            for arc in self.arcs:
+                kept = arc[douglas_peucker(arc, tolerance)]
+                quantized = np.rint((kept - origin) / step).astype(np.int64)
+                # 양자화 후 연속 중복 점 제거 (양 끝은 유지)
+                distinct = np.concatenate([[True], (np.diff(quantized, axis=0) != 0).any(axis=1)])
+                distinct[-1] = True
+                quantized = quantized[distinct]
+                if len(quantized) < 4 and np.array_equal(quantized[0], quantized[-1]):
+                    # 너무 작아진 닫힌 arc는 원래 점을 조금 더 남김
+                    quantized = np.rint((arc[np.linspace(0, len(arc) - 1, 4).astype(int)] - origin) / step).astype(np.int64)
+                deltas = np.vstack([quantized[:1], np.diff(quantized, axis=0)])
+                arcs.append(deltas.tolist())
+                n_points += len(quantized)
+
+            geometries = [
+                {'type': g['type'], 'arcs': g['arcs'], 'properties': {'code': code, 'name': name}}
+                for g, code, name in zip(self.geometries, self.codes, self.names)
+            ]
+            result = {
+                'type': 'Topology',
+                'transform': {'scale': [step, step], 'translate': origin.tolist()},
+                'arcs': arcs,
+                'objects': {self.layer: {'type': 'GeometryCollection', 'geometries': geometries}},
+                'points': n_points
+            }
+            self._simplified[zoom] = result
+            return result
+
+
+class ChoroplethBuilder:
+    """레이어 로드/단순화 캐시와 (레이어, 줌, 지표, 시간 구간) 응답 캐시"""
+
+    def __init__(self, cache_size: int = CHOROPLETH_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._layers: Dict[str, ChoroplethLayer] = {}
+        self._cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def layer(self, name: str) -> ChoroplethLayer:
+        if name not in LAYERS:
+            raise ValueError(f"layer는 {', '.join(LAYERS)} 중 하나여야 합니다.")
+        path = LAYERS[name]
+        with self._lock:
+            cached = self._layers.get(name)
+            if cached is None or cached.mtime != os.path.getmtime(path):
+                cached = ChoroplethLayer(name, path)
+                self._layers[name] = cached
+            return cached
+
+    @staticmethod
+    def _bucket(cube: PopulationCube, date: Optional[str], hour: Optional[int]) -> Tuple[Optional[str], Optional[int]]:
+        if date is None:
+            date = str(cube.dates[-1]) if not cube.is_empty else datetime.now().strftime('%Y-%m-%d')
+        if hour is not None and not 0 <= int(hour) <= 23:
+            raise ValueError("hour는 0~23 사이여야 합니다.")
+        return str(np.datetime64(date, 'D')), None if hour is None else int(hour)
+
+    @staticmethod
+    def _by_code(layer: ChoroplethLayer, values: Dict[str, float]) -> np.ndarray:
+        """코드 -> 값 사전을 레이어 도형 순서 배열로. 구 레이어는 동 값 합계(앞 5자리)"""
+        if layer.layer == 'district':
+            totals: Dict[str, float] = {}
+            for code, value in values.items():
+                totals[code[:5]] = totals.get(code[:5], 0.0) + value
+            values = totals
+        return np.array([values.get(code, np.nan) for code in layer.codes], dtype=np.float64)
+
+    def _population(self, cube: PopulationCube, measure: str, date: str, hour: Optional[int]) -> Dict[str, float]:
+        if cube.is_empty:
+            return {}
+        day = np.datetime64(date, 'D')
+        index = int((day - cube.start_date).astype(int))
+        if not 0 <= index < cube.n_dates:
+            return {}
+        m = MEASURE_NAMES.index(measure)
+        if hour is None:
+            column = cube.daily_means()[:, index, m]
+        else:
+            column = np.asarray(cube.values[:, index, hour, m], dtype=np.float64)
+        return {code: float(v) for code, v in zip(cube.dong_codes, column) if not np.isnan(v)}
+
+    @staticmethod
+    def _forecast(ledger, date: str, hour: Optional[int]) -> Dict[str, float]:
+        start = datetime.fromisoformat(date) + timedelta(hours=hour or 0)
+        end = start + timedelta(hours=1 if hour is not None else 24)
+        forecasts = ledger.latest_forecasts(start, end)
+        if forecasts.empty:
+            return {}
+        return forecasts.groupby('dong_code')['yhat'].mean().to_dict()
+
+    @staticmethod
+    def _areas(layer: ChoroplethLayer) -> Tuple[Optional[float], np.ndarray]:
+        """(출처 수정 시각, 도형 순서 면적 km²). 구 레이어는 인구밀도 CSV의 공식 면적을 우선 사용"""
+        if layer.layer == 'district':
+            try:
+                table = load_density_table()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 인구밀도 자료 로드 실패, 도형 면적 사용: {e}")
+            else:
+                official = table.area_for_dongs(layer.codes)
+                return table.mtime, np.where(np.isnan(official), layer.area_km2, official)
+        return None, layer.area_km2
+
+    def build(self, layer_name: str, zoom: int = DEFAULT_ZOOM, metric: str = 'population', cube: PopulationCube = None,
+              ledger=None, measure: str = 'total', date: str = None, hour: int = None) -> Tuple[bytes, bool]:
+        """직렬화한 단계구분도 응답과 캐시 적중 여부"""
+        if metric not in METRICS:
+            raise ValueError(f"metric은 {', '.join(METRICS)} 중 하나여야 합니다.")
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        zoom = int(min(max(zoom, MIN_ZOOM), MAX_ZOOM))
+        layer = self.layer(layer_name)
+        cube = cube if cube is not None else PopulationCube()
+        date, hour = self._bucket(cube, date, hour)
+        if metric == 'forecast' and ledger is None:
+            raise ValueError("예측 원장이 없어 forecast 지표를 만들 수 없습니다.")
+        data_version = (id(cube), cube.version) if metric != 'forecast' else ('ledger', ledger.revision())
+        areas = self._areas(layer) if metric == 'density' else None
+        key = (layer_name, zoom, metric, measure, date, hour, layer.mtime, data_version,
+               areas[0] if areas else None)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key], True
+
+        if metric == 'forecast':
+            values = self._by_code(layer, self._forecast(ledger, date, hour))
+        else:
+            values = self._by_code(layer, self._population(cube, measure, date, hour))
+            if metric == 'density':
+                values = values / np.where(areas[1] > 0, areas[1], np.nan)
+
+        finite = values[np.isfinite(values)]
+        payload = dict(layer.topology(zoom))
+        payload['values'] = {
+            'metric': metric,
+            'measure': measure,
+            'unit': '명/km²' if metric == 'density' else '명',
+            'date': date,
+            'hour': hour,
+            'codes': layer.codes,
+            'data': [None if not np.isfinite(v) else round(float(v), 1) for v in values],
+            'min': float(finite.min()) if len(finite) else None,
+            'max': float(finite.max()) if len(finite) else None,
+            'breaks': np.quantile(finite, VALUE_BREAK_QUANTILES).round(1).tolist() if len(finite) else [],
+            'coverage': int(len(finite))
+        }
+        payload['zoom'] = zoom
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = body
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return body, False
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else None,
+            'layers': {name: {'features': len(layer.codes), 'simplified_zooms': sorted(layer._simplified)}
+                       for name, layer in self._layers.items()}
+        }
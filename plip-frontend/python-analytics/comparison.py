@@ -0,0 +1,165 @@
+"""
+여러 동 비교 엔진
+
+비교 분석 페이지가 동마다 일별 이력을 받아 브라우저에서 계산하던 지표를
+인구 큐브에서 모든 동을 한 번에(동 축 벡터화) 계산합니다.
+
+    - 요일x시간(168칸) 프로파일, 피크/최저 시간
+    - 주간(06~18시)/야간 비율, 주중/주말 일평균
+    - 상관 행렬 (프로파일 기준 / 일평균 시계열 기준)
+    - 거리 행렬 (평균으로 정규화한 프로파일 간 유클리드 거리)
+
+요일x시간 지표는 profiles.HourOfWeekIndex 누적합에서 (동 x 168) 크기로 바로 구하고,
+나머지도 (동 x 날짜) 일평균에 대한 축 축소라서 2개 동과 50개 동의 소요 시간이 거의 같습니다.
+"""
+
+from typing import Any, Dict, List
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cube import PopulationCube, MEASURE_NAMES, DAY_HOURS, NIGHT_HOURS, WEEKDAY_NAMES
+from profiles import HourOfWeekIndex, HOURS_PER_WEEK
+
+# 한 번에 비교할 수 있는 최대 동 수
+MAX_COMPARE_DONGS = 500
+
+
+def _nanmean(values: np.ndarray, axis) -> np.ndarray:
+    with warnings.catch_warnings():
+        # 관측이 없는 칸은 NaN으로 남김
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(values, axis=axis)
+
+
+def _to_list(values: np.ndarray, digits: int = 0) -> list:
+    """배열을 반올림한 JSON 목록으로 한 번에 변환합니다 (NaN/inf는 None, digits=0이면 정수)."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    if digits == 0:
+        out = np.where(finite, np.rint(values), 0).astype(np.int64).astype(object)
+    else:
+        out = np.round(np.where(finite, values, 0), digits).astype(object)
+    out[~finite] = None
+    return out.tolist()
+
+
+def normalized_profiles(profiles: np.ndarray) -> np.ndarray:
+    """동별 평균으로 나눈 프로파일 (규모 차이를 제거한 모양 비교용), 결측 칸은 1로 채움"""
+    level = _nanmean(profiles, axis=1)
+    level = np.where(np.isnan(level) | (level <= 0), 1.0, level)
+    return np.nan_to_num(profiles / level[:, None], nan=1.0)
+
+
+def correlation_matrix(series: np.ndarray) -> np.ndarray:
+    """행(동)별 시계열 상관 행렬. 모든 동이 관측된 열만 사용합니다."""
+    complete = ~np.isnan(series).any(axis=0)
+    data = series[:, complete]
+    if data.shape[1] < 2:
+        return np.full((series.shape[0], series.shape[0]), np.nan)
+    centered = data - data.mean(axis=1, keepdims=True)
+    norms = np.sqrt((centered ** 2).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (centered @ centered.T) / np.outer(norms, norms)
+    return np.clip(corr, -1, 1)
+
+
+def distance_matrix(vectors: np.ndarray) -> np.ndarray:
+    """행 벡터 간 유클리드 거리 행렬 (|a|^2 + |b|^2 - 2ab)"""
+    squared = (vectors ** 2).sum(axis=1)
+    gram = vectors @ vectors.T
+    return np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * gram, 0))
+
+
+def compare_dongs(cube: PopulationCube, index: HourOfWeekIndex, dong_codes: List[str], measure: str = 'total',
+                  start_date=None, end_date=None, names: Dict[str, str] = None,
+                  include_profiles: bool = True) -> Dict[str, Any]:
+    """동 목록의 비교 지표를 한 번에 계산합니다."""
+    if measure not in MEASURE_NAMES:
+        raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+    dong_codes = list(dict.fromkeys(str(code) for code in dong_codes))
+    if len(dong_codes) < 2:
+        raise ValueError("비교하려면 동이 2개 이상 필요합니다.")
+    if len(dong_codes) > MAX_COMPARE_DONGS:
+        raise ValueError(f"한 번에 최대 {MAX_COMPARE_DONGS}개 동까지 비교할 수 있습니다.")
+
+    if start_date is not None and end_date is not None and pd.Timestamp(start_date) > pd.Timestamp(end_date):
+        raise ValueError("start_date가 end_date보다 늦습니다.")
+
+    names = names or {}
+    dong_index = np.array([cube.dong_index(code) for code in dong_codes])
+    date_slice = cube.date_slice(start_date, end_date)
+    if date_slice.stop <= date_slice.start:
+        raise ValueError("요청한 기간에 큐브 데이터가 없습니다.")
+    m = MEASURE_NAMES.index(measure)
+    daily = cube.daily_means()[dong_index, date_slice, m]                    # (동, 날짜)
+    weekdays = cube.weekdays[date_slice]
+    dates = cube.dates[date_slice]
+
+    sums, counts = index.range_sums(cube, dong_index, date_slice, measure)  # (동, 7, 24)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        profiles = (sums / np.where(counts > 0, counts, np.nan)).reshape(len(dong_codes), HOURS_PER_WEEK)
+        hourly = sums.sum(axis=1) / np.where(counts.sum(axis=1) > 0, counts.sum(axis=1), np.nan)   # (동, 24)
+        day = sums[:, :, DAY_HOURS].sum(axis=(1, 2)) / counts[:, :, DAY_HOURS].sum(axis=(1, 2))
+        night = sums[:, :, NIGHT_HOURS].sum(axis=(1, 2)) / counts[:, :, NIGHT_HOURS].sum(axis=(1, 2))
+    shape = normalized_profiles(profiles)
+
+    observed_hours = ~np.isnan(hourly).all(axis=1)
+    filled_hourly = np.where(np.isnan(hourly), -np.inf, hourly)
+    peak_hour = filled_hourly.argmax(axis=1)
+    low_hour = np.where(np.isnan(hourly), np.inf, hourly).argmin(axis=1)
+    filled_profiles = np.where(np.isnan(profiles), -np.inf, profiles)
+    peak_how = filled_profiles.argmax(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        day_night_ratio = day / night
+    weekend = weekdays >= 5
+    weekday_mean = _nanmean(daily[:, ~weekend], axis=1) if (~weekend).any() else np.full(len(dong_codes), np.nan)
+    weekend_mean = _nanmean(daily[:, weekend], axis=1) if weekend.any() else np.full(len(dong_codes), np.nan)
+    average = _nanmean(daily, axis=1)
+
+    def number(value, digits=0):
+        if np.isnan(value) or np.isinf(value):
+            return None
+        return int(round(float(value))) if digits == 0 else round(float(value), digits)
+
+    profile_lists = _to_list(profiles) if include_profiles else None
+    dongs = []
+    for i, code in enumerate(dong_codes):
+        entry = {
+            'dong_code': code,
+            'dong_name': names.get(code),
+            'average_population': number(average[i]),
+            'peak_hour': int(peak_hour[i]) if observed_hours[i] else None,
+            'peak_population': number(hourly[i, peak_hour[i]]) if observed_hours[i] else None,
+            'lowest_hour': int(low_hour[i]) if observed_hours[i] else None,
+            'lowest_population': number(hourly[i, low_hour[i]]) if observed_hours[i] else None,
+            'peak_hour_of_week': {
+                'weekday': WEEKDAY_NAMES[peak_how[i] // 24], 'hour': int(peak_how[i] % 24)
+            } if observed_hours[i] else None,
+            'day_population': number(day[i]),
+            'night_population': number(night[i]),
+            'day_night_ratio': number(day_night_ratio[i], 3),
+            'weekday_population': number(weekday_mean[i]),
+            'weekend_population': number(weekend_mean[i]),
+            'weekend_weekday_ratio': number(weekend_mean[i] / weekday_mean[i], 3) if weekday_mean[i] else None
+        }
+        if include_profiles:
+            entry['hour_of_week_profile'] = profile_lists[i]
+        dongs.append(entry)
+
+    return {
+        'measure': measure,
+        'start_date': str(dates[0]) if len(dates) else None,
+        'end_date': str(dates[-1]) if len(dates) else None,
+        'dong_codes': dong_codes,
+        'dongs': dongs,
+        'correlation': {
+            'profile': _to_list(correlation_matrix(profiles), 4),
+            'daily': _to_list(correlation_matrix(daily), 4)
+        },
+        'distance': {
+            'profile_shape': _to_list(distance_matrix(shape), 4)
+        }
+    }
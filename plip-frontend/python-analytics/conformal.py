@@ -0,0 +1,176 @@
+"""
+백테스트 잔차 기반 conformal 예측 구간
+
+Prophet의 yhat_lower/yhat_upper는 시뮬레이션(uncertainty_samples)으로 계산되어 느리고,
+시간별 인구 데이터에서는 실제 커버리지와 잘 맞지 않는 경우가 있습니다.
+여기서는 교차 검증(out-of-sample) 잔차를 (시간대, 예측 horizon) 단위로 저장해 두고
+분위수 테이블을 한 번 만들어 배열 인덱싱만으로 구간을 계산합니다.
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 기본 신뢰수준 (80% 구간 = Prophet 기본 interval_width와 동일)
+DEFAULT_ALPHA = 0.2
+
+# horizon 버킷 최대값 (일 단위, 그 이상은 마지막 버킷 사용)
+MAX_HORIZON_DAYS = 7
+
+# 셀(시간대 x horizon)에 필요한 최소 잔차 수, 부족하면 상위 풀로 대체
+MIN_CELL_COUNT = 5
+
+
+def horizon_bucket(horizon: pd.Series) -> np.ndarray:
+    """예측 시점까지의 거리(Timedelta)를 1일 단위 버킷(1..MAX_HORIZON_DAYS)으로 변환합니다."""
+    hours = np.asarray(pd.to_timedelta(horizon) / pd.Timedelta(hours=1), dtype=float)
+    days = np.ceil(np.maximum(hours, 1.0) / 24.0).astype(int)
+    return np.clip(days, 1, MAX_HORIZON_DAYS)
+
+
+def conformal_quantile(sorted_values: np.ndarray, q: float) -> float:
+    """유한 표본 보정을 적용한 conformal 분위수를 반환합니다."""
+    n = len(sorted_values)
+    if n == 0:
+        return 0.0
+    if q >= 0.5:
+        rank = min(n, int(math.ceil((n + 1) * q)))
+    else:
+        rank = max(1, int(math.floor((n + 1) * q)))
+    return float(sorted_values[rank - 1])
+
+
+def short_backtest(model, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """데이터가 짧아 기본 교차 검증이 불가능할 때 쓰는 축소 백테스트입니다."""
+    from prophet.diagnostics import cross_validation
+
+    span_days = (df['ds'].max() - df['ds'].min()) / pd.Timedelta(days=1)
+    horizon_days = int(min(MAX_HORIZON_DAYS, max(1, span_days // 4)))
+    initial_days = int(span_days - horizon_days - 2)
+    if initial_days < 2:
+        return None
+
+    return cross_validation(
+        model,
+        initial=f'{initial_days} days',
+        period='1 days',
+        horizon=f'{horizon_days} days',
+        disable_tqdm=True
+    )
+
+
+class ResidualIntervalStore:
+    """(시간대, horizon)별 out-of-sample 잔차를 저장하고 분위수 구간을 조회합니다."""
+
+    def __init__(self, residuals: pd.DataFrame, source: str = 'cross_validation'):
+        # residuals 컬럼: ds, cutoff, hour, horizon_days, residual(y - yhat)
+        self.residuals = residuals.reset_index(drop=True)
+        self.source = source
+        self._tables: Dict[float, tuple] = {}
+
+    @classmethod
+    def from_backtest(cls, df_cv: pd.DataFrame) -> 'ResidualIntervalStore':
+        """Prophet cross_validation 결과(ds, cutoff, y, yhat)에서 잔차를 추출합니다."""
+        residuals = pd.DataFrame({
+            'ds': df_cv['ds'].values,
+            'cutoff': df_cv['cutoff'].values,
+            'hour': df_cv['ds'].dt.hour.values,
+            'horizon_days': horizon_bucket(df_cv['ds'] - df_cv['cutoff']),
+            'residual': (df_cv['y'] - df_cv['yhat']).values
+        })
+        return cls(residuals, source='cross_validation')
+
+    @classmethod
+    def from_in_sample(cls, history: pd.DataFrame, fitted: pd.DataFrame) -> 'ResidualIntervalStore':
+        """백테스트가 불가능할 때 학습 구간 잔차로 대체합니다 (커버리지가 낙관적일 수 있음)."""
+        residuals = pd.DataFrame({
+            'ds': history['ds'].values,
+            'cutoff': history['ds'].max(),
+            'hour': history['ds'].dt.hour.values,
+            'horizon_days': 1,
+            'residual': history['y'].values - fitted['yhat'].values
+        })
+        return cls(residuals, source='in_sample')
+
+    def __len__(self):
+        return len(self.residuals)
+
+    def _build_table(self, residuals: pd.DataFrame, alpha: float):
+        """(24, MAX_HORIZON_DAYS + 1) 크기의 하한/상한 잔차 분위수 테이블을 만듭니다."""
+        lower = np.zeros((24, MAX_HORIZON_DAYS + 1))
+        upper = np.zeros((24, MAX_HORIZON_DAYS + 1))
+        q_lo, q_hi = alpha / 2, 1 - alpha / 2
+
+        values = residuals['residual'].to_numpy(dtype=float)
+        hours = residuals['hour'].to_numpy(dtype=int)
+        horizons = residuals['horizon_days'].to_numpy(dtype=int)
+        pooled_all = np.sort(values)
+
+        for hour in range(24):
+            hour_mask = hours == hour
+            pooled_hour = np.sort(values[hour_mask])
+            for h in range(1, MAX_HORIZON_DAYS + 1):
+                cell = np.sort(values[hour_mask & (horizons == h)])
+                # 셀 → 시간대 → 전체 순으로 충분한 표본을 가진 풀 사용
+                if len(cell) >= MIN_CELL_COUNT:
+                    pool = cell
+                elif len(pooled_hour) >= MIN_CELL_COUNT:
+                    pool = pooled_hour
+                else:
+                    pool = pooled_all
+                lower[hour, h] = conformal_quantile(pool, q_lo)
+                upper[hour, h] = conformal_quantile(pool, q_hi)
+
+        # horizon 0 (학습 구간 내부)은 1일 버킷과 동일하게 취급
+        lower[:, 0] = lower[:, 1]
+        upper[:, 0] = upper[:, 1]
+        return lower, upper
+
+    def table(self, alpha: float = DEFAULT_ALPHA):
+        """신뢰수준별 분위수 테이블을 캐시해서 반환합니다."""
+        if alpha not in self._tables:
+            self._tables[alpha] = self._build_table(self.residuals, alpha)
+        return self._tables[alpha]
+
+    def intervals(self, yhat: np.ndarray, hours: np.ndarray, horizons: np.ndarray,
+                  alpha: float = DEFAULT_ALPHA):
+        """예측값 배열에 대해 (하한, 상한) 배열을 벡터 연산으로 계산합니다."""
+        lower, upper = self.table(alpha)
+        hours = np.asarray(hours, dtype=int) % 24
+        horizons = np.clip(np.asarray(horizons, dtype=int), 0, MAX_HORIZON_DAYS)
+        yhat = np.asarray(yhat, dtype=float)
+        return yhat + lower[hours, horizons], yhat + upper[hours, horizons]
+
+    def coverage_report(self, alpha: float = DEFAULT_ALPHA) -> Dict:
+        """마지막 cutoff를 평가용으로 남기고 나머지로 보정해 실제 커버리지를 측정합니다."""
+        cutoffs = np.sort(self.residuals['cutoff'].unique())
+        if len(cutoffs) >= 2:
+            eval_mask = (self.residuals['cutoff'] == cutoffs[-1]).to_numpy()
+            method = 'holdout_last_cutoff'
+        else:
+            eval_mask = np.ones(len(self.residuals), dtype=bool)
+            method = 'in_sample'
+
+        calibration = self.residuals[~eval_mask] if method != 'in_sample' else self.residuals
+        evaluation = self.residuals[eval_mask]
+        if evaluation.empty or calibration.empty:
+            return {'nominal': 1 - alpha, 'empirical': None, 'evaluation_points': 0,
+                    'method': method, 'residual_source': self.source}
+
+        lower, upper = self._build_table(calibration, alpha)
+        hours = evaluation['hour'].to_numpy(dtype=int)
+        horizons = evaluation['horizon_days'].to_numpy(dtype=int)
+        values = evaluation['residual'].to_numpy(dtype=float)
+        inside = (values >= lower[hours, horizons]) & (values <= upper[hours, horizons])
+
+        return {
+            'nominal': 1 - alpha,
+            'empirical': float(inside.mean()),
+            'evaluation_points': int(len(values)),
+            'calibration_points': int(len(calibration)),
+            'mean_width': float(np.mean(upper[hours, horizons] - lower[hours, horizons])),
+            'method': method,
+            'residual_source': self.source
+        }
@@ -0,0 +1,355 @@
+"""
+인구 큐브 (동 x 날짜 x 시간 x 측정값)
+
+모든 동의 시간별 생활인구를 하나의 NumPy 배열에 담아 두고, 백엔드의
+/stats/daily, /stats/day-night, /stats/time-week, /stats/weekday-weekend 통계를
+왕복 요청이나 JSON 재파싱 없이 배열 슬라이스/집계로 계산합니다.
+
+    values[dong, date, hour, measure]   (float32, 결측은 NaN)
+    measure: total, local, long, temp
+
+새 날짜/동이 들어오면 배열 용량을 두 배씩 늘리며 제자리에 갱신하고(증분 갱신),
+변경 이력(version, 동 인덱스, 최소 날짜 인덱스)을 남겨 하위 분석이 바뀐 부분만 다시 계산할 수 있게 합니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# 측정값 이름 -> dailyDataList 필드
+MEASURES = {
+    'total': 'totalPopulation',
+    'local': 'localPopulation',
+    'long': 'longForeignerPopulation',
+    'temp': 'tempForeignerPopulation'
+}
+MEASURE_NAMES = list(MEASURES)
+
+# 주간 시간대 (06~18시, 프론트엔드 '주간 (06-18시)'과 동일), 나머지는 야간
+DAY_HOURS = np.arange(6, 18)
+NIGHT_HOURS = np.setdiff1d(np.arange(24), DAY_HOURS)
+
+WEEKDAY_NAMES = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
+
+# 증분 갱신 시 이미 가진 마지막 날짜보다 며칠 앞부터 다시 쓸지 (늦게 보정되는 데이터 반영)
+REFRESH_OVERLAP_DAYS = 1
+
+CUBE_LOAD_WORKERS = 8
+
+
+def raw_to_cells(raw: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """dailyDataList 데이터프레임을 (날짜 datetime64[D], 시간 0..23, 측정값 행렬)로 변환합니다."""
+    if raw is None or raw.empty or 'date' not in raw.columns:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=int), np.empty((0, len(MEASURES)))
+    dates = pd.to_datetime(raw['date'].astype(str), format='%Y%m%d', errors='coerce')
+    hours = pd.to_numeric(raw.get('tmzonPdSe', pd.Series('1', index=raw.index)), errors='coerce') - 1
+    valid = dates.notna().to_numpy() & hours.between(0, 23).to_numpy()
+    values = np.column_stack([
+        pd.to_numeric(raw[field], errors='coerce').to_numpy(dtype=float) if field in raw.columns
+        else np.full(len(raw), np.nan)
+        for field in MEASURES.values()
+    ])
+    return (dates[valid].to_numpy().astype('datetime64[D]'), hours[valid].to_numpy().astype(int), values[valid])
+
+
+class PopulationCube:
+    """모든 동의 시간별 인구를 담은 증분 갱신 가능한 배열 큐브"""
+
+    def __init__(self, dong_capacity: int = 32, date_capacity: int = 64):
+        self._lock = threading.RLock()
+        self._values = np.full((dong_capacity, date_capacity, 24, len(MEASURES)), np.nan, dtype=np.float32)
+        self.dong_codes: List[str] = []
+        self._dong_index: Dict[str, int] = {}
+        self.start_date: Optional[np.datetime64] = None
+        self.n_dates = 0
+        self.version = 0
+        self.updated_at: Optional[datetime] = None
+        # (version, 바뀐 동 인덱스 배열, 바뀐 최소 날짜 인덱스)
+        self.change_log: List[Tuple[int, np.ndarray, int]] = []
+        # 동별 마지막으로 받은 날짜 (증분 갱신 기준)
+        self.last_dates: Dict[str, np.datetime64] = {}
+        # 일평균 캐시 (동 x 날짜 x 측정값)와 계산 시점 version
+        self._daily = None
+        self._daily_version = -1
+        self._daily_start = None
+        # 메모리 맵 스냅샷에서 열었으면 그 경로 (snapshot.py)
+        self.snapshot_path: Optional[str] = None
+
+    # ---------- 구조 ----------
+
+    @property
+    def n_dongs(self) -> int:
+        return len(self.dong_codes)
+
+    @property
+    def values(self) -> np.ndarray:
+        """사용 중인 영역의 뷰 (동 x 날짜 x 24 x 측정값)"""
+        return self._values[:self.n_dongs, :self.n_dates]
+
+    @property
+    def dates(self) -> np.ndarray:
+        if self.start_date is None:
+            return np.array([], dtype='datetime64[D]')
+        return self.start_date + np.arange(self.n_dates)
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """날짜 축의 요일 (월=0 ... 일=6)"""
+        # 1970-01-01은 목요일(3)
+        return (self.dates.astype('int64') + 3) % 7
+
+    @property
+    def is_empty(self) -> bool:
+        return self.n_dongs == 0 or self.n_dates == 0
+
+    def has_dong(self, dong_code: str) -> bool:
+        return dong_code in self._dong_index
+
+    def __contains__(self, dong_code) -> bool:
+        return self.has_dong(dong_code)
+
+    def dong_index(self, dong_code: str) -> int:
+        if dong_code not in self._dong_index:
+            raise KeyError(f"큐브에 없는 동 코드입니다: {dong_code}")
+        return self._dong_index[dong_code]
+
+    def date_slice(self, start_date=None, end_date=None) -> slice:
+        """날짜 범위(포함)를 날짜 축 슬라이스로 변환합니다."""
+        if self.start_date is None:
+            return slice(0, 0)
+        lo = 0 if start_date is None else int((np.datetime64(pd.Timestamp(start_date).date()) - self.start_date).astype(int))
+        hi = self.n_dates if end_date is None else int((np.datetime64(pd.Timestamp(end_date).date()) - self.start_date).astype(int)) + 1
+        return slice(min(max(lo, 0), self.n_dates), min(max(hi, 0), self.n_dates))
+
+    def _grow(self, n_dongs: int, first_date: np.datetime64, last_date: np.datetime64):
+        """동/날짜 축 용량을 확보합니다 (필요하면 두 배로 재할당, 앞쪽 날짜 추가 시 이동)."""
+        shift = 0
+        if self.start_date is None:
+            self.start_date = first_date
+        elif first_date < self.start_date:
+            shift = int((self.start_date - first_date).astype(int))
+            self.start_date = first_date
+        needed_dates = max(self.n_dates + shift, int((last_date - self.start_date).astype(int)) + 1)
+
+        dong_cap, date_cap = self._values.shape[:2]
+        # 읽기 전용 메모리 맵(스냅샷)이면 처음 쓸 때 쓰기 가능한 배열로 복사
+        if n_dongs > dong_cap or needed_dates > date_cap or shift or not self._values.flags.writeable:
+            new_dong_cap = max(dong_cap, 1)
+            while new_dong_cap < n_dongs:
+                new_dong_cap *= 2
+            new_date_cap = max(date_cap, 1)
+            while new_date_cap < needed_dates:
+                new_date_cap *= 2
+            grown = np.full((new_dong_cap, new_date_cap, 24, len(MEASURES)), np.nan, dtype=np.float32)
+            grown[:self.n_dongs, shift:shift + self.n_dates] = self.values
+            self._values = grown
+            if shift:
+                # 기존 날짜 인덱스가 밀렸으므로 이번 갱신(version + 1)을 전체 변경으로 기록
+                self.change_log.append((self.version + 1, np.arange(self.n_dongs), 0))
+        self.n_dates = needed_dates
+
+    # ---------- 적재 / 증분 갱신 ----------
+
+    def upsert(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """동별 dailyDataList 데이터프레임을 큐브에 씁니다 (새 동/날짜는 자동으로 추가)."""
+        parsed = {code: raw_to_cells(frame) for code, frame in frames.items()}
+        parsed = {code: cells for code, cells in parsed.items() if len(cells[0])}
+        if not parsed:
+            return {'version': self.version, 'changed_dongs': 0, 'cells': 0}
+
+        with self._lock:
+            new_codes = [code for code in parsed if code not in self._dong_index]
+            first = min(cells[0].min() for cells in parsed.values())
+            last = max(cells[0].max() for cells in parsed.values())
+            self._grow(self.n_dongs + len(new_codes), first, last)
+            for code in new_codes:
+                self._dong_index[code] = len(self.dong_codes)
+                self.dong_codes.append(code)
+
+            self.version += 1
+            changed, min_date_index, cells_written = [], self.n_dates, 0
+            for code, (dates, hours, values) in parsed.items():
+                i = self._dong_index[code]
+                date_index = (dates - self.start_date).astype(int)
+                self._values[i, date_index, hours] = values
+                changed.append(i)
+                min_date_index = min(min_date_index, int(date_index.min()))
+                cells_written += len(dates)
+                self.last_dates[code] = max(self.last_dates.get(code, dates.max()), dates.max())
+
+            self.change_log.append((self.version, np.array(changed), min_date_index))
+            self.updated_at = datetime.now()
+            return {'version': self.version, 'changed_dongs': len(changed), 'new_dongs': len(new_codes),
+                    'cells': cells_written}
+
+    def refresh(self, source, dong_codes: List[str], district: str = None, full: bool = False) -> Dict[str, Any]:
+        """데이터 소스에서 동별 데이터를 읽어 마지막 적재 이후 부분만 큐브에 반영합니다."""
+        start = time.perf_counter()
+
+        def load(code):
+            raw = source.load(code, district)
+            last = self.last_dates.get(code)
+            if not full and last is not None and 'date' in raw.columns:
+                since = (last - np.timedelta64(REFRESH_OVERLAP_DAYS, 'D')).astype(datetime).strftime('%Y%m%d')
+                raw = raw[raw['date'].astype(str) >= since]
+            return raw
+
+        frames, failed = {}, {}
+        with ThreadPoolExecutor(max_workers=CUBE_LOAD_WORKERS) as executor:
+            futures = {code: executor.submit(load, code) for code in dong_codes}
+            for code, future in futures.items():
+                try:
+                    frames[code] = future.result()
+                except Exception as e:
+                    failed[code] = str(e)
+
+        result = self.upsert(frames)
+        result.update({'failed': failed, 'elapsed_seconds': time.perf_counter() - start})
+        return result
+
+    def changes_since(self, version: int) -> Tuple[np.ndarray, int]:
+        """version 이후 바뀐 (동 인덱스, 최소 날짜 인덱스). 바뀐 것이 없으면 (빈 배열, n_dates)."""
+        entries = [entry for entry in self.change_log if entry[0] > version]
+        if not entries:
+            return np.array([], dtype=int), self.n_dates
+        return np.unique(np.concatenate([e[1] for e in entries])), min(e[2] for e in entries)
+
+    # ---------- 질의 ----------
+
+    @staticmethod
+    def _hour_mean(block: np.ndarray) -> np.ndarray:
+        """시간 축(axis=2) NaN 제외 평균 (모두 결측이면 NaN)"""
+        valid = ~np.isnan(block)
+        counts = valid.sum(axis=2)
+        sums = np.where(valid, block, 0).sum(axis=2, dtype=np.float64)
+        return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+    def daily_means(self) -> np.ndarray:
+        """동 x 날짜 x 측정값 일평균 인구. 바뀐 동/날짜만 다시 계산해 캐시합니다."""
+        with self._lock:
+            if self._daily_version == self.version:
+                return self._daily
+            shape = (self.n_dongs, self.n_dates, len(MEASURES))
+            if self._daily is None or self._daily_start != self.start_date:
+                # 처음이거나 앞쪽 날짜가 추가되어 인덱스가 밀린 경우 전체 계산
+                self._daily = self._hour_mean(self.values)
+            else:
+                changed, min_date = self.changes_since(self._daily_version)
+                daily = np.full(shape, np.nan)
+                old = self._daily
+                daily[:old.shape[0], :old.shape[1]] = old
+                if len(changed):
+                    daily[changed, min_date:] = self._hour_mean(self._values[changed, min_date:self.n_dates])
+                daily[old.shape[0]:] = self._hour_mean(self.values[old.shape[0]:])
+                self._daily = daily
+            self._daily_version = self.version
+            self._daily_start = self.start_date
+            return self._daily
+
+    def series(self, dong_code: str, measure: str = 'total', start_date=None, end_date=None) -> np.ndarray:
+        """동 하나의 (날짜 x 24) 뷰"""
+        return self.values[self.dong_index(dong_code), self.date_slice(start_date, end_date), :, MEASURE_NAMES.index(measure)]
+
+    def info(self) -> Dict[str, Any]:
+        dates = self.dates
+        return {
+            'dongs': self.n_dongs,
+            'dates': self.n_dates,
+            'start_date': str(dates[0]) if len(dates) else None,
+            'end_date': str(dates[-1]) if len(dates) else None,
+            'measures': MEASURE_NAMES,
+            'filled_cells': int(np.count_nonzero(~np.isnan(self.values[..., 0]))),
+            'memory_mb': round(self._values.nbytes / 1024 ** 2, 1),
+            'memory_mapped': isinstance(self._values, np.memmap),
+            'snapshot_path': self.snapshot_path,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    # ---------- 백엔드 /stats/* 와 같은 형식의 통계 ----------
+
+    def _dong_daily(self, dong_code, measure, start_date, end_date):
+        """동 하나의 (일평균, 요일, 날짜) 배열 (관측된 날짜만)"""
+        date_slice = self.date_slice(start_date, end_date)
+        daily = self.daily_means()[self.dong_index(dong_code), date_slice, MEASURE_NAMES.index(measure)]
+        observed = ~np.isnan(daily)
+        return daily[observed], self.weekdays[date_slice][observed], self.dates[date_slice][observed]
+
+    @staticmethod
+    def _round(value) -> Optional[int]:
+        return None if value is None or np.isnan(value) else int(round(float(value)))
+
+    def stats_daily(self, dong_code: str, measure: str = 'total', start_date=None, end_date=None) -> Dict[str, Any]:
+        """일평균 인구의 평균/최대/최소와 해당 날짜 (/stats/daily)"""
+        daily, _, dates = self._dong_daily(dong_code, measure, start_date, end_date)
+        if not len(daily):
+            return {'averagePopulation': None, 'maxPopulation': None, 'minPopulation': None,
+                    'maxDate': None, 'minDate': None}
+        return {
+            'averagePopulation': self._round(daily.mean()),
+            'maxPopulation': self._round(daily.max()),
+            'minPopulation': self._round(daily.min()),
+            'maxDate': str(dates[daily.argmax()]),
+            'minDate': str(dates[daily.argmin()])
+        }
+
+    def _hourly_profile(self, dong_code, measure, start_date, end_date) -> np.ndarray:
+        """시간대별 평균 인구 (24,)"""
+        block = self.series(dong_code, measure, start_date, end_date)
+        valid = ~np.isnan(block)
+        counts = valid.sum(axis=0)
+        sums = np.where(valid, block, 0).sum(axis=0, dtype=np.float64)
+        return np.divide(sums, counts, out=np.full(24, np.nan), where=counts > 0), counts
+
+    def stats_day_night(self, dong_code: str, measure: str = 'total', start_date=None, end_date=None) -> Dict[str, Any]:
+        """주간(06~18시)/야간 시간 평균 인구와 비율 (/stats/day-night)"""
+        hourly, counts = self._hourly_profile(dong_code, measure, start_date, end_date)
+        weighted = np.nan_to_num(hourly) * counts
+
+        def mean(hours):
+            n = counts[hours].sum()
+            return weighted[hours].sum() / n if n else np.nan
+
+        day, night = mean(DAY_HOURS), mean(NIGHT_HOURS)
+        ratio = float(day / night) if night and not np.isnan(day) and not np.isnan(night) else None
+        return {
+            'dayPopulation': self._round(day),
+            'nightPopulation': self._round(night),
+            'dayNightRatio': None if ratio is None else round(ratio, 2)
+        }
+
+    def stats_time_week(self, dong_code: str, measure: str = 'total', start_date=None, end_date=None) -> Dict[str, Any]:
+        """시간대별 평균 인구와 요일별 일평균 인구 (/stats/time-week)"""
+        hourly, _ = self._hourly_profile(dong_code, measure, start_date, end_date)
+        daily, weekdays, _ = self._dong_daily(dong_code, measure, start_date, end_date)
+        weekday_sum = np.bincount(weekdays, weights=daily, minlength=7)
+        weekday_count = np.bincount(weekdays, minlength=7)
+        weekly = np.divide(weekday_sum, weekday_count, out=np.full(7, np.nan), where=weekday_count > 0)
+        return {
+            'timeSlotPopulation': {f"{h:02d}": self._round(v) for h, v in enumerate(hourly) if not np.isnan(v)},
+            'weekdayPopulation': {WEEKDAY_NAMES[d]: self._round(v) for d, v in enumerate(weekly) if not np.isnan(v)}
+        }
+
+    def stats_weekday_weekend(self, dong_code: str, measure: str = 'total', start_date=None, end_date=None) -> Dict[str, Any]:
+        """주중/주말 일평균 인구 (/stats/weekday-weekend). 연령대 분포는 큐브에 없어 빈 값으로 둡니다."""
+        daily, weekdays, _ = self._dong_daily(dong_code, measure, start_date, end_date)
+        weekend = weekdays >= 5
+        return {
+            'weekdayPopulation': self._round(daily[~weekend].mean()) if (~weekend).any() else None,
+            'weekendPopulation': self._round(daily[weekend].mean()) if weekend.any() else None,
+            'ageGroupWeekday': {},
+            'ageGroupWeekend': {}
+        }
+
+
+CUBE_STATS = {
+    'daily': PopulationCube.stats_daily,
+    'day-night': PopulationCube.stats_day_night,
+    'time-week': PopulationCube.stats_time_week,
+    'weekday-weekend': PopulationCube.stats_weekday_weekend
+}
@@ -0,0 +1,286 @@
+"""
+인구 데이터 소스
+
+PopulationPredictor가 일별(시간대별) 인구 데이터를 어디서 읽을지 교체할 수 있게 합니다.
+
+    - BackendDataSource: 기존 Spring 백엔드 (/population/{district}/dongs/{code}/daily)
+    - LocalDatasetSource: dailyDataList와 같은 컬럼의 Parquet/CSV/JSON 파일 디렉터리
+    - UploadedDataSource: 업로드한 파일 하나 (여러 동이면 dongCode 컬럼 필요)
+
+모든 소스는 dailyDataList 스키마의 원본 데이터프레임을 돌려주고,
+Prophet 학습용 변환은 daily_frame_to_training_frame에서 한 번에(벡터화) 처리합니다.
+"""
+
+from typing import Any, Dict, List, Optional
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import requests
+
+from districts import daily_data_path
+
+# dailyDataList 항목 필드 (api_endpoint.txt 기준)
+DAILY_FIELDS = [
+    'date', 'timeZone', 'timeRange', 'tmzonPdSe',
+    'totalPopulation', 'localPopulation', 'tempForeignerPopulation', 'longForeignerPopulation'
+]
+POPULATION_FIELDS = ['totalPopulation', 'localPopulation', 'tempForeignerPopulation', 'longForeignerPopulation']
+
+# 여러 동을 담은 파일에서 동 코드를 나타내는 컬럼 (앞에 있는 이름 우선)
+DONG_CODE_COLUMNS = ('dongCode', 'dong_code', 'adstrdCode', 'adm_cd')
+
+# 문자열로 읽어야 하는 컬럼 (앞자리 0 보존)
+STRING_COLUMNS = {'date': str, 'tmzonPdSe': str, 'timeZone': str, 'timeRange': str,
+                  **{name: str for name in DONG_CODE_COLUMNS}}
+
+DATASET_EXTENSIONS = ('.parquet', '.csv', '.json')
+
+# API로 지정하는 로컬 데이터셋 경로의 기준 디렉터리 (이 밖의 경로는 거부)
+DEFAULT_DATASET_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets')
+
+
+def read_daily_file(source, filename: str) -> pd.DataFrame:
+    """Parquet/CSV/JSON 파일(경로 또는 파일 객체)을 dailyDataList 스키마 데이터프레임으로 읽습니다."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.parquet':
+        try:
+            df = pd.read_parquet(source)
+        except ImportError as e:
+            raise ImportError("Parquet 파일을 읽으려면 pyarrow가 필요합니다: pip install pyarrow") from e
+    elif ext == '.csv':
+        df = pd.read_csv(source, dtype=STRING_COLUMNS, encoding='utf-8-sig')
+    elif ext == '.json':
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, encoding='utf-8') as f:
+                data = json.load(f)
+        else:
+            data = json.load(source)
+        if isinstance(data, dict):
+            data = data.get('dailyDataList', data.get('data', []))
+        df = pd.DataFrame(data)
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {filename} (parquet, csv, json 가능)")
+
+    for column in ('date', 'tmzonPdSe') + DONG_CODE_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(str)
+    return df
+
+
+def _dong_code_column(df: pd.DataFrame) -> Optional[str]:
+    return next((name for name in DONG_CODE_COLUMNS if name in df.columns), None)
+
+
+def daily_frame_to_training_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """dailyDataList 데이터프레임을 Prophet 학습용 프레임(ds, y, 세그먼트, hour, ...)으로 변환합니다."""
+    columns = ['ds', 'y', 'local_population', 'long_foreigner', 'temp_foreigner', 'hour', 'date', 'tmzon_pd_se']
+    if raw is None or raw.empty or 'date' not in raw.columns:
+        return pd.DataFrame(columns=columns)
+
+    # tmzonPdSe는 1부터 시작하므로 0부터 시작하도록 조정 (파싱 불가 값은 0시)
+    tmzon = raw['tmzonPdSe'].astype(str) if 'tmzonPdSe' in raw.columns else pd.Series('0', index=raw.index)
+    hour = pd.to_numeric(tmzon, errors='coerce').sub(1).fillna(0).astype(int)
+    date_str = raw['date'].astype(str)
+    ds = pd.to_datetime(date_str, format='%Y%m%d', errors='coerce') + pd.to_timedelta(hour, unit='h')
+
+    def population(field):
+        if field not in raw.columns:
+            return np.zeros(len(raw))
+        return pd.to_numeric(raw[field], errors='coerce').fillna(0).to_numpy()
+
+    df = pd.DataFrame({
+        'ds': ds,
+        'y': pd.to_numeric(raw['totalPopulation'], errors='coerce') if 'totalPopulation' in raw.columns else 0,
+        'local_population': population('localPopulation'),
+        'long_foreigner': population('longForeignerPopulation'),
+        'temp_foreigner': population('tempForeignerPopulation'),
+        'hour': hour,
+        'date': date_str,
+        'tmzon_pd_se': tmzon
+    })
+    df = df.dropna(subset=['ds', 'y'])  # 필수 컬럼에 결측값 제거
+    return df.sort_values('ds').reset_index(drop=True)
+
+
+class BackendDataSource:
+    """기존 백엔드 API에서 일별 데이터를 가져옵니다."""
+
+    kind = 'backend'
+
+    def __init__(self, backend_url: str, timeout: float = 30):
+        self.backend_url = backend_url
+        self.timeout = timeout
+
+    def load(self, dong_code: str, district: str = None) -> pd.DataFrame:
+        response = requests.get(f"{self.backend_url}{daily_data_path(dong_code, district)}", timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"API 호출 실패: {response.status_code}")
+        data = response.json()
+
+        # 응답이 문자열인 경우 JSON 파싱
+        if isinstance(data, str):
+            data = json.loads(data)
+        # dailyDataList 키가 있는지 확인
+        if isinstance(data, dict) and 'dailyDataList' in data:
+            data = data['dailyDataList']
+        elif not isinstance(data, list):
+            raise Exception(f"예상치 못한 데이터 형식: {type(data)}")
+        return pd.DataFrame(data)
+
+    def dong_codes(self) -> Optional[List[str]]:
+        # 백엔드는 동 목록을 따로 제공하지 않음 (districts.py 목록 사용)
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        return {'type': self.kind, 'backend_url': self.backend_url}
+
+
+class LocalDatasetSource:
+    """로컬 데이터셋 디렉터리에서 일별 데이터를 읽습니다.
+
+    디렉터리 구성 (둘 다 가능):
+        {root}/{dong_code}.parquet|csv|json  또는  {root}/{district}/{dong_code}.*
+        {root}/아무이름.parquet|csv          (dongCode 컬럼으로 여러 동을 담은 파일)
+    """
+
+    kind = 'local'
+
+    def __init__(self, root: str):
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"데이터셋 디렉터리가 없습니다: {root}")
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = None
+        # 여러 동 파일: 경로 -> (수정 시각, 동 코드 -> 데이터프레임)
+        self._combined: Dict[str, tuple] = {}
+
+    def _scan(self) -> Dict[str, str]:
+        """동 코드 -> 파일 경로 색인 (여러 동 파일은 '*'로 표시)"""
+        index = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() not in DATASET_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, filename)
+                if stem.isdigit():
+                    index.setdefault(stem, path)
+                else:
+                    for code in self._combined_groups(path):
+                        index.setdefault(code, '*' + path)
+        return index
+
+    def _combined_groups(self, path: str) -> Dict[str, pd.DataFrame]:
+        mtime = os.path.getmtime(path)
+        cached = self._combined.get(path)
+        if cached is None or cached[0] != mtime:
+            df = read_daily_file(path, path)
+            column = _dong_code_column(df)
+            groups = {} if column is None else {str(code): frame for code, frame in df.groupby(column, sort=False)}
+            cached = (mtime, groups)
+            self._combined[path] = cached
+        return cached[1]
+
+    def refresh(self):
+        with self._lock:
+            self._index = None
+
+    def dong_codes(self) -> List[str]:
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+            return sorted(self._index)
+
+    def load(self, dong_code: str, district: str = None) -> pd.DataFrame:
+        with self._lock:
+            if self._index is None or dong_code not in self._index:
+                # 새로 추가된 파일이 있을 수 있으므로 한 번 다시 색인
+                self._index = self._scan()
+            path = self._index.get(dong_code)
+        if path is None:
+            raise FileNotFoundError(f"로컬 데이터셋에 동 코드 {dong_code}의 데이터가 없습니다: {self.root}")
+        if path.startswith('*'):
+            with self._lock:
+                return self._combined_groups(path[1:])[dong_code].reset_index(drop=True)
+        return read_daily_file(path, path)
+
+    def describe(self) -> Dict[str, Any]:
+        return {'type': self.kind, 'path': self.root, 'dong_count': len(self.dong_codes())}
+
+
+class UploadedDataSource:
+    """업로드한 파일 하나에서 일별 데이터를 읽습니다 (메모리 보관)."""
+
+    kind = 'upload'
+
+    def __init__(self, content: bytes, filename: str, dong_code: str = None):
+        df = read_daily_file(io.BytesIO(content), filename)
+        column = _dong_code_column(df)
+        if column is not None:
+            self._frames = {str(code): frame.reset_index(drop=True) for code, frame in df.groupby(column, sort=False)}
+        elif dong_code:
+            self._frames = {str(dong_code): df}
+        else:
+            raise ValueError("여러 동을 구분할 dongCode 컬럼이 없으면 dong_code를 지정해야 합니다.")
+        self.filename = filename
+        self.rows = len(df)
+
+    def load(self, dong_code: str, district: str = None) -> pd.DataFrame:
+        if dong_code not in self._frames:
+            raise FileNotFoundError(f"업로드한 파일({self.filename})에 동 코드 {dong_code}의 데이터가 없습니다.")
+        return self._frames[dong_code]
+
+    def dong_codes(self) -> List[str]:
+        return sorted(self._frames)
+
+    def describe(self) -> Dict[str, Any]:
+        return {'type': self.kind, 'filename': self.filename, 'rows': self.rows, 'dong_count': len(self._frames)}
+
+
+def data_source_from_spec(spec: str, backend_url: str):
+    """'backend', 'backend:http://host:port', 'local:/경로' 또는 디렉터리 경로로 데이터 소스를 만듭니다."""
+    spec = (spec or 'backend').strip()
+    if spec == 'backend':
+        return BackendDataSource(backend_url)
+    if spec.startswith('backend:'):
+        return BackendDataSource(spec[len('backend:'):])
+    if spec.startswith('local:'):
+        spec = spec[len('local:'):]
+    return LocalDatasetSource(spec)
+
+
+def resolve_dataset_path(path: str, root: str) -> str:
+    """클라이언트가 보낸 경로를 데이터셋 루트 아래의 실제 경로로 바꿉니다 (루트를 벗어나면 ValueError)."""
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"데이터셋 경로는 데이터셋 루트({root}) 안이어야 합니다: {path}")
+    return resolved
+
+
+def export_daily_dataset(source, dong_codes: List[str], directory: str, district: str = None,
+                         fmt: str = 'parquet') -> Dict[str, Any]:
+    """소스의 동별 데이터를 로컬 데이터셋 디렉터리({dong_code}.{fmt})로 저장합니다."""
+    if fmt not in ('parquet', 'csv'):
+        raise ValueError("fmt는 'parquet' 또는 'csv'만 가능합니다.")
+    invalid = [code for code in dong_codes if not str(code).isdigit()]
+    if invalid:
+        raise ValueError(f"동 코드는 숫자만 가능합니다: {invalid}")
+    os.makedirs(directory, exist_ok=True)
+    written, failed = [], {}
+    for code in dong_codes:
+        try:
+            df = source.load(code, district)
+            path = os.path.join(directory, f"{code}.{fmt}")
+            if fmt == 'parquet':
+                df.to_parquet(path, index=False)
+            else:
+                df.to_csv(path, index=False)
+            written.append(code)
+        except Exception as e:
+            failed[code] = str(e)
+    return {'directory': os.path.abspath(directory), 'format': fmt, 'written': written, 'failed': failed}
@@ -0,0 +1,186 @@
+"""
+Prophet 예측 성분 분해 캐시 ("왜 이 시간이 피크인가" 설명용)
+
+요청마다 Prophet predict로 성분을 다시 계산하지 않도록, 학습된 모델마다 한 번만 성분 표를 뽑아 둡니다.
+
+    추세:   변화점 시각과 구간별 기울기/절편 (piecewise linear, 변화점 수만큼의 작은 배열)
+    계절성: 주기 한 바퀴를 SEASONAL_STEP_MINUTES 간격으로 미리 계산한 곡선 (일간 96칸, 주간 672칸, float32)
+    리그레서: 원래 단위 값 1당 기여 계수와 절편 (표준화 mu/std를 미리 반영)
+
+임의 시각의 분해는 추세 구간 탐색 + 계절 곡선 보간 + 리그레서 선형식으로 조립하며,
+yhat = 추세 * (1 + 곱셈 성분 합) + 덧셈 성분 합 (Prophet과 같은 식)이 predict 결과와 일치합니다.
+성분 표는 모델 객체에 묶인 약한 참조 캐시에 두므로 모델이 다시 학습되면 자동으로 새로 만듭니다.
+"""
+
+from typing import Any, Dict
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# 계절 곡선 표 간격 (분)과 주기가 긴 계절성(연간 등)의 최대 표 크기
+SEASONAL_STEP_MINUTES = 15
+MAX_SEASONAL_POINTS = 8784
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _days_since_epoch(ds: pd.Series) -> np.ndarray:
+    """Prophet fourier_series와 같은 기준(1970-01-01부터 일 수)"""
+    return (pd.to_datetime(ds) - pd.Timestamp('1970-01-01')).dt.total_seconds().to_numpy() / MINUTES_PER_DAY / 60
+
+
+class ComponentTables:
+    """학습된 Prophet 모델 하나의 추세/계절/리그레서 성분 표"""
+
+    def __init__(self, model):
+        if model.growth not in ('linear', 'flat'):
+            raise ValueError(f"성분 표는 linear/flat 추세만 지원합니다 (현재 {model.growth}).")
+        if model.holidays is not None or getattr(model, 'country_holidays', None):
+            raise ValueError("공휴일 성분이 있는 모델은 아직 지원하지 않습니다.")
+        beta = np.asarray(model.params['beta'], dtype=np.float64).mean(axis=0)
+        columns = model.train_component_cols
+        self.y_scale = float(model.y_scale)
+        self.multiplicative = set(model.component_modes['multiplicative'])
+
+        # 추세: t = (ds - start) / t_scale, 변화점 이후 기울기 누적
+        self.start = pd.Timestamp(model.start)
+        self.t_scale_seconds = pd.Timedelta(model.t_scale).total_seconds()
+        k = float(np.asarray(model.params['k']).mean())
+        m = float(np.asarray(model.params['m']).mean())
+        if model.growth == 'flat':
+            self.changepoints_t = np.array([])
+            self.slopes = np.array([0.0])
+            self.offsets = np.array([m])
+        else:
+            deltas = np.asarray(model.params['delta'], dtype=np.float64).mean(axis=0)
+            self.changepoints_t = np.asarray(model.changepoints_t, dtype=np.float64)
+            self.slopes = k + np.concatenate([[0.0], np.cumsum(deltas)])
+            self.offsets = m + np.concatenate([[0.0], np.cumsum(-self.changepoints_t * deltas)])
+
+        # 계절성: 주기 한 바퀴 곡선
+        self.seasonal: Dict[str, Dict[str, Any]] = {}
+        for name, spec in model.seasonalities.items():
+            if spec.get('condition_name'):
+                raise ValueError(f"조건부 계절성({name})은 아직 지원하지 않습니다.")
+            period = float(spec['period'])
+            step = max(SEASONAL_STEP_MINUTES / MINUTES_PER_DAY, period / MAX_SEASONAL_POINTS)
+            n_points = int(np.ceil(period / step))
+            positions = np.arange(n_points + 1) * (period / n_points)
+            features = model.fourier_series(pd.Series(pd.Timestamp('1970-01-01') + pd.to_timedelta(positions, unit='D')),
+                                            period, spec['fourier_order'])
+            curve = features @ beta[np.flatnonzero(columns[name].to_numpy())]
+            if name not in self.multiplicative:
+                curve = curve * self.y_scale
+            self.seasonal[name] = {'period': period, 'step': period / n_points, 'curve': curve.astype(np.float32)}
+
+        # 리그레서: 원래 단위 x에 대한 기여 = coef * x + intercept
+        self.regressors: Dict[str, Dict[str, float]] = {}
+        for name, spec in model.extra_regressors.items():
+            weight = float(beta[np.flatnonzero(columns[name].to_numpy())[0]]) / float(spec['std'])
+            if name not in self.multiplicative:
+                weight *= self.y_scale
+            self.regressors[name] = {'coef': weight, 'intercept': -weight * float(spec['mu'])}
+
+    def trend(self, ds: pd.Series) -> np.ndarray:
+        t = (pd.to_datetime(ds) - self.start).dt.total_seconds().to_numpy() / self.t_scale_seconds
+        segment = np.searchsorted(self.changepoints_t, t, side='right')
+        return (self.slopes[segment] * t + self.offsets[segment]) * self.y_scale
+
+    def seasonal_value(self, name: str, ds: pd.Series) -> np.ndarray:
+        """곡선 표 선형 보간"""
+        table = self.seasonal[name]
+        position = np.mod(_days_since_epoch(ds), table['period']) / table['step']
+        lo = np.floor(position).astype(int)
+        frac = position - lo
+        curve = table['curve']
+        return curve[lo] * (1 - frac) + curve[lo + 1] * frac
+
+    def explain(self, frame: pd.DataFrame) -> Dict[str, Any]:
+        """ds와 리그레서 열이 있는 프레임의 시점별 분해 (인구 단위 기여)"""
+        ds = pd.to_datetime(frame['ds']).reset_index(drop=True)
+        trend = self.trend(ds)
+        relative, absolute = {}, {}
+        for name in self.seasonal:
+            (relative if name in self.multiplicative else absolute)[name] = self.seasonal_value(name, ds)
+        for name, spec in self.regressors.items():
+            if name not in frame:
+                raise ValueError(f"리그레서 값이 없습니다: {name}")
+            value = spec['coef'] * frame[name].to_numpy(dtype=np.float64) + spec['intercept']
+            (relative if name in self.multiplicative else absolute)[name] = value
+
+        contributions = {name: trend * value for name, value in relative.items()}
+        contributions.update(absolute)
+        yhat = trend + sum(contributions.values(), np.zeros(len(ds)))
+        return {'ds': ds, 'trend': trend, 'contributions': contributions, 'relative': relative, 'yhat': yhat}
+
+    def summary(self) -> Dict[str, Any]:
+        """성분 표 요약 (계절 곡선은 시간 단위로 줄여서)"""
+        seasonal = {}
+        for name, table in self.seasonal.items():
+            per_hour = int(round(1 / 24 / table['step'])) or 1
+            seasonal[name] = {
+                'period_days': table['period'],
+                'mode': 'multiplicative' if name in self.multiplicative else 'additive',
+                'table_points': int(len(table['curve']) - 1),
+                'hourly_curve': np.round(table['curve'][:-1:per_hour].astype(np.float64), 5).tolist()
+            }
+        return {
+            'trend': {
+                'changepoints': [str(self.start + pd.Timedelta(seconds=t * self.t_scale_seconds)) for t in self.changepoints_t],
+                'slope_per_day_last': round(float(self.slopes[-1] * self.y_scale * 86400 / self.t_scale_seconds), 3)
+            },
+            'seasonal': seasonal,
+            'regressors': {
+                name: {**{key: round(value, 6) for key, value in spec.items()},
+                       'mode': 'multiplicative' if name in self.multiplicative else 'additive'}
+                for name, spec in self.regressors.items()
+            }
+        }
+
+    def nbytes(self) -> int:
+        return int(self.slopes.nbytes + self.offsets.nbytes + self.changepoints_t.nbytes
+                   + sum(table['curve'].nbytes for table in self.seasonal.values()))
+
+
+_tables: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_tables_lock = threading.Lock()
+
+
+def component_tables(model) -> ComponentTables:
+    """모델 객체별 성분 표 (모델당 한 번만 추출)"""
+    with _tables_lock:
+        tables = _tables.get(model)
+        if tables is None:
+            tables = ComponentTables(model)
+            _tables[model] = tables
+        return tables
+
+
+def explain_records(tables: ComponentTables, frame: pd.DataFrame) -> Dict[str, Any]:
+    """API 응답 형식: 시점별 분해와 가장 높은 시점(피크)의 주요 요인"""
+    result = tables.explain(frame)
+    contributions = result['contributions']
+    rows = []
+    for i, ds in enumerate(result['ds']):
+        rows.append({
+            'timestamp': ds.isoformat(),
+            'hour': int(ds.hour),
+            'yhat': round(float(result['yhat'][i]), 1),
+            'trend': round(float(result['trend'][i]), 1),
+            'components': {name: round(float(values[i]), 1) for name, values in contributions.items()}
+        })
+    peak = int(np.argmax(result['yhat']))
+    ranked = sorted(contributions, key=lambda name: -abs(contributions[name][peak]))
+    return {
+        'explanations': rows,
+        'peak': {
+            'timestamp': rows[peak]['timestamp'],
+            'yhat': rows[peak]['yhat'],
+            # 추세 대비 피크를 만든 성분 (기여 절댓값 순)
+            'drivers': [{'component': name, 'contribution': rows[peak]['components'][name],
+                         'relative': round(float(result['relative'][name][peak]), 4) if name in result['relative'] else None}
+                        for name in ranked]
+        }
+    }
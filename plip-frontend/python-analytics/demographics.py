@@ -0,0 +1,202 @@
+"""
+성별 x 연령대 x 시간대 대량 시계열 예측 엔진
+
+동마다 성별(2) x 연령대(14) = 28개의 작은 시계열이 있어 Prophet 모델을 시계열마다
+학습하는 것은 현실적이지 않습니다. 대신 모든 동/버킷 시계열을 하나의 행렬로 쌓고
+
+    1) 시계열별 수준(level)으로 정규화한 뒤 요일x시간(168칸) 프로파일을 계산하고
+    2) 프로파일 행렬을 SVD로 분해해 공유 계절 패턴(k개)을 추출한 다음
+    3) 예측 = 수준 x (적재값 @ 공유 패턴)
+
+을 한 번의 행렬 곱으로 계산합니다.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+import time
+
+import numpy as np
+import pandas as pd
+
+GENDERS = ('male', 'female')
+
+# 백엔드 국내 인구 응답 필드 접미사 -> 연령대 라벨 (api_endpoint.txt 기준)
+AGE_BUCKETS = {
+    'F0t9': '0-9',
+    'F10t14': '10-14',
+    'F15t19': '15-19',
+    'F20t24': '20-24',
+    'F25t29': '25-29',
+    'F30t34': '30-34',
+    'F35t39': '35-39',
+    'F40t44': '40-44',
+    'F45t49': '45-49',
+    'F50t54': '50-54',
+    'F55t59': '55-59',
+    'F60t64': '60-64',
+    'F65t69': '65-69',
+    'F70t74': '70+'
+}
+
+# (gender, age_label) 순서의 버킷 컬럼명
+BUCKET_COLUMNS = [f'{gender}{suffix}LvpopCo' for gender in GENDERS for suffix in AGE_BUCKETS]
+BUCKET_LABELS = [(gender, label) for gender in GENDERS for label in AGE_BUCKETS.values()]
+
+HOURS_PER_WEEK = 168
+
+# 공유 계절 패턴 개수 기본값
+DEFAULT_RANK = 4
+
+# 수준(level) 추정에 사용하는 최근 기간 (일)
+LEVEL_WINDOW_DAYS = 7
+
+
+def hour_of_week(timestamps) -> np.ndarray:
+    """타임스탬프를 월요일 0시 기준 0..167 인덱스로 변환합니다."""
+    ts = pd.DatetimeIndex(timestamps)
+    return (ts.dayofweek * 24 + ts.hour).to_numpy()
+
+
+def records_to_frame(records: List[Dict]) -> pd.DataFrame:
+    """국내 인구 응답(stdrDeId, tmzonPdSe, 성별/연령 컬럼)을 ds + 28개 버킷 데이터프레임으로 변환합니다."""
+    rows = []
+    for item in records:
+        try:
+            hour = int(item.get('tmzonPdSe', '0')) - 1
+        except ValueError:
+            hour = 0
+        try:
+            ds = pd.to_datetime(item.get('stdrDeId', ''), format='%Y%m%d') + pd.Timedelta(hours=hour)
+        except (ValueError, TypeError):
+            continue
+        row = {'ds': ds}
+        for column in BUCKET_COLUMNS:
+            row[column] = item.get(column) or 0
+        rows.append(row)
+
+    if not rows:
+        return pd.DataFrame(columns=['ds'] + BUCKET_COLUMNS)
+    return pd.DataFrame(rows).drop_duplicates('ds').sort_values('ds').reset_index(drop=True)
+
+
+class DemographicEngine:
+    """모든 동의 성별/연령대 시계열을 하나의 저랭크 계절 모델로 예측합니다."""
+
+    def __init__(self, rank: int = DEFAULT_RANK):
+        self.rank = rank
+        self.dong_codes: List[str] = []
+        self.levels = None      # (시계열 수,)
+        self.loadings = None    # (시계열 수, rank)
+        self.patterns = None    # (rank, 168)
+        self.explained_variance = None
+        self.backtest = None
+        self.fit_seconds = None
+        self.fitted_at = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.patterns is not None
+
+    def series_index(self, dong_code: str) -> slice:
+        """dong_code에 해당하는 시계열 행 범위를 반환합니다."""
+        i = self.dong_codes.index(dong_code)
+        n = len(BUCKET_COLUMNS)
+        return slice(i * n, (i + 1) * n)
+
+    @staticmethod
+    def stack(frames: Dict[str, pd.DataFrame]):
+        """동별 데이터프레임을 (동 x 버킷, 시점) 행렬로 쌓습니다. 결측은 NaN."""
+        codes = list(frames)
+        index = pd.DatetimeIndex(sorted(set().union(*[set(frames[c]['ds']) for c in codes])))
+        blocks = [
+            frames[code].set_index('ds')[BUCKET_COLUMNS].reindex(index).to_numpy(dtype=float).T
+            for code in codes
+        ]
+        return codes, index, np.vstack(blocks)
+
+    @staticmethod
+    def _profiles(values: np.ndarray, how: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """수준으로 정규화한 값의 요일x시간 평균 프로파일 (시계열 수 x 168)"""
+        normalized = values / levels[:, None]
+        valid = ~np.isnan(normalized)
+        # 시점 축 그룹 합계를 행렬 곱 하나로 계산
+        onehot = np.zeros((len(how), HOURS_PER_WEEK))
+        onehot[np.arange(len(how)), how] = 1.0
+        sums = np.where(valid, normalized, 0.0) @ onehot
+        counts = valid.astype(float) @ onehot
+        profiles = np.divide(sums, counts, out=np.ones_like(sums), where=counts > 0)
+
+        # 관측되지 않은 요일x시간 칸은 같은 시간대의 평균으로 보정
+        missing = counts == 0
+        if missing.any():
+            hourly = profiles.reshape(-1, 7, 24)
+            hourly_counts = (~missing).reshape(-1, 7, 24)
+            fallback = np.divide((hourly * hourly_counts).sum(axis=1), hourly_counts.sum(axis=1),
+                                 out=np.ones((profiles.shape[0], 24)), where=hourly_counts.sum(axis=1) > 0)
+            profiles = np.where(missing, np.tile(fallback, 7), profiles)
+        return profiles
+
+    def _fit_matrix(self, values: np.ndarray, index: pd.DatetimeIndex):
+        how = hour_of_week(index)
+        recent = index >= index.max() - pd.Timedelta(days=LEVEL_WINDOW_DAYS)
+        levels = np.nanmean(values[:, recent], axis=1)
+        levels = np.where(np.isnan(levels) | (levels <= 0), 1.0, levels)
+
+        profiles = self._profiles(values, how, levels)
+        # 공유 계절 패턴: 프로파일 행렬의 상위 k개 우특이벡터
+        _, singular, vt = np.linalg.svd(profiles, full_matrices=False)
+        rank = min(self.rank, len(singular))
+        patterns = vt[:rank]
+        loadings = profiles @ patterns.T
+        energy = singular ** 2
+        explained = float(energy[:rank].sum() / energy.sum()) if energy.sum() > 0 else 1.0
+        return levels, loadings, patterns, explained
+
+    def fit(self, frames: Dict[str, pd.DataFrame]):
+        """동별 성별/연령 데이터로 엔진을 학습하고 마지막 1주 백테스트를 계산합니다."""
+        if not frames:
+            raise ValueError("훈련 데이터가 없습니다.")
+
+        start = time.perf_counter()
+        codes, index, values = self.stack(frames)
+
+        # 백테스트: 마지막 1주를 제외하고 학습 → 해당 주 예측 오차
+        holdout = index > index.max() - pd.Timedelta(days=7)
+        if holdout.sum() > 0 and (~holdout).sum() >= HOURS_PER_WEEK:
+            levels, loadings, patterns, _ = self._fit_matrix(values[:, ~holdout], index[~holdout])
+            predicted = (levels[:, None] * loadings) @ patterns[:, hour_of_week(index[holdout])]
+            actual = values[:, holdout]
+            valid = ~np.isnan(actual)
+            abs_error = np.abs(np.where(valid, actual - predicted, 0.0))
+            self.backtest = {
+                'mae': float(abs_error.sum() / max(valid.sum(), 1)),
+                'wape': float(abs_error.sum() / max(np.abs(np.where(valid, actual, 0.0)).sum(), 1e-9) * 100),
+                'holdout_hours': int(holdout.sum())
+            }
+        else:
+            self.backtest = None
+
+        self.levels, self.loadings, self.patterns, self.explained_variance = self._fit_matrix(values, index)
+        self.dong_codes = codes
+        self.fit_seconds = time.perf_counter() - start
+        self.fitted_at = datetime.now()
+        print(f"✅ 성별/연령 엔진 훈련 완료: 시계열 {values.shape[0]}개, {self.fit_seconds * 1000:.1f}ms")
+        return self
+
+    def forecast(self, timestamps) -> np.ndarray:
+        """모든 시계열의 예측 행렬 (시계열 수 x 시점 수)을 한 번의 행렬 곱으로 계산합니다."""
+        if not self.is_trained:
+            raise ValueError("성별/연령 엔진이 훈련되지 않았습니다.")
+        weights = self.levels[:, None] * self.loadings
+        return np.maximum(weights @ self.patterns[:, hour_of_week(timestamps)], 0)
+
+    def forecast_dong(self, dong_code: str, timestamps) -> Dict[str, Dict[str, List[int]]]:
+        """특정 동의 성별 -> 연령대 -> 시간별 예측값을 반환합니다."""
+        rows = self.series_index(dong_code)
+        weights = self.levels[rows, None] * self.loadings[rows]
+        values = np.maximum(weights @ self.patterns[:, hour_of_week(timestamps)], 0)
+
+        result = {gender: {} for gender in GENDERS}
+        for (gender, label), row in zip(BUCKET_LABELS, values):
+            result[gender][label] = [int(round(v)) for v in row]
+        return result
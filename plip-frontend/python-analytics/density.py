@@ -0,0 +1,256 @@
+"""
+자치구 인구밀도 참조 데이터 (public/data/인구밀도_*.csv)
+
+서울 열린데이터 광장 인구밀도 CSV는 헤더가 두 줄(1행 연도, 2행 항목명)이고 BOM 붙은 UTF-8 또는 CP949로
+내려받아지며, 지역 열도 '동별(1)/(2)/(3)' 계층(합계 > 구 > 소계)으로 나뉘어 있어 바로 쓰기 어렵습니다.
+파일을 한 번 파싱해 구 순서의 float 배열(인구, 면적 km², 밀도)과 이름/코드/영문 키 -> 행 번호 사전으로 보관합니다.
+
+    lookup('강남구' | '11680' | 'gangnam')   O(1) 조회
+    area_for_dongs(dong_codes)              행정동 코드 순서의 소속 구 면적 배열 (큐브 동 축과 나란히)
+    live_density(cube, ...)                 구별 시간대 생활인구 / 면적 (명/km², 시간별), 거주 밀도 대비 비율
+
+파일 수정 시각(또는 더 최신 파일)이 바뀌면 다시 읽습니다.
+"""
+
+from typing import Any, Dict, List, Optional
+import csv
+import glob
+import io
+import os
+import threading
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+from districts import PUBLIC_DATA_DIR, load_seoul_districts
+
+DENSITY_CSV_PATTERN = os.path.join(PUBLIC_DATA_DIR, '인구밀도_*.csv')
+
+# 파일 인코딩 시도 순서 (BOM 있는 UTF-8, 엑셀 저장본 CP949)
+CSV_ENCODINGS = ('utf-8-sig', 'cp949')
+
+# 2행 항목명 -> 필드 (앞부분 일치)
+DENSITY_FIELDS = {'인구': 'population', '면적': 'area_km2', '인구밀도': 'density'}
+
+# 지역 계층 열의 합계/소계 표기
+TOTAL_LABELS = ('합계', '소계', '계')
+
+
+def latest_density_csv(pattern: str = DENSITY_CSV_PATTERN) -> str:
+    """가장 최근 내려받은 인구밀도 CSV 경로 (파일명 타임스탬프 기준)"""
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"인구밀도 CSV가 없습니다: {pattern}")
+    return paths[-1]
+
+
+def _decode(raw: bytes) -> str:
+    for encoding in CSV_ENCODINGS:
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("인구밀도 CSV 인코딩을 알 수 없습니다 (UTF-8/CP949 아님).")
+
+
+def _number(text: str) -> float:
+    text = text.strip().replace(',', '')
+    try:
+        return float(text)
+    except ValueError:
+        # '-', 'X' 같은 비공개/결측 표기
+        return np.nan
+
+
+def _field(label: str) -> Optional[str]:
+    label = label.replace(' ', '')
+    # '인구밀도'가 '인구'보다 먼저 걸리도록 긴 항목명부터 비교
+    for prefix in sorted(DENSITY_FIELDS, key=len, reverse=True):
+        if label.startswith(prefix):
+            return DENSITY_FIELDS[prefix]
+    return None
+
+
+def parse_density_csv(text: str) -> Dict[str, Any]:
+    """두 줄 헤더 CSV -> 최신 연도 열 기준 구별 (이름, 인구, 면적, 밀도)와 서울 합계"""
+    rows = [row for row in csv.reader(io.StringIO(text)) if row]
+    if len(rows) < 3:
+        raise ValueError("인구밀도 CSV에 데이터 행이 없습니다.")
+    years, labels = rows[0], rows[1]
+    region_columns = [i for i, label in enumerate(labels) if label.startswith('동별')]
+
+    # 필드별로 가장 최근 연도 열을 선택
+    columns: Dict[str, int] = {}
+    column_years: Dict[str, str] = {}
+    for i, label in enumerate(labels):
+        field = _field(label)
+        if field is None or i in region_columns:
+            continue
+        if field not in columns or years[i] >= column_years[field]:
+            columns[field], column_years[field] = i, years[i]
+    missing = {'population', 'area_km2'} - set(columns)
+    if missing:
+        raise ValueError(f"인구밀도 CSV에 필요한 항목이 없습니다: {', '.join(sorted(missing))}")
+
+    names, population, area, density = [], [], [], []
+    total = None
+    for row in rows[2:]:
+        regions = [row[i].strip() for i in region_columns]
+        values = {field: _number(row[i]) for field, i in columns.items()}
+        # 구 단위 행: 두 번째 계층이 구 이름이고 나머지 하위 계층은 소계
+        district = regions[1] if len(regions) > 1 else regions[0]
+        below = regions[2:]
+        if district in TOTAL_LABELS:
+            total = values
+            continue
+        if any(level not in TOTAL_LABELS for level in below):
+            # 동 단위 행(다른 연도 파일)은 구 표에 넣지 않음
+            continue
+        names.append(district)
+        population.append(values['population'])
+        area.append(values['area_km2'])
+        density.append(values.get('density', np.nan))
+
+    population = np.array(population, dtype=np.float64)
+    area = np.array(area, dtype=np.float64)
+    density = np.array(density, dtype=np.float64)
+    # 밀도 열이 비어 있으면 인구 / 면적으로 채움
+    computed = np.divide(population, area, out=np.full(len(area), np.nan), where=area > 0)
+    density = np.where(np.isnan(density), computed, density)
+    return {
+        'names': names, 'population': population, 'area_km2': area, 'density': density,
+        'total': total, 'year': column_years.get('population')
+    }
+
+
+class DensityTable:
+    """구별 인구/면적/밀도 배열과 이름/코드/영문 키 색인"""
+
+    def __init__(self, path: str, mtime: float = None):
+        self.path = path
+        self.mtime = mtime if mtime is not None else os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            parsed = parse_density_csv(_decode(f.read()))
+        self.names: List[str] = parsed['names']
+        self.population = parsed['population']
+        self.area_km2 = parsed['area_km2']
+        self.density = parsed['density']
+        self.total = parsed['total']
+        self.year = parsed['year']
+
+        # 구 한글 이름 -> 영문 키 -> 5자리 구 코드 (TopoJSON 구 경계 기준)
+        district_codes, district_korean_names, _ = load_seoul_districts()
+        korean_to_key = {name: key for key, name in district_korean_names.items()}
+        key_to_code = {key: code for code, key in district_codes.items()}
+        self.keys = [korean_to_key.get(name) for name in self.names]
+        self.codes = [key_to_code.get(key) for key in self.keys]
+
+        self._index: Dict[str, int] = {}
+        for i, (name, key, code) in enumerate(zip(self.names, self.keys, self.codes)):
+            for alias in (name, key, code):
+                if alias:
+                    self._index[alias] = i
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def row(self, district: str) -> int:
+        """구 한글 이름, 5자리 구 코드, 영문 키 -> 행 번호"""
+        index = self._index.get(str(district).strip())
+        if index is None:
+            raise KeyError(f"인구밀도 자료에 없는 구입니다: {district}")
+        return index
+
+    def lookup(self, district: str) -> Dict[str, Any]:
+        i = self.row(district)
+        return {
+            'district': self.keys[i], 'district_code': self.codes[i], 'district_name': self.names[i],
+            'population': None if np.isnan(self.population[i]) else int(self.population[i]),
+            'area_km2': float(self.area_km2[i]),
+            'density': None if np.isnan(self.density[i]) else round(float(self.density[i]), 1)
+        }
+
+    def area_for_dongs(self, dong_codes: List[str]) -> np.ndarray:
+        """행정동(또는 구) 코드 순서의 소속 구 면적 (km²), 자료에 없는 구는 NaN"""
+        rows = self.district_rows(dong_codes)
+        return np.where(rows >= 0, self.area_km2[rows], np.nan)
+
+    def district_rows(self, dong_codes: List[str]) -> np.ndarray:
+        """행정동 코드 순서의 소속 구 행 번호 (자료에 없으면 -1)"""
+        return np.array([self._index.get(str(code)[:5], -1) for code in dong_codes], dtype=int)
+
+    def live_density(self, cube: PopulationCube, measure: str = 'total', start_date=None,
+                     end_date=None) -> Dict[str, Any]:
+        """구별 시간대 생활인구 밀도 (구에 속한 큐브 동 합계 / 구 면적, 명/km²)
+
+        (구, 날짜, 시간) 배열 하나로 계산하며, 거주인구 밀도 대비 비율(activity_ratio)도 함께 돌려줍니다.
+        큐브가 구의 일부 동만 갖고 있으면 covered_dongs로 알 수 있습니다.
+        """
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        date_slice = cube.date_slice(start_date, end_date)
+        if date_slice.stop <= date_slice.start:
+            raise ValueError("요청한 기간에 큐브 데이터가 없습니다.")
+        rows = self.district_rows(cube.dong_codes)
+        dongs = np.flatnonzero(rows >= 0)
+        block = np.asarray(cube.values[dongs, date_slice, :, MEASURE_NAMES.index(measure)], dtype=np.float64)
+        valid = ~np.isnan(block)
+
+        # 동 -> 구 합계를 행 번호 기준 한 번에 누적 (구, 날짜, 시간)
+        n = len(self)
+        sums = np.zeros((n,) + block.shape[1:])
+        counts = np.zeros((n,) + block.shape[1:], dtype=np.int32)
+        np.add.at(sums, rows[dongs], np.where(valid, block, 0))
+        np.add.at(counts, rows[dongs], valid.astype(np.int32))
+        per_km2 = np.where(counts > 0, sums, np.nan) / self.area_km2[:, None, None]
+
+        present = np.flatnonzero(np.bincount(rows[dongs], minlength=n) > 0)
+        hourly = np.nanmean(per_km2[present], axis=1) if len(present) else np.empty((0, 24))
+        dates = cube.dates[date_slice]
+        return {
+            'measure': measure,
+            'start_date': str(dates[0]),
+            'end_date': str(dates[-1]),
+            'reference_year': self.year,
+            'districts': [
+                {
+                    'district': self.keys[i], 'district_name': self.names[i],
+                    'covered_dongs': int((rows[dongs] == i).sum()),
+                    'area_km2': float(self.area_km2[i]),
+                    'resident_density': round(float(self.density[i]), 1),
+                    'hourly_density': [None if np.isnan(v) else round(float(v), 1) for v in hourly[k]],
+                    'mean_density': round(float(np.nanmean(hourly[k])), 1),
+                    'activity_ratio': round(float(np.nanmean(hourly[k]) / self.density[i]), 3)
+                }
+                for k, i in enumerate(present)
+            ]
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'path': os.path.basename(self.path),
+            'mtime': self.mtime,
+            'year': self.year,
+            'districts': len(self),
+            'unmatched': [name for name, code in zip(self.names, self.codes) if code is None],
+            'total': self.total
+        }
+
+
+_density_cache: Dict[str, DensityTable] = {}
+_density_lock = threading.Lock()
+
+
+def load_density_table(path: str = None) -> DensityTable:
+    """인구밀도 참조표 (파일이나 수정 시각이 바뀌었을 때만 다시 파싱)"""
+    path = path or latest_density_csv()
+    mtime = os.path.getmtime(path)
+    with _density_lock:
+        cached = _density_cache.get(path)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+        table = DensityTable(path, mtime)
+        _density_cache[path] = table
+        return table
@@ -0,0 +1,161 @@
+"""
+구(자치구) / 행정동 목록
+
+계층 예측(동 → 구)과 백엔드 조회 경로에서 사용하는 구별 행정동 코드와 이름입니다.
+강남구는 백엔드와 동일한 코드(src/data/gangnamDongs.js)를 그대로 사용하고,
+나머지 구는 public/data의 TopoJSON(topomap.json, topomap_dong.json)에서 읽어옵니다.
+"""
+
+from functools import lru_cache
+from typing import Dict
+import json
+import os
+import re
+
+PUBLIC_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'public', 'data')
+DISTRICT_TOPOJSON_PATH = os.path.join(PUBLIC_DATA_DIR, 'topomap.json')
+DONG_TOPOJSON_PATH = os.path.join(PUBLIC_DATA_DIR, 'topomap_dong.json')
+
+# 백엔드 일별 데이터 경로 템플릿 (구 영문 키 + 행정동 코드)
+DAILY_DATA_PATH = "/population/{district}/dongs/{dong_code}/daily"
+
+# 코드로 구를 찾을 수 없을 때 사용하는 기본 구 (기존 강남구 전용 동작과 호환)
+DEFAULT_DISTRICT = 'gangnam'
+
+# 백엔드 코드와 TopoJSON 코드가 다른 구는 직접 관리하는 목록을 우선 사용
+STATIC_DISTRICT_DONGS: Dict[str, Dict[str, str]] = {
+    'gangnam': {
+        '11680510': '신사동',
+        '11680521': '논현1동',
+        '11680531': '논현2동',
+        '11680545': '압구정동',
+        '11680565': '청담동',
+        '11680580': '삼성1동',
+        '11680590': '삼성2동',
+        '11680600': '대치1동',
+        '11680610': '대치2동',
+        '11680631': '대치4동',
+        '11680640': '역삼1동',
+        '11680650': '역삼2동',
+        '11680655': '도곡1동',
+        '11680656': '도곡2동',
+        '11680660': '개포1동',
+        '11680670': '개포2동',
+        '11680740': '개포3동',
+        '11680690': '개포4동',
+        '11680700': '세곡동',
+        '11680720': '일원본동',
+        '11680730': '일원1동',
+        '11680750': '수서동'
+    }
+}
+
+
+def district_key(english_name: str) -> str:
+    """'Gangnam-gu' 같은 영문 구 이름을 'gangnam' 키로 변환합니다."""
+    name = english_name.strip().lower()
+    return name[:-3] if name.endswith('-gu') else name
+
+
+@lru_cache(maxsize=1)
+def load_seoul_districts():
+    """TopoJSON에서 (구 코드 -> 영문 키, 영문 키 -> 한글 이름, 영문 키 -> 동 목록)을 읽습니다."""
+    with open(DISTRICT_TOPOJSON_PATH, encoding='utf-8') as f:
+        district_topo = json.load(f)
+    with open(DONG_TOPOJSON_PATH, encoding='utf-8') as f:
+        dong_topo = json.load(f)
+
+    codes, names = {}, {}
+    for obj in district_topo['objects'].values():
+        for geometry in obj['geometries']:
+            props = geometry['properties']
+            key = district_key(props['SIG_ENG_NM'])
+            codes[props['SIG_CD']] = key
+            names[key] = props['SIG_KOR_NM']
+
+    dongs = {key: {} for key in names}
+    for obj in dong_topo['objects'].values():
+        for geometry in obj['geometries']:
+            props = geometry['properties']
+            key = codes.get(props['adm_cd'][:5])
+            if key is not None:
+                dongs[key][props['adm_cd']] = props['adm_nm'].split()[-1]
+
+    dongs.update(STATIC_DISTRICT_DONGS)
+    return codes, names, dongs
+
+
+def _district_tables():
+    try:
+        return load_seoul_districts()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ 구/동 TopoJSON 로드 실패, 강남구만 사용: {e}")
+        return {'11680': 'gangnam'}, {'gangnam': '강남구'}, dict(STATIC_DISTRICT_DONGS)
+
+
+def district_names() -> Dict[str, str]:
+    """구 영문 키 -> 한글 이름"""
+    return _district_tables()[1]
+
+
+def get_district_dongs(district: str) -> Dict[str, str]:
+    """구 이름(영문 키)에 속한 행정동 코드 -> 동 이름 사전을 반환합니다."""
+    dongs = _district_tables()[2]
+    if district not in dongs:
+        raise KeyError(f"지원하지 않는 구입니다: {district}")
+    return dongs[district]
+
+
+def dong_names() -> Dict[str, str]:
+    """모든 구의 행정동 코드 -> 동 이름"""
+    names = {}
+    for table in _district_tables()[2].values():
+        names.update(table)
+    return names
+
+
+def find_dong_codes(query: str) -> list:
+    """행정동 코드 또는 이름으로 코드 목록을 찾습니다.
+
+    이름이 정확히 일치하지 않으면 숫자/가운뎃점을 뺀 이름으로 비교하므로
+    '역삼동'은 역삼1동, 역삼2동을 모두 돌려줍니다.
+    """
+    query = str(query).strip()
+    names = dong_names()
+    if query in names:
+        return [query]
+    exact = [code for code, name in names.items() if name == query]
+    if exact:
+        return exact
+    base = re.sub(r'[\d·]+', '', query)
+    return [code for code, name in names.items() if re.sub(r'[\d·]+', '', name) == base]
+
+
+def backend_dong_code(topo_code: str, name: str) -> str:
+    """TopoJSON 행정동 코드를 백엔드 코드로 바꿉니다 (직접 관리하는 구는 같은 이름의 코드 사용)."""
+    topo_code = str(topo_code)
+    for table in STATIC_DISTRICT_DONGS.values():
+        if topo_code in table:
+            return topo_code
+        if any(code[:5] == topo_code[:5] for code in table):
+            matches = [code for code, dong_name in table.items() if dong_name == name]
+            return matches[0] if matches else topo_code
+    return topo_code
+
+
+def district_for_dong(dong_code: str) -> str:
+    """행정동 코드 앞 5자리(구 코드)로 구 영문 키를 찾습니다."""
+    district = _district_tables()[0].get(str(dong_code)[:5])
+    if district is None:
+        raise KeyError(f"구를 찾을 수 없는 행정동 코드입니다: {dong_code}")
+    return district
+
+
+def daily_data_path(dong_code: str, district: str = None) -> str:
+    """동의 백엔드 일별 데이터 경로를 만듭니다 (district 생략 시 코드로 추론)."""
+    if district is None:
+        try:
+            district = district_for_dong(dong_code)
+        except KeyError:
+            district = DEFAULT_DISTRICT
+    return DAILY_DATA_PATH.format(district=district, dong_code=dong_code)
@@ -0,0 +1,304 @@
+"""
+행정동 경계 (TopoJSON) 디코딩과 좌표 -> 행정동 공간 색인
+
+브라우저에서만 풀던 public/data/topomap_dong.json을 서버에서 한 번 디코딩합니다.
+
+    arcs       : 양자화된 델타 좌표 -> 누적합 * scale + translate (경도, 위도)
+    geometries : 동마다 폴리곤 -> 링 -> arc 번호 목록 (음수 ~i는 i번 arc를 뒤집어 사용)
+
+좌표 -> 동 찾기는 전체 경계 범위를 GRID_SIZE x GRID_SIZE 격자로 나눠
+    - 경계선이 지나지 않는 칸: 칸 중심으로 미리 구한 동 번호를 바로 사용 (대부분의 점)
+    - 경계선이 지나는 칸: 그 칸에 걸친 변들만으로 교차 횟수(홀짝)를 세어 정확히 판정
+두 경우 모두 점 배열 전체를 한 번에 처리합니다 (점-변 쌍을 펼쳐 unique로 집계).
+
+파일 수정 시각이 바뀌면 다시 디코딩합니다.
+"""
+
+from typing import Any, Dict, List, Tuple
+import json
+import os
+import threading
+
+import numpy as np
+
+from districts import DONG_TOPOJSON_PATH, backend_dong_code
+
+# 좌표 격자 크기 (한 변 칸 수)
+GRID_SIZE = 512
+
+# 한 요청에서 찾을 수 있는 최대 좌표 수
+MAX_LOCATE_POINTS = 200000
+
+
+def decode_arcs(topology: Dict[str, Any]) -> List[np.ndarray]:
+    """TopoJSON arcs를 (점 수, 2) 경도/위도 배열 목록으로 디코딩합니다."""
+    arcs = topology['arcs']
+    lengths = np.array([len(arc) for arc in arcs])
+    flat = np.array([point[:2] for arc in arcs for point in arc], dtype=np.float64)
+    transform = topology.get('transform')
+    if transform:
+        # arc마다 델타 누적합: 전체 누적합에서 arc 시작 직전 누적값을 뺌
+        cumulative = np.cumsum(flat, axis=0)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        before = np.vstack([np.zeros((1, 2)), cumulative])[starts]
+        flat = cumulative - np.repeat(before, lengths, axis=0)
+        flat = flat * np.array(transform['scale']) + np.array(transform['translate'])
+    return np.split(flat, np.cumsum(lengths)[:-1])
+
+
+def ring_coordinates(arcs: List[np.ndarray], ring: List[int]) -> np.ndarray:
+    """arc 번호 목록을 이어 붙여 닫힌 링 좌표를 만듭니다."""
+    parts = []
+    for k, index in enumerate(ring):
+        coords = arcs[index] if index >= 0 else arcs[~index][::-1]
+        parts.append(coords if k == 0 else coords[1:])
+    return np.vstack(parts)
+
+
+class DongGeometry:
+    """디코딩한 행정동 경계 (코드, 이름, arc 링, 좌표 링, 변 배열)"""
+
+    def __init__(self, topology: Dict[str, Any], path: str = None, mtime: float = None):
+        self.path = path
+        self.mtime = mtime
+        self.arcs = decode_arcs(topology)
+        # 분석/백엔드와 같은 코드 (TopoJSON 원래 코드는 topo_codes)
+        self.codes: List[str] = []
+        self.topo_codes: List[str] = []
+        self.names: List[str] = []
+        self.district_names: List[str] = []
+        # 동마다 폴리곤 -> 링 -> arc 번호
+        self.arc_polygons: List[List[List[List[int]]]] = []
+        self.code_index: Dict[str, int] = {}
+        for obj in topology['objects'].values():
+            for geometry in obj['geometries']:
+                if geometry['type'] == 'Polygon':
+                    polygons = [geometry['arcs']]
+                elif geometry['type'] == 'MultiPolygon':
+                    polygons = geometry['arcs']
+                else:
+                    continue
+                props = geometry['properties']
+                parts = props['adm_nm'].split()
+                code = backend_dong_code(props['adm_cd'], parts[-1])
+                if code in self.code_index:
+                    # 같은 코드가 여러 도형에 붙어 있으면 한 동(멀티폴리곤)으로 합침 (이름은 districts와 같이 마지막 값)
+                    i = self.code_index[code]
+                    self.arc_polygons[i] = self.arc_polygons[i] + polygons
+                    self.names[i] = parts[-1]
+                    continue
+                self.code_index[code] = len(self.codes)
+                self.topo_codes.append(str(props['adm_cd']))
+                self.codes.append(code)
+                self.names.append(parts[-1])
+                self.district_names.append(parts[1] if len(parts) > 2 else '')
+                self.arc_polygons.append(polygons)
+
+        # 모든 링의 변을 (x1, y1, x2, y2, 동 번호) 배열로 펼침 (홀짝 규칙이라 구멍/멀티폴리곤도 그대로 처리)
+        starts, ends, owners = [], [], []
+        for i, polygons in enumerate(self.arc_polygons):
+            for polygon in polygons:
+                for ring in polygon:
+                    coords = ring_coordinates(self.arcs, ring)
+                    starts.append(coords[:-1])
+                    ends.append(coords[1:])
+                    owners.append(np.full(len(coords) - 1, i))
+        start = np.vstack(starts)
+        end = np.vstack(ends)
+        self.edges = np.column_stack([start, end])            # (변, 4): x1, y1, x2, y2
+        self.edge_owner = np.concatenate(owners)
+        self.bbox = (float(self.edges[:, [0, 2]].min()), float(self.edges[:, [1, 3]].min()),
+                     float(self.edges[:, [0, 2]].max()), float(self.edges[:, [1, 3]].max()))
+        self._point_index = None
+        self._lock = threading.Lock()
+
+    @property
+    def n_dongs(self) -> int:
+        return len(self.codes)
+
+    @property
+    def point_index(self) -> "PointInDongIndex":
+        """처음 사용할 때 만든 좌표 -> 동 색인"""
+        with self._lock:
+            if self._point_index is None:
+                self._point_index = PointInDongIndex(self)
+            return self._point_index
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'dongs': self.n_dongs,
+            'arcs': len(self.arcs),
+            'edges': int(len(self.edges)),
+            'bbox': list(self.bbox),
+            'point_index_built': self._point_index is not None
+        }
+
+
+class PointInDongIndex:
+    """격자 기반 좌표 -> 행정동 색인
+
+    - 칸 중심과 격자 꼭짓점의 동은 가로 주사선(scanline)으로 한 번에 미리 계산
+    - 경계선이 없는 칸의 점은 칸 중심의 동을 그대로 사용
+    - 경계 칸의 점은 (점 -> 칸 오른쪽 변 -> 오른쪽 위 꼭짓점) 경로가 가로지르는 그 칸의 변만 세어
+      꼭짓점의 동에서 홀짝을 뒤집어 판정 (닫힌 경계에서는 어떤 경로든 교차 횟수의 홀짝이 같음)
+    """
+
+    def __init__(self, geometry: DongGeometry, grid_size: int = GRID_SIZE):
+        self.geometry = geometry
+        self.grid_size = grid_size
+        x0, y0, x1, y1 = geometry.bbox
+        self.origin = np.array([x0, y0])
+        self.cell = np.array([(x1 - x0) / grid_size, (y1 - y0) / grid_size])
+
+        edges = geometry.edges
+        # 칸 경계에 정확히 닿는 변이 양쪽 칸 모두에 들어가도록 외접 사각형을 아주 조금 넓힘
+        margin = self.cell * 1e-6
+        lo = np.minimum(edges[:, :2], edges[:, 2:]) - margin
+        hi = np.maximum(edges[:, :2], edges[:, 2:]) + margin
+        c0, r0 = self._cells(lo).T
+        c1, r1 = self._cells(hi).T
+
+        # 가로 띠(격자 행)별 변 목록 (CSR, 주사선 계산용)
+        spans = r1 - r0 + 1
+        self.band_edges, self.band_ptr = self._csr(
+            np.repeat(r0, spans) + self._ranges(spans), np.repeat(np.arange(len(edges)), spans), grid_size)
+
+        # 칸별 변 목록 (CSR, 변의 외접 사각형이 덮는 칸)
+        widths = c1 - c0 + 1
+        per_edge = spans * widths
+        k = self._ranges(per_edge)
+        cells = (np.repeat(r0, per_edge) + k // np.repeat(widths, per_edge)) * grid_size \
+            + np.repeat(c0, per_edge) + k % np.repeat(widths, per_edge)
+        self.cell_edges, self.cell_ptr = self._csr(cells, np.repeat(np.arange(len(edges)), per_edge), grid_size ** 2)
+        boundary = np.diff(self.cell_ptr) > 0
+
+        # 칸 중심 / 격자 꼭짓점의 동
+        centers = np.arange(grid_size) + 0.5
+        self.labels = np.vstack([self._scanline(y0 + (r + 0.5) * self.cell[1], x0 + centers * self.cell[0])
+                                 for r in range(grid_size)]).ravel()
+        self.labels[boundary] = -2                                   # -2: 경계 칸 (정밀 판정 필요)
+        corners = np.arange(grid_size + 1)
+        self.corner_labels = np.vstack([self._scanline(y0 + r * self.cell[1], x0 + corners * self.cell[0])
+                                        for r in range(grid_size + 1)])
+        self.boundary_cells = int(boundary.sum())
+
+    @staticmethod
+    def _ranges(lengths: np.ndarray) -> np.ndarray:
+        """[0..n0), [0..n1), ... 를 이어 붙인 배열"""
+        total = int(lengths.sum())
+        return np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    @staticmethod
+    def _csr(keys: np.ndarray, values: np.ndarray, n_keys: int) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(keys, kind='stable')
+        return values[order], np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=n_keys))])
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self.origin) / self.cell).astype(np.int64)
+        return np.clip(cells, 0, self.grid_size - 1)
+
+    def _scanline(self, y: float, xs: np.ndarray) -> np.ndarray:
+        """가로선 y 위 표본점 xs의 동 (오른쪽 반직선 교차를 오른쪽부터 누적하며 홀짝 집합 유지)"""
+        row = int(np.clip(np.floor((y - self.origin[1]) / self.cell[1]), 0, self.grid_size - 1))
+        band = self.band_edges[self.band_ptr[row]:self.band_ptr[row + 1]]
+        x1, y1, x2, y2 = self.geometry.edges[band].T
+        straddles = (y1 > y) != (y2 > y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_cross = (x1 + (y - y1) * (x2 - x1) / (y2 - y1))[straddles]
+        owners = self.geometry.edge_owner[band][straddles]
+        order = np.argsort(-x_cross, kind='stable')
+        x_cross, owners = x_cross[order], owners[order]
+
+        # 오른쪽 끝(바깥)부터 교차할 때마다 해당 동을 토글해 구간별 동을 구함
+        segment_labels = np.full(len(x_cross) + 1, -1, dtype=np.int32)
+        inside = set()
+        for k, owner in enumerate(owners):
+            inside ^= {int(owner)}
+            segment_labels[k + 1] = next(iter(inside)) if len(inside) == 1 else -1
+        # 표본 x보다 오른쪽에 있는 교차 수 = 구간 번호
+        passed = np.searchsorted(-x_cross, -xs, side='left')
+        return segment_labels[passed]
+
+    def _exact(self, points: np.ndarray) -> np.ndarray:
+        """경계 칸 점: 칸 안의 변과의 교차로 오른쪽 위 꼭짓점의 동에서 홀짝을 뒤집어 판정합니다."""
+        labels = np.full(len(points), -1, dtype=np.int32)
+        if not len(points):
+            return labels
+        cells = self._cells(points)
+        cell_id = cells[:, 1] * self.grid_size + cells[:, 0]
+        corner_xy = (cells + 1) * self.cell + self.origin           # 칸 오른쪽 위 꼭짓점
+        corner = self.corner_labels[cells[:, 1] + 1, cells[:, 0] + 1]
+
+        counts = self.cell_ptr[cell_id + 1] - self.cell_ptr[cell_id]
+        pair_point = np.repeat(np.arange(len(points)), counts)
+        pair_edge = self.cell_edges[np.repeat(self.cell_ptr[cell_id], counts) + self._ranges(counts)]
+        px, py = points[pair_point, 0], points[pair_point, 1]
+        xr, yt = corner_xy[pair_point, 0], corner_xy[pair_point, 1]
+        x1, y1, x2, y2 = self.geometry.edges[pair_edge].T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 점 -> (오른쪽 변, py) 가로 구간
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            horizontal = ((y1 > py) != (y2 > py)) & (px < x_cross) & (x_cross <= xr)
+            # (오른쪽 변, py) -> 오른쪽 위 꼭짓점 세로 구간
+            # 주사선 규칙(점을 오른쪽, 그보다 훨씬 작게 위로 민 것과 같음)에 맞춰 끝점에 닿는 변은
+            # 오른쪽 위로 올라가는 변이면 아래 끝(py), 아니면(수평 포함) 위 끝(꼭짓점)에서만 셈
+            y_cross = y1 + (xr - x1) * (y2 - y1) / (x2 - x1)
+            rising = (y2 - y1) * (x2 - x1) > 0
+            vertical = ((x1 > xr) != (x2 > xr)) & np.where(rising, (py <= y_cross) & (y_cross < yt),
+                                                           (py < y_cross) & (y_cross <= yt))
+        crossing = horizontal ^ vertical
+
+        n_dongs = self.geometry.n_dongs
+        toggles = pair_point[crossing] * n_dongs + self.geometry.edge_owner[pair_edge[crossing]]
+        start = np.flatnonzero(corner >= 0)
+        keys = np.concatenate([toggles, start * n_dongs + corner[start]])
+        unique, hits = np.unique(keys, return_counts=True)
+        inside = unique[hits % 2 == 1]
+        labels[inside // n_dongs] = inside % n_dongs
+        return labels
+
+    def locate(self, lon, lat) -> np.ndarray:
+        """경도/위도 배열 -> 동 번호 배열 (경계 밖은 -1)"""
+        points = np.column_stack([np.asarray(lon, dtype=np.float64).ravel(), np.asarray(lat, dtype=np.float64).ravel()])
+        x0, y0, x1, y1 = self.geometry.bbox
+        labels = np.full(len(points), -1, dtype=np.int32)
+        within = ((points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+                  & np.isfinite(points).all(axis=1))
+        index = np.flatnonzero(within)
+        cells = self._cells(points[index])
+        labels[index] = self.labels[cells[:, 1] * self.grid_size + cells[:, 0]]
+        boundary = index[labels[index] == -2]
+        labels[boundary] = self._exact(points[boundary])
+        return labels
+
+    def locate_codes(self, lat, lon) -> Tuple[List, np.ndarray]:
+        """위도/경도 배열 -> (동 코드 목록(밖이면 None), 동 번호 배열)"""
+        labels = self.locate(lon, lat)
+        codes = np.array(self.geometry.codes + [None], dtype=object)[labels]
+        return codes.tolist(), labels
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'grid_size': self.grid_size,
+            'boundary_cells': self.boundary_cells,
+            'boundary_ratio': round(self.boundary_cells / self.grid_size ** 2, 4),
+            'cell_edges': int(len(self.cell_edges))
+        }
+
+
+_geometry_cache: Dict[str, DongGeometry] = {}
+_geometry_lock = threading.Lock()
+
+
+def load_dong_geometry(path: str = DONG_TOPOJSON_PATH) -> DongGeometry:
+    """행정동 TopoJSON을 디코딩합니다 (파일 수정 시각이 같으면 이전 결과 재사용)."""
+    mtime = os.path.getmtime(path)
+    with _geometry_lock:
+        cached = _geometry_cache.get(path)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+        with open(path, encoding='utf-8') as f:
+            geometry = DongGeometry(json.load(f), path=path, mtime=mtime)
+        _geometry_cache[path] = geometry
+        return geometry
@@ -0,0 +1,159 @@
+"""
+동 → 구 계층 예측 파이프라인
+
+구에 속한 모든 동을 한 번에 예측하고, 동 합계를 구 전체 예측과 함께 조정(reconciliation)해
+구/동 두 수준의 예측을 하나의 사전 계산 결과로 제공합니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+import time
+
+import numpy as np
+import pandas as pd
+
+from reconciliation import summing_matrix, reconcile, shrink_covariance, RECONCILE_METHODS
+from segments import fit_prophet_series
+
+# 동 모델 학습 병렬도 (Prophet 학습은 cmdstan 하위 프로세스에서 실행되므로 스레드로 충분)
+HIERARCHY_MAX_WORKERS = 8
+
+# 학습에 필요한 최소 시간별 데이터 수
+MIN_TRAINING_POINTS = 48
+
+
+class HierarchicalResult:
+    """구 합계(0번 행)와 동별 예측(1..m번 행)을 담은 사전 계산 결과입니다."""
+
+    def __init__(self, district: str, dong_names: Dict[str, str], timestamps: pd.DatetimeIndex,
+                 base: np.ndarray, reconciled: np.ndarray, method: str, timing: Dict[str, float]):
+        self.district = district
+        self.dong_codes = list(dong_names)
+        self.dong_names = dong_names
+        self.timestamps = timestamps
+        self.base = base
+        self.reconciled = reconciled
+        self.method = method
+        self.timing = timing
+        self.computed_at = datetime.now()
+        self._row = {code: i + 1 for i, code in enumerate(self.dong_codes)}
+
+    def _series(self, row: int) -> List[Dict]:
+        return [
+            {
+                'timestamp': ts.isoformat(),
+                'hour': ts.hour,
+                'predicted_population': max(0, int(round(self.reconciled[row, i]))),
+                'base_prediction': max(0, int(round(self.base[row, i])))
+            }
+            for i, ts in enumerate(self.timestamps)
+        ]
+
+    def district_series(self) -> List[Dict]:
+        return self._series(0)
+
+    def dong_series(self, dong_code: str) -> List[Dict]:
+        if dong_code not in self._row:
+            raise KeyError(f"{self.district}에 속하지 않은 동입니다: {dong_code}")
+        return self._series(self._row[dong_code])
+
+    def dong_summary(self) -> List[Dict]:
+        """동별 평균/피크 예측 요약 (벡터 연산)"""
+        values = self.reconciled[1:]
+        peaks = values.argmax(axis=1)
+        means = values.mean(axis=1)
+        total_mean = max(float(self.reconciled[0].mean()), 1e-9)
+        return [
+            {
+                'dong_code': code,
+                'dong_name': self.dong_names[code],
+                'avg_population': int(round(means[i])),
+                'peak_timestamp': self.timestamps[peaks[i]].isoformat(),
+                'peak_population': int(round(values[i, peaks[i]])),
+                'share_of_district': float(means[i] / total_mean)
+            }
+            for i, code in enumerate(self.dong_codes)
+        ]
+
+
+class HierarchicalForecaster:
+    """구 단위 계층 예측을 실행합니다."""
+
+    def __init__(self, fetch_fn: Callable[[str], pd.DataFrame], max_workers: int = HIERARCHY_MAX_WORKERS):
+        self.fetch_fn = fetch_fn
+        self.max_workers = max_workers
+
+    def _load_histories(self, dong_codes: List[str], executor) -> Dict[str, pd.DataFrame]:
+        futures = {code: executor.submit(self.fetch_fn, code) for code in dong_codes}
+        histories = {}
+        for code, future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"⚠️ {code} 데이터 조회 실패, 계층에서 제외: {e}")
+                continue
+            if len(df) >= MIN_TRAINING_POINTS:
+                histories[code] = df[['ds', 'y']]
+        return histories
+
+    def run(self, district: str, dong_names: Dict[str, str], timestamps: pd.DatetimeIndex,
+            method: str = 'mint_shrink') -> HierarchicalResult:
+        """모든 동과 구 합계를 예측하고 계층 조정한 결과를 반환합니다."""
+        if method not in RECONCILE_METHODS:
+            raise ValueError(f"지원하지 않는 조정 방식입니다: {method}")
+
+        timing = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            histories = self._load_histories(list(dong_names), executor)
+            if not histories:
+                raise ValueError(f"{district}의 학습 가능한 동 데이터가 없습니다.")
+            timing['fetch_seconds'] = time.perf_counter() - start
+
+            # 동별 시계열을 (시점 x 동) 행렬로 정렬, 구 합계는 모든 동이 관측된 시점만 사용
+            codes = list(histories)
+            wide = pd.concat(
+                [histories[code].drop_duplicates('ds').set_index('ds')['y'].rename(code) for code in codes],
+                axis=1
+            ).sort_index()
+            common = wide.dropna()
+            district_df = pd.DataFrame({'ds': common.index, 'y': common.sum(axis=1).to_numpy()})
+
+            # 구 합계 모델 + 동 모델을 병렬 학습
+            fit_start = time.perf_counter()
+            frames = {'__district__': district_df}
+            frames.update({code: histories[code] for code in codes})
+            model_futures = {key: executor.submit(fit_prophet_series, frame, 'y') for key, frame in frames.items()}
+            models = {key: future.result() for key, future in model_futures.items()}
+            timing['fit_seconds'] = time.perf_counter() - fit_start
+
+            # 미래 예측과 공통 구간 적합값을 한 번에 계산
+            predict_start = time.perf_counter()
+            keys = ['__district__'] + codes
+            future_frame = pd.DataFrame({'ds': timestamps})
+            history_frame = pd.DataFrame({'ds': common.index})
+            forecast_futures = [executor.submit(models[key].predict, future_frame) for key in keys]
+            fitted_futures = [executor.submit(models[key].predict, history_frame) for key in keys]
+            base = np.vstack([f.result()['yhat'].to_numpy() for f in forecast_futures])
+            fitted = np.vstack([f.result()['yhat'].to_numpy() for f in fitted_futures])
+            timing['predict_seconds'] = time.perf_counter() - predict_start
+
+        actual = np.vstack([district_df['y'].to_numpy(), common.to_numpy().T])
+        W = shrink_covariance(actual - fitted) if method == 'mint_shrink' else None
+        reconciled = reconcile(base, summing_matrix(len(codes)), method, W)
+        # 음수 동 예측 제거 후 구 합계를 다시 맞춤
+        reconciled[1:] = np.maximum(reconciled[1:], 0)
+        reconciled[0] = reconciled[1:].sum(axis=0)
+        timing['total_seconds'] = time.perf_counter() - start
+
+        print(f"✅ {district} 계층 예측 완료: 동 {len(codes)}개, {timing['total_seconds']:.1f}초")
+        return HierarchicalResult(
+            district,
+            {code: dong_names[code] for code in codes},
+            timestamps,
+            base,
+            reconciled,
+            method,
+            timing
+        )
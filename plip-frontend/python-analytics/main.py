@@ -1,17 +1,50 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import numpy as np
 import pandas as pd
-from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, r2_score
 import requests
 from datetime import datetime, timedelta, date
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import warnings
 import logging
+import copy
+import time
+import asyncio
+import os
+import threading
+
+from conformal import ResidualIntervalStore, short_backtest, DEFAULT_ALPHA
+from segments import SegmentForecaster, SEGMENTS
+from reconciliation import RECONCILE_METHODS
+from hierarchy import HierarchicalForecaster, HierarchicalResult
+from districts import get_district_dongs, district_names, dong_names, find_dong_codes
+from sharding import ShardedForecastPool, TaskTimeoutError, DEFAULT_TASK_TIMEOUT_SECONDS
+from batch import run_batch
+from monitoring import ForecastLedger, DEFAULT_LEDGER_PATH, SCORING_WINDOW_DAYS
+from demographics import DemographicEngine, records_to_frame as demographic_records_to_frame, DEFAULT_RANK
+from warmup import Warmup
+from cube import PopulationCube, CUBE_STATS, MEASURE_NAMES
+from aggregation import AggregationCache, normalize_query as normalize_aggregation_query
+from comparison import compare_dongs
+from profiles import HourOfWeekIndex
+from rankings import RankingIndex, DEFAULT_WINDOW_DAYS
+from anomalies import AnomalyIndex
+from similarity import SimilarityIndex, DEFAULT_PROFILE_WEEKS, DEFAULT_CLUSTERS
+from rolling import RollingStatsStore
+from geometry import load_dong_geometry, MAX_LOCATE_POINTS
+from adjacency import load_dong_adjacency
+from choropleth import ChoroplethBuilder, DEFAULT_ZOOM
+from density import load_density_table
+from spatiotemporal import SpatioTemporalForecaster, DEFAULT_HORIZON_DAYS
+from prefetch import PrefetchCache, FavoriteWarmer, fetch_favorite_counts, DEFAULT_TOP_DONGS
+from decomposition import component_tables, explain_records
+from snapshot import save_cube_snapshot, load_cube_snapshot, current_snapshot, DEFAULT_SNAPSHOT_DIR
+from datasources import (
+    daily_frame_to_training_frame, data_source_from_spec, export_daily_dataset, resolve_dataset_path,
+    DEFAULT_DATASET_ROOT,
+    BackendDataSource, LocalDatasetSource, UploadedDataSource
+)
 
 # Prophet 로깅 레벨 조정
 logging.getLogger('prophet').setLevel(logging.WARNING)
@@ -29,76 +62,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 큰 JSON 응답(지도 도형 등) 압축
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # 기존 백엔드 API 베이스 URL
 BACKEND_API_URL = "http://localhost:8081"
 
+# Overview Insights Agent (LLM 인사이트 생성 서버)
+OVERVIEW_INSIGHTS_URL = os.getenv("OVERVIEW_INSIGHTS_URL", "http://localhost:8003")
+
+# 샤딩 예측 워커 수 기본값
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", "2"))
+# 샤딩 워커 작업 하나의 시한 (초, 넘으면 504)
+FORECAST_TASK_TIMEOUT = float(os.getenv("FORECAST_TASK_TIMEOUT", str(DEFAULT_TASK_TIMEOUT_SECONDS)))
+
+# 일별 데이터 소스: 'backend'(기본), 'local:/데이터셋/경로' (샤딩 워커도 같은 값을 사용)
+POPULATION_DATA_SOURCE = os.getenv("POPULATION_DATA_SOURCE", "backend")
+# API(PUT /datasource, /datasource/export)로 지정하는 로컬 경로는 이 디렉터리 아래로 제한
+DATASET_ROOT = os.getenv("DATASET_ROOT", DEFAULT_DATASET_ROOT)
+
+# 백엔드 응답 캐시 유지 시간 (초) - 같은 동의 여러 모델/세그먼트가 한 번의 조회를 공유
+FETCH_CACHE_TTL = 300
+
 class PopulationPredictor:
-    def __init__(self):
+    def __init__(self, district: str = None, data_source=None):
         self.model = None
         self.is_trained = False
         self.training_data = None
         self.backend_url = BACKEND_API_URL
+        # 일별 데이터 소스 (None이면 POPULATION_DATA_SOURCE 환경 변수, 기본은 백엔드)
+        self.data_source = data_source or data_source_from_spec(POPULATION_DATA_SOURCE, BACKEND_API_URL)
+        # 조회할 구 (None이면 행정동 코드 앞 5자리로 추론)
+        self.district = district
+        # 마지막으로 훈련한 동 코드 (드리프트 재훈련 대상 판단용)
+        self.dong_code = None
+        # 불확실성 샘플링을 끈 예측 전용 모델 (conformal 구간 모드에서 사용)
+        self.fast_model = None
+        self.residual_store = None
+        # dong_code -> (조회 시각, 데이터프레임)
+        self._fetch_cache = {}
+        # 시간대별 리그레서 평균 (훈련 시 초기화)
+        self._hourly_stats = None
+    
+    def set_data_source(self, data_source):
+        """데이터 소스를 교체하고 조회 캐시를 비웁니다."""
+        self.data_source = data_source
+        self._fetch_cache = {}
     
-    def fetch_population_data(self, dong_code: str) -> pd.DataFrame:
-        """기존 백엔드에서 인구 데이터를 가져옵니다."""
+    def fetch_population_data(self, dong_code: str, use_cache: bool = True) -> pd.DataFrame:
+        """데이터 소스(기본: 기존 백엔드)에서 인구 데이터를 가져옵니다."""
+        cached = self._fetch_cache.get(dong_code)
+        if use_cache and cached is not None and time.time() - cached[0] < FETCH_CACHE_TTL:
+            return cached[1].copy()
+        
         try:
-            # 일별 데이터 가져오기
-            response = requests.get(f"{self.backend_url}/population/gangnam/dongs/{dong_code}/daily", timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"📡 API 응답 타입: {type(data)}")
-                print(f"📡 API 응답 내용: {str(data)[:200]}...")
-                
-                # 응답이 문자열인 경우 JSON 파싱
-                if isinstance(data, str):
-                    import json
-                    data = json.loads(data)
-                
-                # dailyDataList 키가 있는지 확인
-                if isinstance(data, dict) and 'dailyDataList' in data:
-                    data = data['dailyDataList']
-                elif not isinstance(data, list):
-                    print(f"⚠️ 예상치 못한 데이터 형식: {type(data)}")
-                    raise Exception(f"예상치 못한 데이터 형식: {type(data)}")
-                
-                # Prophet용 데이터 전처리
-                df_list = []
-                for item in data:
-                    date_str = item.get('date', '')
-                    tmzon_pd_se = item.get('tmzonPdSe', '0')
-                    
-                    # tmzonPdSe를 사용하여 시간 추출 (1부터 시작하므로 0부터 시작하도록 조정)
-                    try:
-                        hour = int(tmzon_pd_se) - 1
-                    except ValueError:
-                        hour = 0  # 기본값
-                    
-                    # 날짜 + 시간 조합으로 정확한 타임스탬프 생성
-                    try:
-                        base_date = pd.to_datetime(date_str, format='%Y%m%d')
-                        timestamp = base_date + pd.Timedelta(hours=hour)
-                        
-                        df_list.append({
-                            'ds': timestamp,  # Prophet에서 요구하는 날짜 컬럼명
-                            'y': item.get('totalPopulation', 0),  # Prophet에서 요구하는 값 컬럼명
-                            'local_population': item.get('localPopulation', 0),
-                            'long_foreigner': item.get('longForeignerPopulation', 0),
-                            'temp_foreigner': item.get('tempForeignerPopulation', 0),
-                            'hour': hour,
-                            'date': date_str,
-                            'tmzon_pd_se': tmzon_pd_se
-                        })
-                    except:
-                        continue
-                
-                df = pd.DataFrame(df_list)
-                df = df.dropna(subset=['ds', 'y'])  # 필수 컬럼에 결측값 제거
-                df = df.sort_values('ds').reset_index(drop=True)
-                
-                print(f"✅ 데이터 로드 완료: {len(df)}개 레코드")
-                return df
-            else:
-                raise Exception(f"API 호출 실패: {response.status_code}")
+            # 일별 데이터 가져오기 (백엔드 / 로컬 데이터셋 / 업로드 파일)
+            raw = self.data_source.load(dong_code, self.district)
+            df = daily_frame_to_training_frame(raw)
+            
+            print(f"✅ 데이터 로드 완료: {len(df)}개 레코드 ({self.data_source.kind})")
+            self._fetch_cache[dong_code] = (time.time(), df)
+            return df.copy()
         except Exception as e:
             print(f"❌ 데이터 가져오기 오류: {e}")
             raise e
@@ -127,6 +151,10 @@ class PopulationPredictor:
         
         print(f"🤖 Prophet 모델 훈련 시작... (데이터: {len(df)}개)")
         
+        # Prophet은 무거운 모듈이라 서버 시작 시가 아니라 필요할 때 로드 (보통은 백그라운드 워밍업이 먼저 로드)
+        from prophet import Prophet
+        from prophet.diagnostics import cross_validation, performance_metrics
+        
         # Prophet용 데이터 준비
         prophet_df = self.prepare_prophet_data(df)
         
@@ -150,9 +178,15 @@ class PopulationPredictor:
         # 모델 훈련
         self.model.fit(prophet_df)
         self.training_data = prophet_df
+        self._hourly_stats = None
         self.is_trained = True
+        self.fast_model = copy.copy(self.model)
+        self.fast_model.uncertainty_samples = 0
+        # 설명(explain) 화면용 성분 표는 모델마다 한 번만 추출
+        component_tables(self.model)
         
         # 모델 성능 평가 (교차 검증)
+        df_cv = None
         try:
             print("📊 모델 성능 평가 중...")
             # 교차 검증 (최근 7일 예측)
@@ -200,25 +234,59 @@ class PopulationPredictor:
                 'model_type': 'Prophet'
             }
         
+        # conformal 구간용 out-of-sample 잔차 저장
+        self.residual_store = self.build_residual_store(prophet_df, df_cv)
+        performance['interval_coverage'] = self.residual_store.coverage_report()
+        
         print(f"✅ 모델 훈련 완료! MAE: {performance['mae']:.1f}")
         return performance
     
-    def predict_hourly_demand(self, target_date: str = None, hours: List[int] = None) -> List[Dict]:
-        """Prophet을 사용한 특정 날짜의 시간대별 인구 수요 예측"""
-        if not self.is_trained:
-            raise ValueError("모델이 훈련되지 않았습니다.")
+    def build_residual_store(self, prophet_df: pd.DataFrame, df_cv: pd.DataFrame = None) -> ResidualIntervalStore:
+        """교차 검증 잔차로 구간 저장소를 만들고, 불가능하면 축소 백테스트 → 학습 잔차 순으로 대체합니다."""
+        if df_cv is None:
+            try:
+                df_cv = short_backtest(self.model, prophet_df)
+            except Exception as e:
+                print(f"⚠️ 축소 백테스트 실패: {e}")
+                df_cv = None
         
-        # 기본값: 오늘 날짜
-        if target_date is None:
-            target_date = datetime.now().strftime('%Y-%m-%d')
+        if df_cv is not None and not df_cv.empty:
+            return ResidualIntervalStore.from_backtest(df_cv)
         
-        # 기본값: 24시간 전체
-        if hours is None:
-            hours = list(range(24))
+        fitted = self.fast_model.predict(prophet_df)
+        return ResidualIntervalStore.from_in_sample(prophet_df, fitted)
+    
+    def predict_with_intervals(self, future: pd.DataFrame, interval_mode: str = 'prophet',
+                               alpha: float = DEFAULT_ALPHA) -> pd.DataFrame:
+        """예측값과 신뢰구간(yhat, yhat_lower, yhat_upper)을 계산합니다.
         
-        print(f"🔮 Prophet으로 {target_date}의 시간대별 예측 중...")
+        interval_mode:
+            - 'prophet': Prophet 시뮬레이션 기반 구간 (기존 방식)
+            - 'conformal': 저장된 백테스트 잔차 분위수 기반 구간 (불확실성 샘플링 생략)
+        """
+        if interval_mode not in ('prophet', 'conformal'):
+            raise ValueError(f"지원하지 않는 구간 모드입니다: {interval_mode}")
+        
+        if interval_mode == 'prophet' or self.residual_store is None:
+            return self.model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'trend']]
+        
+        forecast = self.fast_model.predict(future)[['ds', 'yhat', 'trend']]
+        last_ds = self.training_data['ds'].max()
+        horizon_hours = (forecast['ds'] - last_ds) / pd.Timedelta(hours=1)
+        horizons = np.ceil(np.maximum(horizon_hours.to_numpy(), 0) / 24.0).astype(int)
+        
+        lower, upper = self.residual_store.intervals(
+            forecast['yhat'].to_numpy(), forecast['ds'].dt.hour.to_numpy(), horizons, alpha
+        )
+        forecast['yhat_lower'] = lower
+        forecast['yhat_upper'] = upper
+        return forecast
+    
+    def hourly_regressor_stats(self) -> Dict[int, Dict[str, float]]:
+        """미래 시점 리그레서로 사용할 시간대별 평균값을 계산합니다 (훈련 데이터 기준)."""
+        if self._hourly_stats is not None:
+            return self._hourly_stats
         
-        # 시간대별 평균값 계산 (훈련 데이터에서)
         hourly_stats = {}
         if self.training_data is not None:
             for hour in range(24):
@@ -245,46 +313,87 @@ class PopulationPredictor:
                     'temp_foreigner': 50
                 }
         
-        # 예측할 타임스탬프 생성
-        predictions = []
+        if self.training_data is not None:
+            self._hourly_stats = hourly_stats
+        return hourly_stats
+    
+    def build_future_frame(self, timestamps: List[pd.Timestamp]) -> pd.DataFrame:
+        """임의의 타임스탬프 목록에 대한 Prophet future 데이터프레임을 만듭니다."""
+        default_stats = {
+            'local_population': 1000,
+            'long_foreigner': 100,
+            'temp_foreigner': 50
+        }
+        hourly_stats = self.hourly_regressor_stats()
+        ds = pd.DatetimeIndex(timestamps)
+        hour_stats_list = [hourly_stats.get(hour, default_stats) for hour in ds.hour]
+        
+        return pd.DataFrame({
+            'ds': ds,
+            'hour': ds.hour,
+            'is_weekend': (ds.dayofweek >= 5).astype(int),
+            'local_population': [stats['local_population'] for stats in hour_stats_list],
+            'long_foreigner': [stats['long_foreigner'] for stats in hour_stats_list],
+            'temp_foreigner': [stats['temp_foreigner'] for stats in hour_stats_list]
+        })
+    
+    def predict_timestamps(self, timestamps: List[pd.Timestamp], interval_mode: str = 'conformal') -> pd.DataFrame:
+        """여러 날짜/시간대를 하나의 future 프레임으로 한 번에 예측합니다 (배치 예측용)."""
+        if not self.is_trained:
+            raise ValueError("모델이 훈련되지 않았습니다.")
+        forecast = self.predict_with_intervals(self.build_future_frame(timestamps), interval_mode)
+        return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    
+    def explain_hourly_demand(self, target_date: str = None, hours: List[int] = None,
+                              include_tables: bool = False) -> Dict[str, Any]:
+        """시간대별 예측을 추세/계절성/리그레서 기여로 분해합니다 (모델당 한 번 뽑은 성분 표 조회)."""
+        if not self.is_trained:
+            raise ValueError("모델이 훈련되지 않았습니다.")
+        base_date = pd.to_datetime(target_date or datetime.now().strftime('%Y-%m-%d'))
+        timestamps = [base_date + pd.Timedelta(hours=hour) for hour in (hours or range(24))]
+        tables = component_tables(self.model)
+        result = explain_records(tables, self.build_future_frame(timestamps))
+        if include_tables:
+            result['tables'] = tables.summary()
+        return result
+    
+    def predict_hourly_demand(self, target_date: str = None, hours: List[int] = None,
+                              interval_mode: str = 'prophet') -> List[Dict]:
+        """Prophet을 사용한 특정 날짜의 시간대별 인구 수요 예측"""
+        if not self.is_trained:
+            raise ValueError("모델이 훈련되지 않았습니다.")
+        
+        # 기본값: 오늘 날짜
+        if target_date is None:
+            target_date = datetime.now().strftime('%Y-%m-%d')
+        
+        # 기본값: 24시간 전체
+        if hours is None:
+            hours = list(range(24))
+        
+        print(f"🔮 Prophet으로 {target_date}의 시간대별 예측 중...")
+        
+        # 예측할 타임스탬프 생성 (모든 시간대를 하나의 데이터프레임으로 예측)
         base_date = pd.to_datetime(target_date)
+        timestamps = [base_date + pd.Timedelta(hours=hour) for hour in hours]
+        future = self.build_future_frame(timestamps)
+        hour_stats_list = future[['local_population', 'long_foreigner', 'temp_foreigner']].to_dict('records')
         
-        for hour in hours:
-            target_timestamp = base_date + pd.Timedelta(hours=hour)
-            
-            # 해당 시간대의 통계값 사용
-            hour_stats = hourly_stats.get(hour, {
-                'local_population': 1000,
-                'long_foreigner': 100,
-                'temp_foreigner': 50
-            })
-            
-            # 단일 시점 예측을 위한 데이터프레임 생성
-            future_single = pd.DataFrame({
-                'ds': [target_timestamp],
-                'hour': [hour],
-                'is_weekend': [1 if target_timestamp.weekday() >= 5 else 0],
-                'local_population': [hour_stats['local_population']],
-                'long_foreigner': [hour_stats['long_foreigner']],
-                'temp_foreigner': [hour_stats['temp_foreigner']]
-            })
-            
-            # 예측 실행
-            forecast_single = self.model.predict(future_single)
-            
-            prediction = forecast_single['yhat'].iloc[0]
-            lower_bound = forecast_single['yhat_lower'].iloc[0]
-            upper_bound = forecast_single['yhat_upper'].iloc[0]
-            
+        # 예측 실행 및 신뢰구간 계산
+        forecast = self.predict_with_intervals(future, interval_mode)
+        
+        predictions = []
+        for i, hour in enumerate(hours):
+            target_timestamp = timestamps[i]
             predictions.append({
                 'hour': hour,
                 'timestamp': target_timestamp.isoformat(),
-                'predicted_population': max(0, int(prediction)),
-                'confidence_lower': max(0, int(lower_bound)),
-                'confidence_upper': int(upper_bound),
+                'predicted_population': max(0, int(forecast['yhat'].iloc[i])),
+                'confidence_lower': max(0, int(forecast['yhat_lower'].iloc[i])),
+                'confidence_upper': int(forecast['yhat_upper'].iloc[i]),
                 'day_of_week': target_timestamp.weekday(),
                 'is_weekend': target_timestamp.weekday() >= 5,
-                'hour_stats': hour_stats  # 디버깅용
+                'hour_stats': hour_stats_list[i]  # 디버깅용
             })
         
         print(f"✅ Prophet 예측 완료: {len(predictions)}개 시간대")
@@ -300,52 +409,229 @@ class PopulationPredictor:
             
             print(f"📡 {six_days_ago_str}의 실제 데이터 가져오기...")
             
-            # 백엔드에서 데이터 가져오기
-            response = requests.get(f"{self.backend_url}/population/gangnam/dongs/{dong_code}/daily", timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                
-                if isinstance(data, dict) and 'dailyDataList' in data:
-                    data = data['dailyDataList']
-                
-                # 해당 날짜의 데이터만 필터링
-                actual_data = []
-                for item in data:
-                    if item.get('date') == six_days_ago_str:
-                        tmzon_pd_se = item.get('tmzonPdSe', '0')
-                        try:
-                            hour = int(tmzon_pd_se) - 1
-                        except ValueError:
-                            hour = 0
-                        
-                        actual_data.append({
-                            'hour': hour,
-                            'actual_population': item.get('totalPopulation', 0),
-                            'local_population': item.get('localPopulation', 0),
-                            'long_foreigner': item.get('longForeignerPopulation', 0),
-                            'temp_foreigner': item.get('tempForeignerPopulation', 0),
-                            'time_range': item.get('timeRange', ''),
-                            'time_zone': item.get('timeZone', '')
-                        })
-                
-                # 시간순으로 정렬
-                actual_data.sort(key=lambda x: x['hour'])
-                return actual_data
-            else:
-                print(f"⚠️ 실제 데이터 가져오기 실패: {response.status_code}")
+            # 데이터 소스에서 가져오기
+            data = self.data_source.load(dong_code, self.district)
+            if data.empty or 'date' not in data.columns:
                 return []
+            
+            # 해당 날짜의 데이터만 필터링
+            actual_data = []
+            for item in data[data['date'].astype(str) == six_days_ago_str].to_dict('records'):
+                tmzon_pd_se = item.get('tmzonPdSe', '0')
+                try:
+                    hour = int(tmzon_pd_se) - 1
+                except ValueError:
+                    hour = 0
+                
+                actual_data.append({
+                    'hour': hour,
+                    'actual_population': item.get('totalPopulation', 0),
+                    'local_population': item.get('localPopulation', 0),
+                    'long_foreigner': item.get('longForeignerPopulation', 0),
+                    'temp_foreigner': item.get('tempForeignerPopulation', 0),
+                    'time_range': item.get('timeRange', ''),
+                    'time_zone': item.get('timeZone', '')
+                })
+            
+            # 시간순으로 정렬
+            actual_data.sort(key=lambda x: x['hour'])
+            return actual_data
                 
         except Exception as e:
             print(f"❌ 실제 데이터 가져오기 오류: {e}")
             return []
 
+    def fetch_demographic_data(self, dong_code: str) -> pd.DataFrame:
+        """국내 인구 API에서 성별 x 연령대 시간별 데이터를 가져옵니다."""
+        response = requests.get(f"{self.backend_url}/population/local-people/code/{dong_code}", timeout=30)
+        if response.status_code != 200:
+            raise Exception(f"API 호출 실패: {response.status_code}")
+        
+        data = response.json()
+        if isinstance(data, dict):
+            data = data.get('data', [])
+        return demographic_records_to_frame(data)
+
 # 전역 예측기 인스턴스
 predictor = PopulationPredictor()
 
+# 동별 세그먼트 예측기 (dong_code -> SegmentForecaster)
+segment_forecasters: Dict[str, SegmentForecaster] = {}
+
+# 구별 계층 예측 결과 (district -> HierarchicalResult)
+hierarchy_results: Dict[str, HierarchicalResult] = {}
+
+# 동 코드 일관 해싱 기반 예측 워커 풀 (첫 요청 시 시작)
+forecast_pool: ShardedForecastPool = None
+
+def get_forecast_pool() -> ShardedForecastPool:
+    global forecast_pool
+    if forecast_pool is None:
+        forecast_pool = ShardedForecastPool(PopulationPredictor, n_workers=FORECAST_WORKERS,
+                                            task_timeout=FORECAST_TASK_TIMEOUT)
+    return forecast_pool
+
+# 서비스한 예측 원장 (정확도 모니터링용, 첫 사용 시 열림 - 샤딩 워커가 main을 import해도 파일을 만들지 않도록)
+forecast_ledger: ForecastLedger = None
+
+_ledger_lock = threading.Lock()
+
+def get_forecast_ledger() -> ForecastLedger:
+    global forecast_ledger
+    with _ledger_lock:
+        if forecast_ledger is None:
+            forecast_ledger = ForecastLedger(os.getenv("FORECAST_LEDGER_PATH", DEFAULT_LEDGER_PATH))
+    return forecast_ledger
+
+def record_served_forecasts(dong_code: str, predictions: List[Dict], source: str):
+    """서비스한 예측을 원장에 저장합니다 (실패해도 응답에는 영향 없음)."""
+    try:
+        get_forecast_ledger().record_predictions(dong_code, predictions, source)
+    except Exception as e:
+        print(f"⚠️ 예측 원장 저장 실패: {e}")
+
+# 성별/연령 대량 시계열 엔진 (모든 동 공용)
+demographic_engine = DemographicEngine()
+
+# 모든 동 x 날짜 x 시간 x 측정값 인구 큐브 (/cube/refresh로 적재, 시작 시 스냅샷이 있으면 메모리 맵으로 열기)
+population_cube = PopulationCube()
+
+# 큐브 group-by 집계 결과 캐시 (큐브 버전 + 정규화된 질의 단위)
+aggregation_cache = AggregationCache()
+
+# 큐브 요일x시간 누적합 색인 (비교/유사도 분석 공용)
+profile_index = HourOfWeekIndex()
+
+# Top-K 순위 점수 테이블 (큐브 버전이 바뀌면 바뀐 동만 다시 계산)
+ranking_index = RankingIndex(profile_index)
+
+# 모든 동 이상치 점수 / 변화점 색인 (조회 시 큐브 버전이 바뀌었으면 바뀐 동/날짜만 갱신)
+anomaly_index = AnomalyIndex()
+
+# 동 프로파일 유사도 / 군집 색인 (큐브 버전이 바뀔 때만 재계산)
+similarity_index = SimilarityIndex(profile_index)
+
+# 시간 단위 누적합 이동 통계 (새 시간은 이어 붙이기만 함)
+rolling_store = RollingStatsStore()
+
+# 줌별 단순화 도형 + 값 배열 단계구분도 응답 캐시
+choropleth_builder = ChoroplethBuilder()
+
+# 이웃 동 특성 전역 시공간 예측 모델 (큐브 버전이 바뀔 때만 다시 학습)
+spatial_forecaster = SpatioTemporalForecaster()
+
+# 큐브 스냅샷 디렉터리 (여러 워커가 같은 스냅샷을 읽기 전용으로 공유)
+CUBE_SNAPSHOT_DIR = os.getenv("CUBE_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+
+def open_cube_snapshot(path: str = None) -> bool:
+    """현재(또는 지정한) 스냅샷을 메모리 맵으로 열어 전역 큐브를 교체합니다."""
+    global population_cube
+    if path is None and current_snapshot(CUBE_SNAPSHOT_DIR) is None:
+        return False
+    start = time.perf_counter()
+    population_cube = load_cube_snapshot(path, root=CUBE_SNAPSHOT_DIR)
+    print(f"📦 큐브 스냅샷 매핑: {population_cube.snapshot_path} "
+          f"(동 {population_cube.n_dongs}개, {(time.perf_counter() - start) * 1000:.1f}ms)")
+    return True
+
+def cube_dong_codes(district: str = None, dong_codes: List[str] = None) -> List[str]:
+    """큐브에 적재할 동 목록: 직접 지정 > 구 > 데이터 소스가 가진 전체 동"""
+    if dong_codes:
+        return [str(code) for code in dong_codes]
+    if district:
+        return list(get_district_dongs(district))
+    codes = predictor.data_source.dong_codes()
+    return codes if codes is not None else list(get_district_dongs('gangnam'))
+
+# 무거운 모듈(Prophet/cmdstanpy) 백그라운드 워밍업
+warmup = Warmup()
+
+@app.on_event("startup")
+async def start_warmup():
+    warmup.start()
+    try:
+        open_cube_snapshot()
+    except Exception as e:
+        print(f"⚠️ 큐브 스냅샷 로드 실패, 빈 큐브로 시작: {e}")
+
 @app.get("/")
 async def root():
     return {"message": "인구 수요 예측 API가 실행 중입니다! 🚀"}
 
+@app.get("/ready")
+async def readiness():
+    """워밍업이 끝나 첫 훈련/예측 요청을 바로 처리할 수 있는지 확인합니다 (준비 전에는 503)."""
+    status = warmup.status()
+    if not status['ready']:
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+@app.get("/datasource")
+async def get_data_source():
+    """현재 예측기가 사용하는 일별 데이터 소스 정보"""
+    return predictor.data_source.describe()
+
+@app.put("/datasource")
+async def set_data_source(data: Dict[str, Any]):
+    """데이터 소스를 바꿉니다. {"type": "backend"} 또는 {"type": "local", "path": "DATASET_ROOT 아래 경로"}"""
+    try:
+        source_type = data.get('type', 'backend')
+        if source_type == 'backend':
+            source = BackendDataSource(data.get('backend_url') or BACKEND_API_URL)
+        elif source_type == 'local':
+            if not data.get('path'):
+                raise HTTPException(status_code=400, detail="local 소스는 path가 필요합니다.")
+            source = LocalDatasetSource(resolve_dataset_path(data['path'], DATASET_ROOT))
+        else:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 데이터 소스입니다: {source_type}")
+        
+        predictor.set_data_source(source)
+        return {"status": "success", "datasource": source.describe()}
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"데이터 소스 변경 실패: {str(e)}")
+
+@app.post("/datasource/upload")
+async def upload_data_source(file: UploadFile = File(...), dong_code: str = Form(None)):
+    """dailyDataList 형식의 Parquet/CSV/JSON 파일을 업로드해 데이터 소스로 사용합니다."""
+    try:
+        source = UploadedDataSource(await file.read(), file.filename, dong_code)
+        predictor.set_data_source(source)
+        return {"status": "success", "datasource": source.describe(), "dong_codes": source.dong_codes()}
+    except (ValueError, ImportError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"파일 업로드 실패: {str(e)}")
+
+@app.post("/datasource/export")
+async def export_data_source(data: Dict[str, Any]):
+    """현재 데이터 소스의 동별 데이터를 DATASET_ROOT 아래 데이터셋 디렉터리로 저장합니다 (재현 가능한 오프라인 학습용)."""
+    try:
+        if not data.get('path'):
+            raise HTTPException(status_code=400, detail="path가 필요합니다.")
+        district = data.get('district')
+        dong_codes = data.get('dong_codes')
+        if not dong_codes:
+            if not district:
+                raise HTTPException(status_code=400, detail="dong_codes 또는 district가 필요합니다.")
+            dong_codes = list(get_district_dongs(district))
+        
+        directory = resolve_dataset_path(data['path'], DATASET_ROOT)
+        return await asyncio.to_thread(
+            export_daily_dataset, predictor.data_source, dong_codes, directory, district, data.get('format', 'parquet')
+        )
+    except HTTPException:
+        raise
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"데이터셋 저장 실패: {str(e)}")
+
 @app.post("/train/{dong_code}")
 async def train_prediction_model(dong_code: str):
     """특정 동의 데이터로 Prophet 예측 모델을 훈련합니다."""
@@ -362,6 +648,7 @@ async def train_prediction_model(dong_code: str):
         
         # Prophet 모델 훈련
         performance = predictor.train_model(df)
+        predictor.dong_code = dong_code
         
         return {
             "status": "success",
@@ -380,8 +667,9 @@ async def train_prediction_model(dong_code: str):
         raise HTTPException(status_code=500, detail=f"모델 훈련 중 오류 발생: {str(e)}")
 
 @app.post("/predict/hourly/{dong_code}")
-async def predict_hourly_population(dong_code: str, target_date: str = None, prediction_hours: List[int] = None):
-    """Prophet을 사용한 시간대별 인구 수요 예측"""
+async def predict_hourly_population(dong_code: str, target_date: str = None, prediction_hours: List[int] = None,
+                                    interval_mode: str = 'prophet'):
+    """Prophet을 사용한 시간대별 인구 수요 예측 (interval_mode=conformal이면 잔차 기반 빠른 구간)"""
     try:
         if not predictor.is_trained:
             raise HTTPException(status_code=400, detail="모델이 훈련되지 않았습니다. 먼저 /train/{dong_code}를 호출하세요.")
@@ -397,7 +685,8 @@ async def predict_hourly_population(dong_code: str, target_date: str = None, pre
         print(f"🔮 동 코드 {dong_code}의 {target_date} 예측 시작...")
         
         # Prophet으로 예측
-        predictions = predictor.predict_hourly_demand(target_date, prediction_hours)
+        predictions = predictor.predict_hourly_demand(target_date, prediction_hours, interval_mode)
+        record_served_forecasts(dong_code, predictions, 'hourly')
         
         # 요약 통계 계산
         if predictions:
@@ -423,6 +712,7 @@ async def predict_hourly_population(dong_code: str, target_date: str = None, pre
             "dong_code": dong_code,
             "prediction_date": target_date,
             "model_type": "Prophet",
+            "interval_mode": interval_mode,
             "predictions": predictions,
             "summary": summary,
             "total_predicted_hours": len(predictions)
@@ -432,6 +722,34 @@ async def predict_hourly_population(dong_code: str, target_date: str = None, pre
         print(f"❌ 예측 실패: {e}")
         raise HTTPException(status_code=500, detail=f"예측 중 오류 발생: {str(e)}")
 
+@app.get("/model/intervals")
+async def get_interval_coverage(alpha: float = DEFAULT_ALPHA):
+    """저장된 백테스트 잔차 기반 conformal 구간의 실제 커버리지를 보고합니다."""
+    try:
+        if not predictor.is_trained or predictor.residual_store is None:
+            raise HTTPException(status_code=400, detail="모델이 훈련되지 않았습니다.")
+        
+        if not 0 < alpha < 1:
+            raise HTTPException(status_code=400, detail="alpha는 0과 1 사이여야 합니다.")
+        
+        store = predictor.residual_store
+        lower, upper = store.table(alpha)
+        
+        return {
+            "alpha": alpha,
+            "residual_count": len(store),
+            "residual_source": store.source,
+            "coverage": store.coverage_report(alpha),
+            "hourly_band_width": {
+                str(hour): float(np.mean(upper[hour, 1:] - lower[hour, 1:])) for hour in range(24)
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"구간 커버리지 계산 중 오류 발생: {str(e)}")
+
 @app.get("/predict/future/{dong_code}")
 async def predict_future_trend(dong_code: str, periods: int = 168):  # 기본 7일 = 168시간
     """Prophet을 사용한 미래 인구 트렌드 예측"""
@@ -484,6 +802,1072 @@ async def predict_future_trend(dong_code: str, periods: int = 168):  # 기본 7
         print(f"❌ 미래 예측 실패: {e}")
         raise HTTPException(status_code=500, detail=f"미래 예측 중 오류 발생: {str(e)}")
 
+@app.post("/predict/segments/{dong_code}")
+async def predict_segment_population(dong_code: str, target_date: str = None, days: int = 1,
+                                     reconcile: str = 'ols', retrain: bool = False):
+    """총인구/내국인/장기체류/단기체류 외국인을 한 번에 예측합니다.
+    
+    reconcile: 'ols' | 'mint_shrink' | 'bottom_up' | 'none' (세그먼트 합 = 총인구 조정 방식)
+    """
+    try:
+        if days < 1 or days > 30:
+            raise HTTPException(status_code=400, detail="예측 기간은 1~30일까지 가능합니다.")
+        
+        reconcile_method = None if reconcile == 'none' else reconcile
+        if reconcile_method is not None and reconcile_method not in RECONCILE_METHODS:
+            # 모델 훈련 전에 거부
+            raise ValueError(f"reconcile은 {', '.join(RECONCILE_METHODS)}, none 중 하나여야 합니다.")
+        
+        # 같은 캐시 데이터로 모든 세그먼트 모델을 한 번에 훈련
+        forecaster = segment_forecasters.get(dong_code)
+        if forecaster is None or retrain:
+            df = predictor.fetch_population_data(dong_code)
+            if len(df) < 48:
+                raise HTTPException(status_code=400, detail=f"훈련 데이터가 부족합니다. 최소 48개 필요, 현재 {len(df)}개")
+            forecaster = SegmentForecaster().fit(df)
+            segment_forecasters[dong_code] = forecaster
+        
+        if target_date is None:
+            target_date = datetime.now().strftime('%Y-%m-%d')
+        
+        timestamps = list(pd.date_range(pd.to_datetime(target_date), periods=days * 24, freq='H'))
+        start = time.perf_counter()
+        forecasts = forecaster.forecast(timestamps, reconcile_method)
+        elapsed = time.perf_counter() - start
+        
+        predictions = []
+        for i, ts in enumerate(timestamps):
+            item = {
+                'timestamp': ts.isoformat(),
+                'hour': ts.hour,
+                'is_weekend': ts.weekday() >= 5
+            }
+            for name in SEGMENTS:
+                item[name] = int(round(forecasts[name][i]))
+            predictions.append(item)
+        
+        return {
+            "dong_code": dong_code,
+            "prediction_date": target_date,
+            "model_type": "Prophet (segments)",
+            "segments": list(SEGMENTS),
+            "reconcile": reconcile,
+            "predictions": predictions,
+            "timing": {
+                "fit_seconds": forecaster.fit_seconds,
+                "predict_seconds": elapsed
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ 세그먼트 예측 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"세그먼트 예측 중 오류 발생: {str(e)}")
+
+@app.post("/hierarchy/{district}/forecast")
+async def run_hierarchical_forecast(district: str, target_date: str = None, days: int = 1,
+                                    method: str = 'mint_shrink'):
+    """구에 속한 모든 동을 일괄 예측하고 동 → 구 계층 조정 결과를 저장합니다.
+    
+    method: 'mint_shrink' | 'ols' | 'bottom_up'
+    """
+    try:
+        try:
+            district_dongs = get_district_dongs(district)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        
+        if days < 1 or days > 30:
+            raise HTTPException(status_code=400, detail="예측 기간은 1~30일까지 가능합니다.")
+        
+        if target_date is None:
+            target_date = datetime.now().strftime('%Y-%m-%d')
+        
+        timestamps = pd.date_range(pd.to_datetime(target_date), periods=days * 24, freq='H')
+        forecaster = HierarchicalForecaster(predictor.fetch_population_data)
+        result = await asyncio.to_thread(forecaster.run, district, district_dongs, timestamps, method)
+        hierarchy_results[district] = result
+        
+        return {
+            "status": "success",
+            "district": district,
+            "district_name": district_names().get(district, district),
+            "method": result.method,
+            "dong_count": len(result.dong_codes),
+            "prediction_start": result.timestamps[0].isoformat(),
+            "prediction_end": result.timestamps[-1].isoformat(),
+            "timing": result.timing
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ 계층 예측 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"계층 예측 중 오류 발생: {str(e)}")
+
+@app.get("/hierarchy/{district}")
+async def get_district_forecast(district: str):
+    """사전 계산된 구 합계 예측과 동별 요약을 반환합니다."""
+    result = hierarchy_results.get(district)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"{district}의 계층 예측 결과가 없습니다. 먼저 /hierarchy/{district}/forecast를 호출하세요.")
+    
+    return {
+        "district": district,
+        "district_name": district_names().get(district, district),
+        "method": result.method,
+        "computed_at": result.computed_at.isoformat(),
+        "predictions": result.district_series(),
+        "dongs": result.dong_summary()
+    }
+
+@app.get("/hierarchy/{district}/dongs/{dong_code}")
+async def get_dong_hierarchical_forecast(district: str, dong_code: str):
+    """사전 계산된 계층 예측 결과에서 특정 동의 예측을 반환합니다."""
+    result = hierarchy_results.get(district)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"{district}의 계층 예측 결과가 없습니다.")
+    
+    try:
+        predictions = result.dong_series(dong_code)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {
+        "district": district,
+        "dong_code": dong_code,
+        "dong_name": result.dong_names[dong_code],
+        "method": result.method,
+        "computed_at": result.computed_at.isoformat(),
+        "predictions": predictions
+    }
+
+@app.post("/workers/scale")
+async def scale_forecast_workers(workers: int):
+    """예측 워커 수를 조정합니다. 일관 해싱으로 일부 동만 다른 워커로 이동합니다."""
+    if workers < 1 or workers > max(4, (os.cpu_count() or 1) * 2):
+        raise HTTPException(status_code=400, detail="워커 수가 허용 범위를 벗어났습니다.")
+    
+    pool = get_forecast_pool()
+    while pool.n_workers < workers:
+        await asyncio.to_thread(pool.add_worker)
+    while pool.n_workers > workers:
+        await asyncio.to_thread(pool.remove_worker)
+    
+    return {"status": "success", "workers": pool.n_workers}
+
+@app.get("/workers")
+async def get_forecast_workers(district: str = None):
+    """워커별 캐시된 동 목록, 처리 건수와 (선택) 구의 동 배정 현황을 반환합니다."""
+    try:
+        pool = get_forecast_pool()
+        response = {
+            "workers": pool.n_workers,
+            "worker_stats": await asyncio.to_thread(pool.stats)
+        }
+        if district is not None:
+            try:
+                dong_codes = list(get_district_dongs(district))
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            response["assignment"] = {str(wid): codes for wid, codes in pool.assignment(dong_codes).items()}
+        return response
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"워커 상태 조회 중 오류 발생: {str(e)}")
+
+@app.post("/train/sharded/{dong_code}")
+async def train_sharded_model(dong_code: str, district: str = None):
+    """동을 담당하는 워커에서 모델을 (재)훈련하고 워커 캐시에 유지합니다."""
+    try:
+        pool = get_forecast_pool()
+        performance = await asyncio.wrap_future(pool.submit('train', dong_code, district=district))
+        # 미리 계산한 예측은 이전 모델 결과이므로 버림
+        prefetch_cache.invalidate('forecast', dong_code)
+        return {
+            "status": "success",
+            "dong_code": dong_code,
+            "worker_id": pool.worker_for(dong_code),
+            "performance": performance
+        }
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        print(f"❌ 샤딩 모델 훈련 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"모델 훈련 중 오류 발생: {str(e)}")
+
+@app.post("/predict/sharded/{dong_code}")
+async def predict_sharded(dong_code: str, target_date: str = None, district: str = None,
+                          interval_mode: str = 'prophet', prediction_hours: List[int] = None):
+    """동을 담당하는 워커의 캐시된 모델로 예측합니다 (모델이 없으면 워커가 먼저 훈련)."""
+    try:
+        if target_date is None:
+            target_date = datetime.now().strftime('%Y-%m-%d')
+        
+        pool = get_forecast_pool()
+        result = await asyncio.wrap_future(pool.submit(
+            'predict', dong_code, district=district, target_date=target_date,
+            hours=prediction_hours or list(range(24)), interval_mode=interval_mode
+        ))
+        record_served_forecasts(dong_code, result['predictions'], 'sharded')
+        return {
+            "dong_code": dong_code,
+            "prediction_date": target_date,
+            "model_type": "Prophet",
+            "worker_id": pool.worker_for(dong_code),
+            "model_cache_hit": result['model_cache_hit'],
+            "predictions": result['predictions']
+        }
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        print(f"❌ 샤딩 예측 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"예측 중 오류 발생: {str(e)}")
+
+@app.post("/predict/batch")
+async def predict_batch(data: Dict[str, Any]):
+    """여러 동 x 날짜 범위 x 시간대 예측을 한 번에 처리합니다.
+    
+    요청 형식:
+        {
+            "interval_mode": "conformal",
+            "requests": [
+                {"dong_code": "11680640", "start_date": "2025-08-20", "end_date": "2025-08-22", "hours": [8, 12, 18]}
+            ]
+        }
+    응답의 yhat/lower/upper는 [날짜][시간] 2차원 배열입니다.
+    """
+    try:
+        items = data.get('requests', [])
+        if not items:
+            raise HTTPException(status_code=400, detail="requests가 비어 있습니다.")
+        
+        interval_mode = data.get('interval_mode', 'conformal')
+        result = await run_batch(get_forecast_pool(), items, interval_mode)
+        for item in result['results']:
+            if 'error' in item:
+                continue
+            timestamps = (pd.DatetimeIndex(item['dates']).values[:, None]
+                          + np.asarray(item['hours'])[None, :].astype('timedelta64[h]')).ravel()
+            try:
+                get_forecast_ledger().record(item['dong_code'], timestamps, np.ravel(item['yhat']),
+                                       np.ravel(item['lower']), np.ravel(item['upper']), source='batch')
+            except Exception as e:
+                print(f"⚠️ 예측 원장 저장 실패: {e}")
+        
+        stats = result['stats']
+        print(f"📦 배치 예측 완료: {stats['forecasts']}개, {stats['forecasts_per_sec']:.0f} forecasts/sec")
+        return result
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ 배치 예측 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"배치 예측 중 오류 발생: {str(e)}")
+
+# 원장 source 중 전역 predictor가 서비스한 경로 (나머지는 샤딩 워커 모델)
+GLOBAL_PREDICTOR_SOURCES = {'hourly'}
+
+def retrain_global_predictor(dong_code: str):
+    """전역 predictor를 최신 데이터로 다시 훈련합니다 (드리프트 경보 백그라운드 작업)."""
+    try:
+        df = predictor.fetch_population_data(dong_code, use_cache=False)
+        if len(df) < 48:
+            print(f"⚠️ {dong_code} 재훈련 데이터 부족: {len(df)}개")
+            return
+        predictor.last_performance = predictor.train_model(df)
+        predictor.dong_code = dong_code
+    except Exception as e:
+        print(f"❌ {dong_code} 전역 모델 재훈련 실패: {e}")
+
+def retrain_sharded_model(dong_code: str):
+    """담당 워커에서 모델을 다시 훈련하고, 끝나면 그 동의 미리 계산한 예측을 버립니다."""
+    def on_done(future):
+        if future.exception() is not None:
+            print(f"❌ {dong_code} 샤딩 모델 재훈련 실패: {future.exception()}")
+            return
+        prefetch_cache.invalidate('forecast', dong_code)
+
+    get_forecast_pool().submit('train', dong_code).add_done_callback(on_done)
+
+@app.post("/monitoring/score")
+async def score_served_forecasts(background_tasks: BackgroundTasks, auto_retrain: bool = True):
+    """원장의 최근 예측을 최신 실제 데이터와 대조해 정확도를 계산하고 드리프트 경보를 만듭니다.
+    
+    auto_retrain=true이면 경보가 난 동의 예측을 서비스한 모델을 백그라운드로 재훈련합니다.
+    (hourly -> 전역 predictor가 아직 그 동 모델일 때, sharded/batch/prefetch -> 담당 워커)
+    """
+    try:
+        ledger = get_forecast_ledger()
+        dong_codes = ledger.dong_codes(since=datetime.now() - timedelta(days=SCORING_WINDOW_DAYS))
+        if not dong_codes:
+            return {"status": "empty", "message": "채점 구간에 저장된 예측이 없습니다."}
+        
+        def load_actuals():
+            from concurrent.futures import ThreadPoolExecutor
+            def fetch(code):
+                try:
+                    df = predictor.fetch_population_data(code, use_cache=False)
+                    return pd.DataFrame({'dong_code': code, 'ds': df['ds'], 'y': df['y']})
+                except Exception as e:
+                    print(f"⚠️ {code} 실제 데이터 조회 실패: {e}")
+                    return None
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                frames = [f for f in executor.map(fetch, dong_codes) if f is not None]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['dong_code', 'ds', 'y'])
+        
+        actuals = await asyncio.to_thread(load_actuals)
+        scores = await asyncio.to_thread(ledger.score, actuals)
+        alerts = ledger.drift_alerts(scores)
+        
+        retraining = []
+        if auto_retrain and alerts:
+            for alert in alerts:
+                code = alert['dong_code']
+                sources = set(alert['sources'])
+                if sources & GLOBAL_PREDICTOR_SOURCES:
+                    if predictor.dong_code == code:
+                        background_tasks.add_task(retrain_global_predictor, code)
+                        retraining.append({"dong_code": code, "model": "global"})
+                    else:
+                        # 전역 predictor는 이미 다른 동으로 다시 훈련됨
+                        retraining.append({"dong_code": code, "model": "global", "skipped": "predictor_retrained_for_other_dong"})
+                if sources - GLOBAL_PREDICTOR_SOURCES:
+                    background_tasks.add_task(retrain_sharded_model, code)
+                    retraining.append({"dong_code": code, "model": "sharded"})
+        
+        return {
+            "status": "success",
+            "scored_dongs": int(scores['dong_code'].nunique()) if not scores.empty else 0,
+            "scored_points": int(scores['n'].sum()) if not scores.empty else 0,
+            "pruned_rows": ledger.last_pruned,
+            "alerts": alerts,
+            "retraining": retraining,
+            "scored_at": ledger.last_scored_at.isoformat()
+        }
+    
+    except Exception as e:
+        print(f"❌ 예측 정확도 채점 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"예측 정확도 채점 중 오류 발생: {str(e)}")
+
+@app.get("/monitoring/accuracy")
+async def get_forecast_accuracy(dong_code: str = None):
+    """마지막 채점 결과의 동별 x horizon별 롤링 MAE/MAPE/bias를 반환합니다."""
+    ledger = get_forecast_ledger()
+    scores = ledger.last_scores
+    if scores is None:
+        raise HTTPException(status_code=404, detail="채점 결과가 없습니다. 먼저 /monitoring/score를 호출하세요.")
+    
+    if dong_code is not None and not scores.empty:
+        scores = scores[scores['dong_code'] == dong_code]
+    
+    return {
+        "scored_at": ledger.last_scored_at.isoformat(),
+        "metrics": scores.replace({np.nan: None}).to_dict('records')
+    }
+
+@app.get("/monitoring/alerts")
+async def get_drift_alerts():
+    """마지막 채점 결과 기준 드리프트 경보 목록을 반환합니다."""
+    ledger = get_forecast_ledger()
+    return {
+        "scored_at": ledger.last_scored_at.isoformat() if ledger.last_scored_at else None,
+        "alerts": ledger.drift_alerts()
+    }
+
+@app.on_event("shutdown")
+async def shutdown_forecast_pool():
+    if forecast_pool is not None:
+        forecast_pool.shutdown()
+
+@app.post("/demographics/train")
+async def train_demographic_engine(district: str = 'gangnam', rank: int = DEFAULT_RANK):
+    """구의 모든 동에 대해 성별 x 연령대 x 시간 시계열 엔진을 일괄 학습합니다 (야간 배치용)."""
+    global demographic_engine
+    try:
+        try:
+            dong_codes = list(get_district_dongs(district))
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        
+        def load_all():
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = dict(zip(dong_codes, executor.map(predictor.fetch_demographic_data, dong_codes)))
+            return {code: df for code, df in results.items() if not df.empty}
+        
+        fetch_start = time.perf_counter()
+        frames = await asyncio.to_thread(load_all)
+        fetch_seconds = time.perf_counter() - fetch_start
+        if not frames:
+            raise HTTPException(status_code=404, detail="성별/연령 데이터를 찾을 수 없습니다.")
+        
+        engine = DemographicEngine(rank=rank).fit(frames)
+        demographic_engine = engine
+        
+        return {
+            "status": "success",
+            "district": district,
+            "dong_count": len(engine.dong_codes),
+            "series_count": int(len(engine.levels)),
+            "rank": int(engine.patterns.shape[0]),
+            "explained_variance": engine.explained_variance,
+            "backtest": engine.backtest,
+            "timing": {
+                "fetch_seconds": fetch_seconds,
+                "fit_seconds": engine.fit_seconds
+            }
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ 성별/연령 엔진 훈련 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"성별/연령 엔진 훈련 중 오류 발생: {str(e)}")
+
+@app.get("/demographics/{dong_code}")
+async def predict_demographics(dong_code: str, target_date: str = None, days: int = 1):
+    """성별 x 연령대별 시간대 예측을 반환합니다."""
+    if not demographic_engine.is_trained:
+        raise HTTPException(status_code=400, detail="성별/연령 엔진이 훈련되지 않았습니다. 먼저 /demographics/train을 호출하세요.")
+    
+    if dong_code not in demographic_engine.dong_codes:
+        raise HTTPException(status_code=404, detail=f"학습되지 않은 동입니다: {dong_code}")
+    
+    if days < 1 or days > 30:
+        raise HTTPException(status_code=400, detail="예측 기간은 1~30일까지 가능합니다.")
+    
+    if target_date is None:
+        target_date = datetime.now().strftime('%Y-%m-%d')
+    
+    timestamps = pd.date_range(pd.to_datetime(target_date), periods=days * 24, freq='H')
+    return {
+        "dong_code": dong_code,
+        "prediction_date": target_date,
+        "model_type": "Shared seasonal profiles (low-rank)",
+        "timestamps": [ts.isoformat() for ts in timestamps],
+        "predictions": demographic_engine.forecast_dong(dong_code, timestamps),
+        "fitted_at": demographic_engine.fitted_at.isoformat()
+    }
+
+@app.post("/cube/refresh")
+async def refresh_population_cube(district: str = None, full: bool = False, data: Dict[str, Any] = None):
+    """데이터 소스에서 동별 데이터를 읽어 인구 큐브에 반영합니다 (기본은 마지막 적재 이후만)."""
+    try:
+        dong_codes = cube_dong_codes(district, (data or {}).get('dong_codes'))
+        result = await asyncio.to_thread(
+            population_cube.refresh, predictor.data_source, dong_codes, district, full
+        )
+        print(f"📦 인구 큐브 갱신: 동 {result['changed_dongs']}개, {result['elapsed_seconds']:.2f}초")
+        prefetch_cache.invalidate('comparison')
+        return {"status": "success", "refresh": result, "cube": population_cube.info()}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인구 큐브 갱신 실패: {str(e)}")
+
+@app.get("/cube")
+async def get_population_cube():
+    """인구 큐브 크기, 기간, 버전 정보"""
+    return population_cube.info()
+
+@app.post("/cube/snapshot")
+async def save_population_cube_snapshot():
+    """현재 큐브를 새 버전 스냅샷(.npy + manifest.json)으로 저장합니다."""
+    try:
+        manifest = await asyncio.to_thread(save_cube_snapshot, population_cube, CUBE_SNAPSHOT_DIR)
+        manifest.pop('dong_codes')
+        manifest.pop('last_dates')
+        return {"status": "success", "snapshot": manifest}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"큐브 스냅샷 저장 실패: {str(e)}")
+
+@app.post("/cube/snapshot/load")
+async def load_population_cube_snapshot():
+    """최신 스냅샷을 읽기 전용 메모리 맵으로 다시 엽니다 (다른 워커가 저장한 스냅샷 반영)."""
+    try:
+        if not open_cube_snapshot():
+            raise HTTPException(status_code=404, detail=f"큐브 스냅샷이 없습니다: {CUBE_SNAPSHOT_DIR}")
+        prefetch_cache.invalidate('comparison')
+        return {"status": "success", "cube": population_cube.info()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"큐브 스냅샷 로드 실패: {str(e)}")
+
+@app.get("/cube/dongs/{dong_code}/stats/{kind}")
+async def get_cube_stats(dong_code: str, kind: str, measure: str = 'total',
+                         start_date: str = None, end_date: str = None):
+    """백엔드 /stats/daily, day-night, time-week, weekday-weekend와 같은 형식의 통계를 큐브에서 계산합니다."""
+    if kind not in CUBE_STATS:
+        raise HTTPException(status_code=404, detail=f"지원하지 않는 통계입니다: {kind} ({', '.join(CUBE_STATS)})")
+    if measure not in MEASURE_NAMES:
+        raise HTTPException(status_code=400, detail=f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+    try:
+        return CUBE_STATS[kind](population_cube, dong_code, measure, start_date, end_date)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/aggregate")
+async def aggregate_population(data: Dict[str, Any]):
+    """인구 큐브 group-by 집계
+
+    {"group_by": ["dong", "weekday"], "measures": ["total", "local"], "aggs": ["mean", "max"],
+     "district": "gangnam", "start_date": "2025-08-01", "end_date": "2025-08-31", "hours": [...], "weekdays": [...]}
+    """
+    try:
+        start = time.perf_counter()
+        district_dongs = list(get_district_dongs(data['district'])) if data.get('district') else None
+        query = normalize_aggregation_query(data, population_cube, district_dongs)
+        result, cached = aggregation_cache.get_or_compute(population_cube, query)
+        return {
+            **result,
+            "cube_version": population_cube.version,
+            "cached": cached,
+            "elapsed_ms": (time.perf_counter() - start) * 1000
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"집계 실패: {str(e)}")
+
+@app.get("/aggregate/cache")
+async def get_aggregation_cache_stats():
+    """집계 결과 캐시 적중률"""
+    return aggregation_cache.stats()
+
+@app.post("/compare")
+async def compare_population(data: Dict[str, Any]):
+    """여러 동의 요일x시간 프로파일, 피크 시간, 주간/야간 비율, 주중/주말, 상관/거리 행렬을 한 번에 계산합니다.
+
+    {"dong_codes": ["11680640", "11680650"], "measure": "total", "start_date": "2025-08-01", "end_date": "2025-08-31"}
+    """
+    try:
+        dong_codes = data.get('dong_codes') or []
+        if not dong_codes and data.get('district'):
+            dong_codes = [code for code in get_district_dongs(data['district']) if code in population_cube.dong_codes]
+        start = time.perf_counter()
+        result = compare_dongs(
+            population_cube, profile_index, dong_codes,
+            measure=data.get('measure', 'total'),
+            start_date=data.get('start_date'),
+            end_date=data.get('end_date'),
+            names=dong_names(),
+            include_profiles=data.get('include_profiles', True)
+        )
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"동 비교 실패: {str(e)}")
+
+@app.get("/rankings/{kind}")
+async def get_rankings(kind: str, k: int = 5, district: str = None, measure: str = 'total', day_type: str = 'all',
+                       hour: str = None, window_days: int = DEFAULT_WINDOW_DAYS):
+    """가장 붐비는/한산한 동(busiest/quietest), 전주 대비 가장 늘어난/줄어든 동(growth/decline) Top-K
+
+    예: /rankings/busiest?district=gangnam&day_type=weekday&hour=18&k=5, hour=now면 현재 시간대
+    """
+    try:
+        dong_codes = None
+        if district:
+            dong_codes = [code for code in get_district_dongs(district) if code in population_cube]
+        if hour not in (None, 'now'):
+            hour = int(hour)
+        start = time.perf_counter()
+        result = ranking_index.top_k(
+            population_cube, kind, k=k, measure=measure, day_type=day_type, hour=hour,
+            window_days=window_days, dong_codes=dong_codes, names=dong_names()
+        )
+        result['district'] = district
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"순위 계산 실패: {str(e)}")
+
+@app.get("/rankings")
+async def get_ranking_stats():
+    """유지 중인 순위 점수 테이블과 갱신 통계"""
+    return ranking_index.stats()
+
+def query_dong_codes(dong_code: str = None, district: str = None):
+    """큐브 조회 대상 동 목록 (둘 다 없으면 큐브의 모든 동)"""
+    if dong_code:
+        return [dong_code]
+    if district:
+        return [code for code in get_district_dongs(district) if code in population_cube]
+    return None
+
+@app.post("/anomalies/refresh")
+async def refresh_anomaly_index(measure: str = 'total'):
+    """이상치/변화점 색인을 현재 큐브 버전까지 갱신합니다 (바뀐 동과 날짜만 다시 계산)."""
+    try:
+        result = await asyncio.to_thread(anomaly_index.refresh, population_cube, measure)
+        return {"status": "success", "refresh": result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"이상치 색인 갱신 실패: {str(e)}")
+
+@app.get("/anomalies")
+async def get_anomalies(dong_code: str = None, district: str = None, start_date: str = None, end_date: str = None,
+                        measure: str = 'total', min_score: float = None, limit: int = 100):
+    """요일-시간 기준선 대비 robust z-score 이상치 (동/구, 날짜 범위로 조회, |z| 내림차순)"""
+    try:
+        return await asyncio.to_thread(
+            anomaly_index.anomalies, population_cube, query_dong_codes(dong_code, district),
+            start_date, end_date, measure, min_score, limit, dong_names()
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"이상치 조회 실패: {str(e)}")
+
+@app.get("/anomalies/change-points")
+async def get_change_points(dong_code: str = None, district: str = None, start_date: str = None,
+                            end_date: str = None, measure: str = 'total'):
+    """동별 일평균 수준 변화점 (PELT)과 변화 전/후 평균"""
+    try:
+        return await asyncio.to_thread(
+            anomaly_index.change_points, population_cube, query_dong_codes(dong_code, district),
+            start_date, end_date, measure, dong_names()
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"변화점 조회 실패: {str(e)}")
+
+@app.get("/similar/{dong}")
+async def get_similar_dongs(dong: str, k: int = 10, district: str = None, measure: str = 'total',
+                            weeks: int = DEFAULT_PROFILE_WEEKS, n_clusters: int = DEFAULT_CLUSTERS):
+    """요일x시간 프로파일 모양이 비슷한 동 k개와 군집 라벨
+
+    dong은 행정동 코드 또는 이름 ('역삼동'처럼 숫자를 뺀 이름이면 역삼1동/역삼2동 평균으로 검색),
+    district를 주면 그 구 안에서만 찾고, weeks=0이면 큐브 전체 기간 프로파일을 사용합니다.
+    """
+    try:
+        # 큐브에 있는 코드는 그대로, 아니면 이름으로 검색
+        codes = [dong] if dong in population_cube else [code for code in find_dong_codes(dong) if code in population_cube]
+        if not codes:
+            raise KeyError(f"큐브에서 동을 찾을 수 없습니다: {dong}")
+        if len({code[:5] for code in codes}) > 1:
+            raise ValueError(f"여러 구에 같은 이름의 동이 있습니다. 코드로 지정하세요: {codes}")
+        candidates = list(get_district_dongs(district)) if district else None
+        start = time.perf_counter()
+        result = similarity_index.similar(
+            population_cube, codes, k=k, measure=measure, weeks=weeks or None,
+            n_clusters=n_clusters, candidates=candidates, names=dong_names()
+        )
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"유사 동 검색 실패: {str(e)}")
+
+@app.get("/clusters")
+async def get_dong_clusters(measure: str = 'total', weeks: int = DEFAULT_PROFILE_WEEKS,
+                            n_clusters: int = DEFAULT_CLUSTERS):
+    """프로파일 모양 기준 동 군집 (구성 동, 중심 프로파일의 피크/주간·야간/주말 특성)"""
+    try:
+        return similarity_index.clusters(population_cube, measure=measure, weeks=weeks or None,
+                                         n_clusters=n_clusters, names=dong_names())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"동 군집 조회 실패: {str(e)}")
+
+@app.get("/rolling")
+async def get_rolling_stats(dong_code: str = None, district: str = None, measure: str = 'total'):
+    """동별 마지막 관측 시간 기준 7일/28일 이동평균과 전주 대비 증감"""
+    try:
+        start = time.perf_counter()
+        result = rolling_store.current(population_cube, query_dong_codes(dong_code, district), measure, dong_names())
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"이동 통계 조회 실패: {str(e)}")
+
+@app.get("/rolling/{dong_code}/history")
+async def get_rolling_history(dong_code: str, start_date: str = None, end_date: str = None,
+                              measure: str = 'total', resolution: str = 'daily'):
+    """동의 이동평균 / 전주 대비 증감 이력 (daily: 날짜별 23시 기준, hourly: 매 시간)"""
+    try:
+        return rolling_store.history(population_cube, dong_code, measure, start_date, end_date, resolution)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"이동 통계 이력 조회 실패: {str(e)}")
+
+@app.get("/geo")
+async def get_geometry_info():
+    """행정동 경계 디코딩 / 좌표 색인 상태"""
+    try:
+        geometry = load_dong_geometry()
+        info = geometry.info()
+        if geometry._point_index is not None:
+            info['point_index'] = geometry.point_index.info()
+        return info
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"행정동 경계 로드 실패: {str(e)}")
+
+@app.post("/geo/locate")
+async def locate_dongs(data: Dict[str, Any]):
+    """좌표 목록 -> 행정동 코드 (경계 밖은 null)
+
+    {"points": [[37.4979, 127.0276], ...]}  (위도, 경도) 목록 -> 점별 객체
+    {"lat": [...], "lon": [...]}             열 배열 -> 열 배열 (대량 요청용)
+    """
+    try:
+        columnar = 'lat' in data and 'lon' in data
+        if columnar:
+            lat, lon = np.asarray(data['lat'], dtype=float), np.asarray(data['lon'], dtype=float)
+            if lat.shape != lon.shape:
+                raise ValueError("lat과 lon 길이가 다릅니다.")
+        else:
+            points = np.asarray(data.get('points') or [], dtype=float).reshape(-1, 2)
+            lat, lon = points[:, 0], points[:, 1]
+        if lat.size > MAX_LOCATE_POINTS:
+            raise ValueError(f"한 번에 최대 {MAX_LOCATE_POINTS:,}개 좌표까지 찾을 수 있습니다.")
+
+        geometry = load_dong_geometry()
+        index = geometry.point_index
+        start = time.perf_counter()
+        codes, labels = index.locate_codes(lat, lon)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        names = np.array(geometry.names + [None], dtype=object)[labels].tolist()
+        districts = np.array(geometry.district_names + [None], dtype=object)[labels].tolist()
+
+        result = {'count': int(lat.size), 'located': int((labels >= 0).sum()), 'elapsed_ms': elapsed_ms}
+        if columnar:
+            result.update({'dong_codes': codes, 'dong_names': names, 'district_names': districts})
+        else:
+            result['results'] = [
+                {'lat': float(a), 'lon': float(b), 'dong_code': code, 'dong_name': name, 'district_name': district}
+                for a, b, code, name, district in zip(lat, lon, codes, names, districts)
+            ]
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"좌표 행정동 조회 실패: {str(e)}")
+
+@app.get("/geo/adjacency")
+async def get_dong_adjacency(include_list: bool = False):
+    """공유 경계(arc) 기반 행정동 인접 그래프 요약 (include_list=true면 동별 이웃 목록 포함)"""
+    try:
+        adjacency = load_dong_adjacency()
+        result = adjacency.info()
+        if include_list:
+            result['adjacency'] = adjacency.adjacency_list()
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인접 그래프 로드 실패: {str(e)}")
+
+@app.get("/geo/neighbors/{dong_code}")
+async def get_dong_neighbors(dong_code: str, measure: str = 'total'):
+    """이웃 동 목록과, 큐브에 있으면 동/이웃의 최근 이동 통계 비교"""
+    try:
+        neighbors = load_dong_adjacency().neighbors(dong_code)
+        result = {'dong_code': dong_code, 'dong_name': dong_names().get(dong_code), 'neighbors': neighbors}
+
+        codes = [code for code in [dong_code] + [n['dong_code'] for n in neighbors]
+                 if code in population_cube]
+        if dong_code in population_cube:
+            stats = {entry['dong_code']: entry for entry in rolling_store.current(population_cube, codes, measure)['dongs']}
+            for neighbor in neighbors:
+                entry = stats.get(neighbor['dong_code'])
+                neighbor['ma_7d'] = entry['ma_7d'] if entry else None
+                neighbor['wow_percent'] = entry['wow_percent'] if entry else None
+            own = stats[dong_code]
+            values = [n['ma_7d'] for n in neighbors if n['ma_7d'] is not None]
+            neighbor_mean = float(np.mean(values)) if values else None
+            result['comparison'] = {
+                'measure': measure,
+                'ma_7d': own['ma_7d'],
+                'wow_percent': own['wow_percent'],
+                'neighbor_mean_ma_7d': round(neighbor_mean, 1) if neighbor_mean is not None else None,
+                'ratio_to_neighbors': round(own['ma_7d'] / neighbor_mean, 3) if neighbor_mean and own['ma_7d'] is not None else None
+            }
+        return result
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"이웃 동 조회 실패: {str(e)}")
+
+@app.get("/choropleth/{layer}")
+async def get_choropleth(layer: str, zoom: int = DEFAULT_ZOOM, metric: str = 'population', measure: str = 'total',
+                         date: str = None, hour: int = None):
+    """줌 레벨에 맞게 단순화한 TopoJSON(district/dong)과 같은 순서의 값 배열 (population/forecast/density)"""
+    try:
+        body, hit = await asyncio.to_thread(
+            choropleth_builder.build, layer, zoom, metric, population_cube, get_forecast_ledger(), measure, date, hour
+        )
+        return Response(content=body, media_type="application/json",
+                        headers={'X-Cache': 'HIT' if hit else 'MISS', 'Cache-Control': 'public, max-age=300'})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"단계구분도 생성 실패: {str(e)}")
+
+@app.get("/choropleth")
+async def get_choropleth_stats():
+    """단계구분도 캐시 상태"""
+    return choropleth_builder.stats()
+
+@app.get("/density")
+async def get_density_table(district: str = None):
+    """구별 인구/면적/인구밀도 참조표 (public/data/인구밀도_*.csv, 파일이 바뀌면 다시 읽음)"""
+    try:
+        table = load_density_table()
+        if district is not None:
+            return table.lookup(district)
+        return {**table.info(), 'districts': [table.lookup(name) for name in table.names]}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"인구밀도 자료 조회 실패: {str(e)}")
+
+@app.get("/density/live")
+async def get_live_density(measure: str = 'total', start_date: str = None, end_date: str = None):
+    """구별 시간대 생활인구 밀도 (명/km²)와 거주인구 밀도 대비 비율"""
+    try:
+        table = load_density_table()
+        return await asyncio.to_thread(table.live_density, population_cube, measure, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"생활인구 밀도 계산 실패: {str(e)}")
+
+@app.get("/predict/spatial")
+async def predict_spatial(dong_code: str = None, district: str = None, days: int = DEFAULT_HORIZON_DAYS,
+                          measure: str = 'total', use_neighbors: bool = True):
+    """큐브의 모든 동을 함께 학습한 전역 모델(이웃 동 지연 특성 포함)로 큐브 마지막 날 다음부터 days일 예측"""
+    try:
+        codes = query_dong_codes(dong_code, district)
+        return await asyncio.to_thread(
+            spatial_forecaster.forecast, population_cube, codes, days, measure, use_neighbors, dong_names()
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"시공간 예측 실패: {str(e)}")
+
+@app.get("/predict/spatial/backtest")
+async def backtest_spatial(test_days: int = 14, measure: str = 'total'):
+    """마지막 test_days일 보류 기간에서 이웃 특성 모델 / 자기 특성만 / 프로파일 기준선 정확도 비교"""
+    try:
+        return await asyncio.to_thread(spatial_forecaster.backtest, population_cube, test_days, measure)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"시공간 모델 백테스트 실패: {str(e)}")
+
+# 즐겨찾기 상위 동 미리 계산 결과 캐시 (화면 요청도 같은 캐시를 사용)
+prefetch_cache = PrefetchCache()
+
+def prefetch_forecast(dong_code: str, date: str) -> Dict[str, Any]:
+    """동 담당 샤딩 워커의 Prophet 모델로 하루 24시간 예측 (워커 모델 캐시도 함께 데워짐)"""
+    pool = get_forecast_pool()
+    result = pool.submit('predict', dong_code, target_date=date, hours=list(range(24)),
+                         interval_mode='prophet').result()
+    record_served_forecasts(dong_code, result['predictions'], 'prefetch')
+    return {"prediction_date": date, "model_type": "Prophet", "predictions": result['predictions']}
+
+def prefetch_comparison(dong_code: str, date: str) -> Dict[str, Any]:
+    """동과 큐브에 있는 이웃 동의 최근 4주 비교 지표"""
+    neighbors = [n['dong_code'] for n in load_dong_adjacency().neighbors(dong_code)
+                 if n['dong_code'] in population_cube]
+    end = pd.Timestamp(date)
+    return compare_dongs(population_cube, profile_index, [dong_code] + neighbors,
+                         start_date=end - pd.Timedelta(days=27), end_date=end, names=dong_names(),
+                         include_profiles=False)
+
+def prefetch_insights(dong_code: str, date: str) -> Dict[str, Any]:
+    """백엔드 AI 번들을 Overview Insights Agent에 보내 LLM 인사이트 생성 (프론트엔드와 같은 변환)"""
+    bundle_response = requests.get(f"{BACKEND_API_URL}/population/ai/bundle/{dong_code}", params={'date': date}, timeout=30)
+    bundle_response.raise_for_status()
+    bundle = bundle_response.json()
+    age_gender = bundle.get('ageGenderStats') or {}
+    response = requests.post(f"{OVERVIEW_INSIGHTS_URL}/analyze/overview-insights", json={
+        'dongName': bundle.get('dongName'),
+        'populationData': bundle.get('populationData'),
+        'timeStats': bundle.get('timeStats'),
+        'genderStats': bundle.get('genderStats'),
+        'ageStats': age_gender.get('totalAgeGroup') or bundle.get('ageStats')
+    }, timeout=120)
+    response.raise_for_status()
+    return response.json()
+
+favorite_warmer = FavoriteWarmer(prefetch_cache, {
+    'forecast': prefetch_forecast,
+    'comparison': prefetch_comparison,
+    'insights': prefetch_insights
+})
+
+def favorite_counts_from(data: Dict[str, Any]) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """요청 본문의 즐겨찾기 개수와 조회 정보
+
+    {"counts": {동: 개수}} (서버에서 집계한 개수, 권장) 또는 {"sessions": [쿠키, ...]}로 백엔드에서 조회.
+    세션 쿠키는 만료되면 조회에 실패하므로 failed_sessions로 알려 줍니다.
+    """
+    if data.get('counts'):
+        counts = {str(code): int(count) for code, count in data['counts'].items()}
+        return counts, {'source': 'counts', 'dongs': len(counts)}
+    if data.get('sessions'):
+        counts, meta = fetch_favorite_counts(BACKEND_API_URL, data['sessions'])
+        return counts, {'source': 'sessions', **meta}
+    raise ValueError("counts 또는 sessions가 필요합니다.")
+
+@app.post("/prefetch/warm")
+async def warm_favorites(data: Dict[str, Any]):
+    """즐겨찾기 상위 동의 예측/비교/인사이트를 미리 계산합니다.
+
+    {"sessions": ["SESSION=..."], "top_k": 20, "kinds": ["forecast", "comparison", "insights"], "date": "2025-08-20"}
+    또는 집계된 개수 {"counts": {"11680640": 37, "11680650": 12}}
+    """
+    try:
+        counts, favorites = await asyncio.to_thread(favorite_counts_from, data)
+        if favorites.get('failed_sessions'):
+            print(f"⚠️ 즐겨찾기 조회 실패 세션 {favorites['failed_sessions']}/{favorites['sessions']}개")
+        report = await asyncio.to_thread(
+            favorite_warmer.warm, counts, int(data.get('top_k', DEFAULT_TOP_DONGS)), data.get('kinds'),
+            data.get('date'), bool(data.get('refresh', False))
+        )
+        report['favorites'] = favorites
+        return report
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"즐겨찾기 워밍 실패: {str(e)}")
+
+@app.post("/prefetch/schedule")
+async def schedule_favorite_warming(data: Dict[str, Any]):
+    """피크 시각(8/12/18시) 30분 전마다 즐겨찾기를 다시 집계해 워밍합니다. {"enabled": false}면 중지
+
+    이미 예약이 있으면 새 설정으로 교체합니다 (응답의 schedule.replaced_previous).
+    세션 쿠키는 만료되므로 장기 예약에는 서버에서 집계한 counts를 권장하며,
+    회차마다 실패한 세션 수를 로그와 상태(last_warm.favorites, last_error)에 남깁니다.
+    """
+    if data.get('enabled', True) is False:
+        await asyncio.to_thread(favorite_warmer.stop_schedule)
+        return favorite_warmer.status()
+    try:
+        if not data.get('counts') and not data.get('sessions'):
+            raise ValueError("counts 또는 sessions가 필요합니다.")
+        description = {'source': 'counts', 'dongs': len(data['counts'])} if data.get('counts') else \
+            {'source': 'sessions', 'sessions': len(data['sessions'])}
+        # 진행 중인 예약 회차가 끝날 때까지 기다릴 수 있으므로 스레드에서 교체
+        await asyncio.to_thread(favorite_warmer.start_schedule, lambda: favorite_counts_from(data),
+                                int(data.get('top_k', DEFAULT_TOP_DONGS)), description)
+        return favorite_warmer.status()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/prefetch")
+async def get_prefetch_status():
+    """예약 상태, 마지막 워밍 결과, 캐시 적중률과 p50/p95 응답 시간"""
+    return favorite_warmer.status()
+
+@app.get("/prefetch/{kind}/{dong_code}")
+async def get_prefetched(kind: str, dong_code: str, date: str = None):
+    """미리 계산한 결과(forecast/comparison/insights)를 돌려줍니다. 없으면 지금 계산해 캐시"""
+    try:
+        start = time.perf_counter()
+        result, hit = await asyncio.to_thread(favorite_warmer.get, kind, dong_code, date)
+        return {
+            "kind": kind,
+            "dong_code": dong_code,
+            "cache_hit": hit,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+            "result": result
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"미리 계산 결과 조회 실패: {str(e)}")
+
+@app.get("/predict/explain")
+async def explain_forecast(target_date: str = None, include_tables: bool = False):
+    """현재 훈련된 모델의 하루 24시간 예측을 추세/일간/주간 계절성/리그레서 기여로 분해합니다."""
+    if not predictor.is_trained:
+        raise HTTPException(status_code=400, detail="모델이 훈련되지 않았습니다. 먼저 /train/{dong_code}를 호출하세요.")
+    try:
+        start = time.perf_counter()
+        target_date = target_date or datetime.now().strftime('%Y-%m-%d')
+        result = await asyncio.to_thread(predictor.explain_hourly_demand, target_date, None, include_tables)
+        return {"prediction_date": target_date, **result, "elapsed_ms": (time.perf_counter() - start) * 1000}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"예측 분해 실패: {str(e)}")
+
+@app.get("/predict/explain/{dong_code}")
+async def explain_sharded_forecast(dong_code: str, target_date: str = None, district: str = None,
+                                   include_tables: bool = False):
+    """동을 담당하는 워커의 캐시된 모델로 예측 분해 (성분 표는 워커의 모델마다 한 번만 추출)"""
+    try:
+        start = time.perf_counter()
+        target_date = target_date or datetime.now().strftime('%Y-%m-%d')
+        pool = get_forecast_pool()
+        result = await asyncio.wrap_future(pool.submit(
+            'explain', dong_code, district=district, target_date=target_date, include_tables=include_tables
+        ))
+        return {
+            "dong_code": dong_code,
+            "prediction_date": target_date,
+            "worker_id": pool.worker_for(dong_code),
+            **result,
+            "elapsed_ms": (time.perf_counter() - start) * 1000
+        }
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        print(f"❌ 예측 분해 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"예측 분해 실패: {str(e)}")
+
 @app.get("/predict/weekly/{dong_code}")
 async def predict_weekly_pattern(dong_code: str):
     """7일간 주간 인구 패턴을 예측합니다."""
@@ -545,7 +1929,7 @@ async def predict_weekly_pattern(dong_code: str):
         raise HTTPException(status_code=500, detail=f"주간 패턴 예측 중 오류 발생: {str(e)}")
 
 @app.post("/predict/compare/{dong_code}")
-async def predict_with_comparison(dong_code: str, target_date: str = None):
+async def predict_with_comparison(dong_code: str, target_date: str = None, interval_mode: str = 'prophet'):
     """예측 결과와 실제 데이터(6일 전)를 비교하여 반환"""
     try:
         if not predictor.is_trained:
@@ -558,7 +1942,7 @@ async def predict_with_comparison(dong_code: str, target_date: str = None):
         print(f"🔮 동 코드 {dong_code}의 {target_date} 예측 + 실제 데이터 비교...")
         
         # Prophet으로 예측
-        predictions = predictor.predict_hourly_demand(target_date, list(range(24)))
+        predictions = predictor.predict_hourly_demand(target_date, list(range(24)), interval_mode)
         
         # 실제 데이터 가져오기 (6일 전)
         actual_data = predictor.fetch_actual_data_for_comparison(dong_code, target_date)
@@ -0,0 +1,50 @@
+"""
+로컬 백엔드 대체 서버 (합성 데이터)
+
+Spring 백엔드(:8081) 없이 예측 서버를 띄우거나 부하 테스트를 할 때 사용합니다.
+백엔드와 같은 경로로 synthetic.py의 합성 dailyDataList를 돌려줍니다.
+
+    SYNTHETIC_DAYS=730 uvicorn mock_backend:app --port 8081
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List
+import os
+
+from fastapi import FastAPI
+
+from synthetic import SyntheticPopulationGenerator, DEFAULT_DAYS, DEFAULT_SEED
+
+app = FastAPI(title="합성 인구 데이터 백엔드", version="1.0.0")
+
+generator = SyntheticPopulationGenerator(
+    start=os.getenv("SYNTHETIC_START"),
+    end=os.getenv("SYNTHETIC_END"),
+    days=int(os.getenv("SYNTHETIC_DAYS", str(DEFAULT_DAYS))),
+    seed=int(os.getenv("SYNTHETIC_SEED", str(DEFAULT_SEED)))
+)
+
+
+@lru_cache(maxsize=64)
+def _daily_records(dong_code: str) -> List[Dict[str, Any]]:
+    return generator.daily_data_list(dong_code)
+
+
+@app.get("/")
+async def root():
+    return {
+        "message": "합성 인구 데이터 백엔드가 실행 중입니다",
+        "start": generator.start.strftime('%Y-%m-%d'),
+        "end": generator.end.strftime('%Y-%m-%d'),
+        "seed": generator.seed
+    }
+
+
+@app.get("/population/{district}/dongs/{dong_code}/daily")
+def get_daily_data(district: str, dong_code: str):
+    return {"dailyDataList": _daily_records(dong_code)}
+
+
+@app.get("/population/{district}/dongs/{dong_code}/time-based")
+def get_time_based_data(district: str, dong_code: str):
+    return {"timeDataList": _daily_records(dong_code)}
@@ -0,0 +1,246 @@
+"""
+예측 정확도 모니터링
+
+서비스한 모든 예측을 SQLite 원장(ledger)에 저장해 두고, 실제 데이터가 늦게 들어오면
+(동, 시점) 기준으로 한 번에 조인해 동별/예측 horizon별 MAE, MAPE, bias를 계산합니다.
+최근 오차가 기준보다 크게 나빠진 동은 드리프트 경보로 표시하고, 그 예측을 서비스한 경로(source)와
+함께 재훈련 대상으로 돌려줍니다. 채점은 최근 SCORING_WINDOW_DAYS일 행만 읽고,
+RETENTION_DAYS일보다 오래된 행은 채점할 때마다 지워 원장 크기가 계속 커지지 않게 합니다.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forecast_ledger.sqlite3')
+
+# 롤링 지표 계산 구간 (일)
+ROLLING_WINDOW_DAYS = 7
+
+# 채점에 읽는 구간 (일, 최근 구간 + 그 앞의 기준 구간)
+SCORING_WINDOW_DAYS = 28
+
+# 원장 보관 기간 (일, 이보다 오래된 대상 시점의 예측은 삭제)
+RETENTION_DAYS = 90
+
+# 드리프트 판정: 최근 구간 MAPE가 기준 구간보다 이 배수 이상 나쁘고 최소 MAPE 이상이면 경보
+DRIFT_MAPE_RATIO = 1.5
+DRIFT_MIN_MAPE = 15.0
+# 평균 대비 bias 비율(%)이 이 값을 넘어도 경보
+DRIFT_BIAS_PERCENT = 10.0
+# 경보 판정에 필요한 최소 채점 건수
+DRIFT_MIN_POINTS = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    dong_code TEXT NOT NULL,
+    target_ts TEXT NOT NULL,
+    issued_at TEXT NOT NULL,
+    horizon_hours REAL NOT NULL,
+    yhat REAL NOT NULL,
+    yhat_lower REAL,
+    yhat_upper REAL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_forecasts_dong_ts ON forecasts (dong_code, target_ts);
+"""
+
+
+class ForecastLedger:
+    """서비스한 예측을 저장하고 실제값과 대조해 정확도를 계산합니다."""
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.last_scores: Optional[pd.DataFrame] = None
+        self.last_scored_at: Optional[datetime] = None
+        self.last_pruned = 0
+
+    def record(self, dong_code: str, timestamps, yhat, yhat_lower=None, yhat_upper=None,
+               source: str = 'hourly', issued_at: datetime = None):
+        """예측 배열을 원장에 한 번에 저장합니다."""
+        issued_at = issued_at or datetime.now()
+        ts = pd.DatetimeIndex(timestamps)
+        n = len(ts)
+        if n == 0:
+            return
+        horizon = (ts - pd.Timestamp(issued_at)) / pd.Timedelta(hours=1)
+        lower = np.full(n, np.nan) if yhat_lower is None else np.asarray(yhat_lower, dtype=float)
+        upper = np.full(n, np.nan) if yhat_upper is None else np.asarray(yhat_upper, dtype=float)
+        rows = zip(
+            [dong_code] * n,
+            ts.strftime('%Y-%m-%dT%H:%M:%S'),
+            [issued_at.isoformat(timespec='seconds')] * n,
+            np.asarray(horizon, dtype=float).tolist(),
+            np.asarray(yhat, dtype=float).tolist(),
+            lower.tolist(),
+            upper.tolist(),
+            [source] * n
+        )
+        with self._lock:
+            self._conn.executemany("INSERT INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def record_predictions(self, dong_code: str, predictions: List[Dict], source: str = 'hourly'):
+        """predict_hourly_demand 형식의 예측 목록을 저장합니다."""
+        if not predictions:
+            return
+        self.record(
+            dong_code,
+            [p['timestamp'] for p in predictions],
+            [p['predicted_population'] for p in predictions],
+            [p['confidence_lower'] for p in predictions],
+            [p['confidence_upper'] for p in predictions],
+            source=source
+        )
+
+    def dong_codes(self, since: datetime = None) -> List[str]:
+        """예측이 있는 동 코드 (since 이후 대상 시점만)"""
+        query, params = "SELECT DISTINCT dong_code FROM forecasts", ()
+        if since is not None:
+            query += " WHERE target_ts >= ?"
+            params = (since.strftime('%Y-%m-%dT%H:%M:%S'),)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def revision(self) -> int:
+        """원장에 행이 추가될 때마다 커지는 값 (결과 캐시 무효화용)"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM forecasts").fetchone()[0]
+
+    def latest_forecasts(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """[start, end) 시점별로 가장 최근에 발행한 예측만 (dong_code, target_ts, yhat)"""
+        query = ("SELECT dong_code, target_ts, issued_at, yhat FROM forecasts "
+                 "WHERE target_ts >= ? AND target_ts < ? ORDER BY issued_at")
+        params = (start.strftime('%Y-%m-%dT%H:%M:%S'), end.strftime('%Y-%m-%dT%H:%M:%S'))
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params)
+        return df.drop_duplicates(['dong_code', 'target_ts'], keep='last')[['dong_code', 'target_ts', 'yhat']]
+
+    def load(self, since: datetime = None) -> pd.DataFrame:
+        query = "SELECT * FROM forecasts"
+        params = ()
+        if since is not None:
+            query += " WHERE target_ts >= ?"
+            params = (since.strftime('%Y-%m-%dT%H:%M:%S'),)
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params)
+        df['target_ts'] = pd.to_datetime(df['target_ts'])
+        df['issued_at'] = pd.to_datetime(df['issued_at'])
+        return df
+
+    def prune(self, before: datetime) -> int:
+        """대상 시점이 before보다 이른 예측을 삭제하고 삭제 건수를 반환합니다."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM forecasts WHERE target_ts < ?",
+                                        (before.strftime('%Y-%m-%dT%H:%M:%S'),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def score(self, actuals: pd.DataFrame, now: datetime = None,
+              window_days: int = SCORING_WINDOW_DAYS) -> pd.DataFrame:
+        """실제값(dong_code, ds, y)과 최근 window_days일 예측을 조인해 (동, 서비스 경로, horizon 일) 단위 지표를 계산합니다.
+
+        반환 컬럼: dong_code, source, horizon_days, window(recent/baseline), n, n_mape, mae, mape, bias, coverage
+        mape는 실제값이 0보다 큰 시점(n_mape건)만으로 계산합니다.
+        """
+        now = pd.Timestamp(now or datetime.now())
+        self.last_pruned = self.prune((now - pd.Timedelta(days=RETENTION_DAYS)).to_pydatetime())
+        forecasts = self.load(since=(now - pd.Timedelta(days=window_days)).to_pydatetime())
+        if forecasts.empty or actuals.empty:
+            self.last_scores = pd.DataFrame()
+            self.last_scored_at = now.to_pydatetime()
+            return self.last_scores
+
+        joined = forecasts.merge(
+            actuals.rename(columns={'ds': 'target_ts', 'y': 'actual'})[['dong_code', 'target_ts', 'actual']],
+            on=['dong_code', 'target_ts'],
+            how='inner'
+        )
+        if joined.empty:
+            self.last_scores = pd.DataFrame()
+            self.last_scored_at = now.to_pydatetime()
+            return self.last_scores
+
+        error = joined['actual'].to_numpy() - joined['yhat'].to_numpy()
+        actual = joined['actual'].to_numpy(dtype=float)
+        joined['abs_error'] = np.abs(error)
+        joined['error'] = error
+        joined['ape'] = np.where(actual > 0, np.abs(error) / np.where(actual > 0, actual, 1) * 100, np.nan)
+        joined['covered'] = ((actual >= joined['yhat_lower']) & (actual <= joined['yhat_upper'])).astype(float)
+        joined.loc[joined['yhat_lower'].isna(), 'covered'] = np.nan
+        joined['horizon_days'] = np.clip(np.ceil(np.maximum(joined['horizon_hours'], 1) / 24), 1, None).astype(int)
+        recent_start = now - pd.Timedelta(days=ROLLING_WINDOW_DAYS)
+        joined['window'] = np.where(joined['target_ts'] >= recent_start, 'recent', 'baseline')
+
+        joined['source'] = joined['source'].fillna('unknown')
+        grouped = joined.groupby(['dong_code', 'source', 'horizon_days', 'window'])
+        scores = grouped.agg(
+            n=('abs_error', 'size'),
+            n_mape=('ape', 'count'),
+            mae=('abs_error', 'mean'),
+            mape=('ape', 'mean'),
+            bias=('error', 'mean'),
+            mean_actual=('actual', 'mean'),
+            coverage=('covered', 'mean')
+        ).reset_index()
+
+        self.last_scores = scores
+        self.last_scored_at = now.to_pydatetime()
+        return scores
+
+    def drift_alerts(self, scores: pd.DataFrame = None) -> List[Dict]:
+        """동별 최근 구간 지표를 기준 구간과 비교해 드리프트 경보를 만듭니다."""
+        scores = self.last_scores if scores is None else scores
+        if scores is None or scores.empty:
+            return []
+
+        # 경로/horizon을 합친 동 x 구간 지표 (건수 가중 평균, MAPE는 실제값 0인 시점을 빼고 가중)
+        weighted = scores.assign(
+            mae_w=scores['mae'] * scores['n'],
+            mape_w=scores['mape'].fillna(0) * scores['n_mape'],
+            bias_w=scores['bias'] * scores['n'],
+            actual_w=scores['mean_actual'] * scores['n']
+        ).groupby(['dong_code', 'window'])[['n', 'n_mape', 'mae_w', 'mape_w', 'bias_w', 'actual_w']].sum()
+        per_window = pd.DataFrame({
+            'n': weighted['n'],
+            'mae': weighted['mae_w'] / weighted['n'],
+            'mape': weighted['mape_w'] / weighted['n_mape'].replace(0, np.nan),
+            'bias_percent': weighted['bias_w'] / weighted['actual_w'].replace(0, np.nan) * 100
+        }).unstack('window')
+        # 최근 구간 예측을 서비스한 경로 (재훈련할 모델 선택용)
+        recent = scores[scores['window'] == 'recent']
+        sources = recent.groupby('dong_code')['source'].agg(lambda values: sorted(set(values)))
+
+        alerts = []
+        for dong_code, row in per_window.iterrows():
+            recent_n = row.get(('n', 'recent'))
+            if pd.isna(recent_n) or recent_n < DRIFT_MIN_POINTS:
+                continue
+            recent_mape = row[('mape', 'recent')]
+            baseline_mape = row.get(('mape', 'baseline'))
+            bias_percent = row[('bias_percent', 'recent')]
+
+            reasons = []
+            if not pd.isna(recent_mape) and recent_mape >= DRIFT_MIN_MAPE and (pd.isna(baseline_mape) or recent_mape >= baseline_mape * DRIFT_MAPE_RATIO):
+                reasons.append('mape')
+            if not pd.isna(bias_percent) and abs(bias_percent) >= DRIFT_BIAS_PERCENT:
+                reasons.append('bias')
+            if reasons:
+                alerts.append({
+                    'dong_code': dong_code,
+                    'reasons': reasons,
+                    'sources': sources.get(dong_code, []),
+                    'recent_points': int(recent_n),
+                    'recent_mape': None if pd.isna(recent_mape) else float(recent_mape),
+                    'baseline_mape': None if pd.isna(baseline_mape) else float(baseline_mape),
+                    'recent_bias_percent': None if pd.isna(bias_percent) else float(bias_percent)
+                })
+        return alerts
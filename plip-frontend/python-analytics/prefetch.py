@@ -0,0 +1,298 @@
+"""
+즐겨찾기 기반 미리 계산(prefetch)과 캐시 워밍
+
+사용자가 가장 먼저 여는 화면은 즐겨찾기한 동의 예측/비교/AI 인사이트입니다.
+백엔드 즐겨찾기(/favorites/my, /api/users/me/favorites)를 동별 개수로 모아 상위 동의 결과를
+피크 시간대(출근/점심/퇴근) 전에 미리 계산해 두고, 화면 요청은 같은 캐시에서 바로 돌려줍니다.
+
+    count_favorites(lists)           즐겨찾기 응답 목록 -> 동 코드별 개수
+    fetch_favorite_counts(url, ...)  세션별로 백엔드 즐겨찾기를 조회해 합산 (두 엔드포인트 순서대로 시도)
+    PrefetchCache                    (종류, 동, 날짜) -> 결과 TTL/LRU 캐시, 요청별 적중 여부와 지연 시간 기록
+    FavoriteWarmer                   상위 동 x 작업 종류를 미리 계산, 피크 전 예약 실행
+
+효과는 PrefetchCache.stats()의 적중률과 p50/p95 지연 시간으로 확인합니다 (benchmark.py prefetch).
+"""
+
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import threading
+import time
+
+import numpy as np
+import requests
+
+# 즐겨찾기 조회 엔드포인트 (앞에서부터 시도)
+FAVORITE_ENDPOINTS = ('/favorites/my', '/api/users/me/favorites')
+
+DEFAULT_TOP_DONGS = 20
+
+# 피크 시작 시각과 그보다 먼저 워밍을 시작하는 시간 (분)
+PEAK_HOURS = (8, 12, 18)
+WARM_LEAD_MINUTES = 30
+
+# 미리 계산한 결과 유지 시간 / 최대 항목 수
+PREFETCH_TTL_SECONDS = 3 * 3600
+MAX_PREFETCH_ENTRIES = 2048
+
+# 지연 시간 통계를 계산하는 최근 요청 수
+LATENCY_WINDOW = 5000
+
+FAVORITE_TIMEOUT_SECONDS = 5
+
+
+def count_favorites(lists: Iterable[Any]) -> Counter:
+    """즐겨찾기 응답들 ([{adstrdCodeSe, dongName}, ...] 또는 {"favorites"/"data": [...]})을 동 코드별 개수로"""
+    counts = Counter()
+    for payload in lists:
+        if isinstance(payload, dict):
+            payload = payload.get('favorites') or payload.get('data') or []
+        codes = {str(item.get('adstrdCodeSe') or item.get('dongCode') or item.get('dong_code'))
+                 for item in payload if isinstance(item, dict)}
+        # 같은 사용자가 같은 동을 중복 등록해도 한 번만 셈
+        counts.update(code for code in codes if code and code != 'None')
+    return counts
+
+
+def fetch_favorite_counts(backend_url: str, sessions: List[str]) -> Tuple[Counter, Dict[str, Any]]:
+    """세션(쿠키 헤더 값)마다 백엔드 즐겨찾기 목록을 받아 합산합니다. 실패한 세션은 건너뜀"""
+    lists, failures = [], 0
+    for cookie in sessions:
+        for endpoint in FAVORITE_ENDPOINTS:
+            try:
+                response = requests.get(f"{backend_url}{endpoint}", headers={'Cookie': cookie},
+                                        timeout=FAVORITE_TIMEOUT_SECONDS)
+            except requests.RequestException:
+                continue
+            if response.status_code == 200:
+                lists.append(response.json())
+                break
+        else:
+            failures += 1
+    return count_favorites(lists), {'sessions': len(sessions), 'failed_sessions': failures}
+
+
+def next_warm_time(now: datetime, peak_hours=PEAK_HOURS, lead_minutes: int = WARM_LEAD_MINUTES) -> datetime:
+    """now 이후 가장 가까운 (피크 시각 - lead_minutes)"""
+    candidates = [
+        datetime.combine(now.date() + timedelta(days=offset), datetime.min.time()) + timedelta(hours=hour)
+        - timedelta(minutes=lead_minutes)
+        for offset in (0, 1) for hour in peak_hours
+    ]
+    return min(t for t in candidates if t > now)
+
+
+class PrefetchCache:
+    """미리 계산한 결과 캐시. 화면 요청마다 적중 여부와 응답 시간을 기록합니다."""
+
+    def __init__(self, ttl_seconds: float = PREFETCH_TTL_SECONDS, max_entries: int = MAX_PREFETCH_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # (종류, 적중 여부, 지연 ms)
+        self._requests: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def _lookup(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, kind: str = None, dong_code: str = None) -> int:
+        """kind 종류(생략 시 전체), dong_code 동(생략 시 전체) 항목 삭제
+
+        큐브가 바뀌어 비교 결과가 낡았거나 모델을 다시 훈련해 예측이 낡았을 때 사용
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (kind is None or key[0] == kind) and (dong_code is None or key[1] == str(dong_code))]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def contains(self, key: tuple) -> bool:
+        return self._lookup(key) is not None
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """화면 요청 경로: 캐시에 있으면 바로, 없으면 계산해 저장. (결과, 적중 여부)"""
+        started = time.perf_counter()
+        entry = self._lookup(key)
+        hit = entry is not None
+        value = entry[1] if hit else compute()
+        if not hit:
+            self.put(key, value)
+        with self._lock:
+            self._requests.append((key[0], hit, (time.perf_counter() - started) * 1000))
+        return value, hit
+
+    def reset_stats(self):
+        with self._lock:
+            self._requests.clear()
+
+    @staticmethod
+    def _summary(records: List[tuple]) -> Dict[str, Any]:
+        if not records:
+            return {'requests': 0, 'hit_rate': None, 'p50_ms': None, 'p95_ms': None}
+        latency = np.array([ms for _, _, ms in records])
+        return {
+            'requests': len(records),
+            'hit_rate': round(sum(hit for _, hit, _ in records) / len(records), 4),
+            'p50_ms': round(float(np.percentile(latency, 50)), 2),
+            'p95_ms': round(float(np.percentile(latency, 95)), 2)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            records = list(self._requests)
+            entries = len(self._entries)
+        kinds = sorted({kind for kind, _, _ in records})
+        return {
+            'entries': entries,
+            'ttl_seconds': self.ttl_seconds,
+            **self._summary(records),
+            'by_kind': {kind: self._summary([r for r in records if r[0] == kind]) for kind in kinds}
+        }
+
+
+class FavoriteWarmer:
+    """즐겨찾기 상위 동의 작업 결과를 캐시에 미리 채우고, 피크 전 예약 실행을 관리합니다.
+
+    jobs: 종류 -> (동 코드, 날짜) -> 결과 함수. 캐시 키는 (종류, 동 코드, 날짜)
+    """
+
+    def __init__(self, cache: PrefetchCache, jobs: Dict[str, Callable[[str, str], Any]]):
+        self.cache = cache
+        self.jobs = jobs
+        self.last_report: Dict[str, Any] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+        self.next_run: datetime = None
+        self.schedule: Dict[str, Any] = None
+        self.last_error: str = None
+
+    @staticmethod
+    def key(kind: str, dong_code: str, date: str) -> tuple:
+        return (kind, str(dong_code), date)
+
+    def warm(self, counts: Dict[str, int], top_k: int = DEFAULT_TOP_DONGS, kinds: List[str] = None,
+             date: str = None, refresh: bool = False) -> Dict[str, Any]:
+        """개수 상위 top_k개 동 x 작업 종류를 미리 계산합니다 (이미 있으면 refresh=True일 때만 다시 계산)."""
+        kinds = list(kinds or self.jobs)
+        unknown = [kind for kind in kinds if kind not in self.jobs]
+        if unknown:
+            raise ValueError(f"알 수 없는 작업 종류입니다: {', '.join(unknown)} (가능: {', '.join(self.jobs)})")
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        top = [code for code, _ in Counter({str(k): int(v) for k, v in counts.items()}).most_common(top_k)]
+
+        started = time.perf_counter()
+        computed, skipped, errors = 0, 0, []
+        timings = {kind: [] for kind in kinds}
+        with self._lock:
+            for code in top:
+                for kind in kinds:
+                    key = self.key(kind, code, date)
+                    if not refresh and self.cache.contains(key):
+                        skipped += 1
+                        continue
+                    job_started = time.perf_counter()
+                    try:
+                        self.cache.put(key, self.jobs[kind](code, date))
+                        computed += 1
+                    except Exception as e:
+                        errors.append({'dong_code': code, 'kind': kind, 'error': f"{type(e).__name__}: {e}"})
+                    timings[kind].append((time.perf_counter() - job_started) * 1000)
+
+        self.last_report = {
+            'date': date,
+            'dongs': top,
+            'favorite_counts': {code: int(counts[code]) for code in top},
+            'computed': computed,
+            'skipped_cached': skipped,
+            'errors': errors,
+            'mean_job_ms': {kind: round(float(np.mean(ms)), 1) for kind, ms in timings.items() if ms},
+            'elapsed_seconds': round(time.perf_counter() - started, 3),
+            'finished_at': datetime.now().isoformat(timespec='seconds')
+        }
+        print(f"🔥 즐겨찾기 워밍: 동 {len(top)}개, 계산 {computed}건, 건너뜀 {skipped}건, 실패 {len(errors)}건 "
+              f"({self.last_report['elapsed_seconds']:.1f}초)")
+        return self.last_report
+
+    def get(self, kind: str, dong_code: str, date: str = None) -> Tuple[Any, bool]:
+        """화면 요청: 미리 계산한 결과가 있으면 바로, 없으면 지금 계산해 캐시"""
+        if kind not in self.jobs:
+            raise ValueError(f"알 수 없는 작업 종류입니다: {kind} (가능: {', '.join(self.jobs)})")
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        return self.cache.get_or_compute(self.key(kind, dong_code, date), lambda: self.jobs[kind](dong_code, date))
+
+    def start_schedule(self, counts_provider: Callable[[], Tuple[Dict[str, int], Dict[str, Any]]],
+                       top_k: int = DEFAULT_TOP_DONGS, description: Dict[str, Any] = None):
+        """피크 시각 WARM_LEAD_MINUTES분 전마다 counts_provider()로 (즐겨찾기 개수, 조회 정보)를 받아 워밍
+
+        이미 예약이 있으면 새 설정으로 교체합니다. 세션 조회가 실패하면(만료 등) 실패 수를 기록하고,
+        개수를 하나도 못 받으면 빈 워밍 대신 last_error에 남깁니다.
+        """
+        replaced = self.stop_schedule()
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                self.next_run = next_warm_time(datetime.now())
+                if stop.wait(max((self.next_run - datetime.now()).total_seconds(), 0)):
+                    break
+                try:
+                    counts, favorites = counts_provider()
+                    failed = favorites.get('failed_sessions', 0)
+                    if failed:
+                        print(f"⚠️ 예약 워밍: 즐겨찾기 조회 실패 세션 {failed}/{favorites.get('sessions')}개 (만료 여부 확인)")
+                    if not counts:
+                        self.last_error = (f"{datetime.now().isoformat(timespec='seconds')} 즐겨찾기 개수가 비어 있어 "
+                                           f"워밍을 건너뜀 (실패 세션 {failed}개)")
+                        print(f"⚠️ {self.last_error}")
+                        continue
+                    report = self.warm(counts, top_k, refresh=True)
+                    report['favorites'] = favorites
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = f"{datetime.now().isoformat(timespec='seconds')} {type(e).__name__}: {e}"
+                    print(f"⚠️ 예약 워밍 실패: {e}")
+
+        self._stop = stop
+        self.schedule = {**(description or {}), 'top_k': top_k, 'replaced_previous': replaced}
+        self._thread = threading.Thread(target=run, name='favorite-warmer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop_schedule(self) -> bool:
+        """예약 중지 (진행 중이던 예약이 있었으면 True)"""
+        running = self._thread is not None and self._thread.is_alive()
+        self._stop.set()
+        if running:
+            self._thread.join(timeout=5)
+        self.next_run = None
+        return running
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'scheduled': self._thread is not None and self._thread.is_alive(),
+            'next_run': self.next_run.isoformat(timespec='minutes') if self.next_run else None,
+            'schedule': self.schedule,
+            'last_error': self.last_error,
+            'peak_hours': list(PEAK_HOURS),
+            'lead_minutes': WARM_LEAD_MINUTES,
+            'last_warm': self.last_report,
+            'cache': self.cache.stats()
+        }
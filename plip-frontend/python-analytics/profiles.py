@@ -0,0 +1,102 @@
+"""
+요일x시간(168칸) 누적합 색인
+
+인구 큐브의 날짜 축을 (주, 요일)로 접고 주 축 방향 누적합을 저장해 두면,
+임의 날짜 범위의 요일x시간 합계/개수를 동 수 x 168칸 크기의 뺄셈 두 번으로 구할 수 있습니다.
+날짜 범위 길이와 무관하므로 비교/유사도 분석에서 동 수가 늘어도 비용이 거의 늘지 않습니다.
+
+    sums[dong, week + 1, weekday, hour]   = 해당 주까지의 누적 합 (결측 제외)
+    counts[dong, week + 1, weekday, hour] = 해당 주까지의 관측 개수
+
+큐브 버전이 바뀌면 바뀐 동만 다시 계산하고, 나머지 동은 새 주를 마지막 누적값으로 채웁니다.
+"""
+
+from typing import Dict, Tuple
+import threading
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+
+HOURS_PER_WEEK = 168
+
+
+def _prefix_tables(rows: np.ndarray, offset: int, n_weeks: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(동, 날짜, 24) 값을 (동, 주 + 1, 7, 24) 누적 합/개수로 변환합니다."""
+    padded = np.full((rows.shape[0], n_weeks * 7, 24), np.nan, dtype=np.float32)
+    padded[:, offset:offset + rows.shape[1]] = rows
+    grid = padded.reshape(rows.shape[0], n_weeks, 7, 24)
+    valid = ~np.isnan(grid)
+    sums = np.zeros((rows.shape[0], n_weeks + 1, 7, 24))
+    counts = np.zeros((rows.shape[0], n_weeks + 1, 7, 24), dtype=np.int32)
+    np.cumsum(np.where(valid, grid, 0), axis=1, dtype=np.float64, out=sums[:, 1:])
+    np.cumsum(valid, axis=1, dtype=np.int32, out=counts[:, 1:])
+    return sums, counts
+
+
+class HourOfWeekIndex:
+    """측정값별 요일x시간 누적합 테이블 (큐브 버전 단위로 갱신)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # measure -> 테이블 정보
+        self._tables: Dict[str, Dict] = {}
+
+    def _table(self, cube: PopulationCube, measure: str) -> Dict:
+        with self._lock:
+            entry = self._tables.get(measure)
+            if entry is not None and entry['cube_id'] == id(cube) and entry['version'] == cube.version:
+                return entry
+
+            m = MEASURE_NAMES.index(measure)
+            offset = int(cube.weekdays[0]) if cube.n_dates else 0
+            n_weeks = max((offset + cube.n_dates + 6) // 7, 1)
+            reusable = (entry is not None and entry['cube_id'] == id(cube)
+                        and entry['start_date'] == cube.start_date and entry['n_weeks'] <= n_weeks)
+            if not reusable:
+                sums, counts = _prefix_tables(cube.values[..., m], offset, n_weeks)
+            else:
+                changed, _ = cube.changes_since(entry['version'])
+                old_dongs, old_weeks = entry['sums'].shape[:2]
+                sums = np.empty((cube.n_dongs, n_weeks + 1, 7, 24))
+                counts = np.empty((cube.n_dongs, n_weeks + 1, 7, 24), dtype=np.int32)
+                # 바뀌지 않은 동은 기존 누적값을 복사하고 새 주는 마지막 누적값으로 채움
+                sums[:old_dongs, :old_weeks] = entry['sums']
+                sums[:old_dongs, old_weeks:] = entry['sums'][:, -1:]
+                counts[:old_dongs, :old_weeks] = entry['counts']
+                counts[:old_dongs, old_weeks:] = entry['counts'][:, -1:]
+                rows = np.union1d(changed, np.arange(old_dongs, cube.n_dongs)).astype(int)
+                if len(rows):
+                    sums[rows], counts[rows] = _prefix_tables(cube.values[rows, :, :, m], offset, n_weeks)
+
+            entry = {
+                'cube_id': id(cube), 'version': cube.version, 'start_date': cube.start_date,
+                'offset': offset, 'n_weeks': n_weeks, 'sums': sums, 'counts': counts
+            }
+            self._tables[measure] = entry
+            return entry
+
+    def range_sums(self, cube: PopulationCube, dong_index: np.ndarray, date_slice: slice,
+                   measure: str = 'total') -> Tuple[np.ndarray, np.ndarray]:
+        """날짜 범위의 (동, 7, 24) 합계와 관측 개수"""
+        if date_slice.stop < date_slice.start:
+            # 뒤집힌 범위는 누적합 차이가 음수가 되므로 거부 (빈 범위는 합계/개수 0)
+            raise ValueError("시작일이 종료일보다 늦습니다.")
+        entry = self._table(cube, measure)
+        start = date_slice.start + entry['offset']
+        stop = date_slice.stop + entry['offset']
+        weekday = np.arange(7)
+        # 요일 w인 위치 중 [start, stop) 안에 드는 주 범위 [k_lo, k_hi)
+        k_lo = (start - weekday + 6) // 7
+        k_hi = (stop - weekday + 6) // 7
+        rows = np.asarray(dong_index)[:, None]
+        sums = entry['sums'][rows, k_hi[None, :], weekday[None, :]] - entry['sums'][rows, k_lo[None, :], weekday[None, :]]
+        counts = entry['counts'][rows, k_hi[None, :], weekday[None, :]] - entry['counts'][rows, k_lo[None, :], weekday[None, :]]
+        return sums, counts
+
+    def profiles(self, cube: PopulationCube, dong_index: np.ndarray, date_slice: slice,
+                 measure: str = 'total') -> np.ndarray:
+        """날짜 범위의 요일x시간 평균 프로파일 (동, 168). 관측이 없는 칸은 NaN"""
+        sums, counts = self.range_sums(cube, dong_index, date_slice, measure)
+        profiles = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+        return profiles.reshape(len(dong_index), HOURS_PER_WEEK)
@@ -0,0 +1,170 @@
+"""
+Top-K 동 순위 (가장 붐비는 / 가장 빠르게 늘어나는 동)
+
+대시보드 위젯용 "평일 18시 가장 붐비는 동 5곳", "전주 대비 가장 많이 늘어난 동" 같은 질의를
+동 이력을 매번 훑지 않고 메모리의 점수 테이블에서 부분 정렬(argpartition)로 답합니다.
+
+    busiest[day_type, hour, dong]  최근 window_days 동안의 평균 인구
+    growth[day_type, hour, dong]   최근 7일 평균 대비 그 전 7일 평균 증감률(%)
+
+    day_type: all / weekday / weekend,  hour: 0..23, 24 = 하루 전체
+
+점수는 요일x시간 누적합 색인(profiles.HourOfWeekIndex)으로 (동 x 168) 크기 연산만 해서 만들고,
+큐브 버전이 바뀌면 기간 창이 그대로인 경우 바뀐 동만, 새 날짜가 들어와 창이 움직였으면 전체를 다시 계산합니다.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List
+import threading
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+from profiles import HourOfWeekIndex
+
+DAY_TYPES = {'all': list(range(7)), 'weekday': list(range(5)), 'weekend': [5, 6]}
+DAY_TYPE_NAMES = list(DAY_TYPES)
+
+RANKING_KINDS = ('busiest', 'quietest', 'growth', 'decline')
+
+DEFAULT_WINDOW_DAYS = 28
+GROWTH_WINDOW_DAYS = 7
+
+# 점수 테이블을 유지하는 (측정값, 기간) 조합 수
+MAX_RANKING_TABLES = 16
+
+ALL_HOURS = 24
+
+
+def slice_scores(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """(동, 7, 24) 합계/개수를 (day_type, 25, 동) 평균 점수로 바꿉니다 (25번째는 하루 전체)."""
+    scores = np.full((len(DAY_TYPES), ALL_HOURS + 1, sums.shape[0]), np.nan)
+    for i, weekdays in enumerate(DAY_TYPES.values()):
+        s = sums[:, weekdays].sum(axis=1)          # (동, 24)
+        c = counts[:, weekdays].sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores[i, :ALL_HOURS] = (s / np.where(c > 0, c, np.nan)).T
+            scores[i, ALL_HOURS] = s.sum(axis=1) / np.where(c.sum(axis=1) > 0, c.sum(axis=1), np.nan)
+    return scores
+
+
+class RankingIndex:
+    """(측정값, 기간)별 순위 점수 테이블을 유지하고 Top-K를 돌려줍니다."""
+
+    def __init__(self, profile_index: HourOfWeekIndex):
+        self.profile_index = profile_index
+        self._lock = threading.Lock()
+        self._tables: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.full_rebuilds = 0
+        self.partial_updates = 0
+
+    def _compute(self, cube: PopulationCube, rows: np.ndarray, measure: str, window_days: int):
+        end = cube.n_dates
+        recent = slice(max(end - window_days, 0), end)
+        last = slice(max(end - GROWTH_WINDOW_DAYS, 0), end)
+        previous = slice(max(end - 2 * GROWTH_WINDOW_DAYS, 0), max(end - GROWTH_WINDOW_DAYS, 0))
+        busiest = slice_scores(*self.profile_index.range_sums(cube, rows, recent, measure))
+        last_scores = slice_scores(*self.profile_index.range_sums(cube, rows, last, measure))
+        previous_scores = slice_scores(*self.profile_index.range_sums(cube, rows, previous, measure))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = (last_scores - previous_scores) / np.where(previous_scores > 0, previous_scores, np.nan) * 100
+        return busiest, growth
+
+    def table(self, cube: PopulationCube, measure: str = 'total', window_days: int = DEFAULT_WINDOW_DAYS) -> Dict[str, Any]:
+        key = (measure, window_days)
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry is not None and entry['cube_id'] == id(cube) and entry['version'] == cube.version:
+                self._tables.move_to_end(key)
+                return entry
+
+            same_window = (entry is not None and entry['cube_id'] == id(cube)
+                           and entry['start_date'] == cube.start_date and entry['n_dates'] == cube.n_dates)
+            if same_window:
+                # 날짜 창은 그대로이고 일부 동 데이터만 바뀐 경우: 바뀐 동과 새 동만 다시 계산
+                changed, _ = cube.changes_since(entry['version'])
+                old_n = entry['busiest'].shape[2]
+                rows = np.union1d(changed, np.arange(old_n, cube.n_dongs)).astype(int)
+                busiest = np.full(entry['busiest'].shape[:2] + (cube.n_dongs,), np.nan)
+                growth = np.full_like(busiest, np.nan)
+                busiest[:, :, :old_n] = entry['busiest']
+                growth[:, :, :old_n] = entry['growth']
+                if len(rows):
+                    busiest[:, :, rows], growth[:, :, rows] = self._compute(cube, rows, measure, window_days)
+                self.partial_updates += 1
+            else:
+                busiest, growth = self._compute(cube, np.arange(cube.n_dongs), measure, window_days)
+                self.full_rebuilds += 1
+
+            entry = {
+                'cube_id': id(cube), 'version': cube.version, 'start_date': cube.start_date,
+                'n_dates': cube.n_dates, 'busiest': busiest, 'growth': growth
+            }
+            self._tables[key] = entry
+            self._tables.move_to_end(key)
+            while len(self._tables) > MAX_RANKING_TABLES:
+                self._tables.popitem(last=False)
+            return entry
+
+    def top_k(self, cube: PopulationCube, kind: str = 'busiest', k: int = 5, measure: str = 'total',
+              day_type: str = 'all', hour=None, window_days: int = DEFAULT_WINDOW_DAYS,
+              dong_codes: List[str] = None, names: Dict[str, str] = None) -> Dict[str, Any]:
+        """순위 종류(kind)와 구간(day_type, hour)에 대한 상위 k개 동"""
+        if kind not in RANKING_KINDS:
+            raise ValueError(f"kind는 {', '.join(RANKING_KINDS)} 중 하나여야 합니다.")
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        if hour == 'now':
+            now = datetime.now()
+            hour, day_type = now.hour, 'weekend' if now.weekday() >= 5 else 'weekday'
+        if day_type not in DAY_TYPES:
+            raise ValueError(f"day_type은 {', '.join(DAY_TYPES)} 중 하나여야 합니다.")
+        if hour is not None and not 0 <= int(hour) < ALL_HOURS:
+            raise ValueError("hour는 0~23 사이여야 합니다.")
+        hour_index = ALL_HOURS if hour is None else int(hour)
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        if not 1 <= window_days <= cube.n_dates:
+            raise ValueError(f"window_days는 1~{cube.n_dates} 사이여야 합니다.")
+
+        entry = self.table(cube, measure, window_days)
+        scores = entry['growth' if kind in ('growth', 'decline') else 'busiest'][DAY_TYPE_NAMES.index(day_type), hour_index]
+        candidates = np.arange(cube.n_dongs) if dong_codes is None else np.array(
+            [cube.dong_index(code) for code in dong_codes], dtype=int)
+        values = scores[candidates]
+        valid = ~np.isnan(values)
+        candidates, values = candidates[valid], values[valid]
+
+        # 내림차순 순위는 부호를 바꿔 같은 부분 정렬 사용
+        keys = -values if kind in ('busiest', 'growth') else values
+        k = max(min(k, len(values)), 0)
+        if k == 0:
+            order = np.array([], dtype=int)
+        else:
+            part = np.argpartition(keys, k - 1)[:k]
+            order = part[np.argsort(keys[part], kind='stable')]
+
+        names = names or {}
+        return {
+            'kind': kind,
+            'measure': measure,
+            'day_type': day_type,
+            'hour': None if hour_index == ALL_HOURS else hour_index,
+            'window_days': window_days if kind in ('busiest', 'quietest') else GROWTH_WINDOW_DAYS,
+            'as_of': str(cube.dates[-1]),
+            'candidates': int(len(values)),
+            'ranking': [
+                {
+                    'rank': rank + 1,
+                    'dong_code': cube.dong_codes[candidates[i]],
+                    'dong_name': names.get(cube.dong_codes[candidates[i]]),
+                    ('growth_percent' if kind in ('growth', 'decline') else 'population'): round(float(values[i]), 2)
+                }
+                for rank, i in enumerate(order)
+            ]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {'tables': [list(key) for key in self._tables], 'full_rebuilds': self.full_rebuilds,
+                'partial_updates': self.partial_updates}
@@ -0,0 +1,90 @@
+"""
+계층 예측 조정(reconciliation)
+
+합계 관계(예: 총인구 = 내국인 + 장기체류 외국인 + 단기체류 외국인)를 만족하도록
+독립적으로 만든 기본 예측(base forecast)을 행렬 연산으로 보정합니다.
+
+표기:
+    S: 합계 행렬 (전체 시계열 수 n x 최하위 시계열 수 m)
+    Y: 기본 예측 행렬 (n x 시점 수)
+    조정 결과 = S @ G @ Y
+"""
+
+from typing import List
+
+import numpy as np
+
+RECONCILE_METHODS = ('bottom_up', 'ols', 'mint_shrink')
+
+
+def summing_matrix(n_bottom: int) -> np.ndarray:
+    """합계 1개 + 최하위 n_bottom개로 구성된 2단계 계층의 합계 행렬을 만듭니다."""
+    return np.vstack([np.ones((1, n_bottom)), np.eye(n_bottom)])
+
+
+def grouped_summing_matrix(groups: List[int]) -> np.ndarray:
+    """전체 합계 → 그룹 합계 → 최하위 순서의 3단계 계층 합계 행렬을 만듭니다.
+
+    groups[i]는 i번째 최하위 시계열이 속한 그룹 인덱스입니다.
+    """
+    groups = np.asarray(groups, dtype=int)
+    n_groups = int(groups.max()) + 1 if len(groups) else 0
+    group_rows = (groups[None, :] == np.arange(n_groups)[:, None]).astype(float)
+    return np.vstack([np.ones((1, len(groups))), group_rows, np.eye(len(groups))])
+
+
+def projection_matrix(S: np.ndarray, method: str = 'ols', W: np.ndarray = None) -> np.ndarray:
+    """기본 예측을 최하위 예측으로 보내는 G 행렬을 계산합니다."""
+    n, m = S.shape
+    if method == 'bottom_up':
+        return np.hstack([np.zeros((m, n - m)), np.eye(m)])
+
+    if method == 'ols':
+        W_inv = np.eye(n)
+    elif method == 'mint_shrink':
+        if W is None:
+            raise ValueError("MinT 조정에는 잔차 공분산 행렬(W)이 필요합니다.")
+        W_inv = np.linalg.pinv(W)
+    else:
+        raise ValueError(f"지원하지 않는 조정 방식입니다: {method}")
+
+    # G = (S' W^-1 S)^-1 S' W^-1
+    StW = S.T @ W_inv
+    return np.linalg.solve(StW @ S, StW)
+
+
+def shrink_covariance(residuals: np.ndarray) -> np.ndarray:
+    """잔차 행렬(n x T)에서 대각 행렬 방향으로 축소한 공분산을 추정합니다 (MinT-shrink).
+
+    축소 강도 λ는 Schäfer-Strimmer 방식으로 상관계수의 분산에서 계산합니다.
+    """
+    residuals = np.asarray(residuals, dtype=float)
+    n, T = residuals.shape
+    centered = residuals - residuals.mean(axis=1, keepdims=True)
+    sample_cov = centered @ centered.T / T
+    variance = np.diag(sample_cov).copy()
+    if T < 2 or n < 2:
+        return np.diag(variance)
+
+    std = np.sqrt(np.where(variance > 0, variance, 1.0))
+    standardized = centered / std[:, None]
+    corr = standardized @ standardized.T / T
+
+    # 상관계수 추정량의 분산 (n x n): w_ij(t) = x_i(t) x_j(t)의 편차 제곱합
+    # = Σ x_i² x_j² - (Σ x_i x_j)² / T 를 행렬 곱 두 번으로 (n x n x T 배열 없이)
+    squared = standardized ** 2
+    cross = standardized @ standardized.T
+    corr_var = T / (T - 1) ** 3 * np.maximum(squared @ squared.T - cross ** 2 / T, 0.0)
+
+    off_diag = ~np.eye(n, dtype=bool)
+    denom = np.sum(corr[off_diag] ** 2)
+    lam = 1.0 if denom == 0 else float(np.clip(np.sum(corr_var[off_diag]) / denom, 0.0, 1.0))
+
+    return lam * np.diag(variance) + (1 - lam) * sample_cov
+
+
+def reconcile(base: np.ndarray, S: np.ndarray, method: str = 'ols', W: np.ndarray = None) -> np.ndarray:
+    """기본 예측 행렬(n x T)을 합계 관계가 성립하도록 조정한 행렬(n x T)을 반환합니다."""
+    base = np.asarray(base, dtype=float)
+    G = projection_matrix(S, method, W)
+    return S @ (G @ base)
@@ -0,0 +1,217 @@
+"""
+이동 통계 저장소 (7일/28일 이동평균, 전주 대비 증감)
+
+추세 위젯이 요청마다 이력 전체를 다시 훑어 계산하던 이동평균을 시간 단위 누적합으로 대체합니다.
+
+    sums[dong, t + 1]   = 처음부터 t시까지 값의 누적합 (결측 제외)
+    counts[dong, t + 1] = 처음부터 t시까지 관측 개수
+    t시 기준 W시간 이동평균 = (sums[t+1] - sums[t+1-W]) / (counts[t+1] - counts[t+1-W])
+
+새 시간이 들어오면 마지막 누적값에 더해 이어 붙이기만 하므로 동/시간당 O(1)이고 (시간 축 용량은 2배씩 확장),
+과거 날짜가 정정된 동만 정정된 날짜부터 누적합을 다시 계산합니다.
+현재값과 과거 임의 시점의 이동값 모두 누적합 두 칸의 차이로 바로 구합니다.
+"""
+
+from typing import Any, Dict, List
+import threading
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+
+# 이동 창 (시간)
+ROLLING_WINDOWS = {'ma_7d': 7 * 24, 'ma_28d': 28 * 24}
+WEEK_HOURS = 7 * 24
+
+# 창 안에 이 비율 이상 관측이 있어야 값을 계산 (부족하면 None)
+MIN_WINDOW_COVERAGE = 0.5
+
+# 한 번에 돌려주는 최대 이력 점 수
+MAX_ROLLING_POINTS = 20000
+
+
+class RollingStatsStore:
+    """측정값별 시간 단위 누적합 테이블과 이동 통계 조회"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # measure -> 테이블 상태
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self.appended_hours = 0
+        self.recomputed_hours = 0
+
+    @staticmethod
+    def _last_observed(valid: np.ndarray) -> np.ndarray:
+        """(동, 시간) 관측 여부에서 동별 마지막 관측 위치 (없으면 -1)"""
+        any_valid = valid.any(axis=1)
+        last = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        return np.where(any_valid, last, -1)
+
+    def _table(self, cube: PopulationCube, measure: str) -> Dict[str, Any]:
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        with self._lock:
+            state = self._tables.get(measure)
+            if state is not None and state['cube_id'] == id(cube) and state['version'] == cube.version:
+                return state
+
+            m = MEASURE_NAMES.index(measure)
+            n_hours = cube.n_dates * 24
+            reusable = (state is not None and state['cube_id'] == id(cube) and state['start_date'] == cube.start_date
+                        and state['n_hours'] <= n_hours)
+            if not reusable:
+                flat = np.asarray(cube.values[..., m], dtype=np.float64).reshape(cube.n_dongs, n_hours)
+                valid = ~np.isnan(flat)
+                capacity = max(n_hours * 2, 24)
+                sums = np.zeros((cube.n_dongs, capacity + 1))
+                counts = np.zeros((cube.n_dongs, capacity + 1), dtype=np.int32)
+                np.cumsum(np.where(valid, flat, 0), axis=1, out=sums[:, 1:n_hours + 1])
+                np.cumsum(valid, axis=1, dtype=np.int32, out=counts[:, 1:n_hours + 1])
+                last_hour = self._last_observed(valid)
+                self.recomputed_hours += cube.n_dongs * n_hours
+            else:
+                sums, counts, last_hour = state['sums'], state['counts'], state['last_hour']
+                old_hours = state['n_hours']
+                capacity = sums.shape[1] - 1
+                if n_hours > capacity or cube.n_dongs > sums.shape[0]:
+                    # 시간 축 용량은 2배씩, 새 동은 행 추가 (기존 누적값은 그대로 복사)
+                    capacity = max(capacity, n_hours * 2) if n_hours > capacity else capacity
+                    grown_sums = np.zeros((cube.n_dongs, capacity + 1))
+                    grown_counts = np.zeros((cube.n_dongs, capacity + 1), dtype=np.int32)
+                    grown_sums[:sums.shape[0], :old_hours + 1] = sums[:, :old_hours + 1]
+                    grown_counts[:counts.shape[0], :old_hours + 1] = counts[:, :old_hours + 1]
+                    last_hour = np.concatenate([last_hour, np.full(cube.n_dongs - len(last_hour), -1)])
+                    sums, counts = grown_sums, grown_counts
+
+                changed, first_date = cube.changes_since(state['version'])
+                old_dongs = state['n_dongs']
+                new_rows = np.arange(old_dongs, cube.n_dongs)
+                changed = changed[changed < old_dongs]
+                # 바뀌지 않은 동은 새 시간 칸을 마지막 누적값으로 채움 (새 시간만큼의 작업)
+                unchanged = np.setdiff1d(np.arange(old_dongs), changed)
+                sums[unchanged, old_hours + 1:n_hours + 1] = sums[unchanged, old_hours:old_hours + 1]
+                counts[unchanged, old_hours + 1:n_hours + 1] = counts[unchanged, old_hours:old_hours + 1]
+
+                for rows, start in ((changed, min(first_date * 24, old_hours)), (new_rows, 0)):
+                    if not len(rows):
+                        continue
+                    block = np.asarray(cube.values[rows, start // 24:, :, m], dtype=np.float64).reshape(len(rows), -1)
+                    valid = ~np.isnan(block)
+                    sums[rows, start + 1:n_hours + 1] = (sums[rows, start][:, None]
+                                                         + np.cumsum(np.where(valid, block, 0), axis=1))
+                    counts[rows, start + 1:n_hours + 1] = (counts[rows, start][:, None]
+                                                           + np.cumsum(valid, axis=1, dtype=np.int32))
+                    last = self._last_observed(valid)
+                    last_hour[rows] = np.where(last >= 0, start + last, np.where(last_hour[rows] < start, last_hour[rows], -1))
+                    self.recomputed_hours += block.size
+                    # 정정으로 뒤쪽 관측이 사라졌다면 앞부분에서 다시 찾음
+                    lost = rows[last_hour[rows] < 0]
+                    for row in lost:
+                        observed = np.flatnonzero(np.diff(counts[row, :start + 1]))
+                        last_hour[row] = observed[-1] if len(observed) else -1
+                self.appended_hours += len(unchanged) * (n_hours - old_hours)
+
+            state = {
+                'cube_id': id(cube), 'version': cube.version, 'start_date': cube.start_date,
+                'n_dongs': cube.n_dongs, 'n_hours': n_hours, 'sums': sums, 'counts': counts, 'last_hour': last_hour
+            }
+            self._tables[measure] = state
+            return state
+
+    @staticmethod
+    def _window_mean(state: Dict[str, Any], rows: np.ndarray, hours: np.ndarray, window: int) -> np.ndarray:
+        """rows 동의 hours 시점(포함)까지 window시간 평균 (관측 부족/시점 없음은 NaN)"""
+        end = hours + 1
+        start = np.maximum(end - window, 0)
+        total = state['sums'][rows, end] - state['sums'][rows, start]
+        count = state['counts'][rows, end] - state['counts'][rows, start]
+        ok = (count >= window * MIN_WINDOW_COVERAGE) & (hours >= 0)
+        return np.divide(total, count, out=np.full(total.shape, np.nan), where=ok & (count > 0))
+
+    def _statistics(self, state: Dict[str, Any], rows: np.ndarray, hours: np.ndarray) -> Dict[str, np.ndarray]:
+        stats = {name: self._window_mean(state, rows, hours, window) for name, window in ROLLING_WINDOWS.items()}
+        previous = self._window_mean(state, rows, hours - WEEK_HOURS, WEEK_HOURS)
+        previous[hours - WEEK_HOURS < 0] = np.nan
+        current = stats['ma_7d']
+        stats['wow_delta'] = current - previous
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats['wow_percent'] = np.where(previous > 0, (current - previous) / previous * 100, np.nan)
+        return stats
+
+    @staticmethod
+    def _number(value, digits=1):
+        return None if np.isnan(value) else round(float(value), digits)
+
+    def current(self, cube: PopulationCube, dong_codes: List[str] = None, measure: str = 'total',
+                names: Dict[str, str] = None) -> Dict[str, Any]:
+        """동별 마지막 관측 시간 기준 이동평균과 전주 대비 증감"""
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        state = self._table(cube, measure)
+        names = names or {}
+        rows = np.arange(cube.n_dongs) if dong_codes is None else np.array(
+            [cube.dong_index(code) for code in dong_codes], dtype=int)
+        hours = state['last_hour'][rows]
+        stats = self._statistics(state, rows, hours)
+        m = MEASURE_NAMES.index(measure)
+        dates = cube.dates
+
+        result = []
+        for k, row in enumerate(rows):
+            hour = int(hours[k])
+            entry = {
+                'dong_code': cube.dong_codes[row],
+                'dong_name': names.get(cube.dong_codes[row]),
+                'as_of': f"{dates[hour // 24]} {hour % 24:02d}:00" if hour >= 0 else None,
+                'value': self._number(cube.values[row, hour // 24, hour % 24, m]) if hour >= 0 else None
+            }
+            for name, values in stats.items():
+                entry[name] = self._number(values[k], 2 if name == 'wow_percent' else 1)
+            result.append(entry)
+        return {'measure': measure, 'dongs': result}
+
+    def history(self, cube: PopulationCube, dong_code: str, measure: str = 'total', start_date=None,
+                end_date=None, resolution: str = 'daily') -> Dict[str, Any]:
+        """동의 날짜 범위 이동 통계 이력 (daily: 날짜별 23시 기준, hourly: 매 시간)"""
+        if resolution not in ('daily', 'hourly'):
+            raise ValueError("resolution은 daily 또는 hourly여야 합니다.")
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        state = self._table(cube, measure)
+        row = cube.dong_index(dong_code)
+        date_slice = cube.date_slice(start_date, end_date)
+        if resolution == 'daily':
+            hours = np.arange(date_slice.start, date_slice.stop) * 24 + 23
+        else:
+            hours = np.arange(date_slice.start * 24, date_slice.stop * 24)
+        if len(hours) > MAX_ROLLING_POINTS:
+            raise ValueError(f"이력 점이 너무 많습니다 ({len(hours):,}개). 기간을 줄이거나 daily를 사용하세요.")
+        stats = self._statistics(state, np.full(len(hours), row), hours)
+
+        dates = cube.dates
+        labels = [str(dates[h // 24]) if resolution == 'daily' else f"{dates[h // 24]} {h % 24:02d}:00" for h in hours]
+
+        def values(name, digits):
+            array = np.round(stats[name].astype(np.float64), digits).astype(object)
+            array[np.isnan(stats[name])] = None
+            return array.tolist()
+
+        return {
+            'dong_code': dong_code,
+            'measure': measure,
+            'resolution': resolution,
+            'time': labels,
+            'ma_7d': values('ma_7d', 1),
+            'ma_28d': values('ma_28d', 1),
+            'wow_delta': values('wow_delta', 1),
+            'wow_percent': values('wow_percent', 2)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'tables': {measure: {'version': state['version'], 'dongs': state['n_dongs'], 'hours': state['n_hours'],
+                                 'capacity_hours': state['sums'].shape[1] - 1}
+                       for measure, state in self._tables.items()},
+            'appended_hours': self.appended_hours,
+            'recomputed_hours': self.recomputed_hours
+        }
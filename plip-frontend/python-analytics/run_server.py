@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 """
 인구 수요 예측 서버 실행 스크립트
+
+기본 실행은 패키지 설치나 파일 감시(reload) 없이 바로 서버를 띄웁니다.
+    python run_server.py              # 빠른 시작
+    python run_server.py --install    # requirements.txt 설치 후 시작
+    python run_server.py --reload     # 개발용 자동 재시작
 """
 
+import argparse
 import uvicorn
 import subprocess
 import sys
@@ -18,23 +24,33 @@ def install_requirements():
         print(f"❌ 패키지 설치 실패: {e}")
         sys.exit(1)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="인구 수요 예측 API 서버")
+    parser.add_argument("--install", action="store_true", help="시작 전에 requirements.txt 패키지 설치")
+    parser.add_argument("--reload", action="store_true", help="코드 변경 시 자동 재시작 (개발용)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("🚀 인구 수요 예측 API 서버를 시작합니다...")
     print("📊 FastAPI + 머신러닝 기반 인구 예측 시스템")
-    print("🌐 서버 주소: http://localhost:8000")
-    print("📖 API 문서: http://localhost:8000/docs")
+    print(f"🌐 서버 주소: http://localhost:{args.port}")
+    print(f"📖 API 문서: http://localhost:{args.port}/docs")
+    print(f"🩺 준비 상태: http://localhost:{args.port}/ready")
     print("-" * 50)
-    
-    # requirements.txt가 있으면 패키지 설치
-    if os.path.exists("requirements.txt"):
+
+    # 패키지 설치는 요청했을 때만 (매 실행마다 pip를 돌리지 않음)
+    if args.install and os.path.exists("requirements.txt"):
         install_requirements()
-    
+
     # FastAPI 서버 실행
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=args.host,
+        port=args.port,
+        reload=args.reload,
         log_level="info"
     )
 
@@ -0,0 +1,107 @@
+"""
+세그먼트별(총인구 / 내국인 / 장기체류 외국인 / 단기체류 외국인) 동시 예측
+
+한 번 가져온 동 데이터로 세그먼트마다 Prophet 모델을 병렬로 학습/예측하고,
+필요하면 세그먼트 합이 총인구와 같아지도록 조정(reconciliation)합니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import time
+
+import numpy as np
+import pandas as pd
+
+from reconciliation import summing_matrix, reconcile, shrink_covariance, RECONCILE_METHODS
+
+# 세그먼트 이름 -> 데이터프레임 컬럼 (첫 번째가 합계)
+SEGMENTS = {
+    'total': 'y',
+    'local': 'local_population',
+    'long_foreigner': 'long_foreigner',
+    'temp_foreigner': 'temp_foreigner'
+}
+
+# 세그먼트 모델 설정 (PopulationPredictor와 동일한 계절성 구성, 인구 리그레서는 제외)
+SEGMENT_PROPHET_PARAMS = {
+    'yearly_seasonality': False,
+    'weekly_seasonality': True,
+    'daily_seasonality': True,
+    'changepoint_prior_scale': 0.05,
+    'seasonality_mode': 'multiplicative',
+    'uncertainty_samples': 0
+}
+
+
+def fit_prophet_series(df: pd.DataFrame, column: str):
+    """단일 시계열(ds + column)에 대한 Prophet 모델을 학습합니다."""
+    from prophet import Prophet
+
+    segment_df = pd.DataFrame({'ds': df['ds'], 'y': df[column].astype(float)})
+    model = Prophet(**SEGMENT_PROPHET_PARAMS)
+    model.fit(segment_df)
+    return model
+
+
+class SegmentForecaster:
+    """한 동의 모든 세그먼트 모델을 묶어서 관리합니다."""
+
+    def __init__(self, max_workers: int = len(SEGMENTS)):
+        self.models = {}
+        self.max_workers = max_workers
+        # 세그먼트별 학습 구간 잔차 (MinT 조정용, 세그먼트 수 x 시점 수)
+        self.residuals = None
+        self.last_ds = None
+        self.fit_seconds = None
+
+    @property
+    def is_trained(self) -> bool:
+        return len(self.models) == len(SEGMENTS)
+
+    def fit(self, df: pd.DataFrame):
+        """모든 세그먼트 모델을 병렬로 학습합니다."""
+        if df.empty:
+            raise ValueError("훈련 데이터가 없습니다.")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(fit_prophet_series, df, column) for name, column in SEGMENTS.items()}
+            self.models = {name: future.result() for name, future in futures.items()}
+
+            history = pd.DataFrame({'ds': df['ds']})
+            fitted = {name: executor.submit(model.predict, history) for name, model in self.models.items()}
+            self.residuals = np.vstack([
+                df[SEGMENTS[name]].to_numpy(dtype=float) - fitted[name].result()['yhat'].to_numpy()
+                for name in SEGMENTS
+            ])
+
+        self.last_ds = df['ds'].max()
+        self.fit_seconds = time.perf_counter() - start
+        print(f"✅ 세그먼트 모델 {len(self.models)}개 훈련 완료 ({self.fit_seconds:.1f}초)")
+        return self
+
+    def forecast(self, timestamps: List[pd.Timestamp], reconcile_method: str = None) -> Dict[str, np.ndarray]:
+        """하나의 future 프레임으로 모든 세그먼트를 병렬 예측합니다.
+
+        reconcile_method가 주어지면 세그먼트 합 = 총인구가 되도록 조정합니다.
+        """
+        if not self.is_trained:
+            raise ValueError("세그먼트 모델이 훈련되지 않았습니다.")
+
+        if reconcile_method is not None and reconcile_method not in RECONCILE_METHODS:
+            raise ValueError(f"지원하지 않는 조정 방식입니다: {reconcile_method}")
+
+        future = pd.DataFrame({'ds': pd.to_datetime(timestamps)})
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(model.predict, future) for name, model in self.models.items()}
+            base = np.vstack([futures[name].result()['yhat'].to_numpy() for name in SEGMENTS])
+
+        # 인구는 음수가 될 수 없음
+        if reconcile_method is not None:
+            W = shrink_covariance(self.residuals) if reconcile_method == 'mint_shrink' else None
+            base = reconcile(base, summing_matrix(len(SEGMENTS) - 1), reconcile_method, W)
+            base[1:] = np.maximum(base[1:], 0)
+            base[0] = base[1:].sum(axis=0)
+        else:
+            base = np.maximum(base, 0)
+        return {name: base[i] for i, name in enumerate(SEGMENTS)}
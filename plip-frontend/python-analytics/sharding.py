@@ -0,0 +1,342 @@
+"""
+동 코드 일관 해싱(consistent hashing) 기반 예측 워커 풀
+
+각 워커 프로세스는 자신에게 배정된 동의 Prophet 모델을 메모리에 캐시합니다.
+같은 동의 요청은 항상 같은 워커로 가므로 모델 캐시가 계속 유지되고,
+워커를 추가해도 해시 링에서 일부 동(약 1/N)만 새 워커로 이동합니다.
+
+감시 스레드가 워커 생존과 작업 시한을 확인합니다. 워커가 죽으면(OOM 등) 그 워커의 대기 작업을
+WorkerCrashedError로 끝내고 같은 번호로 다시 띄우며, 시한을 넘긴 작업은 TaskTimeoutError로 끝내고
+멈춘 워커를 종료해 다시 띄웁니다. 어떤 경우에도 future가 영원히 대기하지 않습니다.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List
+import bisect
+import hashlib
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+# 워커당 가상 노드 수 (많을수록 동 분배가 균등해짐)
+DEFAULT_REPLICAS = 128
+
+# 워커당 메모리에 유지하는 최대 모델 수 (LRU)
+MAX_MODELS_PER_WORKER = 64
+
+# 작업 하나의 기본 시한 (초, 훈련 + 교차 검증 포함)
+DEFAULT_TASK_TIMEOUT_SECONDS = 300
+
+# 워커 생존/작업 시한 확인 간격 (초)
+MONITOR_INTERVAL_SECONDS = 1.0
+
+
+class WorkerCrashedError(RuntimeError):
+    """작업을 처리하던 워커 프로세스가 비정상 종료됨"""
+
+
+class TaskTimeoutError(TimeoutError):
+    """작업이 시한 안에 끝나지 않음"""
+
+
+class ConsistentHashRing:
+    """가상 노드를 사용하는 일관 해시 링"""
+
+    def __init__(self, nodes=(), replicas: int = DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self._keys: List[int] = []
+        self._ring: Dict[int, int] = {}
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def add_node(self, node: int):
+        for replica in range(self.replicas):
+            h = self._hash(f"worker-{node}#{replica}")
+            self._ring[h] = node
+            bisect.insort(self._keys, h)
+
+    def remove_node(self, node: int):
+        for replica in range(self.replicas):
+            h = self._hash(f"worker-{node}#{replica}")
+            del self._ring[h]
+            self._keys.remove(h)
+
+    def get_node(self, key: str) -> int:
+        if not self._keys:
+            raise ValueError("해시 링에 워커가 없습니다.")
+        i = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._ring[self._keys[i]]
+
+
+def _worker_main(worker_id: int, predictor_cls, task_queue, result_queue, max_models: int):
+    """워커 프로세스: 동별 예측기를 LRU로 캐시하며 작업을 처리합니다."""
+    models: "OrderedDict[str, object]" = OrderedDict()
+
+    def get_predictor(dong_code: str, district: str, retrain: bool = False):
+        predictor = models.get(dong_code)
+        if predictor is None or retrain:
+            predictor = predictor_cls(district=district)
+            df = predictor.fetch_population_data(dong_code)
+            if len(df) < 48:
+                raise ValueError(f"훈련 데이터가 부족합니다. 최소 48개 필요, 현재 {len(df)}개")
+            predictor.last_performance = predictor.train_model(df)
+            models[dong_code] = predictor
+            if len(models) > max_models:
+                models.popitem(last=False)
+        models.move_to_end(dong_code)
+        return predictor
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, kind, payload = task
+        try:
+            if kind == 'train':
+                predictor = get_predictor(payload['dong_code'], payload.get('district'), retrain=True)
+                result = predictor.last_performance
+            elif kind == 'predict':
+                cached = payload['dong_code'] in models
+                predictor = get_predictor(payload['dong_code'], payload.get('district'))
+                result = {
+                    'predictions': predictor.predict_hourly_demand(
+                        payload.get('target_date'), payload.get('hours'), payload.get('interval_mode', 'prophet')
+                    ),
+                    'model_cache_hit': cached
+                }
+            elif kind == 'predict_frame':
+                cached = payload['dong_code'] in models
+                predictor = get_predictor(payload['dong_code'], payload.get('district'))
+                forecast = predictor.predict_timestamps(payload['timestamps'], payload.get('interval_mode', 'conformal'))
+                result = {
+                    'yhat': forecast['yhat'].to_numpy(),
+                    'yhat_lower': forecast['yhat_lower'].to_numpy(),
+                    'yhat_upper': forecast['yhat_upper'].to_numpy(),
+                    'model_cache_hit': cached
+                }
+            elif kind == 'explain':
+                cached = payload['dong_code'] in models
+                predictor = get_predictor(payload['dong_code'], payload.get('district'))
+                result = {
+                    **predictor.explain_hourly_demand(payload.get('target_date'), payload.get('hours'),
+                                                      payload.get('include_tables', False)),
+                    'model_cache_hit': cached
+                }
+            elif kind == 'stats':
+                result = {'worker_id': worker_id, 'cached_dongs': list(models)}
+            else:
+                raise ValueError(f"알 수 없는 작업 종류: {kind}")
+            result_queue.put((task_id, True, result))
+        except Exception as e:
+            result_queue.put((task_id, False, f"{type(e).__name__}: {e}"))
+
+
+class ShardedForecastPool:
+    """동 코드 일관 해싱으로 작업을 워커 프로세스에 분배하는 풀"""
+
+    def __init__(self, predictor_cls, n_workers: int = 2, max_models_per_worker: int = MAX_MODELS_PER_WORKER,
+                 task_timeout: float = DEFAULT_TASK_TIMEOUT_SECONDS):
+        self.predictor_cls = predictor_cls
+        self.max_models_per_worker = max_models_per_worker
+        self.task_timeout = task_timeout
+        self._ctx = mp.get_context('spawn')
+        self._workers: Dict[int, tuple] = {}
+        # task_id -> (future, worker_id, 시한 monotonic 또는 None)
+        self._pending: Dict[int, tuple] = {}
+        self._task_ids = itertools.count()
+        self._next_worker_id = itertools.count()
+        self._lock = threading.Lock()
+        self.ring = ConsistentHashRing()
+        self.completed: Dict[int, int] = {}
+        self.restarts: Dict[int, int] = {}
+        self._closed = threading.Event()
+
+        self._monitor = threading.Thread(target=self._watch_workers, daemon=True)
+        self._monitor.start()
+        for _ in range(n_workers):
+            self.add_worker()
+
+    @property
+    def n_workers(self) -> int:
+        return len(self._workers)
+
+    def _spawn(self, worker_id: int) -> tuple:
+        """워커 프로세스 + 작업 큐 + 결과 큐 + 수집 중지 이벤트
+
+        결과 큐를 워커마다 따로 두어, 쓰는 도중 죽은 워커가 큐 잠금을 쥔 채 남아도 다른 워커의 결과 전달은 막히지 않게 합니다.
+        """
+        task_queue = self._ctx.Queue()
+        result_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.predictor_cls, task_queue, result_queue, self.max_models_per_worker),
+            daemon=True
+        )
+        process.start()
+        stop = threading.Event()
+        threading.Thread(target=self._collect_results, args=(result_queue, stop), daemon=True).start()
+        print(f"👷 예측 워커 {worker_id} 시작 (pid={process.pid})")
+        return process, task_queue, result_queue, stop
+
+    def add_worker(self) -> int:
+        """워커를 추가하고 해시 링에 등록합니다 (일부 동만 새 워커로 이동)."""
+        worker_id = next(self._next_worker_id)
+        worker = self._spawn(worker_id)
+        with self._lock:
+            self._workers[worker_id] = worker
+            self.completed[worker_id] = 0
+            self.restarts[worker_id] = 0
+            self.ring.add_node(worker_id)
+        return worker_id
+
+    def remove_worker(self, worker_id: int = None):
+        """워커를 해시 링에서 제거하고 종료합니다 (해당 워커의 동만 다른 워커로 이동).
+
+        worker_id를 생략하면 가장 최근에 추가된 워커를 제거합니다.
+        """
+        with self._lock:
+            if worker_id is None:
+                worker_id = max(self._workers)
+            process, task_queue, _, stop = self._workers.pop(worker_id)
+            self.ring.remove_node(worker_id)
+        task_queue.put(None)
+        process.join(timeout=10)
+        stop.set()
+
+    def worker_for(self, dong_code: str) -> int:
+        with self._lock:
+            return self.ring.get_node(dong_code)
+
+    def _collect_results(self, result_queue, stop: threading.Event):
+        # 부모는 결과 큐에 쓰지 않음 (죽은 워커가 쥔 잠금에 막힐 수 있으므로) -> 이벤트로 중지, 남은 결과는 비우고 종료
+        while True:
+            try:
+                message = result_queue.get(timeout=MONITOR_INTERVAL_SECONDS)
+            except queue.Empty:
+                if stop.is_set():
+                    break
+                continue
+            task_id, ok, value = message
+            with self._lock:
+                entry = self._pending.pop(task_id, None)
+                if entry is None:
+                    # 이미 시한 초과/워커 종료로 끝난 작업의 늦은 결과
+                    continue
+                future, worker_id, _ = entry
+                self.completed[worker_id] = self.completed.get(worker_id, 0) + 1
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+
+    def _fail_pending(self, task_ids: List[int], error: Exception):
+        with self._lock:
+            entries = [self._pending.pop(task_id, None) for task_id in task_ids]
+        for entry in entries:
+            if entry is not None and not entry[0].done():
+                entry[0].set_exception(error)
+
+    def _watch_workers(self):
+        """죽은 워커의 대기 작업을 실패 처리하고 다시 띄우며, 시한을 넘긴 작업을 끝냅니다."""
+        while not self._closed.wait(MONITOR_INTERVAL_SECONDS):
+            now = time.monotonic()
+            with self._lock:
+                dead = {wid: worker[0] for wid, worker in self._workers.items() if not worker[0].is_alive()}
+                expired = [(task_id, worker_id) for task_id, (_, worker_id, deadline) in self._pending.items()
+                           if deadline is not None and deadline < now]
+
+            timed_out: Dict[int, List[int]] = {}
+            for task_id, worker_id in expired:
+                timed_out.setdefault(worker_id, []).append(task_id)
+            for worker_id, task_ids in timed_out.items():
+                # 멈춘 워커는 종료하고 다시 띄움 (뒤에 쌓인 작업도 함께 실패 처리)
+                print(f"⏱️ 워커 {worker_id} 작업 시한 초과, 워커를 다시 시작합니다.")
+                self._restart_worker(worker_id, f"예측 워커 {worker_id}가 시한 초과로 다시 시작되었습니다.", task_ids)
+
+            for worker_id, process in dead.items():
+                print(f"💥 예측 워커 {worker_id} 종료 (exitcode={process.exitcode})")
+                self._restart_worker(worker_id, f"예측 워커 {worker_id}가 작업 중 종료되었습니다 (exitcode={process.exitcode}).")
+
+    def _restart_worker(self, worker_id: int, reason: str, timed_out: List[int] = ()):
+        """같은 번호로 새 워커를 띄워 교체하고, 옛 워커에 보낸 대기 작업을 끝냅니다.
+
+        timed_out 작업은 TaskTimeoutError, 나머지는 WorkerCrashedError
+        """
+        if self._closed.is_set():
+            return
+        replacement = self._spawn(worker_id)
+        # 교체와 옛 워커 작업 수집을 한 번에 (이후 작업은 새 워커로)
+        with self._lock:
+            old = self._workers.get(worker_id)
+            if old is not None:
+                self._workers[worker_id] = replacement
+                self.restarts[worker_id] = self.restarts.get(worker_id, 0) + 1
+            task_ids = [task_id for task_id, (_, wid, _) in self._pending.items() if wid == worker_id]
+        if old is None:
+            # 그 사이 remove_worker로 제거된 워커
+            replacement[1].put(None)
+            replacement[3].set()
+        else:
+            if old[0].is_alive():
+                old[0].terminate()
+            # 읽을 워커가 없는 작업 큐는 종료 시 비우기를 기다리지 않음, 옛 결과 수집 스레드 종료
+            old[1].cancel_join_thread()
+            old[3].set()
+        if timed_out:
+            self._fail_pending(timed_out, TaskTimeoutError(
+                f"워커 {worker_id} 작업이 {self.task_timeout:.0f}초 안에 끝나지 않았습니다."))
+        task_ids = [task_id for task_id in task_ids if task_id not in timed_out]
+        if task_ids:
+            print(f"⚠️ 워커 {worker_id} 대기 작업 {len(task_ids)}건 실패 처리")
+        self._fail_pending(task_ids, WorkerCrashedError(reason))
+
+    def _submit_to(self, worker_id: int, kind: str, payload: Dict, timeout: float = None) -> Future:
+        future = Future()
+        task_id = next(self._task_ids)
+        timeout = self.task_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._pending[task_id] = (future, worker_id, deadline)
+            task_queue = self._workers[worker_id][1]
+        task_queue.put((task_id, kind, payload))
+        return future
+
+    def submit(self, kind: str, dong_code: str, timeout: float = None, **payload) -> Future:
+        """dong_code를 담당하는 워커에 작업을 보냅니다 (timeout 생략 시 풀의 task_timeout)."""
+        payload['dong_code'] = dong_code
+        return self._submit_to(self.worker_for(dong_code), kind, payload, timeout)
+
+    def stats(self, timeout: float = 10) -> List[Dict]:
+        """워커별 캐시된 동 목록과 처리 건수를 수집합니다."""
+        with self._lock:
+            worker_ids = list(self._workers)
+        futures = {wid: self._submit_to(wid, 'stats', {}, timeout) for wid in worker_ids}
+        result = []
+        for wid, future in futures.items():
+            info = future.result(timeout=timeout)
+            info['completed_tasks'] = self.completed.get(wid, 0)
+            info['restarts'] = self.restarts.get(wid, 0)
+            info['pid'] = self._workers[wid][0].pid if wid in self._workers else None
+            result.append(info)
+        return result
+
+    def assignment(self, dong_codes: List[str]) -> Dict[int, List[str]]:
+        """동 코드 목록이 어떤 워커에 배정되는지 반환합니다."""
+        result: Dict[int, List[str]] = {wid: [] for wid in self._workers}
+        for code in dong_codes:
+            result[self.worker_for(code)].append(code)
+        return result
+
+    def shutdown(self):
+        self._closed.set()
+        with self._lock:
+            worker_ids = list(self._workers)
+        for wid in worker_ids:
+            self.remove_worker(wid)
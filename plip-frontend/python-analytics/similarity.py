@@ -0,0 +1,231 @@
+"""
+동 유사도 검색 / 군집
+
+"역삼동과 비슷하게 움직이는 동은?" 같은 질문에 답하기 위해 동마다 168칸(요일x시간) 프로파일을
+평균으로 나눠 규모를 없애고, 중심화 + 단위 길이로 정규화한 벡터를 색인으로 유지합니다.
+
+    유사도: 정규화 벡터의 내적 (= 프로파일 간 피어슨 상관), 행렬곱 한 번으로 모든 동과 비교
+    군집:   같은 벡터에 대한 k-means (k-means++ 초기화, 이전 중심에서 다시 시작해 라벨을 안정적으로 유지)
+
+색인은 (측정값, 기간 주 수, 군집 수)별로 큐브 버전이 바뀔 때만 다시 만들고,
+프로파일은 profiles.HourOfWeekIndex 누적합에서 바로 구하므로 재계산도 수 ms 수준입니다.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List
+import threading
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES, DAY_HOURS, NIGHT_HOURS, WEEKDAY_NAMES
+from comparison import normalized_profiles
+from profiles import HourOfWeekIndex
+
+# 프로파일을 만드는 최근 기간 (주). None이면 큐브 전체 기간
+DEFAULT_PROFILE_WEEKS = 12
+
+DEFAULT_CLUSTERS = 8
+
+KMEANS_ITERATIONS = 100
+KMEANS_SEED = 42
+
+# 유지하는 색인 조합 수
+MAX_SIMILARITY_INDEXES = 8
+
+
+def unit_vectors(profiles: np.ndarray) -> np.ndarray:
+    """(동, 168) 프로파일 -> 평균 정규화, 중심화, 단위 길이 벡터"""
+    shape = normalized_profiles(profiles)
+    centered = shape - shape.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return centered / np.where(norms > 0, norms, 1.0)
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, init: np.ndarray = None, seed: int = KMEANS_SEED,
+           iterations: int = KMEANS_ITERATIONS):
+    """벡터화된 k-means. init이 주어지면 그 중심에서 시작합니다. (라벨, 중심, 관성) 반환"""
+    n = len(vectors)
+    n_clusters = max(min(n_clusters, n), 1)
+    squared = (vectors ** 2).sum(axis=1)
+
+    if init is not None and len(init) == n_clusters:
+        centroids = init.copy()
+    else:
+        # k-means++ 초기화
+        rng = np.random.default_rng(seed)
+        centroids = np.empty((n_clusters, vectors.shape[1]))
+        centroids[0] = vectors[rng.integers(n)]
+        closest = np.maximum(squared - 2 * vectors @ centroids[0] + centroids[0] @ centroids[0], 0)
+        for c in range(1, n_clusters):
+            total = closest.sum()
+            pick = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+            centroids[c] = vectors[pick]
+            closest = np.minimum(closest, np.maximum(squared - 2 * vectors @ centroids[c] + centroids[c] @ centroids[c], 0))
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        distances = squared[:, None] - 2 * vectors @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+        new_labels = distances.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            # 빈 군집은 현재 중심에서 가장 먼 점으로 다시 배치
+            far = np.argsort(-distances[np.arange(n), labels])[:empty.sum()]
+            centroids[empty] = vectors[far]
+
+    inertia = float(np.maximum(distances[np.arange(n), labels], 0).sum())
+    return labels, centroids, inertia
+
+
+def describe_profile(profile: np.ndarray) -> Dict[str, Any]:
+    """168칸 (정규화) 프로파일의 모양 요약: 피크 요일/시간, 주간/야간 비, 주말/주중 비"""
+    grid = profile.reshape(7, 24)
+    peak = int(np.argmax(profile))
+    return {
+        'peak_weekday': WEEKDAY_NAMES[peak // 24],
+        'peak_hour': peak % 24,
+        'day_night_ratio': round(float(grid[:, DAY_HOURS].mean() / grid[:, NIGHT_HOURS].mean()), 3),
+        'weekend_weekday_ratio': round(float(grid[5:].mean() / grid[:5].mean()), 3)
+    }
+
+
+class SimilarityIndex:
+    """정규화 프로파일 벡터 + 군집 색인 (큐브 버전이 바뀔 때만 재계산)"""
+
+    def __init__(self, profile_index: HourOfWeekIndex):
+        self.profile_index = profile_index
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.rebuilds = 0
+
+    def _entry(self, cube: PopulationCube, measure: str, weeks, n_clusters: int) -> Dict[str, Any]:
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        if weeks is not None and weeks < 0:
+            raise ValueError("weeks는 0 이상이어야 합니다 (0 또는 생략하면 전체 기간).")
+        key = (measure, weeks, n_clusters)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['cube_id'] == id(cube) and entry['version'] == cube.version:
+                self._entries.move_to_end(key)
+                return entry
+
+            start = max(cube.n_dates - weeks * 7, 0) if weeks else 0
+            profiles = self.profile_index.profiles(cube, np.arange(cube.n_dongs), slice(start, cube.n_dates), measure)
+            # 기간 안에 관측이 없는 동은 색인에서 제외
+            observed = np.flatnonzero(~np.isnan(profiles).all(axis=1))
+            if len(observed) == 0:
+                raise ValueError(f"{cube.dates[start]}~{cube.dates[-1]} 기간에 관측이 있는 동이 없습니다.")
+            vectors = unit_vectors(profiles[observed])
+            previous = entry['centroids'] if entry is not None else None
+            labels, centroids, inertia = kmeans(vectors, n_clusters, init=previous)
+
+            entry = {
+                'cube_id': id(cube), 'version': cube.version, 'rows': observed,
+                'position': {int(row): i for i, row in enumerate(observed)},
+                'vectors': vectors, 'shapes': normalized_profiles(profiles[observed]),
+                'labels': labels, 'centroids': centroids, 'inertia': inertia,
+                'start_date': str(cube.dates[start]), 'end_date': str(cube.dates[-1])
+            }
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > MAX_SIMILARITY_INDEXES:
+                self._entries.popitem(last=False)
+            self.rebuilds += 1
+            return entry
+
+    def similar(self, cube: PopulationCube, dong_codes: List[str], k: int = 10, measure: str = 'total',
+                weeks=DEFAULT_PROFILE_WEEKS, n_clusters: int = DEFAULT_CLUSTERS, candidates: List[str] = None,
+                names: Dict[str, str] = None) -> Dict[str, Any]:
+        """기준 동(여러 개면 평균 벡터)과 프로파일 모양이 가장 비슷한 k개 동"""
+        entry = self._entry(cube, measure, weeks, n_clusters)
+        names = names or {}
+        positions = []
+        for code in dong_codes:
+            row = cube.dong_index(code)
+            if row not in entry['position']:
+                raise ValueError(f"프로파일 기간에 관측이 없는 동입니다: {code}")
+            positions.append(entry['position'][row])
+
+        query = entry['vectors'][positions].mean(axis=0)
+        query /= max(np.linalg.norm(query), 1e-12)
+        similarity = entry['vectors'] @ query
+
+        allowed = np.ones(len(similarity), dtype=bool)
+        allowed[positions] = False
+        if candidates is not None:
+            rows = {cube.dong_index(code) for code in candidates if code in cube}
+            allowed &= np.isin(entry['rows'], list(rows))
+        pool = np.flatnonzero(allowed)
+        k = max(min(k, len(pool)), 0)
+        if k:
+            part = pool[np.argpartition(-similarity[pool], k - 1)[:k]]
+            order = part[np.argsort(-similarity[part], kind='stable')]
+        else:
+            order = np.array([], dtype=int)
+
+        target_labels = entry['labels'][positions]
+        return {
+            'measure': measure,
+            'start_date': entry['start_date'],
+            'end_date': entry['end_date'],
+            'query': [
+                {'dong_code': code, 'dong_name': names.get(code), 'cluster': int(label)}
+                for code, label in zip(dong_codes, target_labels)
+            ],
+            'query_profile': describe_profile(entry['shapes'][positions].mean(axis=0)),
+            'similar': [
+                {
+                    'rank': rank + 1,
+                    'dong_code': cube.dong_codes[entry['rows'][i]],
+                    'dong_name': names.get(cube.dong_codes[entry['rows'][i]]),
+                    'similarity': round(float(similarity[i]), 4),
+                    'cluster': int(entry['labels'][i]),
+                    'same_cluster': bool(entry['labels'][i] in target_labels)
+                }
+                for rank, i in enumerate(order)
+            ]
+        }
+
+    def clusters(self, cube: PopulationCube, measure: str = 'total', weeks=DEFAULT_PROFILE_WEEKS,
+                 n_clusters: int = DEFAULT_CLUSTERS, names: Dict[str, str] = None) -> Dict[str, Any]:
+        """군집별 구성 동과 중심 프로파일 요약"""
+        entry = self._entry(cube, measure, weeks, n_clusters)
+        names = names or {}
+        clusters = []
+        for c in range(len(entry['centroids'])):
+            members = np.flatnonzero(entry['labels'] == c)
+            if not len(members):
+                continue
+            # 중심과 가장 가까운 동부터 나열 (대표 동)
+            closeness = entry['vectors'][members] @ entry['centroids'][c]
+            members = members[np.argsort(-closeness, kind='stable')]
+            clusters.append({
+                'cluster': c,
+                'size': int(len(members)),
+                'profile': describe_profile(entry['shapes'][members].mean(axis=0)),
+                'dongs': [
+                    {'dong_code': cube.dong_codes[entry['rows'][i]], 'dong_name': names.get(cube.dong_codes[entry['rows'][i]])}
+                    for i in members
+                ]
+            })
+        return {
+            'measure': measure,
+            'start_date': entry['start_date'],
+            'end_date': entry['end_date'],
+            'n_clusters': len(clusters),
+            'inertia': round(entry['inertia'], 4),
+            'labels': {cube.dong_codes[row]: int(label) for row, label in zip(entry['rows'], entry['labels'])},
+            'clusters': clusters
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {'indexes': [list(key) for key in self._entries], 'rebuilds': self.rebuilds}
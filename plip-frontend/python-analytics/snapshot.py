@@ -0,0 +1,165 @@
+"""
+인구 큐브 스냅샷 (메모리 맵)
+
+큐브를 버전별 디렉터리에 .npy 배열 + JSON 매니페스트로 저장하고, 프로세스 시작 시
+np.load(mmap_mode='r')로 읽기 전용 매핑합니다. 데이터를 다시 파싱하지 않으므로 시작이 거의 즉시 끝나고,
+여러 uvicorn 워커가 같은 파일을 매핑하면 OS 페이지 캐시를 공유해 메모리가 워커 수만큼 늘지 않습니다.
+
+    {root}/CURRENT                 현재 스냅샷 디렉터리 이름
+    {root}/v000012/                저장 순번 디렉터리 (큐브 버전과 무관하게 저장할 때마다 증가)
+    {root}/v000012/manifest.json   형식 버전, 큐브 버전, 동 코드, 시작일, shape, dtype ...
+    {root}/v000012/values.npy      (동, 날짜, 24, 측정값) float32
+    {root}/v000012/daily.npy       (동, 날짜, 측정값) 일평균 캐시
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# 보관할 최근 스냅샷 수 (오래된 것은 저장 시 삭제)
+SNAPSHOT_KEEP = 3
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cube_snapshots')
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+
+SNAPSHOT_NAME = re.compile(r'^v(\d+)$')
+
+
+def _snapshot_name(sequence: int) -> str:
+    return f"v{sequence:06d}"
+
+
+def _snapshot_sequences(root: str) -> List[int]:
+    """root 안의 스냅샷 디렉터리 순번 (작성 중인 것 포함)"""
+    return sorted(int(match.group(1)) for match in map(SNAPSHOT_NAME.match, os.listdir(root)) if match)
+
+
+def _reserve_snapshot_dir(root: str) -> tuple:
+    """기존 최대 순번 + 1 디렉터리를 만들어 선점합니다 (다른 프로세스가 먼저 만들면 다음 번호)."""
+    sequences = _snapshot_sequences(root)
+    sequence = (sequences[-1] if sequences else 0) + 1
+    while True:
+        path = os.path.join(root, _snapshot_name(sequence))
+        try:
+            os.mkdir(path)
+            return sequence, path
+        except FileExistsError:
+            sequence += 1
+
+
+def current_snapshot(root: str = DEFAULT_SNAPSHOT_DIR) -> Optional[str]:
+    """현재 스냅샷 디렉터리 경로 (없으면 None)"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding='utf-8') as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(root, name)
+    return path if os.path.isfile(os.path.join(path, MANIFEST_FILE)) else None
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_cube_snapshot(cube: PopulationCube, root: str = DEFAULT_SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP) -> Dict[str, Any]:
+    """큐브를 새 순번 디렉터리에 저장하고 CURRENT를 원자적으로 교체합니다.
+
+    순번은 큐브 버전이 아니라 디렉터리의 기존 최대 순번 + 1이므로, 버전이 낮거나 같은 큐브를 가진
+    다른 프로세스가 저장해도 서로의 스냅샷을 덮어쓰거나 방금 쓴 스냅샷을 지우지 않습니다.
+    """
+    if cube.is_empty:
+        raise ValueError("큐브가 비어 있어 스냅샷을 저장할 수 없습니다.")
+    start = time.perf_counter()
+    os.makedirs(root, exist_ok=True)
+
+    with cube._lock:
+        values = np.ascontiguousarray(cube.values)
+        daily = np.ascontiguousarray(cube.daily_means(), dtype=np.float32)
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'cube_version': cube.version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'start_date': str(cube.start_date),
+            'n_dates': cube.n_dates,
+            'dong_codes': list(cube.dong_codes),
+            'measures': MEASURE_NAMES,
+            'shape': list(values.shape),
+            'dtype': str(values.dtype),
+            'last_dates': {code: str(day) for code, day in cube.last_dates.items()}
+        }
+
+    sequence, final_path = _reserve_snapshot_dir(root)
+    name = os.path.basename(final_path)
+    manifest['sequence'] = sequence
+    np.save(os.path.join(final_path, 'values.npy'), values)
+    np.save(os.path.join(final_path, 'daily.npy'), daily)
+    # 매니페스트를 마지막에 원자적으로 써서 작성 중인 디렉터리는 스냅샷으로 보이지 않게 함
+    manifest_tmp = os.path.join(final_path, MANIFEST_FILE + '.tmp')
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(manifest_tmp, os.path.join(final_path, MANIFEST_FILE))
+
+    current_tmp = os.path.join(root, CURRENT_FILE + '.tmp')
+    with open(current_tmp, 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+
+    # 오래된 스냅샷 정리: 방금 쓴 것보다 순번이 낮은 완성된 스냅샷만, 방금 쓴 것 포함 keep개를 남김
+    # (이미 매핑한 프로세스는 파일이 지워져도 계속 읽을 수 있음)
+    older = [seq for seq in _snapshot_sequences(root) if seq < sequence
+             and os.path.isfile(os.path.join(root, _snapshot_name(seq), MANIFEST_FILE))]
+    for old in older[:len(older) - max(keep - 1, 0)]:
+        shutil.rmtree(os.path.join(root, _snapshot_name(old)), ignore_errors=True)
+
+    manifest['path'] = final_path
+    manifest['size_mb'] = round((values.nbytes + daily.nbytes) / 1024 ** 2, 1)
+    manifest['elapsed_seconds'] = time.perf_counter() - start
+    return manifest
+
+
+def load_cube_snapshot(path: str = None, root: str = DEFAULT_SNAPSHOT_DIR, mmap: bool = True) -> PopulationCube:
+    """스냅샷을 읽기 전용 메모리 맵으로 열어 큐브를 만듭니다 (path 생략 시 CURRENT)."""
+    path = path or current_snapshot(root)
+    if path is None:
+        raise FileNotFoundError(f"큐브 스냅샷이 없습니다: {root}")
+    manifest = read_manifest(path)
+    if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {manifest.get('format_version')}")
+    if manifest.get('measures') != MEASURE_NAMES:
+        raise ValueError(f"스냅샷 측정값 구성이 다릅니다: {manifest.get('measures')}")
+
+    mmap_mode = 'r' if mmap else None
+    values = np.load(os.path.join(path, 'values.npy'), mmap_mode=mmap_mode)
+    daily = np.load(os.path.join(path, 'daily.npy'), mmap_mode=mmap_mode)
+    if list(values.shape) != manifest['shape']:
+        raise ValueError(f"스냅샷 배열 크기가 매니페스트와 다릅니다: {values.shape} != {manifest['shape']}")
+
+    cube = PopulationCube()
+    cube._values = values
+    cube.dong_codes = list(manifest['dong_codes'])
+    cube._dong_index = {code: i for i, code in enumerate(cube.dong_codes)}
+    cube.start_date = np.datetime64(manifest['start_date'], 'D')
+    cube.n_dates = int(manifest['n_dates'])
+    cube.version = int(manifest['cube_version'])
+    cube.updated_at = datetime.fromisoformat(manifest['created_at'])
+    cube.last_dates = {code: np.datetime64(day, 'D') for code, day in manifest['last_dates'].items()}
+    cube._daily = daily
+    cube._daily_version = cube.version
+    cube._daily_start = cube.start_date
+    cube.snapshot_path = path
+    return cube
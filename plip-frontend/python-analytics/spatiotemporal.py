@@ -0,0 +1,269 @@
+"""
+이웃 동 특성을 쓰는 전역(global) 시공간 예측 모델
+
+동별 Prophet 모델은 각 동을 따로 학습하므로 강남역/코엑스처럼 이웃 동에서 흘러드는 인구 변화를 보지 못합니다.
+이 모델은 모든 동을 한 번에 학습하며, 동마다 요일x시간 프로파일에서 벗어난 정도(이상치 편차)를 예측합니다.
+
+    z[d, t, h]  = 동 d의 값 / 학습 기간 평균 (규모 제거)
+    a[d, t, h]  = z - 동 d의 (요일, 시간) 평균 프로파일
+    특성        = 자기 편차의 1일/7일 전 값과 최근 7일 평균, 같은 세 값의 이웃 가중 평균
+    이웃 평균   = W @ a  (W: adjacency의 행 정규화 인접 행렬, 전체 동 x 전체 시점을 희소 행렬곱 한 번으로 계산)
+
+시간대(0~23시)마다 모든 동의 표본을 모아 릿지 회귀 계수 하나를 학습하고, 여러 날 예측은 하루씩
+예측값을 다시 지연 특성으로 넣어 이어 갑니다 (모든 동을 함께 예측하므로 이웃 특성도 예측값으로 갱신).
+backtest()는 같은 기간에 이웃 특성을 뺀 모델, 프로파일만 쓰는 기준선과 정확도를 비교합니다.
+"""
+
+from typing import Any, Dict, List, Optional
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from cube import PopulationCube, MEASURE_NAMES
+
+# 학습 기간 (일)
+DEFAULT_TRAIN_DAYS = 182
+DEFAULT_HORIZON_DAYS = 7
+MAX_HORIZON_DAYS = 28
+
+# 지연 특성 (일)
+LAG_DAYS = (1, 7)
+RECENT_DAYS = 7
+
+RIDGE_ALPHA = 1.0
+
+FEATURE_NAMES = ['intercept', 'own_lag_1d', 'own_lag_7d', 'own_mean_7d',
+                 'neighbor_lag_1d', 'neighbor_lag_7d', 'neighbor_mean_7d']
+
+
+def _nanmean(block: np.ndarray, axis: int) -> np.ndarray:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        return np.nanmean(block, axis=axis)
+
+
+def neighbor_mean(matrix: 'sparse.csr_matrix', values: np.ndarray) -> np.ndarray:
+    """(동, ...) 값의 이웃 가중 평균. 결측 이웃은 빼고 다시 정규화하며 행렬곱 두 번으로 전체 시점을 계산"""
+    flat = values.reshape(values.shape[0], -1)
+    valid = ~np.isnan(flat)
+    totals = matrix @ np.where(valid, flat, 0)
+    weights = matrix @ valid.astype(np.float64)
+    lag = np.divide(totals, weights, out=np.full(totals.shape, np.nan), where=weights > 0)
+    return lag.reshape(values.shape)
+
+
+def ridge(x: np.ndarray, y: np.ndarray, alpha: float = RIDGE_ALPHA) -> np.ndarray:
+    """릿지 회귀 계수 (첫 열 절편은 벌점 제외)"""
+    penalty = alpha * np.eye(x.shape[1])
+    penalty[0, 0] = 0
+    return np.linalg.solve(x.T @ x + penalty, x.T @ y)
+
+
+class SpatioTemporalModel:
+    """한 번 학습한 전역 모델 (계수, 동별 규모/프로파일, 마지막 편차 이력)
+
+    scipy.sparse와 인접 그래프는 main 임포트를 늦추지 않도록 모델을 처음 학습할 때 가져옵니다.
+    """
+
+    def __init__(self, cube: PopulationCube, measure: str = 'total', end_date=None,
+                 train_days: int = DEFAULT_TRAIN_DAYS, use_neighbors: bool = True, alpha: float = RIDGE_ALPHA):
+        from scipy import sparse
+        from adjacency import load_dong_adjacency
+
+        if measure not in MEASURE_NAMES:
+            raise ValueError(f"measure는 {', '.join(MEASURE_NAMES)} 중 하나여야 합니다.")
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        started = time.perf_counter()
+        self.measure = measure
+        self.use_neighbors = use_neighbors
+        self.dong_codes = list(cube.dong_codes)
+        self.cube_id, self.version = id(cube), cube.version
+        self.start_date = cube.start_date
+
+        end = cube.n_dates - 1 if end_date is None else cube.date_slice(None, end_date).stop - 1
+        start = max(end - train_days + 1, 0)
+        history = max(LAG_DAYS + (RECENT_DAYS,))
+        first = max(start - history, 0)
+        if end - start + 1 <= history:
+            raise ValueError(f"학습 기간이 너무 짧습니다 (최소 {history + 1}일 필요).")
+        self.end = end
+        values = np.asarray(cube.values[:, first:end + 1, :, MEASURE_NAMES.index(measure)], dtype=np.float64)
+
+        # 동별 규모와 (요일, 시간) 프로파일은 학습 기간에서만 계산
+        train = values[:, start - first:]
+        self.scale = _nanmean(train.reshape(len(values), -1), axis=1)
+        self.scale[~(self.scale > 0)] = np.nan
+        weekdays = self._weekdays(first, end + 1)
+        z = values / self.scale[:, None, None]
+        self.profile = np.stack([_nanmean(z[:, (weekdays == k) & (np.arange(len(weekdays)) >= start - first)], axis=1)
+                                 for k in range(7)], axis=1)
+        anomaly = z - self.profile[:, weekdays]
+
+        self.matrix = (load_dong_adjacency().weights(self.dong_codes, 'row') if use_neighbors
+                       else sparse.csr_matrix((len(self.dong_codes), len(self.dong_codes))))
+        neighbor = neighbor_mean(self.matrix, anomaly) if use_neighbors else None
+
+        targets = np.arange(max(start - first, history), end - first + 1)
+        x = self._features(anomaly, neighbor, targets)
+        y = anomaly[:, targets]
+        self.coef = np.zeros((24, len(self.feature_names)))
+        self.samples = 0
+        for h in range(24):
+            xh = x[:, :, h].reshape(-1, x.shape[-1])
+            yh = y[:, :, h].ravel()
+            ok = ~np.isnan(yh) & ~np.isnan(xh).any(axis=1)
+            if ok.sum() > xh.shape[1]:
+                self.coef[h] = ridge(xh[ok], yh[ok], alpha)
+            self.samples += int(ok.sum())
+
+        # 예측 시작용 마지막 편차 이력 (결측은 프로파일 그대로 = 편차 0)
+        self.recent = anomaly[:, -history:]
+        self.fit_seconds = time.perf_counter() - started
+
+    @property
+    def feature_names(self) -> List[str]:
+        return FEATURE_NAMES if self.use_neighbors else FEATURE_NAMES[:4]
+
+    def _weekdays(self, lo: int, hi: int) -> np.ndarray:
+        dates = self.start_date + np.arange(lo, hi).astype('timedelta64[D]')
+        # 1970-01-01은 목요일 -> 월요일 0 기준 요일
+        return (dates.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+    def _features(self, anomaly: np.ndarray, neighbor: Optional[np.ndarray], targets: np.ndarray) -> np.ndarray:
+        """(동, 대상 날짜, 시간, 특성) 배열. 순서는 FEATURE_NAMES (자기 3개, 이웃 3개)"""
+        columns = [np.ones((anomaly.shape[0], len(targets), 24))]
+        sources = [anomaly] if neighbor is None else [anomaly, neighbor]
+        for source in sources:
+            columns.append(source[:, targets - LAG_DAYS[0]])
+            columns.append(source[:, targets - LAG_DAYS[1]])
+            recent = np.stack([source[:, targets - k] for k in range(1, RECENT_DAYS + 1)], axis=0)
+            columns.append(_nanmean(recent, axis=0))
+        return np.stack(columns, axis=-1)
+
+    def forecast(self, days: int = DEFAULT_HORIZON_DAYS) -> np.ndarray:
+        """학습 마지막 날 다음부터 days일 (동, 날짜, 24) 예측값. 하루씩 예측값을 지연 특성으로 다시 사용"""
+        history = self.recent.shape[1]
+        anomaly = np.concatenate([np.nan_to_num(self.recent), np.zeros((len(self.dong_codes), days, 24))], axis=1)
+        for k in range(days):
+            # 지연 특성에 필요한 최근 history일만 잘라 이웃 평균 계산 (하루당 행렬곱 한 번)
+            window = anomaly[:, k:history + k + 1]
+            neighbor = neighbor_mean(self.matrix, window) if self.use_neighbors else None
+            x = np.nan_to_num(self._features(window, neighbor, np.array([history])))[:, 0]
+            anomaly[:, history + k] = np.einsum('dhf,hf->dh', x, self.coef)
+        weekdays = self._weekdays(self.end + 1, self.end + 1 + days)
+        predicted = (anomaly[:, history:] + self.profile[:, weekdays]) * self.scale[:, None, None]
+        return np.maximum(predicted, 0)
+
+    def profile_forecast(self, days: int = DEFAULT_HORIZON_DAYS) -> np.ndarray:
+        """프로파일만 쓰는 기준선 (편차 0)"""
+        weekdays = self._weekdays(self.end + 1, self.end + 1 + days)
+        return self.profile[:, weekdays] * self.scale[:, None, None]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'measure': self.measure,
+            'use_neighbors': self.use_neighbors,
+            'dongs': len(self.dong_codes),
+            'train_end': str(self.start_date + np.timedelta64(self.end, 'D')),
+            'samples': self.samples,
+            'neighbor_edges': int(self.matrix.nnz // 2),
+            'fit_ms': round(self.fit_seconds * 1000, 1),
+            'coefficients': {name: np.round(self.coef[:, i], 4).tolist() for i, name in enumerate(self.feature_names)}
+        }
+
+
+def forecast_errors(predicted: np.ndarray, actual: np.ndarray) -> Dict[str, Any]:
+    """(동, 날짜, 시간) 예측 오차 요약 (실측 결측 제외)"""
+    ok = ~np.isnan(actual) & ~np.isnan(predicted)
+    error = np.abs(predicted - actual)[ok]
+    positive = ok & (actual > 0)
+    return {
+        'mae': round(float(error.mean()), 2) if error.size else None,
+        'mape': round(float((np.abs(predicted - actual)[positive] / actual[positive]).mean() * 100), 3)
+        if positive.any() else None,
+        'points': int(ok.sum())
+    }
+
+
+class SpatioTemporalForecaster:
+    """측정값/이웃 사용 여부별 전역 모델 캐시 (큐브 버전이 바뀌면 다시 학습)"""
+
+    def __init__(self, train_days: int = DEFAULT_TRAIN_DAYS):
+        self.train_days = train_days
+        self._models: Dict[tuple, SpatioTemporalModel] = {}
+        self._lock = threading.Lock()
+        self.fits = 0
+
+    def model(self, cube: PopulationCube, measure: str = 'total', use_neighbors: bool = True) -> SpatioTemporalModel:
+        key = (measure, use_neighbors)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None and model.cube_id == id(cube) and model.version == cube.version:
+                return model
+            model = SpatioTemporalModel(cube, measure, train_days=self.train_days, use_neighbors=use_neighbors)
+            self._models[key] = model
+            self.fits += 1
+            return model
+
+    def forecast(self, cube: PopulationCube, dong_codes: List[str] = None, days: int = DEFAULT_HORIZON_DAYS,
+                 measure: str = 'total', use_neighbors: bool = True, names: Dict[str, str] = None) -> Dict[str, Any]:
+        """큐브 마지막 날 다음부터 days일 시간별 예측 (모든 동을 함께 예측하고 요청한 동만 반환)"""
+        if not 1 <= days <= MAX_HORIZON_DAYS:
+            raise ValueError(f"days는 1~{MAX_HORIZON_DAYS} 사이여야 합니다.")
+        started = time.perf_counter()
+        model = self.model(cube, measure, use_neighbors)
+        predicted = model.forecast(days)
+        names = names or {}
+        rows = range(len(model.dong_codes)) if dong_codes is None else [cube.dong_index(code) for code in dong_codes]
+        first = model.start_date + np.timedelta64(model.end + 1, 'D')
+        return {
+            'measure': measure,
+            'use_neighbors': use_neighbors,
+            'dates': [str(first + np.timedelta64(k, 'D')) for k in range(days)],
+            'forecasts': [
+                {
+                    'dong_code': model.dong_codes[row],
+                    'dong_name': names.get(model.dong_codes[row]),
+                    'hourly': None if np.isnan(predicted[row]).all() else np.round(predicted[row], 1).tolist()
+                }
+                for row in rows
+            ],
+            'model': {key: value for key, value in model.info().items() if key != 'coefficients'},
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def backtest(self, cube: PopulationCube, test_days: int = 14, measure: str = 'total',
+                 train_days: int = None) -> Dict[str, Any]:
+        """마지막 test_days일을 떼어 이웃 특성 모델 / 자기 특성만 / 프로파일 기준선 정확도와 시간 비교"""
+        if cube.is_empty:
+            raise ValueError("큐브가 비어 있습니다. 먼저 /cube/refresh로 적재하세요.")
+        if not 1 <= test_days <= MAX_HORIZON_DAYS:
+            raise ValueError(f"test_days는 1~{MAX_HORIZON_DAYS} 사이여야 합니다.")
+        end = cube.n_dates - 1 - test_days
+        end_date = cube.start_date + np.timedelta64(end, 'D')
+        actual = np.asarray(cube.values[:, end + 1:end + 1 + test_days, :, MEASURE_NAMES.index(measure)],
+                            dtype=np.float64)
+        train_days = train_days or self.train_days
+
+        result = {'measure': measure, 'train_end': str(end_date), 'test_days': test_days, 'models': {}}
+        for name, use_neighbors in (('global_neighbors', True), ('global_own_only', False)):
+            model = SpatioTemporalModel(cube, measure, end_date, train_days, use_neighbors)
+            started = time.perf_counter()
+            predicted = model.forecast(test_days)
+            forecast_seconds = time.perf_counter() - started
+            result['models'][name] = {
+                **forecast_errors(predicted, actual),
+                'fit_ms': round(model.fit_seconds * 1000, 1),
+                'forecast_ms': round(forecast_seconds * 1000, 1),
+                'by_horizon_mae': [forecast_errors(predicted[:, k], actual[:, k])['mae'] for k in range(test_days)]
+            }
+            if use_neighbors:
+                result['models']['profile_baseline'] = forecast_errors(model.profile_forecast(test_days), actual)
+                result['coefficients'] = model.info()['coefficients']
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {'models': [model.info() for model in self._models.values()], 'fits': self.fits}
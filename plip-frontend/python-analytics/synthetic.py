@@ -0,0 +1,237 @@
+"""
+합성 생활인구 데이터 생성기 (확장성 테스트용)
+
+백엔드에는 몇 주치 데이터만 있어서 400개 이상 동 x 수년치 시간별 데이터에서
+예측/분석 서비스가 어떻게 동작하는지 확인할 수 없습니다. 이 모듈은 dailyDataList와
+같은 스키마의 시간별 데이터를 동 수와 기간을 지정해 재현 가능하게 만듭니다.
+
+    - 일/주 계절성: 주거형(밤에 많음)과 업무형(평일 낮에 많음) 패턴을 동마다 섞음
+    - 공휴일: 고정 공휴일 + 설/추석/부처님오신날 (공휴일은 일요일처럼, 명절은 인구 자체가 감소)
+    - 세그먼트: 내국인 / 장기체류 외국인 / 단기체류 외국인 (단기는 업무 시간대에 비중 증가)
+    - 추세, 연간 계절성, 일 단위 AR(1) 잡음 + 시간 단위 잡음
+
+같은 (seed, 동 코드)는 항상 같은 데이터를 만들므로 로컬 백엔드 대체 서버(mock_backend.py)와
+오프라인 데이터셋(datasources.LocalDatasetSource)에서 그대로 사용할 수 있습니다.
+
+    python synthetic.py --dongs 424 --days 1095 --out ./synthetic_data --format parquet
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+import argparse
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from districts import load_seoul_districts
+
+DEFAULT_SEED = 42
+DEFAULT_DAYS = 365
+
+# 고정 공휴일 (월, 일)
+FIXED_HOLIDAYS = [(1, 1), (3, 1), (5, 5), (6, 6), (8, 15), (10, 3), (10, 9), (12, 25)]
+
+# 음력 공휴일 (대체공휴일 포함). 목록에 없는 연도는 고정 공휴일만 사용
+LUNAR_HOLIDAYS = {
+    2023: ['01-21', '01-22', '01-23', '01-24', '05-27', '05-29', '09-28', '09-29', '09-30'],
+    2024: ['02-09', '02-10', '02-11', '02-12', '05-15', '09-16', '09-17', '09-18'],
+    2025: ['01-28', '01-29', '01-30', '05-06', '10-05', '10-06', '10-07', '10-08'],
+    2026: ['02-16', '02-17', '02-18', '05-24', '05-25', '09-24', '09-25', '09-26'],
+}
+
+# 설/추석 연휴 (귀성으로 전체 인구가 줄어드는 날)
+MAJOR_HOLIDAY_MONTHS = {1, 2, 9, 10}
+
+# 시간대 구분 (dailyDataList timeZone 값)
+TIME_ZONES = ['새벽'] * 5 + ['오전'] * 7 + ['오후'] * 6 + ['저녁'] * 6
+
+
+def korean_holidays(start, end) -> Tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+    """기간 내 (공휴일, 설/추석 연휴) 날짜 목록을 반환합니다."""
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    holidays, major = set(), set()
+    for year in range(start.year, end.year + 1):
+        for month, day in FIXED_HOLIDAYS:
+            holidays.add(pd.Timestamp(year, month, day))
+        for month_day in LUNAR_HOLIDAYS.get(year, []):
+            day = pd.Timestamp(f"{year}-{month_day}")
+            holidays.add(day)
+            # 부처님오신날(5월)을 제외한 음력 공휴일은 명절 연휴
+            if day.month in MAJOR_HOLIDAY_MONTHS:
+                major.add(day)
+    in_range = lambda days: pd.DatetimeIndex(sorted(d for d in days if start <= d <= end))
+    return in_range(holidays), in_range(major)
+
+
+def synthetic_dong_codes(n_dongs: int) -> List[str]:
+    """서울 행정동 코드(TopoJSON) 앞에서부터 n개, 모자라면 가상 코드(99xxxxxx)로 채웁니다."""
+    try:
+        _, _, dongs = load_seoul_districts()
+        codes = sorted({code for table in dongs.values() for code in table})
+    except (OSError, ValueError, KeyError):
+        codes = []
+    codes = codes[:n_dongs]
+    codes += [f"99{i:06d}" for i in range(n_dongs - len(codes))]
+    return codes
+
+
+class SyntheticPopulationGenerator:
+    """dailyDataList 형식의 시간별 합성 생활인구를 동 단위로 생성합니다."""
+
+    def __init__(self, start=None, end=None, days: int = DEFAULT_DAYS, seed: int = DEFAULT_SEED,
+                 noise: float = 0.04):
+        end = pd.Timestamp(end or date.today() - timedelta(days=1)).normalize()
+        start = pd.Timestamp(start).normalize() if start else end - pd.Timedelta(days=days - 1)
+        if end < start:
+            raise ValueError("end가 start보다 빠릅니다.")
+        self.start, self.end = start, end
+        self.seed = seed
+        self.noise = noise
+
+        # 모든 동이 공유하는 시간축 관련 배열은 한 번만 계산
+        self.timestamps = pd.date_range(start, end + pd.Timedelta(hours=23), freq='h')
+        self.n_days = (end - start).days + 1
+        hours = self.timestamps.hour.to_numpy()
+        days_index = self.timestamps.normalize()
+        holidays, major = korean_holidays(start, end)
+        off_day = (self.timestamps.dayofweek.to_numpy() >= 5) | days_index.isin(holidays)
+        self._hour = hours
+        self._day = np.repeat(np.arange(self.n_days), 24)
+        self._off_day = off_day
+        self._major = days_index.isin(major)
+        self._years = ((self.timestamps - start) / pd.Timedelta(days=365)).to_numpy()
+        self._annual = np.sin(2 * np.pi * self.timestamps.dayofyear.to_numpy() / 365.25)
+
+        # 문자열 컬럼은 동마다 같으므로 미리 만들어 둠
+        self._date_str = np.repeat(pd.date_range(start, end, freq='D').strftime('%Y%m%d').to_numpy(), 24)
+        self._tmzon = np.array([f"{h + 1:02d}" for h in range(24)])[hours]
+        self._time_zone = np.array(TIME_ZONES)[hours]
+        self._time_range = np.array([f"{h:02d}:00-{(h + 1) % 24:02d}:00" if h < 23 else "23:00-24:00"
+                                     for h in range(24)])[hours]
+
+    @property
+    def n_hours(self) -> int:
+        return len(self.timestamps)
+
+    def _rng(self, dong_code: str) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(str(dong_code).encode('utf-8'))])
+
+    def dong_params(self, dong_code: str) -> Dict[str, float]:
+        """동별 특성 (규모, 업무형 비중, 외국인 비중, 추세)"""
+        rng = self._rng(dong_code)
+        return {
+            'level': float(rng.lognormal(np.log(20000), 0.6)),
+            'business_mix': float(rng.beta(2, 3)),
+            'long_share': float(rng.uniform(0.01, 0.08)),
+            'temp_share': float(rng.uniform(0.005, 0.05)),
+            'annual_trend': float(rng.normal(0, 0.03)),
+            'summer_amplitude': float(rng.normal(0, 0.03))
+        }
+
+    def generate_values(self, dong_code: str) -> Dict[str, np.ndarray]:
+        """동 하나의 시간별 (total, local, long, temp) 정수 배열을 만듭니다."""
+        params = self.dong_params(dong_code)
+        rng = self._rng(dong_code + '#noise')
+        hour = self._hour
+
+        residential = 1 + 0.15 * np.cos(2 * np.pi * (hour - 2) / 24) + 0.05 * self._off_day
+        daytime = np.exp(-((hour - 13.5) / 4.0) ** 2)
+        business = np.where(self._off_day, 0.45 + 0.35 * daytime, 0.4 + 1.6 * daytime)
+        mix = params['business_mix']
+        shape = (1 - mix) * residential + mix * business
+
+        level = params['level'] * (1 + params['annual_trend'] * self._years) * (1 + params['summer_amplitude'] * self._annual)
+        level = level * np.where(self._major, 0.85, 1.0)
+
+        # 일 단위 AR(1) 잡음 + 시간 단위 잡음 (로그 스케일)
+        daily_shock = rng.normal(0, self.noise, self.n_days)
+        daily_noise = np.empty(self.n_days)
+        daily_noise[0] = daily_shock[0]
+        for i in range(1, self.n_days):
+            daily_noise[i] = 0.6 * daily_noise[i - 1] + daily_shock[i]
+        noise = np.exp(daily_noise[self._day] + rng.normal(0, self.noise / 2, self.n_hours))
+
+        total = np.maximum(np.round(level * shape * noise), 0).astype(np.int64)
+        long_share = params['long_share'] * (1 + 0.05 * rng.normal(size=self.n_hours))
+        temp_share = params['temp_share'] * (1 + mix * (business - 1)) * (1 + 0.1 * rng.normal(size=self.n_hours))
+        long_foreigner = np.round(total * np.clip(long_share, 0, 0.5)).astype(np.int64)
+        temp_foreigner = np.round(total * np.clip(temp_share, 0, 0.5)).astype(np.int64)
+        local = total - long_foreigner - temp_foreigner
+        return {'total': total, 'local': local, 'long': long_foreigner, 'temp': temp_foreigner}
+
+    def generate_dong(self, dong_code: str) -> pd.DataFrame:
+        """동 하나의 dailyDataList 데이터프레임"""
+        values = self.generate_values(dong_code)
+        return pd.DataFrame({
+            'date': self._date_str,
+            'timeZone': self._time_zone,
+            'timeRange': self._time_range,
+            'tmzonPdSe': self._tmzon,
+            'totalPopulation': values['total'],
+            'localPopulation': values['local'],
+            'tempForeignerPopulation': values['temp'],
+            'longForeignerPopulation': values['long']
+        })
+
+    def daily_data_list(self, dong_code: str) -> List[Dict[str, Any]]:
+        """백엔드 응답과 같은 dailyDataList 항목 목록"""
+        return self.generate_dong(dong_code).to_dict('records')
+
+    def iter_dongs(self, dong_codes: List[str]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        for code in dong_codes:
+            yield code, self.generate_dong(code)
+
+    def generate(self, dong_codes: List[str]) -> pd.DataFrame:
+        """여러 동을 dongCode 컬럼으로 합친 데이터프레임 (작은 규모용)"""
+        return pd.concat([frame.assign(dongCode=code) for code, frame in self.iter_dongs(dong_codes)],
+                         ignore_index=True)
+
+
+def write_synthetic_dataset(directory: str, n_dongs: int = 424, days: int = DEFAULT_DAYS, start=None, end=None,
+                            seed: int = DEFAULT_SEED, fmt: str = 'parquet') -> Dict[str, Any]:
+    """합성 데이터를 LocalDatasetSource 형식({dong_code}.{fmt})으로 저장합니다."""
+    if fmt not in ('parquet', 'csv'):
+        raise ValueError("fmt는 'parquet' 또는 'csv'만 가능합니다.")
+    started = time.perf_counter()
+    generator = SyntheticPopulationGenerator(start=start, end=end, days=days, seed=seed)
+    codes = synthetic_dong_codes(n_dongs)
+    os.makedirs(directory, exist_ok=True)
+    for code, frame in generator.iter_dongs(codes):
+        path = os.path.join(directory, f"{code}.{fmt}")
+        if fmt == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+    return {
+        'directory': os.path.abspath(directory),
+        'format': fmt,
+        'dongs': len(codes),
+        'start': generator.start.strftime('%Y-%m-%d'),
+        'end': generator.end.strftime('%Y-%m-%d'),
+        'rows': len(codes) * generator.n_hours,
+        'seed': seed,
+        'elapsed_seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 생활인구 데이터셋 생성")
+    parser.add_argument('--dongs', type=int, default=424, help="동 개수")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="기간 (일), --start를 주면 무시")
+    parser.add_argument('--start', help="시작일 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료일 (YYYY-MM-DD, 기본: 어제)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--format', default='parquet', choices=['parquet', 'csv'])
+    parser.add_argument('--out', default='synthetic_data', help="출력 디렉터리")
+    args = parser.parse_args()
+
+    summary = write_synthetic_dataset(args.out, args.dongs, args.days, args.start, args.end, args.seed, args.format)
+    print(f"✅ 합성 데이터 생성 완료: {summary['dongs']}개 동, {summary['rows']:,}행, "
+          f"{summary['start']} ~ {summary['end']} ({summary['elapsed_seconds']}초) → {summary['directory']}")
+
+
+if __name__ == '__main__':
+    main()
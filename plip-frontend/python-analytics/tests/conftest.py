@@ -0,0 +1,46 @@
+"""테스트 공통 설정: python-analytics 모듈을 바로 임포트하도록 상위 디렉터리를 경로에 추가하고 API 클라이언트를 제공합니다."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def client():
+    """FastAPI 앱 테스트 클라이언트 (startup 워밍업 없이 요청만 보냄)"""
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
+
+
+def daily_frame(start: str, days: int, seed: int, missing: float = 0.05):
+    """dailyDataList 형식 합성 프레임 (시간별 인구, 일부 결측)"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq='D')
+    hours = np.tile(np.arange(24), days)
+    population = 500 + 300 * np.sin(hours / 24 * 2 * np.pi) + rng.normal(0, 50, len(hours))
+    frame = pd.DataFrame({
+        'date': np.repeat(dates.strftime('%Y%m%d'), 24),
+        'tmzonPdSe': (hours + 1).astype(str),
+        'totalPopulation': population,
+        'localPopulation': population * 0.9,
+    })
+    return frame[rng.random(len(frame)) >= missing].reset_index(drop=True)
+
+
+@pytest.fixture
+def make_cube():
+    """make_cube(n_dongs, start, days) -> 동 코드 1168xxxx의 합성 PopulationCube"""
+    from cube import PopulationCube
+
+    def build(n_dongs: int = 6, start: str = '2025-07-02', days: int = 45, seed: int = 0):
+        cube = PopulationCube()
+        cube.upsert({f'1168{i:04d}': daily_frame(start, days, seed + i) for i in range(n_dongs)})
+        return cube
+    return build
@@ -0,0 +1,99 @@
+"""큐브 group-by 집계: 질의 정규화, 축 축소 결과, 빈 필터"""
+
+import numpy as np
+import pytest
+
+from aggregation import AggregationCache, normalize_query, run_aggregation
+from cube import MEASURE_NAMES
+
+
+@pytest.fixture
+def cube(make_cube):
+    return make_cube(n_dongs=3, start='2025-07-07', days=14)
+
+
+def aggregate(cube, **data):
+    return run_aggregation(cube, normalize_query(data, cube))
+
+
+def test_normalize_defaults_and_dedup(cube):
+    query = normalize_query({'group_by': ['hour', 'hour'], 'hours': [9, 8, 9]}, cube)
+    dong_codes, start, end, hours, weekdays, group_by, measures, aggs = query
+    assert dong_codes == tuple(cube.dong_codes)
+    assert (start, end) == (None, None)
+    assert hours == (8, 9)
+    assert weekdays == tuple(range(7))
+    assert (group_by, measures, aggs) == (('hour',), ('total',), ('mean',))
+
+
+def test_normalize_district_keeps_loaded_dongs(cube):
+    query = normalize_query({}, cube, district_dongs=['11680001', '99999999'])
+    assert query[0] == ('11680001',)
+
+
+@pytest.mark.parametrize('data, error', [
+    ({'group_by': ['month']}, ValueError),
+    ({'measures': ['tourist']}, ValueError),
+    ({'aggs': ['p90']}, ValueError),
+    ({'hours': [24]}, ValueError),
+    ({'weekdays': [7]}, ValueError),
+    ({'dong_codes': ['99999999']}, KeyError),
+])
+def test_normalize_rejects_bad_query(cube, data, error):
+    with pytest.raises(error):
+        normalize_query(data, cube)
+
+
+def test_group_by_dong_hour_matches_numpy(cube):
+    result = aggregate(cube, group_by=['dong', 'hour'], measures=['total', 'local'], aggs=['mean', 'count'],
+                       hours=[8, 18])
+    assert result['date_count'] == 14
+    assert len(result['rows']) == 3 * 2
+    row = result['rows'][1]
+    assert (row['dong'], row['hour']) == ('11680000', 18)
+    values = cube.values[0, :, 18]
+    assert row['total_mean'] == pytest.approx(np.nanmean(values[:, MEASURE_NAMES.index('total')]))
+    assert row['local_count'] == int(np.count_nonzero(~np.isnan(values[:, MEASURE_NAMES.index('local')])))
+
+
+def test_group_by_weekday_and_segment(cube):
+    result = aggregate(cube, group_by=['weekday', 'segment'], measures=['total', 'local'], weekdays=[0, 6])
+    assert [(row['weekday'], row['segment']) for row in result['rows']] == [
+        ('월요일', 'total'), ('월요일', 'local'), ('일요일', 'total'), ('일요일', 'local')
+    ]
+    monday = cube.values[:, cube.weekdays == 0, :, MEASURE_NAMES.index('total')]
+    assert result['rows'][0]['mean'] == pytest.approx(np.nanmean(monday))
+
+
+def test_date_rows_carry_weekday(cube):
+    result = aggregate(cube, group_by=['date', 'weekday'], start_date='2025-07-12', end_date='2025-07-13')
+    assert [(row['date'], row['weekday']) for row in result['rows']] == [('2025-07-12', '토요일'), ('2025-07-13', '일요일')]
+
+
+@pytest.mark.parametrize('data', [
+    {},
+    {'group_by': ['dong']},
+    {'group_by': ['weekday']},
+    {'group_by': ['dong', 'weekday']},
+    {'group_by': ['segment']},
+])
+def test_filters_matching_no_dates_return_no_rows(cube, data):
+    before = aggregate(cube, start_date='2025-09-01', **data)
+    assert before['rows'] == [] and before['date_count'] == 0 and before['cells'] == 0
+    # 기간 안이지만 요일이 맞지 않는 경우도 같음
+    no_weekday = aggregate(cube, start_date='2025-07-08', end_date='2025-07-09', weekdays=[5], **data)
+    assert no_weekday['rows'] == []
+
+
+def test_cache_reuses_until_cube_changes(cube):
+    from conftest import daily_frame
+
+    cache = AggregationCache(maxsize=2)
+    query = normalize_query({'group_by': ['dong']}, cube)
+    first, cached = cache.get_or_compute(cube, query)
+    assert not cached
+    assert cache.get_or_compute(cube, query) == (first, True)
+    cube.upsert({'11680000': daily_frame('2025-07-21', 1, seed=9)})
+    _, cached = cache.get_or_compute(cube, query)
+    assert not cached
+    assert cache.stats()['hits'] == 1
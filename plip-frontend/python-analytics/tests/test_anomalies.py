@@ -0,0 +1,133 @@
+"""이상치/변화점 색인: robust z-score, PELT, 증분 갱신과 전체 재계산 일치"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomalies import (AnomalyIndex, MIN_SEGMENT_DAYS, deseasonalized_daily, pelt_change_points,
+                       robust_scores)
+from conftest import daily_frame
+from cube import PopulationCube
+
+
+def weekly_history(days: int, seed: int = 0) -> np.ndarray:
+    """(1, days, 24) 시간 패턴 + 작은 잡음"""
+    rng = np.random.default_rng(seed)
+    hours = np.arange(24)
+    base = 1000 + 400 * np.sin(hours / 24 * 2 * np.pi)
+    return (base + rng.normal(0, 10, (1, days, 24))).astype(np.float32)
+
+
+def shifted_frame(start: str, days: int, seed: int, shift_day: int, factor: float) -> pd.DataFrame:
+    frame = daily_frame(start, days, seed, missing=0)
+    day = np.repeat(np.arange(days), 24)
+    frame.loc[day >= shift_day, ['totalPopulation', 'localPopulation']] *= factor
+    return frame
+
+
+def test_robust_scores_flag_spike():
+    history = weekly_history(9 * 7)
+    history[0, -1, 12] += 2000
+    z, median = robust_scores(history, n_target=7)
+    assert z.shape == median.shape == (1, 7, 24)
+    assert z[0, -1, 12] > 20
+    others = np.delete(z.ravel(), 6 * 24 + 12)
+    assert np.nanmax(np.abs(others)) < 4
+    assert median[0, -1, 12] == pytest.approx(history[0, :-1, 12].mean(), rel=0.05)
+
+
+def test_robust_scores_need_min_baseline():
+    # 직전 같은 요일 관측이 3주뿐이면 점수 없음
+    z, _ = robust_scores(weekly_history(4 * 7), n_target=7)
+    assert np.isnan(z).all()
+    z, _ = robust_scores(weekly_history(5 * 7), n_target=7)
+    assert not np.isnan(z).any()
+
+
+def test_pelt_finds_level_shift_only():
+    rng = np.random.default_rng(1)
+    n = 84
+    shift = np.where(np.arange(n) >= 42, 3.0, 0.0) + rng.normal(0, 1, n)
+    flat = rng.normal(0, 1, n)
+    points = pelt_change_points(np.stack([shift, flat]))
+    assert len(points[0]) == 1 and abs(points[0][0] - 42) <= 2
+    assert points[1] == []
+    assert pelt_change_points(np.zeros((1, 2 * MIN_SEGMENT_DAYS - 1))) == [[]]
+
+
+def test_one_day_spike_is_not_change_point():
+    rng = np.random.default_rng(2)
+    daily = 1000 + rng.normal(0, 10, (1, 84))
+    daily[0, 30] = 5000
+    weekdays = np.arange(84) % 7
+    residual = deseasonalized_daily(daily, weekdays)
+    assert residual.max() == pytest.approx(3.0)
+    assert pelt_change_points(residual) == [[]]
+
+
+@pytest.fixture
+def cube():
+    cube = PopulationCube()
+    cube.upsert({
+        '11680000': daily_frame('2025-05-05', 84, seed=0),
+        '11680001': shifted_frame('2025-05-05', 84, seed=1, shift_day=42, factor=1.6),
+        '11680002': daily_frame('2025-05-05', 84, seed=2),
+    })
+    return cube
+
+
+def assert_same_index(a: AnomalyIndex, b: AnomalyIndex, measure: str = 'total'):
+    left, right = a._states[measure], b._states[measure]
+    np.testing.assert_array_equal(left['scores'], right['scores'])
+    np.testing.assert_array_equal(left['baseline'], right['baseline'])
+    assert left['change_points'] == right['change_points']
+
+
+def test_incremental_refresh_matches_full(cube):
+    index = AnomalyIndex()
+    assert index.refresh(cube)['mode'] == 'full'
+
+    spike = daily_frame('2025-06-16', 1, seed=9, missing=0)
+    spike['totalPopulation'] *= 6
+    cube.upsert({
+        '11680000': spike,                                              # 과거 날짜 보정
+        '11680002': daily_frame('2025-07-28', 4, seed=10, missing=0),   # 뒤쪽 날짜 추가
+        '11689999': daily_frame('2025-06-02', 60, seed=11),             # 새 동
+    })
+    info = index.refresh(cube)
+    assert info['mode'] == 'incremental' and info['rescored_from'] == '2025-06-02'
+    assert index.refresh(cube) is info
+
+    full = AnomalyIndex()
+    full.refresh(cube)
+    assert_same_index(index, full)
+    assert index._states['total']['change_points'][1] != []
+
+
+def test_refresh_after_prepend_is_full(cube):
+    index = AnomalyIndex()
+    index.refresh(cube)
+    cube.upsert({'11680000': daily_frame('2025-05-01', 2, seed=12)})
+    assert index.refresh(cube)['mode'] == 'full'
+
+
+def test_anomalies_and_change_points_report(cube):
+    spike = daily_frame('2025-07-21', 1, seed=13, missing=0)
+    spike.loc[spike['tmzonPdSe'] == '13', 'totalPopulation'] *= 8
+    cube.upsert({'11680002': spike})
+
+    result = AnomalyIndex().anomalies(cube, start_date='2025-07-21', end_date='2025-07-21')
+    top = result['anomalies'][0]
+    assert (top['dong_code'], top['date'], top['hour'], top['direction']) == ('11680002', '2025-07-21', 12, 'spike')
+    assert top['value'] > top['expected']
+    assert result['by_dong'][0]['dong_code'] == '11680002'
+
+    changes = AnomalyIndex().change_points(cube, dong_codes=['11680001'])['dongs'][0]['change_points']
+    assert len(changes) == 1
+    assert abs((pd.Timestamp(changes[0]['date']) - pd.Timestamp('2025-06-16')).days) <= 2
+    assert changes[0]['change_percent'] == pytest.approx(60, abs=10)
+
+
+def test_refresh_rejects_unknown_measure(cube):
+    with pytest.raises(ValueError):
+        AnomalyIndex().refresh(cube, measure='tourist')
@@ -0,0 +1,76 @@
+"""배치 요청 검증과 동별 그룹/결과 재조립"""
+
+import pytest
+
+from batch import assemble_results, group_by_model, parse_batch_items
+
+
+@pytest.mark.parametrize('item, message', [
+    ({'date': '2025-08-20'}, 'dong_code'),
+    ({'dong_code': '11680640'}, 'start_date'),
+    ({'dong_code': '11680640', 'end_date': '2025-08-20'}, 'start_date'),
+    ({'dong_code': '11680640', 'start_date': '2025-08-22', 'end_date': '2025-08-20'}, 'end_date'),
+    ({'dong_code': '11680640', 'start_date': '2025-08-01', 'end_date': '2025-09-30'}, '기간'),
+    ({'dong_code': '11680640', 'date': '2025-08-20', 'hours': [8, 24]}, '0~23'),
+    ({'dong_code': '11680640', 'date': '2025-08-20', 'hours': ['8']}, '정수'),
+    ({'dong_code': '11680640', 'date': '2025-08-20', 'hours': [8.5]}, '정수'),
+    ({'dong_code': '11680640', 'date': '2025-08-20', 'hours': 8}, '정수'),
+])
+def test_invalid_items_raise_value_error(item, message):
+    with pytest.raises(ValueError, match=message):
+        parse_batch_items([item])
+
+
+def test_conflicting_districts_for_one_dong_raise_value_error():
+    parsed = parse_batch_items([
+        {'dong_code': '11680640', 'date': '2025-08-20', 'district': '강남구'},
+        {'dong_code': '11680640', 'date': '2025-08-21', 'district': '서초구'},
+    ])
+    with pytest.raises(ValueError, match='district'):
+        group_by_model(parsed)
+
+
+def test_group_district_comes_from_any_item():
+    parsed = parse_batch_items([
+        {'dong_code': '11680640', 'date': '2025-08-20'},
+        {'dong_code': '11680640', 'date': '2025-08-21', 'district': '강남구'},
+    ])
+    assert group_by_model(parsed)['11680640']['district'] == '강남구'
+
+
+def test_groups_share_timestamps_and_results_keep_request_order():
+    items = [
+        {'dong_code': 'A', 'start_date': '2025-08-20', 'end_date': '2025-08-21', 'hours': [8, 18]},
+        {'dong_code': 'B', 'date': '2025-08-20', 'hours': [12]},
+        {'dong_code': 'A', 'date': '2025-08-21', 'hours': [18, 8, 8]},
+    ]
+    parsed = parse_batch_items(items)
+    groups = group_by_model(parsed)
+    assert len(groups['A']['timestamps']) == 4  # 두 번째 A 요청은 첫 요청 시점의 부분집합
+
+    # 예측값 = 시점의 시(hour) x 10 으로 두면 재조립 결과를 바로 확인할 수 있음
+    outputs = {}
+    for code, group in groups.items():
+        yhat = group['timestamps'].hour.to_numpy() * 10.0
+        outputs[code] = {'yhat': yhat, 'yhat_lower': yhat - 1, 'yhat_upper': yhat + 1}
+    outputs['B'] = {'error': 'boom'}
+
+    results = assemble_results(parsed, groups, outputs)
+    assert results[0]['dates'] == ['2025-08-20', '2025-08-21']
+    assert results[0]['yhat'] == [[80, 180], [80, 180]]
+    assert results[1] == {'dong_code': 'B', 'error': 'boom'}
+    assert results[2]['hours'] == [8, 18]
+    assert results[2]['upper'] == [[81, 181]]
+
+
+def test_batch_endpoint_rejects_missing_date(client):
+    response = client.post('/predict/batch', json={'requests': [{'dong_code': '11680640'}]})
+    assert response.status_code == 400
+    assert 'start_date' in response.json()['detail']
+
+
+def test_batch_endpoint_rejects_non_integer_hours(client):
+    response = client.post('/predict/batch', json={
+        'requests': [{'dong_code': '11680640', 'date': '2025-08-20', 'hours': ['noon']}]
+    })
+    assert response.status_code == 400
@@ -0,0 +1,31 @@
+"""동 비교: 기간 검증"""
+
+import pytest
+
+from comparison import compare_dongs
+from profiles import HourOfWeekIndex
+
+
+def test_reversed_range_raises_value_error(make_cube):
+    cube = make_cube()
+    with pytest.raises(ValueError, match='start_date'):
+        compare_dongs(cube, HourOfWeekIndex(), cube.dong_codes[:2], start_date='2025-08-01', end_date='2025-07-20')
+
+
+def test_range_outside_cube_raises_value_error(make_cube):
+    cube = make_cube()
+    with pytest.raises(ValueError, match='큐브 데이터가 없습니다'):
+        compare_dongs(cube, HourOfWeekIndex(), cube.dong_codes[:2], start_date='2026-01-01', end_date='2026-01-31')
+
+
+def test_single_day_range_is_accepted(make_cube):
+    cube = make_cube()
+    result = compare_dongs(cube, HourOfWeekIndex(), cube.dong_codes[:3], start_date='2025-07-10', end_date='2025-07-10')
+    assert (result['start_date'], result['end_date']) == ('2025-07-10', '2025-07-10')
+    assert result['dong_codes'] == cube.dong_codes[:3]
+
+
+def test_compare_endpoint_rejects_reversed_range(client):
+    response = client.post('/compare', json={'dong_codes': ['11680640', '11680650'],
+                                             'start_date': '2025-08-31', 'end_date': '2025-08-01'})
+    assert response.status_code == 400
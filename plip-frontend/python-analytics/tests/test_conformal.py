@@ -0,0 +1,71 @@
+"""conformal 분위수와 커버리지 리포트"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conformal import ResidualIntervalStore, conformal_quantile, MAX_HORIZON_DAYS
+
+
+def make_residuals(n_cutoffs: int, per_cell: int, seed: int = 0) -> pd.DataFrame:
+    """cutoff마다 (시간대, horizon) 셀별로 정규 잔차를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    cutoffs = pd.date_range('2025-07-01', periods=n_cutoffs, freq='D')
+    cells = [(cutoff, hour, h) for cutoff in cutoffs for hour in range(24)
+             for h in range(1, MAX_HORIZON_DAYS + 1) for _ in range(per_cell)]
+    frame = pd.DataFrame(cells, columns=['cutoff', 'hour', 'horizon_days'])
+    frame['ds'] = frame['cutoff'] + pd.to_timedelta(frame['horizon_days'] * 24 + frame['hour'] - 24, unit='h')
+    # 시간대마다 잔차 크기가 달라 셀별 분위수를 써야 커버리지가 맞음
+    frame['residual'] = rng.normal(0, 10 + frame['hour'] * 5, len(frame))
+    return frame
+
+
+def test_conformal_quantile_uses_finite_sample_rank():
+    values = np.arange(1, 10, dtype=float)  # n = 9
+    assert conformal_quantile(values, 0.9) == 9.0  # ceil(10 * 0.9) = 9번째
+    assert conformal_quantile(values, 0.5) == 5.0
+    assert conformal_quantile(values, 0.1) == 1.0  # floor(10 * 0.1) = 1번째
+    assert conformal_quantile(np.array([]), 0.9) == 0.0
+
+
+def test_coverage_report_holds_out_last_cutoff():
+    residuals = make_residuals(n_cutoffs=6, per_cell=2)
+    report = ResidualIntervalStore(residuals).coverage_report(alpha=0.2)
+
+    assert report['method'] == 'holdout_last_cutoff'
+    assert report['evaluation_points'] == 24 * MAX_HORIZON_DAYS * 2
+    assert report['calibration_points'] == 5 * 24 * MAX_HORIZON_DAYS * 2
+    assert report['nominal'] == pytest.approx(0.8)
+    assert report['empirical'] == pytest.approx(0.8, abs=0.06)
+
+
+def test_coverage_report_matches_manual_count():
+    residuals = make_residuals(n_cutoffs=3, per_cell=3, seed=1)
+    store = ResidualIntervalStore(residuals)
+    report = store.coverage_report(alpha=0.1)
+
+    last = residuals['cutoff'] == residuals['cutoff'].max()
+    lower, upper = ResidualIntervalStore(residuals[~last]).table(alpha=0.1)
+    evaluation = residuals[last]
+    hours, horizons = evaluation['hour'].to_numpy(), evaluation['horizon_days'].to_numpy()
+    values = evaluation['residual'].to_numpy()
+    inside = (values >= lower[hours, horizons]) & (values <= upper[hours, horizons])
+    assert report['empirical'] == pytest.approx(inside.mean())
+    assert report['mean_width'] == pytest.approx(np.mean(upper[hours, horizons] - lower[hours, horizons]))
+
+
+def test_coverage_report_single_cutoff_is_in_sample():
+    residuals = make_residuals(n_cutoffs=1, per_cell=5)
+    report = ResidualIntervalStore(residuals, source='in_sample').coverage_report()
+    assert report['method'] == 'in_sample'
+    assert report['evaluation_points'] == len(residuals)
+    assert report['empirical'] >= 0.8
+
+
+def test_intervals_add_table_offsets():
+    store = ResidualIntervalStore(make_residuals(n_cutoffs=2, per_cell=5))
+    lower, upper = store.intervals(np.array([100.0, 200.0]), np.array([3, 27]), np.array([0, 99]))
+    table_lower, table_upper = store.table()
+    # 시간은 24로 나눈 나머지, horizon은 0..MAX_HORIZON_DAYS로 자름
+    assert lower.tolist() == [100 + table_lower[3, 0], 200 + table_lower[3, MAX_HORIZON_DAYS]]
+    assert upper.tolist() == [100 + table_upper[3, 0], 200 + table_upper[3, MAX_HORIZON_DAYS]]
@@ -0,0 +1,127 @@
+"""인구 큐브: 동 포함 여부, upsert 변경 이력, 증분 일평균, /stats 형식 통계"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import daily_frame
+from cube import CUBE_STATS, PopulationCube
+
+
+def frame(rows):
+    """(YYYYMMDD, 시(0~23), 총인구) 목록 -> dailyDataList 프레임"""
+    return pd.DataFrame({
+        'date': [r[0] for r in rows],
+        'tmzonPdSe': [str(r[1] + 1) for r in rows],
+        'totalPopulation': [r[2] for r in rows],
+        'localPopulation': [r[2] / 2 for r in rows],
+    })
+
+
+def fresh_daily(cube):
+    return PopulationCube._hour_mean(cube.values)
+
+
+def test_contains_and_has_dong(make_cube):
+    cube = make_cube(n_dongs=2)
+    assert '11680001' in cube and cube.has_dong('11680000')
+    assert '99999999' not in cube and not cube.has_dong('99999999')
+    with pytest.raises(KeyError):
+        cube.dong_index('99999999')
+
+
+def test_upsert_records_change_log():
+    cube = PopulationCube(dong_capacity=1, date_capacity=2)
+    first = cube.upsert({'A': daily_frame('2025-07-01', 3, seed=0), 'B': daily_frame('2025-07-01', 3, seed=1)})
+    assert first['version'] == 1 and first['new_dongs'] == 2 and first['changed_dongs'] == 2
+    assert cube.dong_codes == ['A', 'B'] and cube.n_dates == 3
+
+    second = cube.upsert({'B': frame([('20250703', 5, 100.0), ('20250705', 0, 50.0)])})
+    assert second == {'version': 2, 'changed_dongs': 1, 'new_dongs': 0, 'cells': 2}
+    version, changed, min_date = cube.change_log[-1]
+    assert version == 2 and changed.tolist() == [1] and min_date == 2
+    assert cube.n_dates == 5
+    assert cube.values[1, 2, 5, 0] == 100.0
+
+    changed, min_date = cube.changes_since(1)
+    assert changed.tolist() == [1] and min_date == 2
+    assert cube.changes_since(2)[0].size == 0
+
+    # 빈 프레임은 버전을 올리지 않음
+    assert cube.upsert({'C': frame([])})['version'] == 2
+
+
+def test_prepending_dates_logs_full_change():
+    cube = PopulationCube()
+    cube.upsert({'A': frame([('20250710', 0, 10.0)]), 'B': frame([('20250710', 0, 20.0)])})
+    cube.upsert({'A': frame([('20250708', 3, 5.0)])})
+    assert str(cube.start_date) == '2025-07-08'
+    assert cube.values[0, 2, 0, 0] == 10.0 and cube.values[0, 0, 3, 0] == 5.0
+    changed, min_date = cube.changes_since(1)
+    assert changed.tolist() == [0, 1] and min_date == 0
+
+
+def test_daily_means_incremental_matches_full(make_cube):
+    cube = make_cube(n_dongs=4, days=20)
+    np.testing.assert_allclose(cube.daily_means(), fresh_daily(cube))
+
+    # 과거 날짜 보정 + 뒤쪽 날짜 추가 + 새 동
+    cube.upsert({
+        '11680001': frame([('20250705', h, 1000.0) for h in range(24)]),
+        '11680002': daily_frame('2025-07-22', 5, seed=7),
+        '11689999': daily_frame('2025-07-10', 10, seed=8),
+    })
+    daily = cube.daily_means()
+    assert daily.shape == (5, 25, 4)
+    np.testing.assert_allclose(daily, fresh_daily(cube))
+    assert daily[1, 3, 0] == pytest.approx(1000.0)
+    assert cube.daily_means() is daily
+
+    # 앞쪽 날짜가 추가되면 전체 재계산
+    cube.upsert({'11680000': daily_frame('2025-06-28', 2, seed=9)})
+    np.testing.assert_allclose(cube.daily_means(), fresh_daily(cube))
+
+
+@pytest.fixture
+def stats_cube():
+    # 2025-07-07(월) ~ 07-13(일): 주간 시간 200, 야간 100, 주말은 두 배
+    rows = []
+    for day in range(7):
+        date = (pd.Timestamp('2025-07-07') + pd.Timedelta(days=day)).strftime('%Y%m%d')
+        scale = 2 if day >= 5 else 1
+        rows += [(date, h, (200.0 if 6 <= h < 18 else 100.0) * scale) for h in range(24)]
+    cube = PopulationCube()
+    cube.upsert({'11680000': frame(rows)})
+    return cube
+
+
+def test_stats_daily(stats_cube):
+    result = CUBE_STATS['daily'](stats_cube, '11680000')
+    assert result == {'averagePopulation': 193, 'maxPopulation': 300, 'minPopulation': 150,
+                      'maxDate': '2025-07-12', 'minDate': '2025-07-07'}
+    empty = CUBE_STATS['daily'](stats_cube, '11680000', start_date='2025-08-01')
+    assert empty['averagePopulation'] is None and empty['maxDate'] is None
+
+
+def test_stats_day_night(stats_cube):
+    result = CUBE_STATS['day-night'](stats_cube, '11680000')
+    assert result == {'dayPopulation': 257, 'nightPopulation': 129, 'dayNightRatio': 2.0}
+
+
+def test_stats_time_week(stats_cube):
+    result = CUBE_STATS['time-week'](stats_cube, '11680000', measure='local')
+    assert result['timeSlotPopulation']['00'] == 64
+    assert result['timeSlotPopulation']['12'] == 129
+    assert len(result['timeSlotPopulation']) == 24
+    assert result['weekdayPopulation'] == {'월요일': 75, '화요일': 75, '수요일': 75, '목요일': 75, '금요일': 75,
+                                           '토요일': 150, '일요일': 150}
+
+
+def test_stats_weekday_weekend(stats_cube):
+    result = CUBE_STATS['weekday-weekend'](stats_cube, '11680000', start_date='2025-07-11')
+    assert result == {'weekdayPopulation': 150, 'weekendPopulation': 300, 'ageGroupWeekday': {}, 'ageGroupWeekend': {}}
+
+
+def test_stats_unknown_dong(stats_cube):
+    with pytest.raises(KeyError):
+        CUBE_STATS['daily'](stats_cube, '99999999')
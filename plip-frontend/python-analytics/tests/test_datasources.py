@@ -0,0 +1,84 @@
+"""데이터셋 경로 제한: 루트 밖 경로 거부, 숫자가 아닌 동 코드 거부"""
+
+import os
+
+import pytest
+
+import main
+from conftest import daily_frame
+from datasources import UploadedDataSource, export_daily_dataset, resolve_dataset_path
+
+
+@pytest.fixture
+def dataset_root(tmp_path, monkeypatch):
+    root = tmp_path / 'datasets'
+    root.mkdir()
+    monkeypatch.setattr(main, 'DATASET_ROOT', str(root))
+    return root
+
+
+@pytest.fixture
+def source():
+    frame = daily_frame('2025-07-01', 3, seed=0)
+    return UploadedDataSource(frame.to_csv(index=False).encode(), 'one.csv', '11680640')
+
+
+def test_resolve_keeps_paths_under_root(tmp_path):
+    root = os.path.realpath(tmp_path)
+    assert resolve_dataset_path('population', str(tmp_path)) == os.path.join(root, 'population')
+    assert resolve_dataset_path('a/../b', str(tmp_path)) == os.path.join(root, 'b')
+    assert resolve_dataset_path(os.path.join(root, 'c'), str(tmp_path)) == os.path.join(root, 'c')
+
+
+@pytest.mark.parametrize('path', ['..', '../other', '/etc', 'a/../../other'])
+def test_resolve_rejects_escape(tmp_path, path):
+    with pytest.raises(ValueError, match='데이터셋 루트'):
+        resolve_dataset_path(path, str(tmp_path / 'root'))
+
+
+def test_resolve_rejects_symlink_escape(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'link').symlink_to(tmp_path)
+    with pytest.raises(ValueError):
+        resolve_dataset_path('link/outside', str(root))
+
+
+@pytest.mark.parametrize('code', ['../11680640', '11680640/../../x', ''])
+def test_export_rejects_non_numeric_codes(tmp_path, source, code):
+    with pytest.raises(ValueError, match='숫자'):
+        export_daily_dataset(source, [code], str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_writes_code_files(tmp_path, source):
+    result = export_daily_dataset(source, ['11680640'], str(tmp_path / 'out'), fmt='csv')
+    assert result['written'] == ['11680640']
+    assert (tmp_path / 'out' / '11680640.csv').exists()
+
+
+def test_export_endpoint_rejects_path_outside_root(client, dataset_root):
+    response = client.post('/datasource/export', json={'path': '../escape', 'dong_codes': ['11680640']})
+    assert response.status_code == 400
+    assert not (dataset_root.parent / 'escape').exists()
+
+
+def test_export_endpoint_rejects_bad_code(client, dataset_root):
+    response = client.post('/datasource/export', json={'path': 'population', 'dong_codes': ['../../x']})
+    assert response.status_code == 400
+
+
+def test_set_local_source_rejects_path_outside_root(client, dataset_root):
+    response = client.put('/datasource', json={'type': 'local', 'path': str(dataset_root.parent)})
+    assert response.status_code == 400
+
+
+def test_set_local_source_resolves_under_root(client, dataset_root):
+    (dataset_root / 'population').mkdir()
+    previous = main.predictor.data_source
+    try:
+        response = client.put('/datasource', json={'type': 'local', 'path': 'population'})
+        assert response.status_code == 200
+        assert response.json()['datasource']['path'] == str(dataset_root / 'population')
+    finally:
+        main.predictor.set_data_source(previous)
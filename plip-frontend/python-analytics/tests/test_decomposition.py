@@ -0,0 +1,96 @@
+"""Prophet 성분 표 분해를 Prophet.predict 결과와 비교"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+prophet = pytest.importorskip('prophet')
+logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+from decomposition import ComponentTables, component_tables, explain_records  # noqa: E402
+
+
+def training_frame(days: int = 21, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ds = pd.date_range('2025-07-01', periods=days * 24, freq='h')
+    hour = ds.hour.to_numpy()
+    weekend = (ds.weekday >= 5).astype(int)
+    local = 800 + 300 * np.sin(hour / 24 * 2 * np.pi) + rng.normal(0, 20, len(ds))
+    y = local * 1.2 + 150 * weekend + np.arange(len(ds)) * 0.5 + rng.normal(0, 30, len(ds))
+    return pd.DataFrame({'ds': ds, 'y': y, 'hour': hour, 'is_weekend': weekend, 'local_population': local})
+
+
+def future_frame(seed: int = 1) -> pd.DataFrame:
+    # 15분 표 사이의 시각도 포함해 보간까지 확인
+    frame = training_frame(days=3, seed=seed)
+    frame['ds'] = pd.date_range('2025-07-22 00:07', periods=len(frame), freq='h')
+    return frame.drop(columns='y')
+
+
+def fit(**params):
+    model = prophet.Prophet(weekly_seasonality=True, daily_seasonality=True, yearly_seasonality=False,
+                            uncertainty_samples=0, **params)
+    model.add_regressor('hour')
+    model.add_regressor('is_weekend', mode='additive')
+    model.add_regressor('local_population')
+    return model.fit(training_frame())
+
+
+@pytest.fixture(scope='module')
+def multiplicative_model():
+    return fit(seasonality_mode='multiplicative', changepoint_prior_scale=0.05)
+
+
+@pytest.mark.parametrize('params', [{}, {'growth': 'flat'}])
+def test_additive_explain_matches_predict(params):
+    model = fit(seasonality_mode='additive', **params)
+    frame = future_frame()
+    expected = model.predict(frame)
+    result = ComponentTables(model).explain(frame)
+
+    # 15분 간격 계절 곡선 보간 오차만 남음
+    np.testing.assert_allclose(result['trend'], expected['trend'], rtol=1e-9)
+    np.testing.assert_allclose(result['yhat'], expected['yhat'], atol=0.5)
+    for name in ('daily', 'weekly', 'is_weekend'):
+        np.testing.assert_allclose(result['contributions'][name], expected[name], atol=0.5)
+
+
+def test_multiplicative_explain_matches_predict(multiplicative_model):
+    frame = future_frame()
+    expected = multiplicative_model.predict(frame)
+    result = component_tables(multiplicative_model).explain(frame)
+
+    np.testing.assert_allclose(result['trend'], expected['trend'], rtol=1e-9)
+    np.testing.assert_allclose(result['yhat'], expected['yhat'], atol=0.5)
+    for name in ('daily', 'weekly', 'hour', 'local_population'):
+        # 곱셈 성분은 추세 대비 비율
+        np.testing.assert_allclose(result['relative'][name], expected[name], atol=1e-4)
+    np.testing.assert_allclose(result['contributions']['is_weekend'], expected['is_weekend'], atol=1e-6)
+
+
+def test_component_tables_are_cached_per_model(multiplicative_model):
+    assert component_tables(multiplicative_model) is component_tables(multiplicative_model)
+
+
+def test_explain_records_peak_is_max_yhat(multiplicative_model):
+    frame = future_frame().iloc[:24]
+    records = explain_records(component_tables(multiplicative_model), frame)
+    yhat = [row['yhat'] for row in records['explanations']]
+    assert records['peak']['yhat'] == max(yhat)
+    contributions = [abs(driver['contribution']) for driver in records['peak']['drivers']]
+    assert contributions == sorted(contributions, reverse=True)
+
+
+def test_missing_regressor_raises_value_error(multiplicative_model):
+    with pytest.raises(ValueError, match='local_population'):
+        component_tables(multiplicative_model).explain(future_frame().drop(columns='local_population'))
+
+
+def test_holiday_models_are_rejected():
+    model = prophet.Prophet(holidays=pd.DataFrame({'holiday': 'x', 'ds': pd.to_datetime(['2025-07-05'])}),
+                            uncertainty_samples=0)
+    model.fit(training_frame()[['ds', 'y']])
+    with pytest.raises(ValueError):
+        ComponentTables(model)
@@ -0,0 +1,121 @@
+"""인구밀도 CSV: 두 줄 헤더, 인코딩, 합계/소계 행, 구별 생활인구 밀도"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube import PopulationCube
+from density import DensityTable, _decode, parse_density_csv
+
+# 2023/2024 두 연도 열, 서울 합계 행, 구 소계 행, 구에 속한 동 행(제외 대상)
+CSV = """"동별(1)",동별(2),동별(3),2023,2023,2024,2024,2024
+"동별(1)",동별(2),동별(3),인구 (명),면적 (㎢),인구 (명),면적 (㎢),인구밀도 (명/㎢)
+"합계",소계,소계,"9,400,000",605.21,"9,597,372",605.21,15858
+"합계",강남구,소계,"550,000",39.5,"560,000",40.0,14000
+"합계",강남구,역삼1동,"40,000",2.0,"41,000",2.0,20500
+"합계",서초구,소계,"400,000",47.0,"410,000",50.0,
+"합계",종로구,소계,-,23.91,-,23.91,X
+"""
+
+
+def write(tmp_path, text: str, encoding: str):
+    path = tmp_path / f'인구밀도_{encoding}.csv'
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def test_parse_uses_latest_year_and_skips_totals():
+    parsed = parse_density_csv(CSV)
+    assert parsed['year'] == '2024'
+    assert parsed['names'] == ['강남구', '서초구', '종로구']
+    np.testing.assert_array_equal(parsed['population'][:2], [560000, 410000])
+    np.testing.assert_array_equal(parsed['area_km2'], [40.0, 50.0, 23.91])
+    assert parsed['total'] == {'population': 9597372, 'area_km2': 605.21, 'density': 15858}
+
+
+def test_parse_fills_density_and_missing_values():
+    parsed = parse_density_csv(CSV)
+    assert parsed['density'][0] == 14000
+    # 밀도 칸이 비면 인구 / 면적, 비공개 표기('-', 'X')는 NaN
+    assert parsed['density'][1] == pytest.approx(8200)
+    assert np.isnan(parsed['population'][2]) and np.isnan(parsed['density'][2])
+
+
+@pytest.mark.parametrize('text', ['', CSV.splitlines()[0] + '\n' + CSV.splitlines()[1]])
+def test_parse_rejects_headers_only(text):
+    with pytest.raises(ValueError, match='데이터 행'):
+        parse_density_csv(text)
+
+
+def test_parse_rejects_missing_area():
+    text = '\n'.join(','.join(line.split(',')[:4]) for line in CSV.splitlines())
+    with pytest.raises(ValueError, match='area_km2'):
+        parse_density_csv(text)
+
+
+@pytest.mark.parametrize('encoding', ['utf-8-sig', 'cp949'])
+def test_table_reads_bom_and_cp949(tmp_path, encoding):
+    table = DensityTable(write(tmp_path, CSV, encoding))
+    assert table.names == ['강남구', '서초구', '종로구']
+    assert table.lookup('강남구') == table.lookup('11680') == table.lookup('gangnam')
+    assert table.lookup('gangnam') == {
+        'district': 'gangnam', 'district_code': '11680', 'district_name': '강남구',
+        'population': 560000, 'area_km2': 40.0, 'density': 14000.0
+    }
+    assert table.lookup('jongno')['population'] is None
+    with pytest.raises(KeyError):
+        table.row('mapo')
+
+
+def test_decode_rejects_unknown_encoding():
+    with pytest.raises(ValueError, match='인코딩'):
+        _decode(b'\x80\x80')
+
+
+def test_area_for_dongs(tmp_path):
+    table = DensityTable(write(tmp_path, CSV, 'utf-8-sig'))
+    area = table.area_for_dongs(['11680640', '11650510', '11440555'])
+    assert area[:2].tolist() == [40.0, 50.0] and np.isnan(area[2])
+
+
+def constant_frame(start: str, days: int, value: float) -> pd.DataFrame:
+    dates = pd.date_range(start, periods=days, freq='D').strftime('%Y%m%d')
+    return pd.DataFrame({
+        'date': np.repeat(dates, 24),
+        'tmzonPdSe': np.tile(np.arange(1, 25), days).astype(str),
+        'totalPopulation': value,
+    })
+
+
+def test_live_density_sums_dongs_per_district(tmp_path):
+    table = DensityTable(write(tmp_path, CSV, 'utf-8-sig'))
+    cube = PopulationCube()
+    cube.upsert({
+        '11680640': constant_frame('2025-08-01', 3, 1000.0),
+        '11680650': constant_frame('2025-08-01', 3, 1800.0),
+        '11650510': constant_frame('2025-08-01', 3, 500.0),
+        '11440555': constant_frame('2025-08-01', 3, 9999.0),  # 자료에 없는 구
+    })
+    result = table.live_density(cube, start_date='2025-08-02')
+    assert (result['start_date'], result['end_date'], result['reference_year']) == ('2025-08-02', '2025-08-03', '2024')
+    by_district = {row['district']: row for row in result['districts']}
+    assert set(by_district) == {'gangnam', 'seocho'}
+
+    gangnam = by_district['gangnam']
+    assert gangnam['covered_dongs'] == 2
+    assert gangnam['hourly_density'] == [70.0] * 24
+    assert gangnam['mean_density'] == 70.0
+    assert gangnam['activity_ratio'] == pytest.approx(70 / 14000, abs=1e-3)
+    assert by_district['seocho']['hourly_density'][0] == 10.0
+
+
+def test_live_density_validates_input(tmp_path):
+    table = DensityTable(write(tmp_path, CSV, 'utf-8-sig'))
+    with pytest.raises(ValueError, match='비어'):
+        table.live_density(PopulationCube())
+    cube = PopulationCube()
+    cube.upsert({'11680640': constant_frame('2025-08-01', 1, 1.0)})
+    with pytest.raises(ValueError, match='measure'):
+        table.live_density(cube, measure='tourist')
+    with pytest.raises(ValueError, match='기간'):
+        table.live_density(cube, start_date='2025-09-01')
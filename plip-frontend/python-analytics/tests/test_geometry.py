@@ -0,0 +1,89 @@
+"""좌표 -> 행정동 색인을 모든 변에 대한 홀짝 판정(brute force)과 비교"""
+
+import numpy as np
+import pytest
+
+from districts import DONG_TOPOJSON_PATH
+from geometry import DongGeometry, PointInDongIndex, load_dong_geometry
+
+
+def brute_force(geometry: DongGeometry, points: np.ndarray, chunk: int = 500) -> np.ndarray:
+    """점마다 모든 변과 오른쪽 반직선 교차 수를 세어 홀수인 동 (없으면 -1, 여럿이면 -3)"""
+    x1, y1, x2, y2 = geometry.edges.T
+    labels = np.empty(len(points), dtype=np.int32)
+    for lo in range(0, len(points), chunk):
+        px, py = points[lo:lo + chunk, :1], points[lo:lo + chunk, 1:]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossing = ((y1 > py) != (y2 > py)) & (px < x_cross)
+        odd = np.stack([np.bincount(geometry.edge_owner[row], minlength=geometry.n_dongs) % 2 == 1
+                        for row in crossing])
+        hits = odd.sum(axis=1)
+        labels[lo:lo + chunk] = np.where(hits == 1, odd.argmax(axis=1), np.where(hits == 0, -1, -3))
+    return labels
+
+
+def random_points(geometry: DongGeometry, n: int, seed: int = 0) -> np.ndarray:
+    x0, y0, x1, y1 = geometry.bbox
+    rng = np.random.default_rng(seed)
+    # 경계 상자 밖 점도 조금 섞음
+    return rng.uniform([x0 - 0.01, y0 - 0.01], [x1 + 0.01, y1 + 0.01], (n, 2))
+
+
+def synthetic_topology():
+    """구멍이 있는 동, 그 구멍을 채우는 동, 두 조각짜리 동 (양자화 좌표)
+
+    축에 평행한 변이 격자선/경계 상자에 겹치도록 만들고, 기울어진 변은 격자 꼭짓점을 지나지 않게 둡니다.
+    """
+    def arc(*points):
+        points = np.asarray(points)
+        return np.vstack([points[:1], np.diff(points, axis=0)]).tolist()
+
+    def props(code, name):
+        return {'adm_cd': code, 'adm_nm': f'테스트시 테스트구 {name}'}
+
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [0.001, 0.001], 'translate': [127.0, 37.5]},
+        'arcs': [
+            arc([0, 0], [100, 0], [100, 100], [0, 100], [0, 0]),          # 0: 바깥 사각형
+            arc([30, 30], [30, 70], [70, 70], [70, 30], [30, 30]),        # 1: 구멍 (시계 방향)
+            arc([121, 0], [157, 3], [141, 43], [121, 0]),                 # 2: 삼각형
+            arc([120, 60], [160, 60], [160, 100], [120, 100], [120, 60]), # 3: 사각형
+        ],
+        'objects': {'dongs': {'type': 'GeometryCollection', 'geometries': [
+            {'type': 'Polygon', 'arcs': [[0], [1]], 'properties': props('99990001', '가동')},
+            {'type': 'Polygon', 'arcs': [[~1]], 'properties': props('99990002', '나동')},
+            {'type': 'MultiPolygon', 'arcs': [[[2]], [[3]]], 'properties': props('99990003', '다동')},
+        ]}}
+    }
+
+
+@pytest.mark.parametrize('grid_size', [1, 8, 64])
+def test_synthetic_polygons_match_brute_force(grid_size):
+    geometry = DongGeometry(synthetic_topology())
+    index = PointInDongIndex(geometry, grid_size=grid_size)
+    points = random_points(geometry, 5000)
+    labels = index.locate(points[:, 0], points[:, 1])
+    np.testing.assert_array_equal(labels, brute_force(geometry, points))
+    assert {0, 1, 2, -1} <= set(labels.tolist())
+
+
+def test_synthetic_known_points():
+    index = PointInDongIndex(DongGeometry(synthetic_topology()), grid_size=16)
+    codes, _ = index.locate_codes([37.55, 37.51, 37.52, 37.59, 37.55], [127.05, 127.01, 127.139, 127.14, 127.11])
+    assert codes == ['99990002', '99990001', '99990003', '99990003', None]
+
+
+def test_dong_topojson_matches_brute_force():
+    geometry = load_dong_geometry(DONG_TOPOJSON_PATH)
+    points = random_points(geometry, 3000, seed=1)
+    expected = brute_force(geometry, points)
+    assert (expected == -3).sum() == 0  # 행정동끼리 겹치지 않음
+    labels = geometry.point_index.locate(points[:, 0], points[:, 1])
+    np.testing.assert_array_equal(labels, expected)
+
+
+def test_non_finite_points_are_outside():
+    index = PointInDongIndex(DongGeometry(synthetic_topology()), grid_size=8)
+    assert index.locate([np.nan, np.inf], [37.55, 37.55]).tolist() == [-1, -1]
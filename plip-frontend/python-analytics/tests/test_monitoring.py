@@ -0,0 +1,79 @@
+"""예측 원장 채점: 채점 창, 보존 기간 정리, 실제값 0 시점의 MAPE 제외"""
+
+from datetime import datetime, timedelta
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from monitoring import ForecastLedger, DRIFT_MIN_POINTS, RETENTION_DAYS, SCORING_WINDOW_DAYS
+
+NOW = datetime(2025, 9, 1)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return ForecastLedger(str(tmp_path / 'ledger.sqlite3'))
+
+
+def hourly(start: datetime, hours: int) -> pd.DatetimeIndex:
+    return pd.date_range(start, periods=hours, freq='h')
+
+
+def actuals_for(dong_code: str, timestamps, values) -> pd.DataFrame:
+    return pd.DataFrame({'dong_code': dong_code, 'ds': timestamps, 'y': values})
+
+
+def test_score_uses_window_and_prunes_old_rows(ledger):
+    old = hourly(NOW - timedelta(days=RETENTION_DAYS + 5), 24)
+    outside_window = hourly(NOW - timedelta(days=SCORING_WINDOW_DAYS + 3), 24)
+    recent = hourly(NOW - timedelta(days=2), 24)
+    for timestamps in (old, outside_window, recent):
+        ledger.record('A', timestamps, np.full(24, 100.0), np.full(24, 90.0), np.full(24, 110.0),
+                      issued_at=timestamps[0].to_pydatetime() - timedelta(days=1))
+    actuals = pd.concat([actuals_for('A', ts, np.full(24, 105.0)) for ts in (old, outside_window, recent)])
+
+    scores = ledger.score(actuals, now=NOW)
+    assert ledger.last_pruned == 24
+    assert int(scores['n'].sum()) == 24          # 채점 창 밖 예측은 읽지 않음
+    assert len(ledger.load()) == 48              # 창 밖이지만 보존 기간 안의 예측은 남김
+    assert scores['coverage'].iloc[0] == 1.0
+    assert scores['mape'].iloc[0] == pytest.approx(5 / 105 * 100)
+
+
+def test_zero_actuals_are_excluded_from_mape(ledger):
+    timestamps = hourly(NOW - timedelta(days=1), DRIFT_MIN_POINTS)
+    ledger.record('A', timestamps, np.full(len(timestamps), 100.0), source='sharded',
+                  issued_at=timestamps[0].to_pydatetime() - timedelta(hours=1))
+    values = np.where(np.arange(len(timestamps)) % 2 == 0, 0.0, 50.0)
+
+    scores = ledger.score(actuals_for('A', timestamps, values), now=NOW)
+    row = scores.iloc[0]
+    assert row['n'] == len(timestamps) and row['n_mape'] == len(timestamps) // 2
+    assert row['mape'] == pytest.approx(100.0)   # 실제값 50인 시점만: |50 - 100| / 50
+
+    alerts = ledger.drift_alerts(scores)
+    assert [alert['dong_code'] for alert in alerts] == ['A']
+    assert alerts[0]['recent_mape'] == pytest.approx(100.0)
+    assert alerts[0]['sources'] == ['sharded']
+
+
+def test_all_zero_actuals_leave_mape_empty(ledger):
+    timestamps = hourly(NOW - timedelta(days=1), DRIFT_MIN_POINTS)
+    ledger.record('A', timestamps, np.full(len(timestamps), 100.0),
+                  issued_at=timestamps[0].to_pydatetime() - timedelta(hours=1))
+    scores = ledger.score(actuals_for('A', timestamps, np.zeros(len(timestamps))), now=NOW)
+    assert scores['n_mape'].iloc[0] == 0 and pd.isna(scores['mape'].iloc[0])
+    # 0으로 채워 '완벽한 예측'으로 세지도, MAPE 경보를 내지도 않음
+    assert ledger.drift_alerts(scores) == []
+
+
+def test_importing_main_does_not_create_the_ledger(tmp_path):
+    path = tmp_path / 'ledger.sqlite3'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', 'import main'], cwd=root, check=True, capture_output=True,
+                   env={**os.environ, 'FORECAST_LEDGER_PATH': str(path)}, timeout=120)
+    assert not path.exists()
@@ -0,0 +1,99 @@
+"""즐겨찾기 워밍: 예약 교체, 실패 세션 기록, 캐시 무효화"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import prefetch
+from prefetch import FavoriteWarmer, PrefetchCache, count_favorites, next_warm_time
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('조건을 기다리다 시간 초과')
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def fast_schedule(monkeypatch):
+    """예약 실행 간격을 0.05초로 줄임"""
+    monkeypatch.setattr(prefetch, 'next_warm_time', lambda now, *args, **kwargs: now + timedelta(seconds=0.05))
+
+
+@pytest.fixture
+def warmer():
+    warmer = FavoriteWarmer(PrefetchCache(), {'forecast': lambda code, date: {'dong_code': code}})
+    yield warmer
+    warmer.stop_schedule()
+
+
+def test_next_warm_time_is_before_next_peak():
+    assert next_warm_time(datetime(2025, 8, 20, 7, 0)) == datetime(2025, 8, 20, 7, 30)
+    assert next_warm_time(datetime(2025, 8, 20, 7, 30)) == datetime(2025, 8, 20, 11, 30)
+    assert next_warm_time(datetime(2025, 8, 20, 18, 0)) == datetime(2025, 8, 21, 7, 30)
+
+
+def test_count_favorites_counts_each_user_once():
+    counts = count_favorites([
+        [{'adstrdCodeSe': '11680640'}, {'adstrdCodeSe': '11680640'}, {'dongCode': '11680650'}],
+        {'favorites': [{'dong_code': '11680640'}]},
+        {'data': [{'name': 'no code'}]},
+    ])
+    assert counts == {'11680640': 2, '11680650': 1}
+
+
+def test_invalidate_by_kind_and_dong():
+    cache = PrefetchCache()
+    for key in [('forecast', 'A', 'd'), ('forecast', 'B', 'd'), ('comparison', 'A', 'd')]:
+        cache.put(key, 1)
+    assert cache.invalidate('forecast', 'A') == 1
+    assert not cache.contains(('forecast', 'A', 'd'))
+    assert cache.contains(('forecast', 'B', 'd')) and cache.contains(('comparison', 'A', 'd'))
+    assert cache.invalidate('forecast') == 1
+    assert cache.invalidate() == 1
+
+
+def test_second_schedule_replaces_the_first(warmer, fast_schedule):
+    warmer.start_schedule(lambda: ({'A': 1}, {'source': 'counts'}), top_k=1, description={'source': 'counts'})
+    assert warmer.schedule['replaced_previous'] is False
+    wait_for(lambda: warmer.last_report is not None and warmer.last_report['dongs'] == ['A'])
+
+    warmer.start_schedule(lambda: ({'B': 1}, {'source': 'counts'}), top_k=1, description={'source': 'counts'})
+    assert warmer.schedule['replaced_previous'] is True
+    wait_for(lambda: warmer.last_report['dongs'] == ['B'])
+    assert sum(thread.name == 'favorite-warmer' for thread in threading.enumerate()) == 1
+
+    assert warmer.stop_schedule() is True
+    assert warmer.status()['scheduled'] is False
+
+
+def test_failed_sessions_are_recorded(warmer, fast_schedule):
+    favorites = {'source': 'sessions', 'sessions': 3, 'failed_sessions': 1}
+    warmer.start_schedule(lambda: ({'A': 2}, favorites), top_k=1)
+    wait_for(lambda: warmer.last_report is not None)
+    assert warmer.status()['last_warm']['favorites'] == favorites
+    assert warmer.last_error is None
+
+
+def test_all_sessions_failing_skips_warming(warmer, fast_schedule):
+    warmer.start_schedule(lambda: ({}, {'source': 'sessions', 'sessions': 2, 'failed_sessions': 2}), top_k=1)
+    wait_for(lambda: warmer.last_error is not None)
+    assert warmer.last_report is None
+    assert '실패 세션 2개' in warmer.status()['last_error']
+
+
+def test_schedule_endpoint_replaces_running_schedule(client):
+    first = client.post('/prefetch/schedule', json={'counts': {'11680640': 3}, 'top_k': 1})
+    second = client.post('/prefetch/schedule', json={'counts': {'11680650': 2}, 'top_k': 2})
+    stopped = client.post('/prefetch/schedule', json={'enabled': False})
+    assert first.json()['schedule']['replaced_previous'] is False
+    assert second.json()['schedule'] == {'source': 'counts', 'dongs': 1, 'top_k': 2, 'replaced_previous': True}
+    assert stopped.json()['scheduled'] is False
+
+
+def test_schedule_endpoint_requires_counts_or_sessions(client):
+    assert client.post('/prefetch/schedule', json={'top_k': 3}).status_code == 400
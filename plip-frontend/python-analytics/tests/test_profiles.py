@@ -0,0 +1,64 @@
+"""요일x시간 누적합 색인을 날짜 축 직접 합계와 비교"""
+
+import numpy as np
+import pytest
+
+from conftest import daily_frame
+from cube import MEASURE_NAMES
+from profiles import HourOfWeekIndex
+
+
+def brute_force(cube, rows, date_slice, measure='total'):
+    values = cube.values[rows, date_slice, :, MEASURE_NAMES.index(measure)].astype(np.float64)
+    weekdays = cube.weekdays[date_slice]
+    sums = np.zeros((len(rows), 7, 24))
+    counts = np.zeros((len(rows), 7, 24), dtype=int)
+    for weekday in range(7):
+        block = values[:, weekdays == weekday]
+        sums[:, weekday] = np.nansum(block, axis=1)
+        counts[:, weekday] = (~np.isnan(block)).sum(axis=1)
+    return sums, counts
+
+
+@pytest.mark.parametrize('start, stop', [(0, 45), (3, 17), (10, 11), (40, 45), (5, 5)])
+def test_range_sums_match_brute_force(make_cube, start, stop):
+    cube = make_cube()  # 2025-07-02(수)부터 시작해 첫 주가 잘림
+    rows = np.arange(cube.n_dongs)
+    sums, counts = HourOfWeekIndex().range_sums(cube, rows, slice(start, stop))
+    expected_sums, expected_counts = brute_force(cube, rows, slice(start, stop))
+    np.testing.assert_allclose(sums, expected_sums, rtol=1e-5)
+    np.testing.assert_array_equal(counts, expected_counts)
+
+
+def test_incremental_update_matches_rebuild(make_cube):
+    cube = make_cube()
+    index = HourOfWeekIndex()
+    index.range_sums(cube, np.arange(cube.n_dongs), slice(0, cube.n_dates))
+
+    # 기존 동 하나를 고치고, 새 날짜와 새 동을 추가
+    cube.upsert({'11680001': daily_frame('2025-07-10', 5, seed=99),
+                 '11680000': daily_frame('2025-08-16', 10, seed=100),
+                 '11689999': daily_frame('2025-07-02', 55, seed=101)})
+    rows = np.arange(cube.n_dongs)
+    for date_slice in (slice(0, cube.n_dates), slice(20, 50)):
+        sums, counts = index.range_sums(cube, rows, date_slice)
+        expected_sums, expected_counts = brute_force(cube, rows, date_slice)
+        np.testing.assert_allclose(sums, expected_sums, rtol=1e-5)
+        np.testing.assert_array_equal(counts, expected_counts)
+
+
+def test_profiles_are_means_with_nan_for_empty_cells(make_cube):
+    cube = make_cube()
+    rows = np.array([0, 2])
+    profiles = HourOfWeekIndex().profiles(cube, rows, slice(0, 3), 'local')
+    sums, counts = brute_force(cube, rows, slice(0, 3), 'local')
+    with np.errstate(invalid='ignore'):
+        expected = (sums / np.where(counts > 0, counts, np.nan)).reshape(2, 168)
+    np.testing.assert_allclose(profiles, expected, rtol=1e-5)
+    assert np.isnan(profiles).any()  # 3일 범위라 관측 없는 요일이 있음
+
+
+def test_reversed_range_raises_value_error(make_cube):
+    cube = make_cube()
+    with pytest.raises(ValueError):
+        HourOfWeekIndex().range_sums(cube, np.arange(cube.n_dongs), slice(10, 5))
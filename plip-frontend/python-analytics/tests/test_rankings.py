@@ -0,0 +1,43 @@
+"""Top-K 순위: 입력 검증과 전체 정렬 결과 비교"""
+
+import numpy as np
+import pytest
+
+from profiles import HourOfWeekIndex
+from rankings import RankingIndex
+
+
+@pytest.mark.parametrize('window_days', [-5, 0, 46])
+def test_window_days_out_of_range_raises_value_error(make_cube, window_days):
+    cube = make_cube(days=45)
+    with pytest.raises(ValueError, match='window_days'):
+        RankingIndex(HourOfWeekIndex()).top_k(cube, window_days=window_days)
+
+
+@pytest.mark.parametrize('kwargs', [{'kind': 'busiest_now'}, {'measure': 'visitors'}, {'day_type': 'holiday'},
+                                    {'hour': 24}, {'hour': -1}])
+def test_invalid_arguments_raise_value_error(make_cube, kwargs):
+    with pytest.raises(ValueError):
+        RankingIndex(HourOfWeekIndex()).top_k(make_cube(), **kwargs)
+
+
+def test_busiest_matches_full_sort(make_cube):
+    cube = make_cube(n_dongs=12)
+    result = RankingIndex(HourOfWeekIndex()).top_k(cube, 'busiest', k=4, day_type='weekday', hour=18, window_days=14)
+
+    values = cube.values[:, cube.n_dates - 14:, 18, 0]
+    weekday = cube.weekdays[cube.n_dates - 14:] < 5
+    means = np.nanmean(values[:, weekday], axis=1)
+    expected = [cube.dong_codes[i] for i in np.argsort(-means)[:4]]
+    assert [row['dong_code'] for row in result['ranking']] == expected
+    assert [row['population'] for row in result['ranking']] == pytest.approx(np.sort(means)[::-1][:4], abs=0.01)
+
+
+def test_full_window_is_accepted(make_cube):
+    cube = make_cube(days=45)
+    result = RankingIndex(HourOfWeekIndex()).top_k(cube, 'quietest', k=3, window_days=45)
+    assert len(result['ranking']) == 3
+
+
+def test_rankings_endpoint_rejects_negative_window(client):
+    assert client.get('/rankings/busiest', params={'window_days': -5}).status_code == 400
@@ -0,0 +1,87 @@
+"""계층 예측 조정: 조정 후 최하위 합 = 합계"""
+
+import numpy as np
+import pytest
+
+from reconciliation import grouped_summing_matrix, projection_matrix, reconcile, shrink_covariance, summing_matrix
+
+
+def incoherent_base(S: np.ndarray, T: int = 24, seed: int = 0) -> np.ndarray:
+    """합계 관계가 맞는 예측에 잡음을 더해 합이 어긋난 기본 예측을 만듭니다."""
+    rng = np.random.default_rng(seed)
+    bottom = rng.uniform(100, 1000, (S.shape[1], T))
+    return S @ bottom + rng.normal(0, 50, (S.shape[0], T))
+
+
+def assert_coherent(S: np.ndarray, reconciled: np.ndarray):
+    n_bottom = S.shape[1]
+    bottom = reconciled[-n_bottom:]
+    np.testing.assert_allclose(reconciled, S @ bottom, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize('S', [summing_matrix(3), grouped_summing_matrix([0, 0, 1, 2, 2, 2])])
+@pytest.mark.parametrize('method', ['bottom_up', 'ols'])
+def test_reconciled_bottom_rows_sum_to_totals(S, method):
+    base = incoherent_base(S)
+    assert not np.allclose(base[0], base[-S.shape[1]:].sum(axis=0))
+    assert_coherent(S, reconcile(base, S, method))
+
+
+def test_summing_matrix_totals():
+    S = grouped_summing_matrix([0, 1, 1])
+    assert S.tolist() == [[1, 1, 1], [1, 0, 0], [0, 1, 1], [1, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+
+def test_bottom_up_keeps_bottom_forecasts():
+    S = summing_matrix(3)
+    base = incoherent_base(S)
+    reconciled = reconcile(base, S, 'bottom_up')
+    np.testing.assert_allclose(reconciled[1:], base[1:])
+    np.testing.assert_allclose(reconciled[0], base[1:].sum(axis=0))
+
+
+def test_ols_leaves_coherent_forecasts_unchanged():
+    S = grouped_summing_matrix([0, 0, 1])
+    coherent = S @ np.random.default_rng(1).uniform(0, 100, (3, 10))
+    np.testing.assert_allclose(reconcile(coherent, S, 'ols'), coherent)
+
+
+def test_invalid_methods_raise_value_error():
+    S = summing_matrix(2)
+    with pytest.raises(ValueError):
+        projection_matrix(S, 'median')
+    with pytest.raises(ValueError):
+        projection_matrix(S, 'mint_shrink')  # W 없음
+
+
+def test_segments_endpoint_rejects_unknown_reconcile(client):
+    response = client.post('/predict/segments/11680640', params={'reconcile': 'median'})
+    assert response.status_code == 400
+
+
+def shrink_covariance_reference(residuals: np.ndarray) -> np.ndarray:
+    """(n x n x T) 배열로 직접 계산한 Schäfer-Strimmer 축소 공분산"""
+    n, T = residuals.shape
+    centered = residuals - residuals.mean(axis=1, keepdims=True)
+    sample_cov = centered @ centered.T / T
+    variance = np.diag(sample_cov)
+    standardized = centered / np.sqrt(variance)[:, None]
+    corr = standardized @ standardized.T / T
+    w = np.einsum('it,jt->ijt', standardized, standardized)
+    corr_var = T / (T - 1) ** 3 * ((w - w.mean(axis=2, keepdims=True)) ** 2).sum(axis=2)
+    off_diag = ~np.eye(n, dtype=bool)
+    lam = np.clip(corr_var[off_diag].sum() / (corr[off_diag] ** 2).sum(), 0, 1)
+    return lam * np.diag(variance) + (1 - lam) * sample_cov
+
+
+def test_shrink_covariance_matches_reference():
+    rng = np.random.default_rng(2)
+    residuals = rng.normal(0, 1, (6, 40)) + rng.normal(0, 1, (1, 40))  # 공통 성분으로 상관 부여
+    np.testing.assert_allclose(shrink_covariance(residuals), shrink_covariance_reference(residuals), rtol=1e-10)
+
+
+@pytest.mark.parametrize('S', [summing_matrix(3), grouped_summing_matrix([0, 0, 1, 2, 2, 2])])
+def test_mint_shrink_is_coherent(S):
+    residuals = np.random.default_rng(3).normal(0, 1, (S.shape[0], 60))
+    base = incoherent_base(S)
+    assert_coherent(S, reconcile(base, S, 'mint_shrink', shrink_covariance(residuals)))
@@ -0,0 +1,72 @@
+"""이동 통계 저장소: 증분 갱신 결과를 전체 재계산과 비교"""
+
+import numpy as np
+import pytest
+
+from conftest import daily_frame
+from rolling import RollingStatsStore, ROLLING_WINDOWS, MIN_WINDOW_COVERAGE
+
+
+def assert_same_tables(incremental, rebuilt):
+    n_hours = rebuilt['n_hours']
+    assert incremental['n_hours'] == n_hours
+    np.testing.assert_allclose(incremental['sums'][:, :n_hours + 1], rebuilt['sums'][:, :n_hours + 1], rtol=1e-9)
+    np.testing.assert_array_equal(incremental['counts'][:, :n_hours + 1], rebuilt['counts'][:, :n_hours + 1])
+    np.testing.assert_array_equal(incremental['last_hour'], rebuilt['last_hour'])
+
+
+def test_incremental_append_matches_full_recompute(make_cube):
+    cube = make_cube(n_dongs=5, days=30)
+    store = RollingStatsStore()
+    store._table(cube, 'total')
+
+    updates = [
+        # 모든 동에 새 날짜 추가 (이어 붙이기)
+        {code: daily_frame('2025-08-01', 3, seed=10 + i) for i, code in enumerate(cube.dong_codes)},
+        # 일부 동만 새 날짜 (나머지는 마지막 누적값으로 채움) + 새 동
+        {cube.dong_codes[0]: daily_frame('2025-08-04', 40, seed=20), '11689999': daily_frame('2025-07-20', 10, seed=21)},
+        # 과거 날짜 정정
+        {cube.dong_codes[2]: daily_frame('2025-07-05', 2, seed=30)},
+    ]
+    for update in updates:
+        cube.upsert(update)
+        assert_same_tables(store._table(cube, 'total'), RollingStatsStore()._table(cube, 'total'))
+    assert store.appended_hours > 0
+
+
+def test_correction_that_removes_last_observations(make_cube):
+    cube = make_cube(n_dongs=3, days=20)
+    store = RollingStatsStore()
+    store._table(cube, 'total')
+
+    # 마지막 이틀을 결측으로 정정하면 마지막 관측 시점이 앞으로 이동
+    erased = daily_frame('2025-07-20', 2, seed=40, missing=0)
+    erased['totalPopulation'] = np.nan
+    cube.upsert({cube.dong_codes[1]: erased})
+    incremental = store._table(cube, 'total')
+    assert_same_tables(incremental, RollingStatsStore()._table(cube, 'total'))
+    assert incremental['last_hour'][1] < 18 * 24
+
+
+def test_current_moving_average_matches_direct_mean(make_cube):
+    cube = make_cube(n_dongs=4, days=40)
+    result = RollingStatsStore().current(cube)
+
+    for row, entry in enumerate(result['dongs']):
+        flat = cube.values[row, :, :, 0].astype(np.float64).ravel()
+        last = np.flatnonzero(~np.isnan(flat))[-1]
+        for name, window in ROLLING_WINDOWS.items():
+            values = flat[max(last + 1 - window, 0):last + 1]
+            observed = values[~np.isnan(values)]
+            expected = round(observed.mean(), 1) if len(observed) >= window * MIN_WINDOW_COVERAGE else None
+            assert entry[name] == pytest.approx(expected, abs=0.051)
+
+
+def test_history_daily_uses_end_of_day(make_cube):
+    cube = make_cube(n_dongs=2, days=30)
+    history = RollingStatsStore().history(cube, cube.dong_codes[0], start_date='2025-07-20', end_date='2025-07-25')
+    assert history['time'] == [f'2025-07-{day}' for day in range(20, 26)]
+
+    flat = cube.values[0, :, :, 0].astype(np.float64).ravel()
+    end = (cube.date_slice('2025-07-20').start + 1) * 24
+    assert history['ma_7d'][0] == pytest.approx(round(np.nanmean(flat[end - 7 * 24:end]), 1), abs=0.051)
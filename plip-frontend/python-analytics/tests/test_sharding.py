@@ -0,0 +1,55 @@
+"""샤딩 워커 풀: 워커가 죽거나 작업이 시간을 넘기면 future가 실패하고 워커가 교체됨"""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from sharding import ShardedForecastPool, TaskTimeoutError, WorkerCrashedError
+
+
+class FakePredictor:
+    """동 코드에 따라 정상 훈련 / 프로세스 종료 / 무한 대기하는 예측기"""
+
+    def __init__(self, district=None):
+        self.district = district
+
+    def fetch_population_data(self, dong_code):
+        if dong_code == 'crash':
+            os._exit(9)
+        if dong_code == 'hang':
+            time.sleep(60)
+        return pd.DataFrame({'y': range(48)})
+
+    def train_model(self, df):
+        return {'rows': len(df)}
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = ShardedForecastPool(FakePredictor, n_workers=1, task_timeout=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_train_returns_performance(pool):
+    assert pool.submit('train', 'ok').result(timeout=60) == {'rows': 48}
+
+
+def test_dead_worker_fails_pending_future_and_restarts(pool):
+    restarts = pool.restarts[0]
+    with pytest.raises(WorkerCrashedError):
+        pool.submit('train', 'crash').result(timeout=30)
+    assert pool.restarts[0] == restarts + 1
+    assert pool.submit('train', 'ok').result(timeout=60) == {'rows': 48}
+
+
+def test_task_timeout_fails_future_and_restarts(pool):
+    restarts = pool.restarts[0]
+    start = time.monotonic()
+    with pytest.raises(TaskTimeoutError):
+        pool.submit('train', 'hang').result(timeout=30)
+    assert time.monotonic() - start < 20
+    assert pool.restarts[0] == restarts + 1
+    assert pool.submit('train', 'ok').result(timeout=60) == {'rows': 48}
@@ -0,0 +1,50 @@
+"""유사 동 검색: 입력 검증과 코사인 유사도 직접 계산 비교"""
+
+import numpy as np
+import pytest
+
+from profiles import HourOfWeekIndex
+from similarity import SimilarityIndex, unit_vectors
+
+
+def test_negative_weeks_raises_value_error(make_cube):
+    cube = make_cube()
+    index = SimilarityIndex(HourOfWeekIndex())
+    with pytest.raises(ValueError, match='weeks'):
+        index.similar(cube, [cube.dong_codes[0]], weeks=-1)
+    with pytest.raises(ValueError, match='weeks'):
+        index.clusters(cube, weeks=-2)
+
+
+def test_window_without_observations_raises_value_error(make_cube):
+    cube = make_cube()  # 합성 데이터에 장기체류 외국인(long) 값이 없음
+    with pytest.raises(ValueError, match='관측이 있는 동이 없습니다'):
+        SimilarityIndex(HourOfWeekIndex()).clusters(cube, measure='long')
+
+
+def test_similar_matches_brute_force_cosine(make_cube):
+    cube = make_cube(n_dongs=10)
+    profile_index = HourOfWeekIndex()
+    result = SimilarityIndex(profile_index).similar(cube, [cube.dong_codes[3]], k=4, weeks=4)
+
+    start = cube.n_dates - 4 * 7
+    vectors = unit_vectors(profile_index.profiles(cube, np.arange(cube.n_dongs), slice(start, cube.n_dates)))
+    similarity = vectors @ vectors[3]
+    similarity[3] = -np.inf
+    expected = [cube.dong_codes[i] for i in np.argsort(-similarity)[:4]]
+    assert [row['dong_code'] for row in result['similar']] == expected
+    assert [row['similarity'] for row in result['similar']] == pytest.approx(np.sort(similarity)[::-1][:4], abs=1e-4)
+
+
+def test_similar_endpoint_accepts_loaded_code(client, make_cube, monkeypatch):
+    import main
+
+    cube = make_cube(n_dongs=6)
+    monkeypatch.setattr(main, 'population_cube', cube)
+    response = client.get('/similar/11680002', params={'k': 3, 'weeks': 4})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body['similar']) == 3
+    assert '11680002' not in [row['dong_code'] for row in body['similar']]
+
+    assert client.get('/similar/11689999').status_code == 404
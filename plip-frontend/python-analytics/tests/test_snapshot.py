@@ -0,0 +1,72 @@
+"""큐브 스냅샷 저장/매핑과 오래된 스냅샷 정리"""
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import daily_frame
+from snapshot import CURRENT_FILE, current_snapshot, load_cube_snapshot, save_cube_snapshot
+
+
+def snapshot_dirs(root):
+    return sorted(name for name in os.listdir(root) if name != CURRENT_FILE)
+
+
+def test_round_trip_preserves_cube(make_cube, tmp_path):
+    cube = make_cube(n_dongs=4, days=20)
+    manifest = save_cube_snapshot(cube, str(tmp_path))
+    loaded = load_cube_snapshot(root=str(tmp_path))
+
+    assert loaded.snapshot_path == manifest['path'] == current_snapshot(str(tmp_path))
+    assert loaded.dong_codes == cube.dong_codes
+    assert (loaded.start_date, loaded.n_dates, loaded.version) == (cube.start_date, cube.n_dates, cube.version)
+    assert loaded.last_dates == cube.last_dates
+    np.testing.assert_array_equal(loaded.values, cube.values)
+    np.testing.assert_allclose(loaded.daily_means(), cube.daily_means(), rtol=1e-6)
+    assert not loaded.values.flags.writeable  # 읽기 전용 메모리 맵
+
+
+def test_snapshot_from_mmap_becomes_writable_on_upsert(make_cube, tmp_path):
+    save_cube_snapshot(make_cube(n_dongs=2, days=10), str(tmp_path))
+    loaded = load_cube_snapshot(root=str(tmp_path))
+    loaded.upsert({loaded.dong_codes[0]: daily_frame('2025-07-12', 2, seed=5)})
+    assert loaded.n_dates == 12 and loaded.values.flags.writeable
+
+
+def test_prune_keeps_latest_saves(make_cube, tmp_path):
+    cube = make_cube(n_dongs=2, days=10)
+    for _ in range(5):
+        save_cube_snapshot(cube, str(tmp_path), keep=3)  # 같은 큐브 버전으로 여러 번 저장
+    assert snapshot_dirs(tmp_path) == ['v000003', 'v000004', 'v000005']
+    assert current_snapshot(str(tmp_path)).endswith('v000005')
+
+
+def test_lower_cube_version_does_not_delete_its_own_snapshot(make_cube, tmp_path):
+    newer = make_cube(n_dongs=2, days=10)
+    for seed in range(3):
+        newer.upsert({newer.dong_codes[0]: daily_frame('2025-07-05', 1, seed=seed)})
+        save_cube_snapshot(newer, str(tmp_path), keep=2)
+    older = make_cube(n_dongs=3, days=10)  # 버전 1
+    assert older.version < newer.version
+
+    manifest = save_cube_snapshot(older, str(tmp_path), keep=2)
+    assert os.path.isdir(manifest['path'])
+    assert current_snapshot(str(tmp_path)) == manifest['path']
+    assert load_cube_snapshot(root=str(tmp_path)).dong_codes == older.dong_codes
+    assert len(snapshot_dirs(tmp_path)) == 2
+
+
+def test_incomplete_snapshot_dirs_are_left_alone(make_cube, tmp_path):
+    os.mkdir(tmp_path / 'v000001')  # 다른 프로세스가 작성 중인 디렉터리 (매니페스트 없음)
+    manifest = save_cube_snapshot(make_cube(n_dongs=2, days=5), str(tmp_path), keep=1)
+    assert manifest['path'].endswith('v000002')
+    assert snapshot_dirs(tmp_path) == ['v000001', 'v000002']
+
+
+def test_empty_cube_cannot_be_saved(tmp_path):
+    from cube import PopulationCube
+    with pytest.raises(ValueError):
+        save_cube_snapshot(PopulationCube(), str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        load_cube_snapshot(root=str(tmp_path))
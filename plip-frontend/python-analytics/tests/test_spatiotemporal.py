@@ -0,0 +1,104 @@
+"""전역 시공간 모델: 예측 모양, 이웃 없는 동 처리, 백테스트 결과 키"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import adjacency
+from spatiotemporal import SpatioTemporalForecaster, SpatioTemporalModel
+
+
+class ChainAdjacency:
+    """동 순서대로 앞뒤 동이 이웃인 인접 그래프 (isolated에 든 동은 이웃 없음)"""
+
+    def __init__(self, isolated=()):
+        self.isolated = set(isolated)
+
+    def weights(self, dong_codes, weighting='row'):
+        n = len(dong_codes)
+        matrix = np.zeros((n, n))
+        for i in range(n - 1):
+            if dong_codes[i] not in self.isolated and dong_codes[i + 1] not in self.isolated:
+                matrix[i, i + 1] = matrix[i + 1, i] = 1
+        totals = matrix.sum(axis=1, keepdims=True)
+        return sparse.csr_matrix(np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0))
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    def install(isolated=()):
+        monkeypatch.setattr(adjacency, 'load_dong_adjacency', lambda *args: ChainAdjacency(isolated))
+    install()
+    return install
+
+
+def test_forecast_shape_and_dates(make_cube, chain):
+    cube = make_cube(n_dongs=5)
+    forecaster = SpatioTemporalForecaster()
+    result = forecaster.forecast(cube, ['11680001', '11680003'], days=3)
+    assert result['dates'] == ['2025-08-16', '2025-08-17', '2025-08-18']
+    assert [row['dong_code'] for row in result['forecasts']] == ['11680001', '11680003']
+    for row in result['forecasts']:
+        hourly = np.array(row['hourly'])
+        assert hourly.shape == (3, 24)
+        assert np.isfinite(hourly).all() and (hourly >= 0).all()
+    assert result['model']['neighbor_edges'] == 4
+
+    model = forecaster.model(cube)
+    assert model.forecast(5).shape == (5, 5, 24)
+    # 같은 큐브 버전이면 다시 학습하지 않음
+    forecaster.forecast(cube, days=2)
+    assert forecaster.fits == 1
+
+
+def test_forecast_rejects_bad_horizon(make_cube, chain):
+    with pytest.raises(ValueError, match='days'):
+        SpatioTemporalForecaster().forecast(make_cube(), days=0)
+
+
+def test_isolated_dong_still_forecast(make_cube, chain):
+    chain(isolated={'11680002'})
+    cube = make_cube(n_dongs=5)
+    predicted = SpatioTemporalModel(cube).forecast(4)
+    assert np.isfinite(predicted).all()
+    assert predicted[2].max() > 0
+
+
+def test_no_neighbors_falls_back_to_profile(make_cube, chain):
+    cube = make_cube(n_dongs=4)
+    chain(isolated=set(cube.dong_codes))
+    model = SpatioTemporalModel(cube)
+    assert model.info()['neighbor_edges'] == 0
+    # 이웃 특성이 모두 결측이라 학습 표본이 없고 계수는 0 -> 프로파일 기준선과 같음
+    assert model.samples == 0
+    np.testing.assert_allclose(model.forecast(3), model.profile_forecast(3))
+
+
+def test_backtest_reports_each_model(make_cube, chain):
+    result = SpatioTemporalForecaster().backtest(make_cube(n_dongs=5), test_days=5)
+    assert result['train_end'] == '2025-08-10'
+    assert result['test_days'] == 5
+    assert set(result['models']) == {'global_neighbors', 'global_own_only', 'profile_baseline'}
+    for name in ('global_neighbors', 'global_own_only'):
+        scores = result['models'][name]
+        assert {'mae', 'mape', 'points', 'fit_ms', 'forecast_ms', 'by_horizon_mae'} <= set(scores)
+        assert len(scores['by_horizon_mae']) == 5
+        assert scores['points'] > 0
+    assert set(result['coefficients']) == {
+        'intercept', 'own_lag_1d', 'own_lag_7d', 'own_mean_7d', 'neighbor_lag_1d', 'neighbor_lag_7d', 'neighbor_mean_7d'
+    }
+
+
+def test_backtest_rejects_empty_cube():
+    from cube import PopulationCube
+    with pytest.raises(ValueError, match='비어'):
+        SpatioTemporalForecaster().backtest(PopulationCube())
+
+
+def test_main_import_does_not_load_scipy():
+    code = "import sys, main; sys.exit(any(name.startswith('scipy') for name in sys.modules))"
+    assert subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(adjacency.__file__))).returncode == 0
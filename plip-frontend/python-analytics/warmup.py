@@ -0,0 +1,94 @@
+"""
+서버 콜드 스타트 워밍업
+
+Prophet(cmdstanpy) 같은 무거운 모듈은 main.py 임포트 시점에 로드하지 않고,
+서버가 뜬 직후 백그라운드 스레드에서 미리 로드합니다.
+'/'는 프로세스 생존 확인(liveness)용으로 바로 응답하고,
+'/ready'는 워밍업이 끝나 첫 훈련/예측을 바로 처리할 수 있을 때만 200을 돌려줍니다.
+"""
+
+from typing import Any, Dict, List
+import importlib
+import threading
+import time
+
+# 백그라운드에서 미리 임포트하는 무거운 모듈
+HEAVY_MODULES = ('prophet', 'prophet.diagnostics')
+
+
+class Warmup:
+    """무거운 모듈 임포트와 Stan 백엔드 로드를 한 번만 수행합니다."""
+
+    def __init__(self, modules=HEAVY_MODULES):
+        self.modules = modules
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.error: str = None
+        self._done = threading.Event()
+        self._thread: threading.Thread = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._done.is_set() and self.error is None
+
+    def start(self):
+        """워밍업 스레드를 시작합니다 (이미 시작했으면 무시)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _run(self):
+        try:
+            for name in self.modules:
+                start = time.perf_counter()
+                importlib.import_module(name)
+                self.timings[name] = time.perf_counter() - start
+
+            # Prophet 인스턴스를 한 번 만들어 Stan 모델 파일 로드까지 끝내 둠
+            start = time.perf_counter()
+            from prophet import Prophet
+            Prophet()
+            self.timings['stan_backend'] = time.perf_counter() - start
+            print(f"✅ 워밍업 완료: {sum(self.timings.values()):.2f}초")
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"❌ 워밍업 실패: {self.error}")
+        finally:
+            self.timings['total_since_start'] = time.perf_counter() - self.started_at
+            self._done.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self.is_ready,
+            'finished': self._done.is_set(),
+            'error': self.error,
+            'timings_seconds': {k: round(v, 3) for k, v in self.timings.items()}
+        }
+
+
+def parse_importtime(stderr: str, top: int = 15) -> List[Dict[str, Any]]:
+    """`python -X importtime` 출력에서 누적 시간이 큰 모듈 상위 목록을 뽑습니다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        name = parts[2].rstrip()
+        rows.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_ms': self_us / 1000,
+            'cumulative_ms': cumulative_us / 1000
+        })
+    rows.sort(key=lambda r: r['cumulative_ms'], reverse=True)
+    return rows[:top]
@@ -281,9 +281,10 @@ export const pythonApiClient = {
   },
 
   // 시간대별 인구 수요 예측 (Prophet)
-  async predictHourlyPopulation(dongCode, targetDate = null, hours = null) {
+  async predictHourlyPopulation(dongCode, targetDate = null, hours = null, intervalMode = null) {
     const params = new URLSearchParams();
     if (targetDate) params.append('target_date', targetDate);
+    if (intervalMode) params.append('interval_mode', intervalMode);
     
     const endpoint = `/predict/hourly/${dongCode}${params.toString() ? '?' + params.toString() : ''}`;
     const body = hours ? JSON.stringify(hours) : null;
@@ -293,6 +294,183 @@ export const pythonApiClient = {
     });
   },
 
+  // 세그먼트별(총인구/내국인/장기/단기 외국인) 예측
+  async predictSegmentPopulation(dongCode, targetDate = null, days = 1, reconcile = 'ols') {
+    const params = new URLSearchParams({ days: String(days), reconcile });
+    if (targetDate) params.append('target_date', targetDate);
+    return this.request(`/predict/segments/${dongCode}?${params.toString()}`, {
+      method: 'POST',
+    });
+  },
+
+  // 구 전체 계층 예측 실행 (동 → 구 조정)
+  async runHierarchicalForecast(district = 'gangnam', targetDate = null, days = 1, method = 'mint_shrink') {
+    const params = new URLSearchParams({ days: String(days), method });
+    if (targetDate) params.append('target_date', targetDate);
+    return this.request(`/hierarchy/${district}/forecast?${params.toString()}`, {
+      method: 'POST',
+    });
+  },
+
+  // 사전 계산된 구 합계 예측 조회
+  async getDistrictForecast(district = 'gangnam') {
+    return this.request(`/hierarchy/${district}`);
+  },
+
+  // 사전 계산된 동별 계층 예측 조회
+  async getDongHierarchicalForecast(district, dongCode) {
+    return this.request(`/hierarchy/${district}/dongs/${dongCode}`);
+  },
+
+  // 성별 x 연령대 시간대 예측
+  async getDemographicForecast(dongCode, targetDate = null, days = 1) {
+    const params = new URLSearchParams({ days: String(days) });
+    if (targetDate) params.append('target_date', targetDate);
+    return this.request(`/demographics/${dongCode}?${params.toString()}`);
+  },
+
+  // 여러 동 x 날짜 배치 예측 (requests: [{ dong_code, start_date, end_date, hours }])
+  async predictBatch(requests, intervalMode = 'conformal') {
+    return this.request('/predict/batch', {
+      method: 'POST',
+      body: JSON.stringify({ requests, interval_mode: intervalMode }),
+    });
+  },
+
+  // 인구 큐브 통계 (kind: daily | day-night | time-week | weekday-weekend)
+  async getCubeStats(dongCode, kind, measure = 'total', startDate = null, endDate = null) {
+    const params = new URLSearchParams({ measure });
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    return this.request(`/cube/dongs/${dongCode}/stats/${kind}?${params.toString()}`);
+  },
+
+  // 인구 큐브 group-by 집계 (query: { group_by, measures, aggs, district, dong_codes, start_date, end_date, hours, weekdays })
+  async aggregatePopulation(query) {
+    return this.request('/aggregate', {
+      method: 'POST',
+      body: JSON.stringify(query),
+    });
+  },
+
+  // 여러 동 비교 (프로파일, 피크 시간, 주간/야간, 주중/주말, 상관/거리 행렬)
+  async compareDongs(dongCodes, measure = 'total', startDate = null, endDate = null) {
+    return this.request('/compare', {
+      method: 'POST',
+      body: JSON.stringify({ dong_codes: dongCodes, measure, start_date: startDate, end_date: endDate }),
+    });
+  },
+
+  // 동 순위 Top-K (busiest, quietest, growth, decline)
+  async getRankings(kind = 'busiest', { k = 5, district = null, measure = 'total', dayType = 'all', hour = null } = {}) {
+    const params = new URLSearchParams({ k, measure, day_type: dayType });
+    if (district) params.append('district', district);
+    if (hour !== null) params.append('hour', hour);
+    return this.request(`/rankings/${kind}?${params.toString()}`);
+  },
+
+  // 이상치 조회 ({ dongCode, district, startDate, endDate, minScore, limit })
+  async getAnomalies({ dongCode = null, district = null, startDate = null, endDate = null, minScore = null, limit = 100 } = {}) {
+    const params = new URLSearchParams({ limit });
+    if (dongCode) params.append('dong_code', dongCode);
+    if (district) params.append('district', district);
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    if (minScore !== null) params.append('min_score', minScore);
+    return this.request(`/anomalies?${params.toString()}`);
+  },
+
+  // 동별 수준 변화점
+  async getChangePoints(dongCode, startDate = null, endDate = null) {
+    const params = new URLSearchParams({ dong_code: dongCode });
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    return this.request(`/anomalies/change-points?${params.toString()}`);
+  },
+
+  // 프로파일이 비슷한 동 (dong: 코드 또는 이름)
+  async getSimilarDongs(dong, k = 10, district = null) {
+    const params = new URLSearchParams({ k });
+    if (district) params.append('district', district);
+    return this.request(`/similar/${encodeURIComponent(dong)}?${params.toString()}`);
+  },
+
+  // 프로파일 모양 기준 동 군집
+  async getDongClusters(nClusters = 8) {
+    return this.request(`/clusters?n_clusters=${nClusters}`);
+  },
+
+  // 7일/28일 이동평균, 전주 대비 증감 (현재값)
+  async getRollingStats(dongCode = null, district = null) {
+    const params = new URLSearchParams();
+    if (dongCode) params.append('dong_code', dongCode);
+    if (district) params.append('district', district);
+    return this.request(`/rolling${params.toString() ? '?' + params.toString() : ''}`);
+  },
+
+  // 이동 통계 이력
+  async getRollingHistory(dongCode, startDate = null, endDate = null, resolution = 'daily') {
+    const params = new URLSearchParams({ resolution });
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    return this.request(`/rolling/${dongCode}/history?${params.toString()}`);
+  },
+
+  // 좌표 -> 행정동 (points: [[lat, lon], ...])
+  async locateDongs(points) {
+    return this.request('/geo/locate', {
+      method: 'POST',
+      body: JSON.stringify({ points }),
+    });
+  },
+
+  // 이웃 동과 최근 이동 통계 비교
+  async getDongNeighbors(dongCode) {
+    return this.request(`/geo/neighbors/${dongCode}`);
+  },
+
+  // 단계구분도 (layer: 'district' | 'dong', metric: 'population' | 'forecast' | 'density')
+  async getChoropleth(layer, zoom, metric = 'population', date = null, hour = null, measure = 'total') {
+    const params = new URLSearchParams({ zoom, metric, measure });
+    if (date) params.append('date', date);
+    if (hour !== null && hour !== undefined) params.append('hour', hour);
+    return this.request(`/choropleth/${layer}?${params.toString()}`);
+  },
+
+  // 구 인구밀도 참조표 (district 생략 시 전체)
+  async getDensity(district = null) {
+    return this.request(`/density${district ? `?district=${encodeURIComponent(district)}` : ''}`);
+  },
+
+  // 구별 시간대 생활인구 밀도
+  async getLiveDensity(startDate = null, endDate = null, measure = 'total') {
+    const params = new URLSearchParams({ measure });
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    return this.request(`/density/live?${params.toString()}`);
+  },
+
+  // 이웃 동 특성 전역 모델 예측 (dongCode 또는 district, 둘 다 없으면 전체)
+  async predictSpatial({ dongCode = null, district = null, days = 7, measure = 'total' } = {}) {
+    const params = new URLSearchParams({ days, measure });
+    if (dongCode) params.append('dong_code', dongCode);
+    if (district) params.append('district', district);
+    return this.request(`/predict/spatial?${params.toString()}`);
+  },
+
+  // 즐겨찾기 워밍으로 미리 계산한 결과 (kind: 'forecast' | 'comparison' | 'insights')
+  async getPrefetched(kind, dongCode, date = null) {
+    return this.request(`/prefetch/${kind}/${dongCode}${date ? `?date=${date}` : ''}`);
+  },
+
+  // 예측 성분 분해 (추세/계절성/리그레서 기여, dongCode 생략 시 현재 훈련된 모델)
+  async explainForecast(dongCode = null, targetDate = null, includeTables = false) {
+    const params = new URLSearchParams();
+    if (targetDate) params.append('target_date', targetDate);
+    if (includeTables) params.append('include_tables', 'true');
+    return this.request(`/predict/explain${dongCode ? `/${dongCode}` : ''}?${params.toString()}`);
+  },
+
   // 예측 결과와 실제 데이터 비교
   async predictWithComparison(dongCode, targetDate = null) {
     const params = new URLSearchParams();